@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 效能基準測試
+離線執行（不需要 VS Code、Copilot 或網路），結果以 JSON 寫入 benchmarks/results/ 供前後比較
+"""
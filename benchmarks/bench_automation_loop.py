@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Copilot 互動流程基準測試（不需要 VS Code / 顯示器）
+
+以 SimulatedCopilotDriver 取代 pyautogui / pyperclip，執行 CopilotHandler.process_project_with_line_by_line：
+- 虛擬時鐘：固定等待（sleep）只推進虛擬時間，數百行的流程在數秒內跑完
+- 情境：ideal（無異常）與 faults（速率限制、截斷、通知遮擋依參數比例發生）
+- 延遲模式：fixed（原本的固定延遲）與 adaptive（ui_delays 依畫面變化調整）
+
+每個案例報告虛擬時間的吞吐量（行/小時）、sleep 中 Copilot 並未生成的額外負擔、重試次數，
+以及執行模擬本身的實際耗時（median / min / max）
+
+使用方式：
+    python -m benchmarks.bench_automation_loop --lines 50 --latency 20 --rate-limit 0.05
+    python -m benchmarks.bench_automation_loop --compare benchmarks/results/automation_loop_20250101_120000.json
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    compare_results,
+    format_summary,
+    load_results,
+    run_metadata,
+    time_call,
+    write_results,
+)
+from config.config import config
+from src.copilot_handler import CopilotHandler
+from src.simulated_copilot import SimulatedCopilotDriver, SimulationProfile
+from src.ui_delay_controller import ui_delays
+from src.ui_driver import use_ui_driver
+
+DELAY_MODES = ("fixed", "adaptive")
+
+
+@contextmanager
+def simulated_environment(driver: SimulatedCopilotDriver, workdir: Path, adaptive: bool,
+                          timeout: float) -> Iterator[SimulatedCopilotDriver]:
+    """
+    以模擬驅動執行互動流程：回應檔案與 UI 延遲設定檔寫到暫存資料夾，結束後還原設定
+
+    Args:
+        driver: 模擬驅動
+        workdir: 暫存資料夾
+        adaptive: 是否啟用自適應 UI 延遲
+        timeout: 等待單一回應的最長虛擬秒數
+    """
+    overrides = {
+        "EXECUTION_RESULT_DIR": workdir / "ExecutionResult",
+        "RESPONSE_CAPTURE_MODE": "clipboard",
+        "SMART_WAIT_ENABLED": True,
+        "COPILOT_RESPONSE_TIMEOUT": timeout,
+    }
+    config_class = type(config)
+    saved = {name: getattr(config_class, name) for name in overrides}
+    saved_delays = (ui_delays.profile_path, ui_delays.enabled)
+
+    for name, value in overrides.items():
+        setattr(config_class, name, value)
+    # 模擬的觀測值不可寫進本機的延遲設定檔
+    ui_delays.profile_path = workdir / "ui_delays.json"
+    ui_delays.enabled = adaptive
+    ui_delays.reset()
+    try:
+        with use_ui_driver(driver):
+            yield driver
+    finally:
+        for name, value in saved.items():
+            setattr(config_class, name, value)
+        ui_delays.reset()
+        ui_delays.profile_path, ui_delays.enabled = saved_delays
+
+
+def make_prompt_lines(count: int) -> List[str]:
+    """產生與 prompts/ 相同格式的 prompt 行"""
+    return [f"請幫我定位到pkg/module_{i % 10}.py的handler_{i}()的函式，並直接實作任何你覺得可行的程式碼"
+            for i in range(count)]
+
+
+def run_simulation(profile: SimulationProfile, prompt_lines: List[str], workdir: Path,
+                   adaptive: bool, chain: bool = False, timeout: float = 3600) -> Dict[str, Any]:
+    """
+    以模擬驅動處理一輪 prompt 行
+
+    Args:
+        profile: 模擬參數
+        prompt_lines: prompt 行
+        workdir: 暫存資料夾（專案與回應檔案）
+        adaptive: 是否啟用自適應 UI 延遲
+        chain: 是否啟用回應串接
+        timeout: 等待單一回應的最長虛擬秒數
+
+    Returns:
+        Dict[str, Any]: 虛擬時間的吞吐量、額外負擔與模擬統計
+    """
+    project_dir = Path(tempfile.mkdtemp(prefix="sim_project_", dir=workdir))
+    (project_dir / config.PROJECT_PROMPT_FILENAME).write_text("\n".join(prompt_lines) + "\n", encoding="utf-8")
+
+    driver = SimulatedCopilotDriver(profile)
+    with simulated_environment(driver, workdir, adaptive, timeout):
+        handler = CopilotHandler(interaction_settings={"include_previous_response": chain})
+        _, succeeded, failed = handler.process_project_with_line_by_line(str(project_dir), round_number=1)
+
+    stats = driver.stats
+    elapsed = driver.clock.now
+    return {
+        "lines": len(prompt_lines),
+        "succeeded": succeeded,
+        "failed": len(failed),
+        "virtual_seconds": elapsed,
+        "lines_per_hour": succeeded * 3600 / elapsed if elapsed else 0.0,
+        "seconds_per_line": elapsed / succeeded if succeeded else None,
+        "overhead_per_line": stats.overhead_seconds / succeeded if succeeded else None,
+        "retries": stats.submits - succeeded,
+        **stats.to_dict(),
+    }
+
+
+def run_benchmarks(profile: SimulationProfile, lines: int, workdir: Path, repeat: int,
+                   chain: bool = False) -> Dict[str, Dict]:
+    """
+    執行所有案例
+
+    Args:
+        profile: faults 情境的模擬參數（ideal 情境使用相同延遲但不發生異常）
+        lines: 每輪的 prompt 行數
+        workdir: 暫存資料夾
+        repeat: 每個案例的重複次數（虛擬時間結果取最後一次）
+        chain: 是否啟用回應串接
+
+    Returns:
+        Dict[str, Dict]: 案例名稱 -> 計時與模擬結果
+    """
+    prompt_lines = make_prompt_lines(lines)
+    scenarios = {
+        "ideal": replace(profile, rate_limit_rate=0.0, truncated_rate=0.0, notification_rate=0.0),
+        "faults": profile,
+    }
+    timeout = max(600.0, profile.response_latency * (1 + profile.latency_jitter) * 10)
+    results: Dict[str, Dict] = {}
+    for scenario, scenario_profile in scenarios.items():
+        for mode in DELAY_MODES:
+            stats = time_call(lambda: run_simulation(scenario_profile, prompt_lines, workdir,
+                                                     mode == "adaptive", chain, timeout), repeat)
+            simulation = stats.pop("result")
+            results[f"loop[{scenario},{mode}]"] = {**stats, **simulation}
+    return results
+
+
+def format_simulation(results: Dict[str, Dict]) -> str:
+    """虛擬時間結果的文字表格"""
+    lines = [f"{'case':<28} {'ok/lines':>9} {'lines/h':>9} {'s/line':>8} "
+             f"{'overhead/line':>14} {'retries':>8} {'premature':>10}"]
+    for case, result in results.items():
+        seconds_per_line = result["seconds_per_line"]
+        overhead = result["overhead_per_line"]
+        lines.append(
+            f"{case:<28} {result['succeeded']:>4}/{result['lines']:<4} {result['lines_per_hour']:>9.1f} "
+            f"{seconds_per_line if seconds_per_line is not None else float('nan'):>8.1f} "
+            f"{overhead if overhead is not None else float('nan'):>14.2f} "
+            f"{result['retries']:>8} {result['premature_copies']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    defaults = SimulationProfile()
+    parser = argparse.ArgumentParser(description="Copilot 互動流程基準測試（模擬 VS Code / Copilot）")
+    parser.add_argument("--lines", type=int, default=30, help="每輪的 prompt 行數")
+    parser.add_argument("--latency", type=float, default=defaults.response_latency, help="回應生成的平均秒數")
+    parser.add_argument("--jitter", type=float, default=defaults.latency_jitter, help="延遲的隨機變動比例")
+    parser.add_argument("--chars", type=int, default=defaults.response_chars, help="回應的平均字元數")
+    parser.add_argument("--rate-limit", type=float, default=0.05, help="faults 情境每次送出觸發速率限制的機率")
+    parser.add_argument("--rate-limit-window", type=float, default=defaults.rate_limit_window,
+                        help="速率限制持續的秒數")
+    parser.add_argument("--truncated", type=float, default=0.05, help="faults 情境回應被截斷的機率")
+    parser.add_argument("--notifications", type=float, default=0.1, help="faults 情境出現通知遮擋的機率")
+    parser.add_argument("--ui-latency", type=float, default=defaults.ui_latency, help="按鍵後畫面更新的秒數")
+    parser.add_argument("--chain", action="store_true", help="啟用回應串接")
+    parser.add_argument("--repeat", type=int, default=1, help="每個案例的重複次數")
+    parser.add_argument("--seed", type=int, default=0, help="亂數種子")
+    parser.add_argument("--output", type=Path, help="結果 JSON（預設為 benchmarks/results/automation_loop_<時間>.json）")
+    parser.add_argument("--compare", type=Path, help="與先前的結果 JSON 比較")
+    parser.add_argument("--keep", action="store_true", help="保留模擬的專案與回應檔案")
+    args = parser.parse_args(argv)
+
+    profile = SimulationProfile(
+        response_latency=args.latency, latency_jitter=args.jitter, response_chars=args.chars,
+        rate_limit_rate=args.rate_limit, rate_limit_window=args.rate_limit_window,
+        truncated_rate=args.truncated, notification_rate=args.notifications,
+        ui_latency=args.ui_latency, seed=args.seed,
+    )
+    workdir = Path(tempfile.mkdtemp(prefix="bench_automation_loop_"))
+    try:
+        results = run_benchmarks(profile, args.lines, workdir, args.repeat, args.chain)
+    finally:
+        if args.keep:
+            print(f"模擬的專案與回應檔案: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    metadata = run_metadata(lines=args.lines, chain=args.chain, repeat=args.repeat,
+                            profile=vars(profile))
+    output = write_results("automation_loop", metadata, results, args.output)
+    print(format_summary(results))
+    print()
+    print(format_simulation(results))
+    print(f"\n結果已寫入: {output}")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        if baseline is None:
+            print(f"無法讀取比較基準: {args.compare}")
+            return 1
+        print()
+        print(compare_results(baseline, {"results": results}, key="seconds_per_line"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+CWE 掃描流程基準測試
+
+以合成專案計時：
+- CWEDetector._extract_function_info（所有函式）
+- CWEDetector._aggregate_vulnerabilities_by_function
+- CWEDetector.scan_single_file（每個 CWE 掃描所有檔案）
+- CWEDetector.scan_project
+- CWEScanManager.scan_from_prompt_function_level（所有 prompt 行，端到端含 CSV 寫入）
+
+未安裝 Bandit / Semgrep 時，需要掃描器的案例標記為 skipped；掃描結果寫到暫存資料夾，不會影響 OriginalScanResult / CWE_Result
+
+使用方式：
+    python -m benchmarks.bench_cwe_scan --files 20 --functions 10 --density 0.3 --repeat 3
+    python -m benchmarks.bench_cwe_scan --compare benchmarks/results/cwe_scan_20250101_120000.json
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    compare_results,
+    format_summary,
+    load_results,
+    run_metadata,
+    time_call,
+    write_results,
+)
+from benchmarks.synthetic_project import VULNERABILITY_PATTERNS, SyntheticProject, generate_project
+from src.cwe_detector import CWEDetector, CWEVulnerability, ScannerType
+from src.cwe_scan_manager import CWEScanManager
+
+
+def _redirect_detector_output(detector: CWEDetector, workdir: Path):
+    """原始掃描報告改寫到暫存資料夾"""
+    detector.original_scan_dir = workdir / "OriginalScanResult"
+    detector.bandit_original_dir = detector.original_scan_dir / "Bandit"
+    detector.semgrep_original_dir = detector.original_scan_dir / "Semgrep"
+    detector.bandit_original_dir.mkdir(parents=True, exist_ok=True)
+    detector.semgrep_original_dir.mkdir(parents=True, exist_ok=True)
+
+
+def _synthetic_vulnerabilities(project: SyntheticProject, duplicates: int) -> List[CWEVulnerability]:
+    """依植入的漏洞建立掃描結果（每個函式重複 duplicates 次、兩種掃描器），供聚合計時"""
+    vulnerabilities = []
+    for function in project.vulnerable:
+        for scanner in (ScannerType.BANDIT, ScannerType.SEMGREP):
+            for i in range(duplicates):
+                vulnerabilities.append(CWEVulnerability(
+                    cwe_id=function.cwe,
+                    file_path=str(project.root / function.file_path),
+                    line_start=function.vuln_line + i,
+                    line_end=function.vuln_line + i,
+                    function_name=function.name,
+                    function_start=function.start,
+                    function_end=function.end,
+                    scanner=scanner,
+                    severity=("LOW", "MEDIUM", "HIGH")[i % 3],
+                    confidence=("HIGH", "MEDIUM", "LOW")[i % 3],
+                    description=f"synthetic issue {i}",
+                ))
+    return vulnerabilities
+
+
+def _strip(stats: Dict[str, Any], **info) -> Dict[str, Any]:
+    """移除不可序列化的返回值，加上案例資訊"""
+    stats = {key: value for key, value in stats.items() if key != "result"}
+    stats.update(info)
+    return stats
+
+
+def run_benchmarks(project: SyntheticProject, workdir: Path, cwes: List[str], repeat: int) -> Dict[str, Dict]:
+    """
+    執行所有案例
+
+    Args:
+        project: 合成專案
+        workdir: 掃描結果的暫存資料夾
+        cwes: 要掃描的 CWE
+        repeat: 每個案例的重複次數
+
+    Returns:
+        Dict[str, Dict]: 案例名稱 -> 計時結果
+    """
+    manager = CWEScanManager(output_dir=workdir / "CWE_Result")
+    detector = manager.detector
+    _redirect_detector_output(detector, workdir)
+    has_scanner = bool(detector.available_scanners)
+    results: Dict[str, Dict] = {}
+
+    # 1. 函式資訊擷取（有漏洞的函式查漏洞行，其他查函式中間的行）
+    def extract_all():
+        matched = 0
+        for function in project.functions:
+            line = function.vuln_line or (function.start + function.end) // 2
+            name, _, _ = detector._extract_function_info(project.root / function.file_path, line)
+            matched += name == function.name
+        return matched
+
+    stats = time_call(extract_all, repeat)
+    results["extract_function_info"] = _strip(stats, calls=len(project.functions),
+                                              matched=stats["result"])
+
+    # 2. 漏洞聚合（會修改輸入，每次重建）
+    stats = time_call(detector._aggregate_vulnerabilities_by_function, repeat,
+                      setup=lambda: _synthetic_vulnerabilities(project, duplicates=3))
+    results["aggregate_by_function"] = _strip(stats, input=len(project.vulnerable) * 6,
+                                              output=len(stats["result"]))
+
+    # 3、4. 需要掃描器的案例
+    for cwe in cwes:
+        case = f"scan_single_file[CWE-{cwe}]"
+        if not has_scanner:
+            results[case] = {"skipped": "Bandit / Semgrep 未安裝"}
+            continue
+
+        def scan_files(cwe=cwe):
+            return sum(len(detector.scan_single_file(project.root / path, cwe, "bench_project", 1))
+                       for path in project.files)
+
+        stats = time_call(scan_files, repeat)
+        results[case] = _strip(stats, files=len(project.files), vulnerabilities=stats["result"])
+
+    if has_scanner:
+        stats = time_call(lambda: detector.scan_project(project.root, cwes=cwes), repeat)
+        results["scan_project"] = _strip(stats, cwes=cwes,
+                                         vulnerabilities=sum(len(v) for v in stats["result"].values()))
+    else:
+        results["scan_project"] = {"skipped": "Bandit / Semgrep 未安裝"}
+
+    # 5. 端到端函式級別掃描（每次使用新的輸出資料夾，避免追加模式累積）
+    prompt_lines = project.prompt_lines()
+    run_counter = iter(range(1, 1 << 30))
+
+    def fresh_output():
+        manager.output_dir = workdir / f"CWE_Result_{next(run_counter)}"
+        return manager
+
+    def scan_prompts(manager):
+        succeeded = 0
+        for line_number, prompt in enumerate(prompt_lines, 1):
+            success, _ = manager.scan_from_prompt_function_level(
+                project.root, "bench_project", prompt, cwes[0],
+                round_number=1, line_number=line_number
+            )
+            succeeded += bool(success)
+        return succeeded
+
+    stats = time_call(scan_prompts, repeat, setup=fresh_output)
+    results[f"scan_from_prompt_function_level[CWE-{cwes[0]}]"] = _strip(
+        stats, prompt_lines=len(prompt_lines), succeeded=stats["result"], scanners=has_scanner
+    )
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="CWE 掃描流程基準測試")
+    parser.add_argument("--files", type=int, default=10, help="合成專案的檔案數")
+    parser.add_argument("--functions", type=int, default=8, help="每個檔案的函式數")
+    parser.add_argument("--function-lines", type=int, default=12, help="每個函式的行數")
+    parser.add_argument("--density", type=float, default=0.25, help="含漏洞函式的比例")
+    parser.add_argument("--cwes", default=",".join(VULNERABILITY_PATTERNS),
+                        help="植入與掃描的 CWE（逗號分隔）")
+    parser.add_argument("--repeat", type=int, default=3, help="每個案例的重複次數")
+    parser.add_argument("--seed", type=int, default=0, help="亂數種子")
+    parser.add_argument("--output", type=Path, help="結果 JSON（預設為 benchmarks/results/cwe_scan_<時間>.json）")
+    parser.add_argument("--compare", type=Path, help="與先前的結果 JSON 比較")
+    parser.add_argument("--keep", action="store_true", help="保留合成專案與掃描結果")
+    args = parser.parse_args(argv)
+
+    cwes = [cwe.strip() for cwe in args.cwes.split(",") if cwe.strip()]
+    workdir = Path(tempfile.mkdtemp(prefix="bench_cwe_scan_"))
+    try:
+        project = generate_project(workdir / "project", args.files, args.functions,
+                                   args.function_lines, args.density, cwes, args.seed)
+        results = run_benchmarks(project, workdir, cwes, args.repeat)
+    finally:
+        if args.keep:
+            print(f"合成專案與掃描結果: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    metadata = run_metadata(files=args.files, functions=args.functions, function_lines=args.function_lines,
+                            density=args.density, cwes=cwes, repeat=args.repeat, seed=args.seed)
+    output = write_results("cwe_scan", metadata, results, args.output)
+    print(format_summary(results))
+    print(f"\n結果已寫入: {output}")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        if baseline is None:
+            print(f"無法讀取比較基準: {args.compare}")
+            return 1
+        print()
+        print(compare_results(baseline, {"results": results}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+基準測試共用工具：計時統計、執行環境資訊、結果 JSON 寫入與比較
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def time_call(func: Callable[[], Any], repeat: int = 3, setup: Callable[[], Any] = None,
+              warmup: int = 0) -> Dict[str, Any]:
+    """
+    重複執行並統計耗時（setup 不計入）
+
+    Args:
+        func: 要計時的函數；有 setup 時以 setup 的返回值為參數
+        repeat: 重複次數
+        setup: 每次執行前的準備（例如建立會被修改的輸入資料）
+        warmup: 暖身次數（不計入）
+
+    Returns:
+        Dict[str, Any]: {runs, min, median, mean, max, samples, result}（秒）
+    """
+    samples: List[float] = []
+    result = None
+    for i in range(warmup + repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        result = func(argument) if setup else func()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return {
+        "runs": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+        "samples": samples,
+        "result": result,
+    }
+
+
+def run_metadata(**params) -> Dict[str, Any]:
+    """執行環境資訊（比較不同執行的結果時用來確認條件相同）"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": params,
+    }
+
+
+def write_results(name: str, metadata: Dict[str, Any], results: Dict[str, Dict[str, Any]],
+                  output: Path = None) -> Path:
+    """
+    寫入結果 JSON
+
+    Args:
+        name: 基準測試名稱（檔名前綴）
+        metadata: run_metadata() 的結果
+        results: 案例名稱 -> time_call() 的結果（result 欄位須可序列化或已移除）
+        output: 輸出檔案，預設為 benchmarks/results/<name>_<時間>.json
+
+    Returns:
+        Path: 輸出檔案
+    """
+    if output is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = RESULTS_DIR / f"{name}_{timestamp}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({"benchmark": name, "meta": metadata, "results": results},
+                  f, ensure_ascii=False, indent=2, default=str)
+    return output
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], key: str = "median") -> str:
+    """
+    比較兩次執行的結果
+
+    Args:
+        baseline: 基準結果（結果 JSON 的內容）
+        current: 本次結果
+        key: 比較的統計值
+
+    Returns:
+        str: 文字表格（比值 < 1 表示變快）
+    """
+    lines = [f"{'case':<40} {'baseline':>12} {'current':>12} {'ratio':>8}"]
+    for case, stats in current["results"].items():
+        old = baseline.get("results", {}).get(case)
+        if not old or key not in old or key not in stats:
+            lines.append(f"{case:<40} {'-':>12} {_format_seconds(stats.get(key)):>12} {'-':>8}")
+            continue
+        ratio = stats[key] / old[key] if old[key] else float("inf")
+        lines.append(f"{case:<40} {_format_seconds(old[key]):>12} {_format_seconds(stats[key]):>12} {ratio:>7.2f}x")
+    return "\n".join(lines)
+
+
+def format_summary(results: Dict[str, Dict[str, Any]]) -> str:
+    """本次結果的文字表格"""
+    lines = [f"{'case':<40} {'median':>12} {'min':>12} {'max':>12}"]
+    for case, stats in results.items():
+        if "skipped" in stats:
+            lines.append(f"{case:<40} skipped: {stats['skipped']}")
+            continue
+        lines.append(f"{case:<40} {_format_seconds(stats['median']):>12} "
+                     f"{_format_seconds(stats['min']):>12} {_format_seconds(stats['max']):>12}")
+    return "\n".join(lines)
+
+
+def load_results(path: Path) -> Optional[Dict[str, Any]]:
+    """讀取結果 JSON，失敗時返回 None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if value < 1e-3:
+        return f"{value * 1e6:.1f}µs"
+    if value < 1:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value:.3f}s"
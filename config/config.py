@@ -43,13 +43,68 @@ class Config:
     VSCODE_STARTUP_DELAY = 5   # VS Code 啟動等待時間（秒）
     VSCODE_STARTUP_TIMEOUT = 30  # VS Code 啟動超時時間（秒）
     VSCODE_COMMAND_DELAY = 1    # 命令執行間隔時間（秒）
+    VSCODE_PROCESS_NAMES = ("code", "code-insiders", "codium")  # 視為 VS Code 的行程名稱（完全比對，另含 VSCODE_EXECUTABLE 的檔名）
+    VSCODE_REUSE_WINDOW = False  # 專案之間保留同一個 VS Code 視窗，以 --reuse-window 切換資料夾（當機時才完整重啟）
+    VSCODE_WORKSPACE_READY_TIMEOUT = 30  # 切換資料夾後等待工作區就緒的最長時間（秒）
+    VSCODE_READY_INTERVAL = 0.5  # 檢查工作區就緒的間隔（秒）
+    # 工作區就緒訊號（src/vscode_readiness.py）：window = X11 視窗標題顯示專案資料夾（需要 xdotool），
+    # chat_panel = 畫面上看得到 Copilot Chat 的 send 按鈕，marker = 啟動工作寫出的標記檔；皆不可用時改用 VSCODE_STARTUP_DELAY
+    VSCODE_READY_CHECKS = ("window", "marker")
+    VSCODE_READY_MARKER_FILE = None  # 標記檔路徑（相對路徑以專案資料夾為基準），例如 ".vscode/.automation_ready"
     
     # Copilot Chat 相關設定
     COPILOT_RESPONSE_TIMEOUT = 999999999999  # Copilot 回應超時時間（秒） - 增加到999999999999秒
     COPILOT_CHECK_INTERVAL = 3      # 檢查回應完成間隔（秒）
     COPILOT_COPY_RETRY_MAX = 3      # 複製回應重試次數
     COPILOT_COPY_RETRY_DELAY = 2    # 複製重試間隔（秒）
-    
+
+    # 執行結果（回應檔案、檢查點）根目錄
+    EXECUTION_RESULT_DIR = PROJECT_ROOT / "ExecutionResult"
+
+    # 回應擷取通道設定
+    # "clipboard"（鍵盤 + 剪貼簿）或 "file"（讀取匯出掛鉤寫入的檔案；需另外執行 src/chat_export_hook.py 作為寫入端）
+    RESPONSE_CAPTURE_MODE = "clipboard"
+    RESPONSE_EXPORT_DIR = PROJECT_ROOT / "ExecutionResult" / "ResponseExport"  # 匯出掛鉤寫入回應的目錄
+    RESPONSE_EXPORT_HOOK_USER_DATA_DIR = Path.home() / ".config" / "Code"  # 匯出掛鉤監看的 VS Code user-data-dir
+    RESPONSE_CAPTURE_TIMEOUT = 10         # 等待匯出檔案出現的最長時間（秒），逾時改用剪貼簿
+    RESPONSE_CAPTURE_POLL_INTERVAL = 0.05  # 輪詢匯出目錄的間隔（秒）
+
+    # 回應失敗重試（指數退避）設定
+    RATE_LIMIT_BACKOFF_BASE = {          # 各失敗類型第一次重試的等待基準（秒）
+        "empty": 5,                      # 剪貼簿為空（複製失敗）
+        "truncated": 20,                 # 缺少「已完成回答」標記（回應被截斷）
+        "rate_limited": 60,              # 出現速率限制提示
+    }
+    RATE_LIMIT_BACKOFF_MULTIPLIER = 2    # 每次連續失敗的等待倍數
+    RATE_LIMIT_BACKOFF_MAX = 1800        # 單次等待上限（秒），即原本的固定 30 分鐘
+    RATE_LIMIT_EMPTY_MAX_RETRIES = 3     # 剪貼簿為空時最多重試次數，超過則視為該行失敗
+    RATE_LIMIT_READY_PROBE_TIMEOUT = 60  # 等待結束後確認 Copilot 可輸入的最長時間（秒）
+    RATE_LIMIT_READY_PROBE_INTERVAL = 5  # 可輸入檢查間隔（秒）
+
+    # 背景工作設定（在退避等待的閒置時段執行不需操作 UI 的工作）
+    CWE_SCAN_DEFER_TO_IDLE = True        # 逐行 CWE 掃描先快照檔案，延後到閒置時段或專案結束時執行
+    CWE_BASELINE_SCAN_ENABLED = True     # 為尚未處理的專案排入第0輪（修改前）基準掃描
+    CWE_BASELINE_PRESCAN_ENABLED = True  # 開啟 VS Code 前先以多行程平行完成所有待處理專案的基準掃描
+    CWE_BASELINE_WORKERS = max(1, (os.cpu_count() or 2) // 2)  # 基準掃描的行程數
+    # 尚未量測過耗時的背景工作所採用的保守預估（秒）；閒置時段短於預估時不開始該工作
+    BACKGROUND_TASK_ESTIMATES = {"cwe_scan": 30, "baseline_scan": 120, "report": 1}
+    BACKGROUND_TASK_DEFAULT_ESTIMATE = 60  # 未列出的工作類型
+
+    # 平行工作模式（每個 worker 使用獨立的 Xvfb 顯示器、VS Code user-data-dir 與剪貼簿）
+    PARALLEL_WORKERS = 1                      # 1 表示維持原本的單一視窗逐一處理
+    PARALLEL_DISPLAY_BASE = 90                # worker i 使用 DISPLAY=:{BASE + i}
+    PARALLEL_DISPLAY_RESOLUTION = "1920x1080x24"  # 需與 assets 圖像截圖時的解析度一致
+    PARALLEL_XVFB_EXECUTABLE = "Xvfb"
+    PARALLEL_WINDOW_MANAGER = ""              # 例如 "openbox"；空字串表示不啟動（改以結束行程關閉 VS Code）
+    PARALLEL_USER_DATA_ROOT = PROJECT_ROOT / "parallel_workers"  # 各 worker 的 user-data-dir 上層目錄
+    PARALLEL_USER_DATA_TEMPLATE = None        # 已登入 Copilot 的 user-data-dir，首次建立 worker 目錄時複製
+
+    # 專案工作佇列（多主機共同處理同一批專案）
+    PROJECT_QUEUE_DB = None                   # SQLite 佇列路徑（需在支援 POSIX 檔案鎖的共享檔案系統上）；None 表示只在本機分派
+    PROJECT_QUEUE_LEASE_SECONDS = 600         # 租約長度（秒），worker 每 1/3 租約續約一次
+    PROJECT_QUEUE_MAX_ATTEMPTS = 3            # 租約到期被收回超過此次數即標記為失敗
+    PROJECT_QUEUE_POLL_INTERVAL = 30          # 主控制器等待其他主機完成時的輪詢間隔（秒）
+
     # 智能等待設定
     SMART_WAIT_ENABLED = True    # 是否啟用智能等待
     SMART_WAIT_MAX_ATTEMPTS = 30  # 智能等待最大嘗試次數 - 增加到30次
@@ -57,14 +112,26 @@ class Config:
     SMART_WAIT_TIMEOUT = 999999999999      # 智能等待最大時間（秒） - 與主超時時間保持一致
     
     # Copilot 記憶清除命令序列
+    # step: 自適應延遲的步驟名稱；probe: 'screen' 表示以畫面變化判斷命令已生效
     COPILOT_CLEAR_MEMORY_COMMANDS = [
         # 開啟 Copilot Chat
-        {'type': 'hotkey', 'keys': ['ctrl', 'f1'], 'delay': 2},
+        {'type': 'hotkey', 'keys': ['ctrl', 'f1'], 'delay': 2, 'step': 'clear_memory.open_chat', 'probe': 'screen'},
         # 清除對話歷史 (Ctrl+L)
-        {'type': 'hotkey', 'keys': ['ctrl', 'l'], 'delay': 1},
+        {'type': 'hotkey', 'keys': ['ctrl', 'l'], 'delay': 1, 'step': 'clear_memory.clear_history'},
         # 關閉 Copilot Chat
-        {'type': 'key', 'key': 'escape', 'delay': 0.5},
+        {'type': 'key', 'key': 'escape', 'delay': 0.5, 'step': 'clear_memory.close_chat', 'probe': 'screen'},
     ]
+
+    # 自適應 UI 延遲設定（依實測的生效時間調整每個 UI 步驟的等待）
+    UI_ADAPTIVE_DELAY_ENABLED = True   # 關閉時一律使用原本的固定延遲
+    UI_DELAY_PROFILE_DIR = PROJECT_ROOT / "config" / "ui_delay_profiles"  # 每台機器一個 {hostname}.json
+    UI_DELAY_PERCENTILE = 95           # 以觀測值的第幾百分位數作為基準
+    UI_DELAY_SAFETY_MARGIN = 1.5       # 百分位數乘上的安全係數
+    UI_DELAY_MIN_SECONDS = 0.05        # 任何步驟的最短等待時間（秒）
+    UI_DELAY_SHRINK_FACTOR = 0.9       # 每次成功後延遲縮減的比例（逐步逼近實測值）
+    UI_DELAY_MIN_SAMPLES = 5           # 至少累積幾筆觀測值才開始縮減
+    UI_DELAY_MAX_SAMPLES = 50          # 每個步驟保留的觀測值數量
+    UI_DELAY_PROBE_INTERVAL = 0.05     # 探測畫面/剪貼簿變化的輪詢間隔（秒）
     
     # 圖像辨識設定
     IMAGE_CONFIDENCE = 0.9  # 圖像匹配信心度
@@ -82,6 +149,20 @@ class Config:
     
     # 專案處理設定
     MAX_RETRY_ATTEMPTS = 3  # 失敗重試次數
+    RESUME_FROM_CHECKPOINT = True  # 依逐行進度檢查點從中斷處繼續（清理執行記錄時保留未完成的專案）
+    STATUS_JOURNAL_COMPACT_EVERY = 50  # 狀態日誌累積幾筆後合併回 automation_status.json
+    STATUS_JOURNAL_FSYNC = True        # 每筆狀態日誌寫入後是否 fsync（關閉可加快，但斷電可能遺失最後幾筆）
+    RESPONSE_WRITE_FSYNC = "round"     # 回應檔案 fsync 策略：always（每個檔案）、round（每輪結束）、never
+    RESPONSE_WRITE_BACKGROUND = False  # 是否在背景執行緒寫入回應檔案（每輪結束時等待寫入完成）
+    
+    # 專案檔案掃描設定
+    PROJECT_SCAN_IGNORE_DIRS = [       # 一律略過的目錄（虛擬環境另以 pyvenv.cfg 辨識）
+        ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+        ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".idea", ".vscode",
+    ]
+    PROJECT_SCAN_USE_GITIGNORE = True  # 是否遵守專案內的 .gitignore
+    PROJECT_SCAN_CACHE_DIRNAME = ".project_manifests"  # 專案根目錄下的 manifest 快取（以 . 開頭，不會被當成專案）
+    PROJECT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # 平行分析專案的執行緒數（I/O 為主，可多於核心數）
     
     # 反覆互動設定（將從 settings.json 讀取，以下為預設值）
     INTERACTION_MAX_ROUNDS = 1      # 最大互動輪數
@@ -89,6 +170,7 @@ class Config:
     INTERACTION_ROUND_DELAY = 2     # 每輪互動間隔時間（秒）
     INTERACTION_INCLUDE_PREVIOUS_RESPONSE = False  # 是否在新一輪提示詞中包含上一輪 Copilot 回應
     INTERACTION_SHOW_UI_ON_STARTUP = True  # 是否在啟動時顯示設定介面
+    CONTEXT_WINDOW_MAX_CHARS = 12000  # 串接模式送出的提示詞字元上限，超過時裁剪上一個回應（0 表示不限制）
     # CopilotChat 修改結果處理設定
     COPILOT_CHAT_MODIFICATION_ACTION = "keep"  # 預設行為：'keep'(保留) 或 'revert'(復原)
     
@@ -96,6 +178,14 @@ class Config:
     LOG_LEVEL = "DEBUG"      # 日誌等級：DEBUG, INFO, WARNING, ERROR
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_FILE_PREFIX = "automation_"
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # 單一日誌檔上限，超過時輪替
+    LOG_BACKUP_COUNT = 5              # 保留的輪替日誌檔數量
+    EVENT_LOG_ENABLED = True          # 是否輸出各階段計時的 JSON lines 事件檔（logs/events_*.jsonl）
+    TRACE_ENABLED = False             # 是否記錄熱點追蹤 span，結束時匯出 Chrome trace JSON（logs/trace_*.json）
+    TRACE_MAX_SPANS = 200000          # 追蹤 span 數量上限（超過後捨棄，避免長時間執行佔用記憶體）
+    THROUGHPUT_REPORT_ENABLED = True  # 是否在執行期間更新吞吐量報告（throughput.json / throughput.html）
+    THROUGHPUT_REPORT_INTERVAL = 30   # 吞吐量報告的最短更新間隔（秒）
+    THROUGHPUT_REPORT_DIR = EXECUTION_RESULT_DIR / "AutomationReport"  # 吞吐量報告目錄
     
     # UI 初始化設定
     UI_RESET_COMMANDS = [
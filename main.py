@@ -6,28 +6,34 @@ Hybrid UI Automation Script - 主控制腳本
 
 import time
 import sys
+from functools import cached_property
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
 from datetime import datetime
 
 # 設定模組搜尋路徑
 sys.path.append(str(Path(__file__).parent))
 sys.path.append(str(Path(__file__).parent.parent))
 
-# 導入所有模組
+# 導入所有模組（VS Code、Copilot、圖像辨識與 CWE 掃描在第一次使用時才載入，
+# 讓第一個對話框不必等待 pyautogui / cv2 匯入、進程走訪與掃描工具檢查）
 from config.config import config
-from src.logger import get_logger, create_project_logger
+from src.logger import add_event_listener, get_logger, create_project_logger, remove_event_listener
 from src.project_manager import ProjectManager, ProjectInfo
-from src.vscode_controller import VSCodeController
-from src.copilot_handler import CopilotHandler
-from src.image_recognition import ImageRecognition
 from src.ui_manager import UIManager
 from src.error_handler import (
     ErrorHandler, RecoveryManager,
     AutomationError, ErrorType, RecoveryAction
 )
-from src.cwe_scan_manager import CWEScanManager
 from src.cwe_scan_ui import show_cwe_scan_settings
+from src.background_work_queue import BackgroundWorkQueue
+from src.progress_checkpoint import has_unfinished_checkpoint
+from src.throughput_report import ThroughputTracker
+
+if TYPE_CHECKING:
+    from src.copilot_handler import CopilotHandler
+    from src.image_recognition import ImageRecognition
+    from src.vscode_controller import VSCodeController
 
 class HybridUIAutomationScript:
     """混合式 UI 自動化腳本主控制器"""
@@ -36,21 +42,17 @@ class HybridUIAutomationScript:
         """初始化主控制器"""
         self.logger = get_logger("MainController")
         
-        # 初始化各個模組
+        # 初始化各個模組（vscode_controller、copilot_handler、image_recognition 於第一次使用時建立）
         self.project_manager = ProjectManager()
-        self.vscode_controller = VSCodeController()
         self.error_handler = ErrorHandler()
-        self.copilot_handler = CopilotHandler(
-            self.error_handler, 
-            interaction_settings=None,
-            cwe_scan_manager=None,
-            cwe_scan_settings=None
-        )  # 初始化時傳入基本參數
-        self.image_recognition = ImageRecognition()
         self.recovery_manager = RecoveryManager()
         self.ui_manager = UIManager()
         self.cwe_scan_manager = None  # CWE 掃描管理器（按需初始化）
         
+        # 背景工作佇列（CWE 掃描、基準掃描、報告），於退避等待期間執行
+        self.background_queue = BackgroundWorkQueue()
+        self.throughput: Optional[ThroughputTracker] = None  # 執行期間的吞吐量報告
+        
         # 執行選項
         self.use_smart_wait = True  # 預設使用智能等待
         self.interaction_settings = None  # 儲存互動設定
@@ -66,6 +68,36 @@ class HybridUIAutomationScript:
         
         self.logger.info("混合式 UI 自動化腳本初始化完成")
     
+    @cached_property
+    def vscode_controller(self) -> "VSCodeController":
+        """VS Code 控制器（建立時會走訪現有進程，延後到第一次使用）"""
+        from src.vscode_controller import VSCodeController
+        return VSCodeController()
+    
+    @cached_property
+    def image_recognition(self) -> "ImageRecognition":
+        """圖像辨識器（延後到第一次使用才載入 cv2 / pyautogui）"""
+        from src.image_recognition import ImageRecognition
+        return ImageRecognition()
+    
+    @cached_property
+    def copilot_handler(self) -> "CopilotHandler":
+        """Copilot 操作處理器（通常在互動設定對話框後以使用者設定建立）"""
+        return self._create_copilot_handler()
+    
+    def _create_copilot_handler(self) -> "CopilotHandler":
+        """以目前的互動與 CWE 掃描設定建立 CopilotHandler，並連接背景工作佇列"""
+        from src.copilot_handler import CopilotHandler
+        handler = CopilotHandler(
+            self.error_handler,
+            self.interaction_settings,
+            self.cwe_scan_manager,
+            self.cwe_scan_settings,
+            self.vscode_controller
+        )
+        handler.set_background_queue(self.background_queue)
+        return handler
+    
     def run(self) -> bool:
         """
         執行完整的自動化流程
@@ -83,6 +115,8 @@ class HybridUIAutomationScript:
             # 如果需要清理歷史記錄
             if clean_history and selected_projects:
                 self.logger.info(f"清理 {len(selected_projects)} 個專案的執行記錄")
+                if self.ui_manager.resume_projects:
+                    self.logger.info(f"保留未完成進度（從中斷處繼續）: {', '.join(sorted(self.ui_manager.resume_projects))}")
                 if not self.ui_manager.clean_project_history(selected_projects):
                     self.logger.error("清理執行記錄失敗")
                     return False
@@ -117,14 +151,32 @@ class HybridUIAutomationScript:
             
             self.total_projects = len(selected_project_list)
             self.logger.info(f"將處理 {self.total_projects} 個選定的專案")
+            self._start_throughput_report(selected_project_list)
+            
+            # 開啟 VS Code 前，平行完成待處理專案的基準掃描（第0輪）
+            baselined = self._run_baseline_prescan(selected_project_list)
             
-            # 執行所有選定的專案
-            if not self._process_all_projects(selected_project_list):
+            # 其餘專案排入背景佇列，在閒置時段或專案開啟前執行
+            self._schedule_baseline_scans(
+                [p for p in selected_project_list if p.name not in baselined]
+            )
+            
+            # 執行所有選定的專案（PARALLEL_WORKERS > 1 時使用多個虛擬顯示器平行處理）
+            if config.PARALLEL_WORKERS > 1:
+                processed_ok = self._process_all_projects_parallel(selected_project_list)
+            else:
+                processed_ok = self._process_all_projects(selected_project_list)
+            if not processed_ok:
                 self.logger.warning("專案處理過程中發生錯誤")
             
             # 檢查是否收到中斷請求
             if self.error_handler.emergency_stop_requested:
                 self.logger.warning("收到中斷請求，停止處理")
+                if len(self.background_queue):
+                    self.logger.warning(f"放棄 {len(self.background_queue)} 個尚未執行的背景工作")
+            else:
+                # 完成閒置時段未執行完的背景工作
+                self.background_queue.drain_all()
             
             self.logger.info("所有專案處理完成")
             
@@ -165,12 +217,7 @@ class HybridUIAutomationScript:
             else:
                 # 儲存設定並重新初始化 CopilotHandler（加入 CWE 掃描參數）
                 self.interaction_settings = settings
-                self.copilot_handler = CopilotHandler(
-                    self.error_handler, 
-                    settings,
-                    self.cwe_scan_manager,
-                    self.cwe_scan_settings
-                )
+                self.copilot_handler = self._create_copilot_handler()
                 self.logger.info(f"本次執行的互動設定: {settings}")
                 
         except Exception as e:
@@ -202,6 +249,7 @@ class HybridUIAutomationScript:
                 
                 # 如果啟用了掃描，初始化掃描管理器
                 if settings["enabled"]:
+                    from src.cwe_scan_manager import CWEScanManager
                     output_dir = Path(settings["output_dir"])
                     self.cwe_scan_manager = CWEScanManager(output_dir)
                     self.logger.info(f"✅ CWE 掃描已啟用 (類型: CWE-{settings['cwe_type']})")
@@ -269,6 +317,10 @@ class HybridUIAutomationScript:
                     self.logger.warning("收到緊急停止請求，中止專案處理")
                     break
                 
+                # 開啟專案前先完成其基準掃描（若閒置時段尚未執行）
+                if self.background_queue.run_matching("baseline_scan", project.name):
+                    self.logger.info(f"已完成 {project.name} 的基準掃描")
+                
                 # 處理單一專案
                 success = self._process_single_project(project)
                 
@@ -281,6 +333,12 @@ class HybridUIAutomationScript:
                 
                 self.processed_projects += 1
                 
+                # 排入進度報告（佇列中已有則不重複）
+                self.background_queue.submit(
+                    "report", self.project_manager.save_summary_report,
+                    kwargs={"filename": "automation_report_progress.json"}, unique=True
+                )
+                
                 # 項目間短暫休息
                 time.sleep(2)
             
@@ -294,6 +352,90 @@ class HybridUIAutomationScript:
             self.logger.error(f"處理專案時發生錯誤: {str(e)}")
             return False
     
+    def _process_all_projects_parallel(self, projects: List[ProjectInfo]) -> bool:
+        """
+        以多個 worker（各自的 Xvfb 顯示器與 VS Code 實例）平行處理專案
+        專案狀態只由主控制器更新，worker 只回報結果
+        
+        Args:
+            projects: 專案列表
+            
+        Returns:
+            bool: 是否所有專案都有回報結果
+        """
+        from src.parallel_workers import ParallelCoordinator
+        
+        try:
+            start_time = time.time()
+            
+            # worker 開啟專案前，尚未完成的基準掃描必須先執行
+            self.background_queue.run_matching("baseline_scan")
+            
+            options = {
+                "use_smart_wait": self.use_smart_wait,
+                "interaction_settings": self.interaction_settings,
+                "cwe_scan_settings": self.cwe_scan_settings,
+            }
+            
+            def on_started(project_name: str):
+                self.project_manager.update_project_status(project_name, "processing")
+            
+            def on_result(project_name: str, result: Dict):
+                if result["success"]:
+                    self.project_manager.mark_project_completed(project_name, result["processing_time"])
+                    self.successful_projects += 1
+                else:
+                    self.project_manager.mark_project_failed(project_name, result["error"], result["processing_time"])
+                    self.failed_projects += 1
+                self.processed_projects += 1
+            
+            self.logger.info(f"平行模式: {config.PARALLEL_WORKERS} 個 worker 處理 {len(projects)} 個專案")
+            if config.PROJECT_QUEUE_DB:
+                self.logger.info(f"使用共享工作佇列: {config.PROJECT_QUEUE_DB}（其他主機可執行 "
+                                 f"python -m src.parallel_workers --queue-db ... 加入）")
+            coordinator = ParallelCoordinator(config.PARALLEL_WORKERS, on_result=on_result,
+                                              on_started=on_started, queue_db=config.PROJECT_QUEUE_DB)
+            results = coordinator.run(projects, options)
+            
+            if config.PROJECT_QUEUE_DB:
+                # 其他主機處理的專案只記錄在佇列中，寫回 automation_status.json 並重新統計
+                from src.project_queue import SQLiteProjectQueue
+                self.project_manager.sync_from_queue(SQLiteProjectQueue(config.PROJECT_QUEUE_DB))
+                statuses = [self.project_manager.get_project_by_name(p.name) for p in projects]
+                self.successful_projects = sum(1 for p in statuses if p and p.status == "completed")
+                self.failed_projects = sum(1 for p in statuses if p and p.status == "failed")
+                self.processed_projects = self.successful_projects + self.failed_projects
+                handled = self.processed_projects
+            else:
+                handled = len(results)
+            
+            elapsed = time.time() - start_time
+            self.logger.info(f"平行處理完成: 成功 {self.successful_projects}, 失敗 {self.failed_projects}, "
+                             f"未處理 {len(projects) - handled}, 耗時 {elapsed:.1f}秒")
+            return handled == len(projects)
+            
+        except Exception as e:
+            self.logger.error(f"平行處理專案時發生錯誤: {str(e)}")
+            return False
+    
+    def configure_worker(self, options: Dict, vscode_controller: "VSCodeController"):
+        """
+        以主控制器傳來的選項設定 worker 行程（不顯示任何對話框）
+        
+        Args:
+            options: use_smart_wait、interaction_settings、cwe_scan_settings
+            vscode_controller: 使用 worker 專用 user-data-dir 的 VS Code 控制器
+        """
+        self.use_smart_wait = options.get("use_smart_wait", True)
+        self.interaction_settings = options.get("interaction_settings")
+        self.cwe_scan_settings = options.get("cwe_scan_settings")
+        if self.cwe_scan_settings and self.cwe_scan_settings.get("enabled"):
+            from src.cwe_scan_manager import CWEScanManager
+            self.cwe_scan_manager = CWEScanManager(Path(self.cwe_scan_settings["output_dir"]))
+        
+        self.vscode_controller = vscode_controller
+        self.copilot_handler = self._create_copilot_handler()
+    
     def _process_single_project(self, project: ProjectInfo) -> bool:
         """
         處理單一專案
@@ -315,7 +457,10 @@ class HybridUIAutomationScript:
             
             # 創建專案專用日誌
             project_logger = create_project_logger(project.name)
-            project_logger.log("開始處理專案")
+            if has_unfinished_checkpoint(project.name):
+                project_logger.log("開始處理專案（依進度檢查點從上次中斷的行繼續）")
+            else:
+                project_logger.log("開始處理專案")
             
             # 更新專案狀態為處理中
             self.project_manager.update_project_status(project.name, "processing")
@@ -473,7 +618,7 @@ class HybridUIAutomationScript:
             # 確保在異常情況下也關閉 VS Code
             try:
                 project_logger.log("異常情況下關閉 VS Code 專案")
-                self.vscode_controller.close_current_project()
+                self.vscode_controller.close_current_project(force=True)
             except:
                 pass
             raise
@@ -481,11 +626,136 @@ class HybridUIAutomationScript:
             # 確保在異常情況下也關閉 VS Code
             try:
                 project_logger.log("異常情況下關閉 VS Code 專案")
-                self.vscode_controller.close_current_project()
+                self.vscode_controller.close_current_project(force=True)
             except:
                 pass
             raise AutomationError(str(e), ErrorType.UNKNOWN_ERROR)
     
+    def _load_scan_prompt_lines(self, project: ProjectInfo) -> List[str]:
+        """
+        依 prompt 來源模式讀取專案要掃描的 prompt 行
+        
+        Args:
+            project: 專案資訊
+            
+        Returns:
+            List[str]: prompt 行（找不到或為空時返回空列表）
+        """
+        prompt_source_mode = self.interaction_settings.get(
+            "prompt_source_mode", 
+            config.PROMPT_SOURCE_MODE
+        ) if self.interaction_settings else config.PROMPT_SOURCE_MODE
+        
+        # 根據 prompt 來源模式讀取 prompt
+        if prompt_source_mode == "project":
+            # 專案專用提示詞模式：讀取專案目錄下的 prompt.txt
+            prompt_file = Path(project.path) / config.PROJECT_PROMPT_FILENAME
+            if not prompt_file.exists():
+                self.logger.warning(f"專案提示詞檔案不存在: {prompt_file}")
+                return []
+        else:
+            # 全域提示詞模式：讀取 prompts/prompt1.txt
+            prompt_file = config.PROMPT1_FILE_PATH
+            if not prompt_file.exists():
+                self.logger.warning(f"全域提示詞檔案不存在: {prompt_file}")
+                return []
+        
+        # 逐行讀取 prompt 內容
+        with open(prompt_file, 'r', encoding='utf-8') as f:
+            prompt_lines = [line.strip() for line in f.readlines() if line.strip()]
+        
+        if not prompt_lines:
+            self.logger.warning(f"提示詞檔案為空: {prompt_file}")
+        return prompt_lines
+    
+    def _run_baseline_prescan(self, projects: List[ProjectInfo]) -> set:
+        """
+        在任何 UI 自動化開始前，以行程池平行執行待處理專案的基準掃描（第0輪）
+        
+        Args:
+            projects: 選定要處理的專案列表
+            
+        Returns:
+            set: 已完成基準掃描的專案名稱
+        """
+        if not (self.cwe_scan_manager and self.cwe_scan_settings and self.cwe_scan_settings.get("enabled")):
+            return set()
+        if not (config.CWE_BASELINE_SCAN_ENABLED and config.CWE_BASELINE_PRESCAN_ENABLED):
+            return set()
+        
+        jobs = []
+        for project in self._projects_needing_baseline(projects):
+            prompt_lines = self._load_scan_prompt_lines(project)
+            if prompt_lines:
+                jobs.append((Path(project.path), project.name, prompt_lines))
+        
+        if not jobs:
+            return set()
+        
+        try:
+            results = self.cwe_scan_manager.prescan_baselines(
+                jobs, self.cwe_scan_settings["cwe_type"], config.CWE_BASELINE_WORKERS
+            )
+            return set(results)
+        except Exception as e:
+            self.logger.error(f"平行基準掃描失敗，改為排入背景佇列: {e}")
+            return set()
+    
+    def _projects_needing_baseline(self, projects: List[ProjectInfo]) -> List[ProjectInfo]:
+        """
+        篩選需要第0輪基準掃描的專案：只處理尚未被 Copilot 修改過的待處理專案，
+        已有第0輪結果或保留未完成進度（從中斷處繼續）的專案不重新掃描，避免覆蓋修改前的結果
+        
+        Args:
+            projects: 選定要處理的專案列表
+            
+        Returns:
+            List[ProjectInfo]: 需要基準掃描的專案
+        """
+        pending_names = {p.name for p in self.project_manager.get_all_pending_projects()}
+        cwe_type = self.cwe_scan_settings["cwe_type"]
+        return [
+            project for project in projects
+            if project.name in pending_names
+            and not has_unfinished_checkpoint(project.name)
+            and not self.cwe_scan_manager.has_baseline_result(project.name, cwe_type)
+        ]
+    
+    def _schedule_baseline_scans(self, projects: List[ProjectInfo]):
+        """
+        為需要的專案排入第0輪基準掃描（Copilot 修改前的狀態，篩選條件見 _projects_needing_baseline）
+        
+        Args:
+            projects: 將要處理的專案列表
+        """
+        if not (self.cwe_scan_manager and self.cwe_scan_settings and self.cwe_scan_settings.get("enabled")):
+            return
+        if not config.CWE_BASELINE_SCAN_ENABLED:
+            return
+        
+        cwe_type = self.cwe_scan_settings["cwe_type"]
+        scheduled = 0
+        for project in self._projects_needing_baseline(projects):
+            prompt_lines = self._load_scan_prompt_lines(project)
+            if not prompt_lines:
+                continue
+            self.background_queue.submit(
+                "baseline_scan",
+                self.cwe_scan_manager.scan_baseline_function_level,
+                kwargs={
+                    "project_path": Path(project.path),
+                    "project_name": project.name,
+                    "prompt_lines": prompt_lines,
+                    "cwe_type": cwe_type
+                },
+                key=project.name,
+                unique=True
+            )
+            scheduled += 1
+        
+        if scheduled:
+            self.logger.info(f"📋 已排入 {scheduled} 個專案的基準掃描（第0輪）")
+    
     def _execute_cwe_scan(self, project: ProjectInfo, project_logger) -> bool:
         """
         執行 CWE 函式級別掃描（逐行模式）
@@ -507,32 +777,9 @@ class HybridUIAutomationScript:
             
             self.logger.info(f"開始執行 CWE-{cwe_type} 函式級別掃描（逐行模式）...")
             
-            # 讀取專案的 prompt 檔案
-            prompt_source_mode = self.interaction_settings.get(
-                "prompt_source_mode", 
-                config.PROMPT_SOURCE_MODE
-            ) if self.interaction_settings else config.PROMPT_SOURCE_MODE
-            
-            # 根據 prompt 來源模式讀取 prompt
-            if prompt_source_mode == "project":
-                # 專案專用提示詞模式：讀取專案目錄下的 prompt.txt
-                prompt_file = Path(project.path) / config.PROJECT_PROMPT_FILENAME
-                if not prompt_file.exists():
-                    self.logger.warning(f"專案提示詞檔案不存在: {prompt_file}")
-                    return False
-            else:
-                # 全域提示詞模式：讀取 prompts/prompt1.txt
-                prompt_file = config.PROMPT1_FILE_PATH
-                if not prompt_file.exists():
-                    self.logger.warning(f"全域提示詞檔案不存在: {prompt_file}")
-                    return False
-            
-            # 逐行讀取 prompt 內容
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                prompt_lines = [line.strip() for line in f.readlines() if line.strip()]
-            
+            # 讀取專案的 prompt 行
+            prompt_lines = self._load_scan_prompt_lines(project)
             if not prompt_lines:
-                self.logger.warning(f"提示詞檔案為空: {prompt_file}")
                 return False
             
             total_lines = len(prompt_lines)
@@ -613,17 +860,56 @@ class HybridUIAutomationScript:
             if report_file:
                 self.logger.info(f"詳細報告已儲存: {report_file}")
             
+            # 吞吐量與時間分配
+            if self.throughput is not None:
+                throughput = self.throughput.snapshot()
+                self.logger.info(f"吞吐量: {throughput['lines']} 行，每小時 {throughput['lines_per_hour']:.1f} 行")
+                for item in throughput["breakdown"].values():
+                    self.logger.info(f"  {item['label']}: {item['seconds']:.0f} 秒 ({item['percent']:.1f}%)")
+            
         except Exception as e:
             self.logger.error(f"生成最終報告時發生錯誤: {str(e)}")
     
+    def _start_throughput_report(self, projects: List[ProjectInfo]):
+        """
+        開始統計吞吐量（每小時行數、時間分配與佇列剩餘時間），執行期間定期更新報告
+        
+        Args:
+            projects: 本次處理的專案
+        """
+        if not config.THROUGHPUT_REPORT_ENABLED:
+            return
+        if config.PARALLEL_WORKERS > 1:
+            # worker 的事件在各自的行程中，由事件檔離線統計
+            self.logger.info("平行模式的吞吐量報告請於執行後以 python -m src.throughput_report 由事件檔產生")
+            return
+        
+        interaction_enabled = self.interaction_settings.get("interaction_enabled", config.INTERACTION_ENABLED) if self.interaction_settings else config.INTERACTION_ENABLED
+        max_rounds = self.interaction_settings.get("max_rounds", config.INTERACTION_MAX_ROUNDS) if self.interaction_settings else config.INTERACTION_MAX_ROUNDS
+        rounds = max_rounds if interaction_enabled else 1
+        planned_lines = sum(len(self._load_scan_prompt_lines(p)) for p in projects) * rounds
+        
+        self.throughput = ThroughputTracker(planned_lines)
+        add_event_listener(self.throughput.record)
+        self.logger.info(f"吞吐量報告: {self.throughput.output_dir / 'throughput.html'}（預計 {planned_lines} 行）")
+    
     def _cleanup(self):
         """清理環境"""
         try:
             self.logger.info("清理執行環境...")
             
+            # 寫出最終的吞吐量報告
+            if self.throughput is not None:
+                remove_event_listener(self.throughput.record)
+                self.throughput.write()
+            
             # 程式結束時不主動關閉 VS Code
             # self.vscode_controller.ensure_clean_environment()
             
+            # 保留視窗模式下最後一個專案的視窗仍開著，所有專案處理完畢後才關閉
+            if config.VSCODE_REUSE_WINDOW and "vscode_controller" in self.__dict__:
+                self.vscode_controller.close_current_project(force=True)
+            
             # 可以添加其他清理邏輯
             
             self.logger.info("✅ 環境清理完成")
@@ -17,13 +17,14 @@ if projects_dir.exists():
         except Exception as e:
             print(f"刪除 {file} 失敗: {e}")
 
-# 刪除 automation_status.json
-if status_file.exists():
-    try:
-        status_file.unlink()
-        print(f"已刪除狀態檔案: {status_file}")
-    except Exception as e:
-        print(f"刪除 {status_file} 失敗: {e}")
+# 刪除 automation_status.json 及其狀態日誌
+for path in (status_file, Path('projects/automation_status.journal.jsonl')):
+    if path.exists():
+        try:
+            path.unlink()
+            print(f"已刪除狀態檔案: {path}")
+        except Exception as e:
+            print(f"刪除 {path} 失敗: {e}")
 
 # 刪除統一的 ExecutionResult 資料夾
 if execution_result_dir.exists():
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 背景工作佇列模組
+收集不需要操作 UI 的工作（延後的 CWE 掃描、後續專案的基準掃描、報告產生），
+在 Copilot 退避等待等閒置時段依序執行
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+except ImportError:
+    from config import config
+    from logger import get_logger
+
+
+@dataclass
+class BackgroundTask:
+    """單一背景工作"""
+    kind: str                          # 工作類型，例如 "cwe_scan"、"baseline_scan"、"report"
+    func: Callable[..., Any]
+    args: Tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    key: Optional[str] = None          # 識別用（通常為專案名稱）
+    submitted_at: float = field(default_factory=time.time)
+
+    @property
+    def label(self) -> str:
+        return f"{self.kind}:{self.key}" if self.key else self.kind
+
+
+class BackgroundWorkQueue:
+    """先進先出的背景工作佇列（在呼叫端執行緒中執行，不另開執行緒）"""
+
+    def __init__(self):
+        self.logger = get_logger("BackgroundWorkQueue")
+        self._tasks: Deque[BackgroundTask] = deque()
+        self._lock = threading.Lock()
+        self._durations: Dict[str, float] = {}  # 各類工作的平均耗時（秒）
+        self.completed_count = 0
+        self.failed_count = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tasks)
+
+    def submit(self, kind: str, func: Callable[..., Any], args: Tuple = (),
+               kwargs: Dict[str, Any] = None, key: str = None, unique: bool = False) -> bool:
+        """
+        排入一個背景工作
+
+        Args:
+            kind: 工作類型
+            func: 要執行的函式
+            args: 位置參數
+            kwargs: 關鍵字參數
+            key: 識別用鍵值（通常為專案名稱）
+            unique: 若已有相同類型與鍵值的工作在佇列中則不重複排入
+
+        Returns:
+            bool: 是否已排入
+        """
+        task = BackgroundTask(kind, func, tuple(args), dict(kwargs or {}), key)
+        with self._lock:
+            if unique and any(t.kind == kind and t.key == key for t in self._tasks):
+                return False
+            self._tasks.append(task)
+            pending = len(self._tasks)
+        self.logger.debug(f"排入背景工作 {task.label}（佇列中 {pending} 個）")
+        return True
+
+    def drain(self, budget_seconds: float) -> int:
+        """
+        在時間預算內依序執行背景工作
+        只在預估耗時（同類工作的平均耗時；尚未量測時為設定中的保守預估）不超過剩餘時間時才開始下一個工作
+
+        Args:
+            budget_seconds: 可用的閒置時間（秒）
+
+        Returns:
+            int: 執行的工作數量
+        """
+        deadline = time.monotonic() + budget_seconds
+        executed = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            with self._lock:
+                if not self._tasks:
+                    break
+                task = self._tasks[0]
+                if self.estimate(task.kind) > remaining:
+                    break
+                self._tasks.popleft()
+            self._run(task)
+            executed += 1
+
+        if executed:
+            self.logger.info(f"🧵 閒置時段執行了 {executed} 個背景工作，剩餘 {len(self)} 個")
+        return executed
+
+    def estimate(self, kind: str) -> float:
+        """
+        預估某類工作的耗時
+
+        Args:
+            kind: 工作類型
+
+        Returns:
+            float: 同類工作的平均耗時；尚未執行過時為 config.BACKGROUND_TASK_ESTIMATES 的保守預估
+        """
+        if kind in self._durations:
+            return self._durations[kind]
+        return config.BACKGROUND_TASK_ESTIMATES.get(kind, config.BACKGROUND_TASK_DEFAULT_ESTIMATE)
+
+    def drain_all(self) -> int:
+        """
+        執行佇列中所有工作（不限時間）
+
+        Returns:
+            int: 執行的工作數量
+        """
+        executed = 0
+        while True:
+            with self._lock:
+                if not self._tasks:
+                    break
+                task = self._tasks.popleft()
+            self._run(task)
+            executed += 1
+        if executed:
+            self.logger.info(f"🧵 已完成剩餘的 {executed} 個背景工作")
+        return executed
+
+    def run_matching(self, kind: str, key: str = None) -> int:
+        """
+        立即執行（並移出佇列）指定類型與鍵值的工作，例如開啟專案前先完成其基準掃描
+
+        Args:
+            kind: 工作類型
+            key: 識別用鍵值，None 表示不限
+
+        Returns:
+            int: 執行的工作數量
+        """
+        with self._lock:
+            matched = [t for t in self._tasks if t.kind == kind and (key is None or t.key == key)]
+            for task in matched:
+                self._tasks.remove(task)
+        for task in matched:
+            self._run(task)
+        return len(matched)
+
+    def _run(self, task: BackgroundTask):
+        """執行單一工作並更新平均耗時；工作失敗不影響佇列"""
+        start = time.monotonic()
+        try:
+            task.func(*task.args, **task.kwargs)
+            self.completed_count += 1
+        except Exception as e:
+            self.failed_count += 1
+            self.logger.error(f"背景工作 {task.label} 執行失敗: {e}")
+        finally:
+            elapsed = time.monotonic() - start
+            previous = self._durations.get(task.kind)
+            self._durations[task.kind] = elapsed if previous is None else previous * 0.7 + elapsed * 0.3
+            self.logger.debug(f"背景工作 {task.label} 耗時 {elapsed:.1f} 秒")
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - Chat 匯出掛鉤
+回應擷取通道（RESPONSE_CAPTURE_MODE = "file"）的寫入端：監看 VS Code 儲存的 Copilot Chat 工作階段，
+把每個完成的回應依 docs/RESPONSE_CAPTURE_CHANNEL.md 的檔案協定寫入匯出目錄
+
+VS Code 會把 Chat 工作階段存成 <user-data-dir>/User/workspaceStorage/<hash>/chatSessions/*.json
+（沒有開啟資料夾時為 User/globalStorage/emptyWindowChatSessions/*.json），
+每個請求帶有 requestId、response（回應片段）與完成後才出現的 result。
+
+使用方式（與自動化腳本同時執行）：
+    python src/chat_export_hook.py [--user-data-dir ~/.config/Code] [--export-dir ExecutionResult/ResponseExport]
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+except ImportError:
+    from config import config
+    from logger import get_logger
+
+
+def write_response_export(export_dir: Path, name: str, text: str, completed_at: float = None) -> Path:
+    """
+    依檔案協定寫入一筆回應：先寫 *.tmp 暫存檔，再 rename 成 .json
+
+    Args:
+        export_dir: 匯出目錄
+        name: 檔名（不含副檔名），例如 requestId
+        text: 回應全文
+        completed_at: 完成時間（epoch 秒數），預設為現在
+
+    Returns:
+        Path: 寫入的 .json 檔案路徑
+    """
+    export_dir = Path(export_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    payload = {"text": text, "completed_at": time.time() if completed_at is None else completed_at}
+    tmp_path = export_dir / f"{name}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+    target = export_dir / f"{name}.json"
+    os.replace(tmp_path, target)
+    return target
+
+
+def response_text(parts: List) -> str:
+    """
+    把工作階段中一個請求的回應片段組成全文（只取 markdown 內容）
+
+    Args:
+        parts: 請求的 response 列表
+
+    Returns:
+        str: 回應全文
+    """
+    texts = []
+    for part in parts or []:
+        if not isinstance(part, dict):
+            continue
+        if isinstance(part.get("value"), str):
+            texts.append(part["value"])
+        elif part.get("kind") == "markdownContent":
+            content = part.get("content") or {}
+            if isinstance(content.get("value"), str):
+                texts.append(content["value"])
+    return "".join(texts)
+
+
+class ChatSessionExportHook:
+    """監看 VS Code Chat 工作階段並匯出完成的回應"""
+
+    def __init__(self, user_data_dir: Path = None, export_dir: Path = None):
+        """
+        初始化匯出掛鉤
+
+        Args:
+            user_data_dir: VS Code 的 user-data-dir，預設為 config.RESPONSE_EXPORT_HOOK_USER_DATA_DIR
+            export_dir: 匯出目錄，預設為 config.RESPONSE_EXPORT_DIR
+        """
+        self.logger = get_logger("ChatSessionExportHook")
+        self.user_data_dir = Path(user_data_dir or config.RESPONSE_EXPORT_HOOK_USER_DATA_DIR).expanduser()
+        self.export_dir = Path(export_dir or config.RESPONSE_EXPORT_DIR)
+        self._exported: Set[str] = set()
+        self._mtimes: Dict[Path, float] = {}
+        self._primed = False
+
+    def session_files(self) -> Iterator[Path]:
+        """列出所有 Chat 工作階段檔案"""
+        user_dir = self.user_data_dir / "User"
+        yield from user_dir.glob("workspaceStorage/*/chatSessions/*.json")
+        yield from user_dir.glob("globalStorage/emptyWindowChatSessions/*.json")
+
+    def completed_requests(self, session_file: Path) -> List[Tuple[str, str]]:
+        """
+        讀取工作階段檔案中已完成的請求
+
+        Args:
+            session_file: 工作階段檔案
+
+        Returns:
+            List[Tuple[str, str]]: (requestId, 回應全文) 列表
+        """
+        try:
+            with open(session_file, 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"讀取工作階段失敗（可能正在寫入）: {session_file.name} - {e}")
+            return []
+
+        requests = session.get("requests") if isinstance(session, dict) else None
+        completed = []
+        for request in requests or []:
+            if not isinstance(request, dict) or request.get("isCanceled"):
+                continue
+            request_id = request.get("requestId")
+            if not request_id or request.get("result") is None:
+                continue  # 回應尚未完成
+            text = response_text(request.get("response"))
+            if text.strip():
+                completed.append((request_id, text))
+        return completed
+
+    def poll(self) -> int:
+        """
+        檢查一次有變動的工作階段檔案，匯出新完成的回應；
+        第一次呼叫只記錄既有的請求，不匯出啟動前的舊回應
+
+        Returns:
+            int: 本次匯出的回應數量
+        """
+        exported = 0
+        for session_file in self.session_files():
+            try:
+                mtime = session_file.stat().st_mtime
+            except OSError:
+                continue
+            if self._mtimes.get(session_file) == mtime:
+                continue
+            self._mtimes[session_file] = mtime
+
+            for request_id, text in self.completed_requests(session_file):
+                if request_id in self._exported:
+                    continue
+                self._exported.add(request_id)
+                if not self._primed:
+                    continue
+                write_response_export(self.export_dir, request_id, text)
+                self.logger.debug(f"匯出回應: {request_id} ({len(text)} 字元)")
+                exported += 1
+        self._primed = True
+        return exported
+
+    def run(self, interval: float = None, stop_after: Optional[float] = None):
+        """
+        持續監看直到中斷
+
+        Args:
+            interval: 檢查間隔（秒），預設為 config.RESPONSE_CAPTURE_POLL_INTERVAL
+            stop_after: 最長執行秒數，None 表示不限
+        """
+        interval = config.RESPONSE_CAPTURE_POLL_INTERVAL if interval is None else interval
+        deadline = None if stop_after is None else time.monotonic() + stop_after
+        self.logger.info(f"Chat 匯出掛鉤啟動: {self.user_data_dir} → {self.export_dir}")
+        while deadline is None or time.monotonic() < deadline:
+            self.poll()
+            time.sleep(interval)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="把 VS Code Copilot Chat 完成的回應寫入回應擷取通道")
+    parser.add_argument("--user-data-dir", type=Path, help="VS Code user-data-dir（預設為 ~/.config/Code）")
+    parser.add_argument("--export-dir", type=Path, help="匯出目錄（預設為 config.RESPONSE_EXPORT_DIR）")
+    parser.add_argument("--interval", type=float, help="檢查間隔（秒）")
+    args = parser.parse_args(argv)
+
+    hook = ChatSessionExportHook(args.user_data_dir, args.export_dir)
+    try:
+        hook.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
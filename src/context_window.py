@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 串接上下文視窗模組
+串接模式下把上一個回應放在下一行提示詞前面，回應本身又會重複先前的內容，
+不加限制時提示詞會越來越長（貼上、Copilot 處理、寫檔都跟著變慢）。
+此模組將上下文限制在字元預算內，裁剪規則依序為：
+1. 由舊到新捨棄說明文字段落（程式碼區塊保留）
+2. 仍超過預算時，由舊到新捨棄程式碼區塊（至少保留最後一個）
+3. 仍超過預算時，只保留結尾部分
+每次裁剪都會在原位置留下標記，並記錄省略了哪些內容
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+except ImportError:
+    from config import config
+    from logger import get_logger
+
+
+# 以 ``` 圍起的程式碼區塊（未關閉的區塊延伸到結尾）
+_FENCE_PATTERN = re.compile(r"```[^\n]*\n.*?(?:```|\Z)", re.DOTALL)
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SEPARATOR = "\n\n"
+_MARKER_RESERVE = 48  # 每個省略標記預留的字元數
+
+
+@dataclass
+class ElidedSegment:
+    """被省略的一段上下文"""
+    kind: str    # prose / code / head
+    chars: int
+    detail: str = ""
+
+
+@dataclass
+class ContextWindow:
+    """裁剪後的上下文"""
+    text: str
+    original_chars: int
+    elided: List[ElidedSegment] = field(default_factory=list)
+
+    @property
+    def was_trimmed(self) -> bool:
+        return bool(self.elided)
+
+    def summary(self) -> str:
+        """省略內容的摘要（寫入日誌與回應檔案）"""
+        if not self.elided:
+            return ""
+        labels = {"prose": "說明文字", "code": "程式碼區塊", "head": "開頭內容"}
+        parts = []
+        for kind in ("prose", "code", "head"):
+            segments = [s for s in self.elided if s.kind == kind]
+            if segments:
+                chars = sum(s.chars for s in segments)
+                parts.append(f"{labels[kind]} {len(segments)} 段 ({chars} 字元)")
+        return f"原始 {self.original_chars} 字元，保留 {len(self.text)} 字元；省略" + "、".join(parts)
+
+
+class ContextWindowManager:
+    """串接上下文的字元預算管理"""
+
+    def __init__(self, max_chars: int = None):
+        """
+        初始化上下文視窗
+
+        Args:
+            max_chars: 整個提示詞（上下文 + 本行提示詞）的字元上限，預設為 config.CONTEXT_WINDOW_MAX_CHARS，
+                       0 表示不限制
+        """
+        self.logger = get_logger("ContextWindowManager")
+        self.max_chars = config.CONTEXT_WINDOW_MAX_CHARS if max_chars is None else max_chars
+
+    def fit(self, context: str, reserve: int = 0) -> ContextWindow:
+        """
+        將上下文裁剪到預算內
+
+        Args:
+            context: 要串接的上下文（上一個回應）
+            reserve: 需要保留給其他內容（例如本行提示詞）的字元數
+
+        Returns:
+            ContextWindow: 裁剪結果
+        """
+        context = context.strip()
+        budget = max(0, self.max_chars - reserve)
+        if self.max_chars <= 0 or len(context) <= budget:
+            return ContextWindow(text=context, original_chars=len(context))
+
+        segments = _split_segments(context)
+        dropped = [False] * len(segments)
+        elided: List[ElidedSegment] = []
+        size = len(context)
+
+        # 規則 1、2：先捨棄說明文字，再捨棄程式碼區塊（由舊到新，最後一個程式碼區塊保留給規則 3）
+        code_indexes = [i for i, (kind, _) in enumerate(segments) if kind == "code"]
+        candidates = [i for i, (kind, _) in enumerate(segments) if kind == "prose"] + code_indexes[:-1]
+        for i in candidates:
+            if size <= budget:
+                break
+            kind, text = segments[i]
+            dropped[i] = True
+            size -= len(text) - _MARKER_RESERVE
+            elided.append(ElidedSegment(kind, len(text), _describe(kind, text)))
+
+        text = _render(segments, dropped)
+
+        # 規則 3：只保留結尾（在行首切開，避免半行程式碼）
+        if len(text) > budget:
+            cut = len(text) - max(0, budget - _MARKER_RESERVE)
+            newline = text.find("\n", cut)
+            if newline != -1 and newline - cut < _MARKER_RESERVE:
+                cut = newline + 1
+            elided.append(ElidedSegment("head", cut))
+            text = f"[…已省略前 {cut} 字元…]\n" + text[cut:]
+            if len(text) > budget:
+                text = text[len(text) - budget:]
+
+        window = ContextWindow(text=text, original_chars=len(context), elided=elided)
+        self.logger.info(f"✂️ 串接上下文超過預算 {budget} 字元：{window.summary()}")
+        return window
+
+    def build_prompt(self, context: str, prompt_line: str) -> Tuple[str, ContextWindow]:
+        """
+        組合「上下文 + 本行提示詞」，上下文依預算裁剪（本行提示詞一律完整保留）
+
+        Args:
+            context: 上一個回應
+            prompt_line: 本行提示詞
+
+        Returns:
+            Tuple[str, ContextWindow]: (要發送的提示詞, 上下文裁剪結果)
+        """
+        window = self.fit(context, reserve=len(prompt_line) + 1)
+        if not window.text:
+            return prompt_line, window
+        return f"{window.text}\n{prompt_line}", window
+
+
+def _split_segments(text: str) -> List[Tuple[str, str]]:
+    """切分為說明文字段落與程式碼區塊"""
+    segments = []
+    position = 0
+    for match in _FENCE_PATTERN.finditer(text):
+        segments.extend(_prose_segments(text[position:match.start()]))
+        segments.append(("code", match.group(0).strip()))
+        position = match.end()
+    segments.extend(_prose_segments(text[position:]))
+    return segments
+
+
+def _prose_segments(text: str) -> List[Tuple[str, str]]:
+    return [("prose", paragraph.strip()) for paragraph in _PARAGRAPH_SPLIT.split(text) if paragraph.strip()]
+
+
+def _describe(kind: str, text: str) -> str:
+    if kind == "code":
+        language = text.split("\n", 1)[0][3:].strip() or "程式碼"
+        return f"{language}，{text.count(chr(10)) - 1} 行"
+    return f"{len(text)} 字元"
+
+
+def _render(segments: List[Tuple[str, str]], dropped: List[bool]) -> str:
+    """組回文字，連續被省略的段落合併為一個標記"""
+    parts = []
+    run: List[Tuple[str, str]] = []
+
+    def flush():
+        if not run:
+            return
+        prose = [text for kind, text in run if kind == "prose"]
+        code = [text for kind, text in run if kind == "code"]
+        labels = []
+        if prose:
+            labels.append(f"{len(prose)} 段說明文字")
+        if code:
+            labels.append(f"{len(code)} 個程式碼區塊（{'、'.join(_describe('code', c) for c in code)}）")
+        parts.append(f"[…已省略{'、'.join(labels)}…]")
+        run.clear()
+
+    for segment, is_dropped in zip(segments, dropped):
+        if is_dropped:
+            run.append(segment)
+        else:
+            flush()
+            parts.append(segment[1])
+    flush()
+    return _SEPARATOR.join(parts)
@@ -6,12 +6,10 @@ Hybrid UI Automation Script - Copilot Chat 操作模組
 支援 Rate Limit 檢測和自動重試機制
 """
 
-import pyautogui
-import pyperclip
-import psutil
 import time
+from functools import partial
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
 import sys
 
 # 導入配置和日誌
@@ -26,25 +24,56 @@ except ImportError:
         sys.path.append(str(Path(__file__).parent.parent / "config"))
         import config
 try:
-    from src.logger import get_logger
+    from src.logger import get_logger, reset_event_context, set_event_context, timed_phase
     from src.image_recognition import image_recognition
     from src.copilot_rate_limit_handler import (
-        is_response_incomplete,
-        wait_and_retry
+        ResponseFailure,
+        RateLimitBackoff,
+        classify_response_failure
+    )
+    from src.response_capture import ResponseExportReader
+    from src.ui_delay_controller import ui_delays
+    from src.progress_checkpoint import ProgressCheckpoint
+    from src.context_window import ContextWindowManager
+    from src.response_writer import ResponseWriter
+    from src.lazy_import import LazyInstance
+    from src.tracing import span, traced
+    from src.ui_driver import ui
+    from src.response_index import (
+        RESPONSE_MARKER,
+        ResponseIndex,
+        extract_response,
+        find_latest_response_file
     )
 except ImportError:
-    from logger import get_logger
+    from logger import get_logger, reset_event_context, set_event_context, timed_phase
     from image_recognition import image_recognition
     from copilot_rate_limit_handler import (
-        is_response_incomplete,
-        wait_and_retry
+        ResponseFailure,
+        RateLimitBackoff,
+        classify_response_failure
+    )
+    from response_capture import ResponseExportReader
+    from ui_delay_controller import ui_delays
+    from progress_checkpoint import ProgressCheckpoint
+    from context_window import ContextWindowManager
+    from response_writer import ResponseWriter
+    from lazy_import import LazyInstance
+    from tracing import span, traced
+    from ui_driver import ui
+    from response_index import (
+        RESPONSE_MARKER,
+        ResponseIndex,
+        extract_response,
+        find_latest_response_file
     )
 
 class CopilotHandler:
     """Copilot Chat 操作處理器"""
     COMPLETION_INSTRUCTION = '【重要】除了寫程式外，不要執行其餘操作，一次就回答完成，並且在回答完成後，務必在最後一行加上「已完成回答」'
     
-    def __init__(self, error_handler=None, interaction_settings=None, cwe_scan_manager=None, cwe_scan_settings=None):
+    def __init__(self, error_handler=None, interaction_settings=None, cwe_scan_manager=None, cwe_scan_settings=None,
+                 vscode_controller=None):
         """
         初始化 Copilot 處理器
         
@@ -53,22 +82,44 @@ class CopilotHandler:
             interaction_settings: 互動設定
             cwe_scan_manager: CWE 掃描管理器
             cwe_scan_settings: CWE 掃描設定
+            vscode_controller: 實際啟動 VS Code 的控制器（檢查關閉狀態時使用它的行程追蹤），None 表示使用全域實例
         """
         self.logger = get_logger("CopilotHandler")
         self.is_chat_open = False
         self.last_response = ""
         self.last_sent_prompt = ""
+        self.last_saved_file: Optional[Path] = None  # 最近一次儲存的回應檔案
+        self._response_indexes: Dict[str, ResponseIndex] = {}  # 專案結果資料夾 -> 回應索引
+        self.context_window = ContextWindowManager()  # 串接模式的上下文字元預算
+        self.response_writer = ResponseWriter()  # 回應檔案寫入（快取資料夾、原子寫入、可背景寫入）
         self.error_handler = error_handler  # 添加 error_handler 引用
         self.image_recognition = image_recognition  # 添加圖像識別引用
         self.interaction_settings = interaction_settings  # 添加外部設定支援
         self.cwe_scan_manager = cwe_scan_manager  # CWE 掃描管理器
         self.cwe_scan_settings = cwe_scan_settings  # CWE 掃描設定
+        self.vscode_controller = vscode_controller  # 啟動 VS Code 的控制器
         self._clipboard_lock = False  # 剪貼簿鎖定狀態，避免併發衝突
+        # 匯出檔案回應通道（僅在 file 模式啟用）
+        self.response_reader = ResponseExportReader() if config.RESPONSE_CAPTURE_MODE == "file" else None
+        
+        # 回應失敗（截斷/速率限制/空白）的退避控制
+        self.rate_limit_backoff = RateLimitBackoff(self.logger)
+        self.background_queue = None  # 背景工作佇列（由主控制器設定）
         
         self.logger.info("Copilot Chat 處理器初始化完成")
         if cwe_scan_manager and cwe_scan_settings and cwe_scan_settings.get("enabled"):
             self.logger.info(f"✅ CWE 掃描已啟用 (類型: CWE-{cwe_scan_settings.get('cwe_type')})")
 
+    def set_background_queue(self, background_queue):
+        """
+        設定背景工作佇列：退避等待期間會執行佇列中的工作，逐行 CWE 掃描也可延後排入
+        
+        Args:
+            background_queue: BackgroundWorkQueue 實例
+        """
+        self.background_queue = background_queue
+        self.rate_limit_backoff.on_idle = background_queue.drain if background_queue else None
+
     def _ensure_completion_instruction(self, prompt: str) -> str:
         """確保提示詞包含完成回報指示"""
         instruction = self.COMPLETION_INSTRUCTION
@@ -80,6 +131,7 @@ class CopilotHandler:
             return f"{prompt}{instruction}"
         return f"{prompt}\n\n{instruction}"
     
+    @timed_phase("send")
     def _send_prompt_with_content(self, prompt_content: str, line_number: int, total_lines: int) -> bool:
         """
         發送提示詞內容到 Copilot Chat（支援串接內容）
@@ -108,19 +160,8 @@ class CopilotHandler:
                 self.logger.error(f"無法複製第 {line_number} 行完整提示詞到剪貼簿")
                 return False
             
-            # 確保聚焦到輸入框（輕量級檢查）
-            pyautogui.hotkey('ctrl', 'f1')
-            time.sleep(0.5)
-            
-            # 清空現有內容並貼上提示詞
-            pyautogui.hotkey('ctrl', 'a')  # 全選
-            time.sleep(0.2)
-            pyautogui.hotkey('ctrl', 'v')  # 貼上
-            time.sleep(0.5)
-            
-            # 發送提示詞
-            pyautogui.press('enter')
-            time.sleep(1)
+            # 聚焦輸入框、貼上並發送提示詞
+            self._paste_and_submit_prompt(submit_delay=1)
             
             self.logger.copilot_interaction(f"發送第 {line_number} 行", "SUCCESS", f"長度: {len(prompt_to_send)} 字元")
             return True
@@ -129,6 +170,68 @@ class CopilotHandler:
             self.logger.copilot_interaction(f"發送第 {line_number} 行", "ERROR", str(e))
             return False
     
+    def _paste_and_submit_prompt(self, submit_delay: float) -> bool:
+        """
+        聚焦 Copilot Chat 輸入框、以剪貼簿內容取代輸入並按下 Enter
+        各步驟的等待時間由 ui_delays 依實測結果調整
+        
+        Args:
+            submit_delay: 按下 Enter 後原本的固定等待時間
+            
+        Returns:
+            bool: 貼上與送出是否都觀測到畫面變化
+        """
+        # 確保聚焦到輸入框（輕量級檢查）
+        ui.hotkey('ctrl', 'f1')
+        ui_delays.wait('chat.focus_input', 0.5)
+        
+        # 清空現有內容並貼上提示詞
+        ui.hotkey('ctrl', 'a')  # 全選
+        ui_delays.wait('chat.select_all', 0.2)
+        paste_probe = ui_delays.screen_probe()
+        ui.hotkey('ctrl', 'v')  # 貼上
+        pasted = ui_delays.wait_until('chat.paste', paste_probe, 0.5)
+        
+        # 發送提示詞
+        self._mark_prompt_sent()
+        probe = ui_delays.screen_probe()
+        ui.press('enter')
+        submitted = ui_delays.wait_until('chat.submit', probe, submit_delay)
+        
+        # 觀測到貼上生效代表前面的聚焦與全選等待足夠
+        if paste_probe is not None:
+            for step, default in (('chat.focus_input', 0.5), ('chat.select_all', 0.2)):
+                if pasted:
+                    ui_delays.report_success(step, default)
+                else:
+                    ui_delays.report_failure(step, default)
+        return pasted and submitted
+    
+    def _mark_prompt_sent(self):
+        """記錄提示詞送出時間，供匯出檔案通道過濾舊回應"""
+        if self.response_reader is not None:
+            self.response_reader.mark_request_sent()
+    
+    def _read_exported_response(self) -> Optional[str]:
+        """
+        從匯出檔案通道讀取回應（不經過剪貼簿）
+        
+        Returns:
+            Optional[str]: 回應內容，通道未取得回應則返回 None
+        """
+        try:
+            response = self.response_reader.wait_for_response()
+        except Exception as e:
+            self.logger.warning(f"讀取匯出回應時發生錯誤: {e}")
+            return None
+        
+        if not response:
+            return None
+        
+        self.last_response = response
+        self.logger.copilot_interaction("讀取匯出回應", "SUCCESS", f"長度: {len(response)} 字元")
+        return response
+    
     def _safe_clipboard_copy(self, content: str, context: str = "") -> bool:
         """
         安全的剪貼簿複製操作，避免併發衝突
@@ -148,16 +251,17 @@ class CopilotHandler:
                 # 避免併發操作
                 while self._clipboard_lock:
                     self.logger.debug("等待剪貼簿解鎖...")
-                    time.sleep(0.2)
+                    ui.sleep(0.2)
                 
                 self._clipboard_lock = True
                 
                 # 執行複製
-                pyperclip.copy(content)
-                time.sleep(wait_time)
+                ui.copy(content)
+                ui_delays.wait_until('clipboard.copy', lambda: ui.paste() == content,
+                                     wait_time, settle=False)
                 
                 # 驗證複製結果
-                copied_content = pyperclip.paste()
+                copied_content = ui.paste()
                 
                 self._clipboard_lock = False
                 
@@ -167,14 +271,14 @@ class CopilotHandler:
                 else:
                     self.logger.warning(f"剪貼簿內容不符 - {context} (第 {attempt + 1} 次)")
                     if attempt < max_attempts - 1:
-                        time.sleep(1)
+                        ui.sleep(1)
                         continue
                         
             except Exception as e:
                 self._clipboard_lock = False
                 self.logger.warning(f"剪貼簿操作異常 - {context}: {e}")
                 if attempt < max_attempts - 1:
-                    time.sleep(1)
+                    ui.sleep(1)
                     continue
         
         self.logger.error(f"剪貼簿複製失敗 - {context}")
@@ -191,11 +295,11 @@ class CopilotHandler:
             self.logger.info("開啟 Copilot Chat...")
             
             # 使用 Ctrl+F1 聚焦到 Copilot Chat 輸入框
-            pyautogui.hotkey('ctrl', 'f1')
-            time.sleep(config.VSCODE_COMMAND_DELAY)
+            ui.hotkey('ctrl', 'f1')
+            ui.sleep(config.VSCODE_COMMAND_DELAY)
             
             # 等待面板開啟和聚焦
-            time.sleep(2)
+            ui.sleep(2)
             
             self.is_chat_open = True
             self.logger.copilot_interaction("開啟 Chat 面板", "SUCCESS")
@@ -205,6 +309,7 @@ class CopilotHandler:
             self.logger.copilot_interaction("開啟 Chat 面板", "ERROR", str(e))
             return False
     
+    @timed_phase("send")
     def send_prompt(self, prompt: str = None, round_number: int = 1) -> bool:
         """
         發送提示詞到 Copilot Chat (使用鍵盤操作)
@@ -233,18 +338,19 @@ class CopilotHandler:
                 return False
             
             # 使用 Ctrl+F1 聚焦到輸入框
-            pyautogui.hotkey('ctrl', 'f1')
-            time.sleep(1)
+            ui.hotkey('ctrl', 'f1')
+            ui.sleep(1)
             
             # 清空現有內容並貼上提示詞
-            pyautogui.hotkey('ctrl', 'a')  # 全選
-            time.sleep(0.2)
-            pyautogui.hotkey('ctrl', 'v')  # 貼上
-            time.sleep(1)
+            ui.hotkey('ctrl', 'a')  # 全選
+            ui.sleep(0.2)
+            ui.hotkey('ctrl', 'v')  # 貼上
+            ui.sleep(1)
             
             # 發送提示詞
-            pyautogui.press('enter')
-            time.sleep(1)
+            self._mark_prompt_sent()
+            ui.press('enter')
+            ui.sleep(1)
             
             self.is_chat_open = True
             self.logger.copilot_interaction("發送提示詞", "SUCCESS", f"長度: {len(prompt)} 字元")
@@ -324,19 +430,8 @@ class CopilotHandler:
                 self.logger.error(f"無法複製第 {line_number} 行提示詞到剪貼簿")
                 return False
             
-            # 確保聚焦到輸入框（輕量級檢查）
-            pyautogui.hotkey('ctrl', 'f1')
-            time.sleep(0.5)
-            
-            # 清空現有內容並貼上提示詞
-            pyautogui.hotkey('ctrl', 'a')  # 全選
-            time.sleep(0.2)
-            pyautogui.hotkey('ctrl', 'v')  # 貼上
-            time.sleep(0.5)
-            
-            # 發送提示詞
-            pyautogui.press('enter')
-            time.sleep(0.5)
+            # 聚焦輸入框、貼上並發送提示詞
+            self._paste_and_submit_prompt(submit_delay=0.5)
             
             self.is_chat_open = True
             self.logger.copilot_interaction(f"發送第 {line_number} 行提示詞", "SUCCESS", 
@@ -347,6 +442,7 @@ class CopilotHandler:
             self.logger.copilot_interaction(f"發送第 {line_number} 行提示詞", "ERROR", str(e))
             return False
     
+    @timed_phase("wait")
     def wait_for_response(self, timeout: int = None, use_smart_wait: bool = None) -> bool:
         """
         等待 Copilot 回應完成
@@ -379,7 +475,7 @@ class CopilotHandler:
                     if self.error_handler and self.error_handler.emergency_stop_requested:
                         self.logger.warning("收到中斷請求，停止等待 Copilot 回應")
                         return False
-                    time.sleep(1)
+                    ui.sleep(1)
                 
                 self.logger.copilot_interaction("回應等待完成", "SUCCESS", f"等待時間: {wait_time}秒")
                 return True
@@ -388,6 +484,7 @@ class CopilotHandler:
             self.logger.copilot_interaction("等待回應", "ERROR", str(e))
             return False
     
+    @traced("copilot.smart_wait")
     def _smart_wait_for_response(self, timeout: int) -> bool:
         """
         智能等待 Copilot 回應完成 (純圖像識別)
@@ -401,26 +498,28 @@ class CopilotHandler:
         try:
             self.logger.info(f"智能等待 Copilot 回應（純圖像識別），最長等待 {timeout} 秒...")
             
-            start_time = time.time()
+            start_time = ui.time()
             check_interval = 3.0  # 檢查間隔
             
             # 初始等待
             initial_wait = 5
             self.logger.info(f"初始等待 {initial_wait} 秒...")
-            time.sleep(initial_wait)
+            with span("copilot.smart_wait.initial_sleep"):
+                ui.sleep(initial_wait)
             
             # 持續圖像檢測
-            while (time.time() - start_time) < timeout:
+            while (ui.time() - start_time) < timeout:
                 # 檢查緊急停止
                 if self.error_handler and self.error_handler.emergency_stop_requested:
                     self.logger.warning("收到中斷請求，停止等待")
                     return False
                 
-                elapsed_time = time.time() - start_time
+                elapsed_time = ui.time() - start_time
                 
                 # 圖像識別檢查
                 try:
-                    copilot_status = self.image_recognition.check_copilot_response_status_with_auto_clear()
+                    with span("copilot.smart_wait.status_check", elapsed=int(elapsed_time)):
+                        copilot_status = self.image_recognition.check_copilot_response_status_with_auto_clear()
                     
                     # 自動清除通知
                     if copilot_status.get('notifications_cleared', False):
@@ -446,7 +545,8 @@ class CopilotHandler:
                     except:
                         self.logger.info(f"⏱️ 已等待 {int(elapsed_time)} 秒")
                 
-                time.sleep(check_interval)
+                with span("copilot.smart_wait.sleep"):
+                    ui.sleep(check_interval)
             
             # 超時
             self.logger.warning(f"⏰ 圖像檢測等待超時 ({timeout}秒)")
@@ -462,6 +562,8 @@ class CopilotHandler:
     
 
     
+    @timed_phase("copy")
+    @traced("copilot.copy_response")
     def copy_response(self) -> Optional[str]:
         """
         複製 Copilot 的回應內容 (使用鍵盤操作，支援重試)
@@ -469,58 +571,79 @@ class CopilotHandler:
         Returns:
             Optional[str]: 回應內容，若複製失敗則返回 None
         """
+        # 優先使用匯出檔案通道，失敗時才退回剪貼簿流程
+        if self.response_reader is not None:
+            response = self._read_exported_response()
+            if response:
+                return response
+            self.logger.warning("匯出檔案通道未取得回應，改用剪貼簿複製")
+        
         for attempt in range(config.COPILOT_COPY_RETRY_MAX):
             try:
                 self.logger.info(f"複製 Copilot 回應 (第 {attempt + 1}/{config.COPILOT_COPY_RETRY_MAX} 次)...")
                 
                 # 使用安全的剪貼簿清空
-                self._safe_clipboard_copy("", "清空剪貼簿")
+                with span("copilot.copy.clear_clipboard", attempt=attempt + 1):
+                    self._safe_clipboard_copy("", "清空剪貼簿")
                 
                 # 使用鍵盤操作複製回應
-                # 1. Ctrl+F1 聚焦到 Copilot Chat 輸入框
-                pyautogui.hotkey('ctrl', 'f1')
-                time.sleep(1)
-                
-                # 2. Ctrl+↑ 聚焦到 Copilot 回應
-                pyautogui.hotkey('ctrl', 'up')
-                time.sleep(1)
-                
-                # 3. Shift+F10 開啟右鍵選單
-                pyautogui.hotkey('shift', 'f10')
-                time.sleep(1)
-                
-                # 4. 一次方向鍵下，定位到"複製"
-                pyautogui.press('down')
-                time.sleep(0.3)
+                with span("copilot.copy.keyboard", attempt=attempt + 1):
+                    # 1. Ctrl+F1 聚焦到 Copilot Chat 輸入框
+                    ui.hotkey('ctrl', 'f1')
+                    ui_delays.wait('copy.focus_input', 1)
+                    
+                    # 2. Ctrl+↑ 聚焦到 Copilot 回應
+                    ui.hotkey('ctrl', 'up')
+                    ui_delays.wait('copy.focus_response', 1)
+                    
+                    # 3. Shift+F10 開啟右鍵選單
+                    probe = ui_delays.screen_probe()
+                    ui.hotkey('shift', 'f10')
+                    ui_delays.wait_until('copy.context_menu', probe, 1)
+                    
+                    # 4. 一次方向鍵下，定位到"複製"
+                    probe = ui_delays.screen_probe()
+                    ui.press('down')
+                    ui_delays.wait_until('copy.menu_down', probe, 0.3)
                 
-                # 5. Enter 執行複製
-                pyautogui.press('enter')
-                time.sleep(2)  # 增加等待時間確保複製完成
+                # 5. Enter 執行複製（剪貼簿出現內容即完成）
+                with span("copilot.copy.clipboard_wait", attempt=attempt + 1) as clipboard_span:
+                    ui.press('enter')
+                    ui_delays.wait_until('copy.clipboard', lambda: bool(ui.paste().strip()),
+                                         2, settle=False)
+                    
+                    # 取得剪貼簿內容
+                    response = ui.paste()
+                    clipboard_span.set(chars=len(response or ""))
+                copied = bool(response and len(response.strip()) > 0)
+                for step, default in (('copy.focus_input', 1), ('copy.focus_response', 1)):
+                    if copied:
+                        ui_delays.report_success(step, default)
+                    else:
+                        ui_delays.report_failure(step, default)
                 
-                # 取得剪貼簿內容
-                response = pyperclip.paste()
-                if response and len(response.strip()) > 0:
+                if copied:
                     self.last_response = response
                     self.logger.copilot_interaction("複製回應", "SUCCESS", f"長度: {len(response)} 字元")
                     
                     # 複製完成後，聚焦回輸入框以便下一步操作
                     self.logger.debug("複製完成，聚焦回輸入框...")
-                    pyautogui.hotkey('ctrl', 'f1')
-                    time.sleep(0.5)
+                    ui.hotkey('ctrl', 'f1')
+                    ui.sleep(0.5)
                     
                     return response
                 else:
                     self.logger.warning(f"第 {attempt + 1} 次複製失敗，剪貼簿內容為空")
                     if attempt < config.COPILOT_COPY_RETRY_MAX - 1:
                         self.logger.info(f"等待 {config.COPILOT_COPY_RETRY_DELAY} 秒後重試...")
-                        time.sleep(config.COPILOT_COPY_RETRY_DELAY)
+                        ui.sleep(config.COPILOT_COPY_RETRY_DELAY)
                         continue
                 
             except Exception as e:
                 self.logger.error(f"第 {attempt + 1} 次複製時發生錯誤: {str(e)}")
                 if attempt < config.COPILOT_COPY_RETRY_MAX - 1:
                     self.logger.info(f"等待 {config.COPILOT_COPY_RETRY_DELAY} 秒後重試...")
-                    time.sleep(config.COPILOT_COPY_RETRY_DELAY)
+                    ui.sleep(config.COPILOT_COPY_RETRY_DELAY)
                     continue
         
         self.logger.copilot_interaction("複製回應", "ERROR", f"重試 {config.COPILOT_COPY_RETRY_MAX} 次後仍然失敗")
@@ -536,21 +659,24 @@ class CopilotHandler:
         try:
             self.logger.debug("測試 VS Code 是否可以關閉...")
             
-            # 嘗試使用 Alt+F4 關閉視窗
-            pyautogui.hotkey('alt', 'f4')
-            time.sleep(1)
-            
-            # 檢查是否還有 VS Code 進程在運行（只檢查自動開啟的）
-            try:
-                from src.vscode_controller import vscode_controller
-            except ImportError:
-                from vscode_controller import vscode_controller
+            controller = self.vscode_controller
+            if controller is None:
+                try:
+                    from src.vscode_controller import vscode_controller as controller
+                except ImportError:
+                    from vscode_controller import vscode_controller as controller
             
-            still_running = []
-            for proc in psutil.process_iter(['pid', 'name']):
-                if ('code' in proc.info['name'].lower() and 
-                    proc.info['pid'] not in vscode_controller.pre_existing_vscode_pids):
-                    still_running.append(proc.info['pid'])
+            # 嘗試使用 Alt+F4 關閉視窗
+            processes = controller.processes
+            processes.expect_exit()
+            ui.hotkey('alt', 'f4')
+            ui.sleep(1)
+            
+            # 檢查自動開啟的 VS Code 行程樹是否還在運行；沒有在追蹤時走訪一次行程表
+            if processes.tracking:
+                still_running = sorted(processes.pids) if processes.is_alive() else []
+            else:
+                still_running = processes.running_pids()
             
             if not still_running:
                 self.logger.debug("✅ VS Code 已成功關閉，Copilot 回應應該已完成")
@@ -563,6 +689,7 @@ class CopilotHandler:
             self.logger.error(f"測試 VS Code 關閉狀態時發生錯誤: {str(e)}")
             return False
     
+    @timed_phase("save")
     def save_response_to_file(self, project_path: str, response: str = None, is_success: bool = True, **kwargs) -> bool:
         """
         將回應儲存到統一的 ExecutionResult 資料夾
@@ -571,7 +698,8 @@ class CopilotHandler:
             project_path: 專案路徑
             response: 回應內容，若為 None 則使用最後一次的回應
             is_success: 是否成功執行
-            **kwargs: 額外參數，如 round_number（互動輪數）
+            **kwargs: 額外參數，如 round_number（互動輪數）、
+                      on_saved（檔案就位後以檔案路徑呼叫；背景寫入時在寫入執行緒中呼叫）
         
         Returns:
             bool: 儲存是否成功
@@ -587,19 +715,14 @@ class CopilotHandler:
             project_dir = Path(project_path)
             project_name = project_dir.name
             
-            # 建立統一的 ExecutionResult 資料夾結構（在腳本根目錄）
-            script_root = Path(__file__).parent.parent  # 腳本根目錄
-            execution_result_dir = script_root / "ExecutionResult"
+            # 建立統一的 ExecutionResult 資料夾結構（預設在腳本根目錄）
+            execution_result_dir = config.EXECUTION_RESULT_DIR
             result_subdir = execution_result_dir / ("Success" if is_success else "Fail")
             
-            # 建立專案專屬資料夾
+            # 專案專屬資料夾與輪數專屬資料夾（由寫入器建立並快取）
             project_subdir = result_subdir / project_name
-            project_subdir.mkdir(parents=True, exist_ok=True)
-            
-            # 建立輪數專屬資料夾
             round_number = kwargs.get('round_number', 1)
             round_subdir = project_subdir / f"第{round_number}輪"
-            round_subdir.mkdir(parents=True, exist_ok=True)
             
             # 生成檔名（包含時間戳記和行號，用於反覆互動的版本控制）
             timestamp = time.strftime('%Y%m%d_%H%M%S')  # 增加秒數確保唯一性
@@ -619,48 +742,65 @@ class CopilotHandler:
             actual_sent_prompt = kwargs.get('actual_sent_prompt', None)  # 實際發送的完整內容
             retry_count = kwargs.get('retry_count', 0)  # 重試次數
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("# Copilot 自動補全記錄\n")
-                f.write(f"# 生成時間: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"# 專案: {project_name}\n")
-                f.write(f"# 專案路徑: {project_path}\n")
-                f.write(f"# 互動輪數: 第 {round_number} 輪\n")
-                
-                # 如果有行號資訊，添加行號
-                if line_number is not None:
-                    total_lines = kwargs.get('total_lines', '?')
-                    f.write(f"# 提示詞行號: 第 {line_number}/{total_lines} 行\n")
-                
-                # 記錄重試信息
-                if retry_count > 0:
-                    f.write(f"# 重試次數: {retry_count}\n")
-                
-                f.write(f"# 執行狀態: {'成功' if is_success else '失敗'}\n")
-                f.write("=" * 50 + "\n\n")
-                
-                # 添加原始提示詞
-                if line_number is not None:
-                    f.write(f"## 第 {line_number} 行原始提示詞\n\n")
-                else:
-                    f.write("## 本輪原始提示詞\n\n")
-                f.write(prompt_text)
-                f.write("\n\n")
-                
-                # 如果有實際發送的內容（串接後），也記錄下來
-                if actual_sent_prompt and actual_sent_prompt != prompt_text:
-                    f.write("## 實際發送內容（包含串接）\n\n")
-                    f.write(actual_sent_prompt)
-                    f.write("\n\n")
-                    f.write(f"**注意**: 本次發送包含了前面回應的串接內容，總長度: {len(actual_sent_prompt)} 字元\n\n")
-                
-                # 添加回應內容
-                f.write("## Copilot 回應\n\n")
-                f.write(response)
+            parts = [
+                "# Copilot 自動補全記錄\n",
+                f"# 生成時間: {time.strftime('%Y-%m-%d %H:%M:%S')}\n",
+                f"# 專案: {project_name}\n",
+                f"# 專案路徑: {project_path}\n",
+                f"# 互動輪數: 第 {round_number} 輪\n",
+            ]
             
-            self.logger.copilot_interaction("儲存回應", "SUCCESS", f"檔案: {output_file.name}")
+            # 如果有行號資訊，添加行號
+            if line_number is not None:
+                total_lines = kwargs.get('total_lines', '?')
+                parts.append(f"# 提示詞行號: 第 {line_number}/{total_lines} 行\n")
+            
+            # 記錄重試信息
+            if retry_count > 0:
+                parts.append(f"# 重試次數: {retry_count}\n")
             
-            # 等待短暫時間確保檔案完全寫入
-            time.sleep(0.5)
+            parts.append(f"# 執行狀態: {'成功' if is_success else '失敗'}\n")
+            parts.append("=" * 50 + "\n\n")
+            
+            # 添加原始提示詞
+            if line_number is not None:
+                parts.append(f"## 第 {line_number} 行原始提示詞\n\n")
+            else:
+                parts.append("## 本輪原始提示詞\n\n")
+            parts.append(prompt_text)
+            parts.append("\n\n")
+            
+            # 如果有實際發送的內容（串接後），也記錄下來
+            if actual_sent_prompt and actual_sent_prompt != prompt_text:
+                parts.append("## 實際發送內容（包含串接）\n\n")
+                parts.append(actual_sent_prompt)
+                parts.append("\n\n")
+                parts.append(f"**注意**: 本次發送包含了前面回應的串接內容，總長度: {len(actual_sent_prompt)} 字元\n\n")
+                context_elided = kwargs.get('context_elided')
+                if context_elided:
+                    parts.append(f"**上下文裁剪**: {context_elided}\n\n")
+            
+            # 添加回應內容（記錄回應在檔案中的位元組位置供索引使用）
+            parts.append(RESPONSE_MARKER)
+            header = "".join(parts).encode('utf-8')
+            body = response.encode('utf-8')
+            on_saved = kwargs.get('on_saved')
+            
+            def on_written(path: Path):
+                # 檔案就位後才加入索引與通知呼叫端，中斷時不會留下指向不存在檔案的記錄
+                if is_success:
+                    self._get_response_index(project_subdir).add(
+                        round_number, line_number, path, len(header), len(body)
+                    )
+                if on_saved is not None:
+                    on_saved(path)
+            
+            if not self.response_writer.write(output_file, header + body, on_written=on_written):
+                self.logger.copilot_interaction("儲存回應", "ERROR", f"檔案: {output_file.name}")
+                return False
+            
+            self.logger.copilot_interaction("儲存回應", "SUCCESS", f"檔案: {output_file.name}")
+            self.last_saved_file = output_file
             return True
             
         except Exception as e:
@@ -668,7 +808,8 @@ class CopilotHandler:
             return False
     
     def process_project_with_line_by_line(self, project_path: str, round_number: int = 1, 
-                                        use_smart_wait: bool = None) -> Tuple[bool, int, List[str]]:
+                                        use_smart_wait: bool = None,
+                                        checkpoint: ProgressCheckpoint = None) -> Tuple[bool, int, List[str]]:
         """
         使用專案專用提示詞模式處理專案（按行發送）
         支援累積串接功能：每次將當前回應串接到下一行提示詞前面
@@ -677,10 +818,12 @@ class CopilotHandler:
             project_path: 專案路徑
             round_number: 當前互動輪數
             use_smart_wait: 是否使用智能等待
+            checkpoint: 進度檢查點，提供時從本輪下一個未完成的行開始，並在每行儲存後更新
             
         Returns:
             Tuple[bool, int, List[str]]: (是否成功, 成功處理的行數, 失敗的行列表)
         """
+        context_token = set_event_context(round=round_number)  # 本輪的階段事件帶有輪數與行號
         try:
             project_name = Path(project_path).name
             self.logger.create_separator(f"專案專用模式處理: {project_name} (第 {round_number} 輪)")
@@ -708,6 +851,26 @@ class CopilotHandler:
             failed_lines = []
             accumulated_response = ""  # 累積的回應內容
             
+            # 從檢查點續跑：略過本輪已完成的行
+            start_line = 1
+            if checkpoint is not None:
+                start_line = checkpoint.next_line(round_number)
+                if include_previous_response and start_line > 1:
+                    previous = checkpoint.load_response(round_number, start_line - 1)
+                    if previous is None:
+                        # 無法取回上一行的回應就無法正確串接，改從上一行重新開始
+                        self.logger.warning(f"無法讀回第 {start_line - 1} 行的回應，從該行重新處理")
+                        start_line -= 1
+                        if start_line > 1:
+                            previous = checkpoint.load_response(round_number, start_line - 1) or ""
+                    accumulated_response = (previous or "").strip()
+                successful_lines = start_line - 1
+                if start_line > total_lines:
+                    self.logger.info(f"⏭️ 第 {round_number} 輪已全部完成（依進度檢查點），略過")
+                    return True, successful_lines, []
+                if start_line > 1:
+                    self.logger.info(f"⏯️ 依進度檢查點從第 {round_number} 輪第 {start_line}/{total_lines} 行繼續")
+            
             # 步驟1: 一次性開啟 Copilot Chat
             if not self.open_copilot_chat():
                 error_msg = "無法開啟 Copilot Chat"
@@ -716,8 +879,13 @@ class CopilotHandler:
             
             # 逐行處理
             for line_num, original_prompt_line in enumerate(prompt_lines, 1):
+                if line_num < start_line:
+                    continue
                 line_success = False
                 retry_count = 0
+                empty_retries = 0
+                set_event_context(line=line_num)
+                line_start = time.monotonic()
                 
                 # 持續重試直到成功
                 while not line_success:
@@ -727,10 +895,13 @@ class CopilotHandler:
                         else:
                             self.logger.info(f"處理第 {line_num}/{total_lines} 行...")
                         
-                        # 準備當前要發送的提示詞
+                        # 準備當前要發送的提示詞（串接的上下文限制在字元預算內，避免提示詞逐行變長）
+                        context_window = None
                         if include_previous_response and accumulated_response and line_num > 1:
-                            current_prompt = f"{accumulated_response}\n{original_prompt_line}"
-                            self.logger.info(f"📎 串接模式：將前面的回應(長度: {len(accumulated_response)} 字元)串接到第 {line_num} 行")
+                            current_prompt, context_window = self.context_window.build_prompt(
+                                accumulated_response, original_prompt_line
+                            )
+                            self.logger.info(f"📎 串接模式：將前面的回應(長度: {len(context_window.text)}/{context_window.original_chars} 字元)串接到第 {line_num} 行")
                         else:
                             current_prompt = original_prompt_line
                             if line_num == 1:
@@ -752,31 +923,39 @@ class CopilotHandler:
                         
                         # 複製回應
                         response = self.copy_response()
-                        if not response:
-                            error_msg = f"第 {line_num} 行：無法複製回應內容"
-                            failed_lines.append(error_msg)
-                            self.logger.error(error_msg)
-                            break
                         
-                        # 檢查回應完整性
-                        if is_response_incomplete(response):
-                            self.logger.warning(f"⚠️  第 {line_num} 行回應不完整，將等待後重試")
+                        # 檢查回應完整性並判斷失敗類型
+                        failure = classify_response_failure(response)
+                        if failure is not None:
+                            if failure == ResponseFailure.EMPTY:
+                                if empty_retries >= config.RATE_LIMIT_EMPTY_MAX_RETRIES:
+                                    error_msg = f"第 {line_num} 行：無法複製回應內容"
+                                    failed_lines.append(error_msg)
+                                    self.logger.error(error_msg)
+                                    break
+                                empty_retries += 1
+                            
+                            self.logger.warning(f"⚠️  第 {line_num} 行回應失敗（{failure.value}），將退避後重試")
                             retry_count += 1
                             
-                            # 等待 30 分鐘
-                            wait_and_retry(1800, line_num, round_number, self.logger, retry_count)
+                            # 指數退避等待，並確認 Copilot 回到可輸入狀態
+                            self.rate_limit_backoff.wait(
+                                failure, line_num, round_number,
+                                ready_probe=image_recognition.check_copilot_response_ready
+                            )
                             
                             # 清空輸入框準備重試
-                            pyautogui.hotkey('ctrl', 'f1')
-                            time.sleep(0.5)
-                            pyautogui.hotkey('ctrl', 'a')
-                            time.sleep(0.2)
-                            pyautogui.press('delete')
-                            time.sleep(0.5)
+                            ui.hotkey('ctrl', 'f1')
+                            ui.sleep(0.5)
+                            ui.hotkey('ctrl', 'a')
+                            ui.sleep(0.2)
+                            ui.press('delete')
+                            ui.sleep(0.5)
                             
                             continue  # 繼續重試循環
                         
                         # 回應完整，繼續處理
+                        self.rate_limit_backoff.reset()
                         self.logger.info(f"✅ 第 {line_num} 行回應完整")
                         
                         # 更新累積回應
@@ -796,7 +975,11 @@ class CopilotHandler:
                             total_lines=total_lines,
                             prompt_text=original_prompt_line,
                             actual_sent_prompt=actual_sent_prompt,
-                            retry_count=retry_count
+                            retry_count=retry_count,
+                            context_elided=context_window.summary() if context_window else None,
+                            # 回應落地後立即記錄進度（之後中斷也不必重做這一行）
+                            on_saved=partial(checkpoint.record_line, round_number, line_num, response,
+                                             retry_count=retry_count) if checkpoint is not None else None
                         ):
                             error_msg = f"第 {line_num} 行：無法儲存回應到檔案"
                             failed_lines.append(error_msg)
@@ -810,12 +993,15 @@ class CopilotHandler:
                                 project_path=project_path,
                                 prompt_line=original_prompt_line,
                                 line_number=line_num,
-                                round_number=round_number
+                                round_number=round_number,
+                                checkpoint=checkpoint
                             )
                             if scan_success:
                                 self.logger.info(f"✅ 第 {line_num} 行 CWE 掃描完成")
                             else:
                                 self.logger.warning(f"⚠️  第 {line_num} 行 CWE 掃描失敗（繼續執行）")
+                        elif checkpoint is not None:
+                            checkpoint.mark_scan(round_number, line_num, "disabled")
                         
                         successful_lines += 1
                         line_success = True
@@ -824,18 +1010,26 @@ class CopilotHandler:
                         # 行之間的停頓
                         if line_num < total_lines:
                             self.logger.debug(f"準備處理下一行 ({line_num + 1}/{total_lines})...")
-                            time.sleep(1.5)
+                            ui.sleep(1.5)
                         else:
                             self.logger.info("所有行處理完成")
                             if include_previous_response:
                                 self.logger.info(f"🎯 累積串接處理完成，最終累積回應長度: {len(accumulated_response)} 字元")
-                            time.sleep(1)
+                            ui.sleep(1)
                         
                     except Exception as e:
                         error_msg = f"第 {line_num} 行處理失敗: {str(e)}"
                         failed_lines.append(error_msg)
                         self.logger.error(error_msg)
                         break
+                
+                # 整行（含重試）的事件，供吞吐量報告計算每小時行數
+                self.logger.event("line", line_start, time.monotonic(),
+                                  "ok" if line_success else "failed", retries=retry_count)
+            
+            # 輪次結束：等待回應檔案寫入完成
+            if not self.response_writer.flush():
+                failed_lines.append(f"第 {round_number} 輪：部分回應檔案寫入失敗")
             
             # 處理完成
             self.logger.create_separator(f"專案 {project_name} 第 {round_number} 輪處理完成")
@@ -853,6 +1047,8 @@ class CopilotHandler:
             error_msg = f"專案專用模式處理失敗: {str(e)}"
             self.logger.error(error_msg)
             return False, 0, [error_msg]
+        finally:
+            reset_event_context(context_token)
     
     def _process_project_with_project_prompts(self, project_path: str, max_rounds: int = None, 
                                             interaction_settings: dict = None) -> bool:
@@ -876,12 +1072,25 @@ class CopilotHandler:
             
             project_name = Path(project_path).name
             
+            # 逐行進度檢查點（中斷後從下一個未完成的行繼續）
+            checkpoint = None
+            if config.RESUME_FROM_CHECKPOINT:
+                checkpoint = ProgressCheckpoint(project_name, self.load_project_prompt_lines(project_path))
+                if checkpoint.has_progress:
+                    self.logger.info(f"⏯️ 找到專案 {project_name} 的進度檢查點，將從中斷處繼續")
+                    lost_scans = checkpoint.unscanned_lines()
+                    if lost_scans:
+                        self.logger.warning(f"上次中斷時以下行的 CWE 掃描尚未完成（檔案已變更，無法補掃）: "
+                                            f"{', '.join(lost_scans[:10])}")
+            
             # 檢查是否啟用多輪互動
             if not interaction_settings.get("interaction_enabled", True):
                 self.logger.info("多輪互動功能已停用，執行單輪專案專用處理")
                 success, successful_lines, failed_lines = self.process_project_with_line_by_line(
-                    project_path, round_number=1
+                    project_path, round_number=1, checkpoint=checkpoint
                 )
+                if success and not failed_lines and checkpoint is not None:
+                    checkpoint.mark_finished()
                 return success
             
             # 使用設定中的參數
@@ -908,6 +1117,11 @@ class CopilotHandler:
             
             # 進行多輪互動
             for round_num in range(1, max_rounds + 1):
+                if checkpoint is not None and checkpoint.is_round_complete(round_num):
+                    self.logger.info(f"⏭️ 第 {round_num} 輪已全部完成（依進度檢查點），略過")
+                    total_successful_lines += total_lines
+                    continue
+                
                 self.logger.create_separator(f"專案專用模式：開始第 {round_num} 輪互動")
                 
                 if round_num > 1:
@@ -921,11 +1135,11 @@ class CopilotHandler:
                         config.COPILOT_CHAT_MODIFICATION_ACTION
                     )
                     vscode_controller.clear_copilot_memory(modification_action)
-                    time.sleep(2)  # 等待記憶清除完成
+                    ui.sleep(2)  # 等待記憶清除完成
                 
                 # 處理本輪的按行互動
                 success, successful_lines, failed_lines = self.process_project_with_line_by_line(
-                    project_path, round_number=round_num
+                    project_path, round_number=round_num, checkpoint=checkpoint
                 )
                 
                 if success:
@@ -940,7 +1154,7 @@ class CopilotHandler:
                 # 輪次間暫停
                 if round_num < max_rounds:
                     self.logger.info(f"等待 {round_delay} 秒後進行下一輪...")
-                    time.sleep(round_delay)
+                    ui.sleep(round_delay)
             
             # 處理結束統計
             expected_total = total_lines * max_rounds
@@ -951,11 +1165,13 @@ class CopilotHandler:
             
             if total_failed_lines:
                 self.logger.warning(f"總計失敗行數: {len(total_failed_lines)}")
+            elif checkpoint is not None and total_successful_lines >= expected_total:
+                checkpoint.mark_finished()
             
             # 互動完成後的穩定期
             cooldown_time = 3
             self.logger.info(f"所有互動輪次完成，進入穩定期 {cooldown_time} 秒...")
-            time.sleep(cooldown_time)
+            ui.sleep(cooldown_time)
             
             return overall_success and (total_successful_lines > 0)
             
@@ -977,6 +1193,8 @@ class CopilotHandler:
         Returns:
             Tuple[bool, Optional[str]]: (是否成功, 錯誤訊息)
         """
+        prompt_start = time.monotonic()
+        outcome = "failed"
         try:
             project_name = Path(project_path).name
             self.logger.create_separator(f"處理專案: {project_name} (第 {round_number} 輪)")
@@ -1012,9 +1230,10 @@ class CopilotHandler:
                 return False, "無法儲存回應到檔案"
             
             # 確保檔案寫入完成後再繼續（避免競爭條件）
-            time.sleep(1)
+            ui.sleep(1)
             
             self.logger.copilot_interaction(f"第 {round_number} 輪處理完成", "SUCCESS", project_name)
+            outcome = "ok"
             return True, response  # 返回成功狀態和回應內容，供後續輪次使用
             
         except Exception as e:
@@ -1028,6 +1247,18 @@ class CopilotHandler:
                 pass  # 如果連錯誤日誌都無法儲存，就忽略
                 
             return False, error_msg
+        finally:
+            # 全域提示詞模式一次送出整份 prompt1.txt：事件記為其行數，與吞吐量報告的預計行數一致
+            self.logger.event("line", prompt_start, time.monotonic(), outcome,
+                              retries=0, lines=self._global_prompt_line_count())
+    
+    def _global_prompt_line_count(self) -> int:
+        """全域提示詞（prompt1.txt）的非空白行數，至少為 1"""
+        try:
+            with open(config.PROMPT1_FILE_PATH, 'r', encoding='utf-8') as f:
+                return max(1, sum(1 for line in f if line.strip()))
+        except OSError:
+            return 1
     
     def clear_chat_history(self) -> bool:
         """
@@ -1074,9 +1305,58 @@ class CopilotHandler:
         if not previous_response or len(previous_response.strip()) < 10:
             self.logger.warning("上一輪回應內容過短或為空，使用基礎提示詞")
             return base_prompt
-        cleaned_response = previous_response.strip()
-        # 直接由 prompt2.txt 內容與上一輪回應組成，無自動前後綴
-        return f"{cleaned_response}\n{base_prompt}"
+        # 直接由 prompt2.txt 內容與上一輪回應組成，無自動前後綴（上一輪回應依字元預算裁剪）
+        prompt, _ = self.context_window.build_prompt(previous_response, base_prompt)
+        return prompt
+    
+    def _get_response_index(self, project_result_dir: Path) -> ResponseIndex:
+        """
+        取得（並快取）專案的回應索引
+        
+        Args:
+            project_result_dir: 專案結果資料夾（ExecutionResult/Success/<專案>）
+            
+        Returns:
+            ResponseIndex: 回應索引
+        """
+        key = str(project_result_dir)
+        index = self._response_indexes.get(key)
+        if index is None or (len(index) and not index.index_file.exists()):
+            # 結果資料夾被清理後重新載入
+            index = ResponseIndex(project_result_dir)
+            self._response_indexes[key] = index
+        return index
+    
+    def _project_result_dir(self, project_path: str) -> Path:
+        """專案的成功結果資料夾"""
+        return config.EXECUTION_RESULT_DIR / "Success" / Path(project_path).name
+    
+    def _read_indexed_response(self, project_path: str, round_number: int = None) -> Optional[str]:
+        """
+        依索引讀取最新的回應（可指定輪數），索引缺少或失效時改為搜尋結果資料夾
+        
+        Args:
+            project_path: 專案路徑
+            round_number: 指定輪數，None 表示不限
+            
+        Returns:
+            Optional[str]: 回應內容
+        """
+        self.response_writer.flush()  # 背景寫入中的回應先落地
+        project_result_dir = self._project_result_dir(project_path)
+        index = self._get_response_index(project_result_dir)
+        entry = index.latest(round_number)
+        if entry is not None:
+            response = index.read(entry)
+            if response is not None:
+                return response
+            self.logger.debug(f"索引指向的回應檔案已變更: {entry.file}，改為搜尋結果資料夾")
+        
+        latest_file = find_latest_response_file(project_result_dir, round_number)
+        if latest_file is None:
+            return None
+        with open(latest_file, 'r', encoding='utf-8') as f:
+            return extract_response(f.read())
     
     def _read_previous_round_response(self, project_path: str, round_number: int) -> Optional[str]:
         """
@@ -1090,34 +1370,13 @@ class CopilotHandler:
             Optional[str]: Copilot 回應內容，如果讀取失敗則返回 None
         """
         try:
-            project_name = Path(project_path).name
-            script_root = Path(__file__).parent.parent
-            execution_result_dir = script_root / "ExecutionResult" / "Success" / project_name
-            
-            # 尋找該輪次的檔案（使用萬用字元匹配時間戳記）
-            pattern = f"*_第{round_number}輪.md"
-            matching_files = list(execution_result_dir.glob(pattern))
-            
-            if not matching_files:
+            response_content = self._read_indexed_response(project_path, round_number)
+            if response_content is None:
                 self.logger.warning(f"找不到第 {round_number} 輪的回應檔案")
                 return None
             
-            # 取最新的檔案（如果有多個）
-            latest_file = max(matching_files, key=lambda x: x.stat().st_mtime)
-            
-            # 讀取檔案內容並提取 Copilot 回應部分
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 提取 "## Copilot 回應" 之後的內容
-            response_marker = "## Copilot 回應\n\n"
-            if response_marker in content:
-                response_content = content.split(response_marker, 1)[1]
-                self.logger.debug(f"成功讀取第 {round_number} 輪回應內容 (長度: {len(response_content)} 字元)")
-                return response_content.strip()
-            else:
-                self.logger.warning(f"在第 {round_number} 輪檔案中找不到回應標記")
-                return None
+            self.logger.debug(f"成功讀取第 {round_number} 輪回應內容 (長度: {len(response_content)} 字元)")
+            return response_content.strip()
                 
         except Exception as e:
             self.logger.error(f"讀取第 {round_number} 輪回應時發生錯誤: {str(e)}")
@@ -1134,22 +1393,12 @@ class CopilotHandler:
             Optional[Path]: 檔案路徑，若無檔案則返回 None
         """
         try:
-            project_name = Path(project_path).name
-            script_root = Path(__file__).parent.parent  # 腳本根目錄
-            project_result_dir = script_root / "ExecutionResult" / "Success" / project_name
-            
-            if not project_result_dir.exists():
-                return None
-            
-            # 找出所有回應檔案
-            response_files = list(project_result_dir.glob("*_第*輪.md"))
-            
-            if not response_files:
-                return None
-                
-            # 根據修改時間排序，取最新的
-            latest_file = max(response_files, key=lambda f: f.stat().st_mtime)
-            return latest_file
+            project_result_dir = self._project_result_dir(project_path)
+            index = self._get_response_index(project_result_dir)
+            entry = index.latest()
+            if entry is not None and index.path_of(entry).exists():
+                return index.path_of(entry)
+            return find_latest_response_file(project_result_dir)
             
         except Exception as e:
             self.logger.error(f"獲取最新回應檔案失敗: {str(e)}")
@@ -1166,27 +1415,7 @@ class CopilotHandler:
             Optional[str]: 上一輪的回應內容，若無法讀取則返回 None
         """
         try:
-            latest_file = self.get_latest_response_file(project_path)
-            if not latest_file:
-                return None
-                
-            # 讀取檔案內容
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # 提取 Copilot 回應部分
-            response_marker = "## Copilot 回應\n\n"
-            if response_marker in content:
-                response = content.split(response_marker)[1]
-                return response
-                
-            # 舊格式檔案處理
-            separator = "=" * 50 + "\n\n"
-            if separator in content:
-                response = content.split(separator)[1]
-                return response
-                
-            return None
+            return self._read_indexed_response(project_path)
             
         except Exception as e:
             self.logger.error(f"讀取上一輪回應失敗: {str(e)}")
@@ -1336,7 +1565,7 @@ class CopilotHandler:
                         modification_action = self.interaction_settings.get("copilot_chat_modification_action", modification_action)
                     
                     vscode_controller.clear_copilot_memory(modification_action)
-                    time.sleep(1)  # 等待記憶清除完成
+                    ui.sleep(1)  # 等待記憶清除完成
                 
                 # 處理本輪互動
                 success, result = self.process_project_complete(
@@ -1357,15 +1586,16 @@ class CopilotHandler:
                 # 輪次間暫停
                 if round_num < max_rounds:
                     self.logger.info(f"等待 {round_delay} 秒後進行下一輪...")
-                    time.sleep(round_delay)
+                    ui.sleep(round_delay)
             
             # 處理結束
+            self.response_writer.flush()
             total_result = f"完成 {success_count}/{max_rounds} 輪互動"
             
             # 互動完成後的穩定期，確保背景任務完成
             cooldown_time = 5  # 秒
             self.logger.info(f"所有互動輪次完成，進入穩定期 {cooldown_time} 秒...")
-            time.sleep(cooldown_time)
+            ui.sleep(cooldown_time)
             
             # 如果全部成功，記錄成功狀態
             if success_count == max_rounds:
@@ -1384,7 +1614,8 @@ class CopilotHandler:
         project_path: str, 
         prompt_line: str, 
         line_number: int,
-        round_number: int
+        round_number: int,
+        checkpoint: ProgressCheckpoint = None
     ) -> bool:
         """
         對單行 prompt 進行 CWE 函式級別掃描
@@ -1394,6 +1625,7 @@ class CopilotHandler:
             prompt_line: 當前的 prompt 行內容
             line_number: 行號
             round_number: 輪數
+            checkpoint: 進度檢查點，用來記錄該行的掃描狀態
             
         Returns:
             bool: 掃描是否成功
@@ -1402,6 +1634,41 @@ class CopilotHandler:
             project_name = Path(project_path).name
             cwe_type = self.cwe_scan_settings.get("cwe_type", "022")
             
+            # 延後掃描：先快照目標檔案，掃描排入背景佇列於閒置時段執行
+            if self.background_queue is not None and config.CWE_SCAN_DEFER_TO_IDLE:
+                snapshot_dir = self.cwe_scan_manager.snapshot_prompt_targets(Path(project_path), prompt_line)
+                if snapshot_dir is None:
+                    self.logger.warning(f"第 {line_number} 行未提取到函式目標，略過掃描")
+                    if checkpoint is not None:
+                        checkpoint.mark_scan(round_number, line_number, "failed")
+                    return False
+                
+                scan_func = self.cwe_scan_manager.scan_snapshot_function_level
+                if checkpoint is not None:
+                    checkpoint.mark_scan(round_number, line_number, "deferred")
+                    
+                    def scan_func(**kwargs):
+                        result = self.cwe_scan_manager.scan_snapshot_function_level(**kwargs)
+                        checkpoint.mark_scan(round_number, line_number,
+                                             "done" if result and result[0] else "failed")
+                        return result
+                
+                self.background_queue.submit(
+                    "cwe_scan",
+                    scan_func,
+                    kwargs={
+                        "snapshot_dir": snapshot_dir,
+                        "project_name": project_name,
+                        "prompt_content": prompt_line,
+                        "cwe_type": cwe_type,
+                        "round_number": round_number,
+                        "line_number": line_number
+                    },
+                    key=project_name
+                )
+                self.logger.info(f"📸 第 {line_number} 行已建立檔案快照，CWE 掃描延後至閒置時段執行")
+                return True
+            
             self.logger.debug(f"開始 CWE-{cwe_type} 函式級別掃描: 第 {round_number} 輪 / 第 {line_number} 行")
             
             # 使用函式級別掃描
@@ -1414,6 +1681,9 @@ class CopilotHandler:
                 line_number=line_number
             )
             
+            if checkpoint is not None:
+                checkpoint.mark_scan(round_number, line_number, "done" if success else "failed")
+            
             if not success:
                 self.logger.warning(f"第 {line_number} 行函式級別掃描失敗")
                 return False
@@ -1425,8 +1695,8 @@ class CopilotHandler:
             self.logger.error(f"CWE 函式級別掃描執行失敗: {e}", exc_info=True)
             return False
 
-# 創建全域實例
-copilot_handler = CopilotHandler()
+# 創建全域實例（第一次使用時才建立）
+copilot_handler = LazyInstance(CopilotHandler)
 
 # 便捷函數
 def process_project_with_copilot(project_path: str, use_smart_wait: bool = None) -> Tuple[bool, Optional[str]]:
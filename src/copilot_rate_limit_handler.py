@@ -1,20 +1,44 @@
 # -*- coding: utf-8 -*-
 """
-Copilot Rate Limit Handler - 簡單的回應檢測和重試機制
+Copilot Rate Limit Handler - 回應檢測、失敗分類和指數退避重試機制
 """
 
-import time
+import random
+import re
+from enum import Enum
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional
 import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
+from config.config import config
 from src.logger import get_logger
+from src.ui_driver import ui
 
 
 COMPLETION_MARKER = "已完成回答"
 COMPLETION_MARKER_en = "Completed response"
 _COMPLETION_TRAILING_CHARS = ' \t\r\n"""\'\'」』】》）〉>。、.!?;；:、…'
 
+# Copilot 速率限制/暫時性錯誤提示（只比對回應尾端，避免誤判程式碼中的字串）
+_RATE_LIMIT_PATTERNS = [
+    re.compile(r"rate[- ]limit", re.IGNORECASE),
+    re.compile(r"too many requests", re.IGNORECASE),
+    re.compile(r"exceeded your .*(quota|allowance|limit)", re.IGNORECASE),
+    re.compile(r"you've reached your .*limit", re.IGNORECASE),
+    re.compile(r"please wait .* before trying again", re.IGNORECASE),
+    re.compile(r"your request failed", re.IGNORECASE),
+    re.compile(r"速率限制|請求次數過多|請稍後再試"),
+]
+_RATE_LIMIT_TAIL_CHARS = 400
+
+
+class ResponseFailure(Enum):
+    """回應失敗類型"""
+    EMPTY = "empty"                # 剪貼簿/回應為空
+    TRUNCATED = "truncated"        # 缺少完成標記（回應被截斷）
+    RATE_LIMITED = "rate_limited"  # 出現速率限制提示
+
 # Copilot 自動追加的後綴內容列表（需要清理）
 _COPILOT_AUTO_SUFFIXES = [
     "Made changes.",
@@ -71,6 +95,140 @@ def is_response_incomplete(response: str) -> bool:
     return True
 
 
+def classify_response_failure(response: Optional[str]) -> Optional[ResponseFailure]:
+    """
+    判斷回應失敗的類型
+
+    Args:
+        response: 複製到的回應內容（None 表示剪貼簿為空）
+
+    Returns:
+        Optional[ResponseFailure]: 失敗類型，回應完整時返回 None
+    """
+    if not response or not response.strip():
+        return ResponseFailure.EMPTY
+
+    if not is_response_incomplete(response):
+        return None
+
+    tail = _clean_copilot_response(response)[-_RATE_LIMIT_TAIL_CHARS:]
+    if any(pattern.search(tail) for pattern in _RATE_LIMIT_PATTERNS):
+        return ResponseFailure.RATE_LIMITED
+
+    return ResponseFailure.TRUNCATED
+
+
+class RateLimitBackoff:
+    """
+    回應失敗的指數退避控制器
+
+    連續失敗次數跨行累計（速率限制是全域的），任何一次成功即歸零；
+    等待時間 = min(上限, 基準 × 倍數^連續失敗次數)，再取其 50%~100% 的隨機值避免固定節奏；
+    等待結束後以便宜的可輸入檢查（send 按鈕出現）確認 Copilot 已恢復才繼續；
+    設定 on_idle 時，等待期間會先把時間交給背景工作（例如 BackgroundWorkQueue.drain）
+    """
+
+    def __init__(self, logger=None, base_delays: Dict[str, float] = None,
+                 multiplier: float = None, max_delay: float = None,
+                 sleep: Callable[[float], None] = None,
+                 on_idle: Callable[[float], Any] = None):
+        """
+        初始化退避控制器
+
+        Args:
+            logger: 日誌記錄器
+            base_delays: 各失敗類型的等待基準（秒），預設為 config.RATE_LIMIT_BACKOFF_BASE
+            multiplier: 等待倍數，預設為 config.RATE_LIMIT_BACKOFF_MULTIPLIER
+            max_delay: 單次等待上限（秒），預設為 config.RATE_LIMIT_BACKOFF_MAX
+            sleep: 睡眠函式（測試時可替換），預設為目前 UI 驅動的 sleep
+            on_idle: 閒置回呼，參數為可用秒數，須在時限內返回
+        """
+        self.logger = logger or get_logger("RateLimitBackoff")
+        self.base_delays = base_delays or config.RATE_LIMIT_BACKOFF_BASE
+        self.multiplier = multiplier or config.RATE_LIMIT_BACKOFF_MULTIPLIER
+        self.max_delay = max_delay or config.RATE_LIMIT_BACKOFF_MAX
+        self._sleep = sleep or (lambda seconds: ui.sleep(seconds))
+        self.on_idle = on_idle
+        self.consecutive_failures = 0
+
+    def reset(self):
+        """回應成功後重設連續失敗次數"""
+        if self.consecutive_failures:
+            self.logger.info(f"✅ 回應恢復正常，重設退避計數（原連續失敗 {self.consecutive_failures} 次）")
+        self.consecutive_failures = 0
+
+    def next_delay(self, failure: ResponseFailure) -> float:
+        """
+        計算下一次重試前的等待時間（含隨機抖動）
+
+        Args:
+            failure: 失敗類型
+
+        Returns:
+            float: 等待秒數
+        """
+        base = self.base_delays.get(failure.value, self.max_delay)
+        ceiling = min(self.max_delay, base * (self.multiplier ** self.consecutive_failures))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def wait(self, failure: ResponseFailure, line_number: int, round_number: int,
+             ready_probe: Callable[[], bool] = None) -> float:
+        """
+        依失敗類型退避等待，並在繼續前確認 Copilot 可輸入
+
+        Args:
+            failure: 失敗類型
+            line_number: 提示詞行號
+            round_number: 互動輪數
+            ready_probe: 可輸入檢查函式，None 表示不檢查
+
+        Returns:
+            float: 實際等待秒數（不含可輸入檢查）
+        """
+        delay = self.next_delay(failure)
+        self.consecutive_failures += 1
+        self.logger.warning(
+            f"⏳ 回應失敗（{failure.value}），退避 {delay:.0f} 秒後重試 "
+            f"[輪次: {round_number}, 行號: {line_number}, 連續失敗: {self.consecutive_failures}]"
+        )
+
+        remaining = delay
+        if self.on_idle is not None:
+            start = ui.monotonic()
+            try:
+                self.on_idle(delay)
+            except Exception as e:
+                self.logger.warning(f"閒置時段背景工作發生錯誤: {e}")
+            remaining = max(0.0, delay - (ui.monotonic() - start))
+
+        # 只計入實際閒置等待（閒置時段執行的背景工作有各自的階段事件）
+        with self.logger.phase("backoff", failure=failure.value, delay=round(delay, 1)):
+            while remaining > 0:
+                chunk = min(60, remaining)
+                self._sleep(chunk)
+                remaining -= chunk
+                if remaining > 0:
+                    self.logger.info(f"   剩餘 {remaining:.0f} 秒...")
+
+            if ready_probe is not None:
+                self._wait_until_ready(ready_probe)
+        return delay
+
+    def _wait_until_ready(self, ready_probe: Callable[[], bool]) -> bool:
+        """等待結束後確認 Copilot 已回到可輸入狀態，逾時仍繼續重試（由重試結果判斷）"""
+        waited = 0.0
+        while waited < config.RATE_LIMIT_READY_PROBE_TIMEOUT:
+            try:
+                if ready_probe():
+                    return True
+            except Exception as e:
+                self.logger.debug(f"可輸入檢查失敗: {e}")
+            self._sleep(config.RATE_LIMIT_READY_PROBE_INTERVAL)
+            waited += config.RATE_LIMIT_READY_PROBE_INTERVAL
+        self.logger.warning(f"⚠️ {config.RATE_LIMIT_READY_PROBE_TIMEOUT} 秒內未確認 Copilot 可輸入，仍嘗試重試")
+        return False
+
+
 def wait_and_retry(seconds: int, line_number: int, round_number: int, logger, retry_count: int = 0):
     """
     等待指定時間並顯示倒數
@@ -92,7 +250,7 @@ def wait_and_retry(seconds: int, line_number: int, round_number: int, logger, re
             logger.info(f"   開始等待 {seconds} 秒...")
         else:
             logger.info(f"   剩餘 {remaining} 秒...")
-        time.sleep(chunk)
+        ui.sleep(chunk)
         remaining -= chunk
     
     logger.info(f"   ✓ 等待完成，準備第 {retry_count + 1} 次重試")
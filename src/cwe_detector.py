@@ -14,6 +14,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from src.logger import get_logger
+from src.tracing import span, traced
 
 logger = get_logger("CWEDetector")
 
@@ -693,6 +694,7 @@ class CWEDetector:
         
         return vulnerabilities
     
+    @traced("cwe.extract_function_info")
     def _extract_function_info(
         self, 
         file_path: Path, 
@@ -932,6 +934,7 @@ class CWEDetector:
         logger.info(f"漏洞報告已生成: {report_file}")
         return report_file
     
+    @traced("cwe.scan_single_file", category="scan")
     def scan_single_file(
         self,
         file_path: Path,
@@ -989,9 +992,11 @@ class CWEDetector:
             cmd = [bandit_cmd, str(file_path), "-t", tests, "-f", "json", "-o", str(output_file)]
             
             try:
-                result = subprocess.run(cmd, capture_output=True, timeout=60, text=True)
+                with span("cwe.bandit_run", category="scan", cwe=cwe, file=file_path.name):
+                    result = subprocess.run(cmd, capture_output=True, timeout=60, text=True)
                 if output_file.exists():
-                    vulns = self._parse_bandit_results(output_file, cwe, file_path)
+                    with span("cwe.bandit_parse", category="scan"):
+                        vulns = self._parse_bandit_results(output_file, cwe, file_path)
                     all_vulns.extend(vulns)
                     logger.info(f"Bandit 掃描完成，發現 {len(vulns)} 個漏洞")
                 else:
@@ -1054,10 +1059,14 @@ class CWEDetector:
                         str(file_path)
                     ])
                     
-                    result = subprocess.run(cmd, capture_output=True, timeout=60, text=True)
+                    # 規則由 registry（r/、p/）取得，下載時間也算在此區段內
+                    with span("cwe.semgrep_run", category="scan", cwe=cwe, file=file_path.name,
+                              rules=len(rule_patterns)):
+                        result = subprocess.run(cmd, capture_output=True, timeout=60, text=True)
                     
                     if output_file.exists():
-                        vulns = self._parse_semgrep_results(output_file, cwe, file_path)
+                        with span("cwe.semgrep_parse", category="scan"):
+                            vulns = self._parse_semgrep_results(output_file, cwe, file_path)
                         all_vulns.extend(vulns)
                         logger.info(f"Semgrep 掃描完成，發現 {len(vulns)} 個漏洞")
                     else:
@@ -10,18 +10,27 @@ CWE 掃描結果管理模組
 
 import re
 import csv
+import hashlib
+import shutil
 import subprocess
 import json
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
-from src.logger import get_logger
+from src.logger import get_logger, timed_phase
 from src.cwe_detector import CWEDetector, CWEVulnerability
+from src.lazy_import import LazyInstance
+from src.tracing import traced
 
 logger = get_logger("CWEScanManager")
 
+SNAPSHOT_PREFIX = "cwe_snapshot_"  # 延後掃描快照的暫存資料夾前綴
+
 
 @dataclass
 class ScanResult:
@@ -204,6 +213,7 @@ class CWEScanManager:
     
 
     
+    @traced("cwe.save_function_level_csv", category="csv")
     def _save_function_level_csv(
         self,
         file_path: Path,
@@ -351,6 +361,7 @@ class CWEScanManager:
         
         self.logger.debug(f"函式級別掃描結果已寫入: {file_path}")
     
+    @timed_phase("scan")
     def scan_from_prompt_function_level(
         self,
         project_path: Path,
@@ -495,7 +506,264 @@ class CWEScanManager:
             
         except Exception as e:
             self.logger.error(f"函式級別掃描過程發生錯誤: {e}", exc_info=True)
+    
+    def snapshot_prompt_targets(self, project_path: Path, prompt_content: str) -> Optional[Path]:
+        """
+        將 prompt 指定的目標檔案複製到暫存目錄（保留相對路徑），供延後掃描使用
+        快照放在與專案同名的子資料夾，原始掃描報告的檔名與直接掃描專案時相同
+        
+        Args:
+            project_path: 專案路徑
+            prompt_content: prompt 內容
+            
+        Returns:
+            Optional[Path]: 快照目錄，沒有任何目標時返回 None
+        """
+        function_targets = self.extract_function_targets_from_prompt(prompt_content)
+        if not function_targets:
+            return None
+        
+        snapshot_dir = Path(tempfile.mkdtemp(prefix=SNAPSHOT_PREFIX)) / Path(project_path).name
+        for file_path in set(t.file_path for t in function_targets):
+            source = Path(project_path) / file_path
+            if not source.exists():
+                continue
+            target = snapshot_dir / file_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+        
+        self.logger.debug(f"已建立掃描快照: {snapshot_dir}")
+        return snapshot_dir
+    
+    def scan_snapshot_function_level(
+        self,
+        snapshot_dir: Path,
+        project_name: str,
+        prompt_content: str,
+        cwe_type: str,
+        round_number: int = 0,
+        line_number: int = 0
+    ) -> Tuple[bool, Optional[Path]]:
+        """
+        對快照目錄執行函式級別掃描（結果與直接掃描專案相同），完成後刪除快照
+        
+        Args:
+            snapshot_dir: snapshot_prompt_targets 建立的快照目錄
+            project_name: 專案名稱
+            prompt_content: prompt 內容
+            cwe_type: CWE 類型
+            round_number: 輪數
+            line_number: 行號
+            
+        Returns:
+            Tuple[bool, Optional[Path]]: (是否成功, 掃描結果檔案路徑)
+        """
+        try:
+            return self.scan_from_prompt_function_level(
+                project_path=Path(snapshot_dir),
+                project_name=project_name,
+                prompt_content=prompt_content,
+                cwe_type=cwe_type,
+                round_number=round_number,
+                line_number=line_number
+            )
+        finally:
+            snapshot_dir = Path(snapshot_dir)
+            # 連同 snapshot_prompt_targets 建立的暫存上層資料夾一併刪除
+            if snapshot_dir.parent.name.startswith(SNAPSHOT_PREFIX):
+                snapshot_dir = snapshot_dir.parent
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+    
+    def scan_baseline_function_level(
+        self,
+        project_path: Path,
+        project_name: str,
+        prompt_lines: List[str],
+        cwe_type: str
+    ) -> int:
+        """
+        在 Copilot 修改專案之前執行基準掃描，結果存放於第0輪資料夾
+        
+        Args:
+            project_path: 專案路徑
+            project_name: 專案名稱
+            prompt_lines: 專案的所有 prompt 行
+            cwe_type: CWE 類型
+            
+        Returns:
+            int: 掃描成功的行數
+        """
+        successful = 0
+        for line_number, prompt_line in enumerate(prompt_lines, 1):
+            result = self.scan_from_prompt_function_level(
+                project_path=Path(project_path),
+                project_name=project_name,
+                prompt_content=prompt_line,
+                cwe_type=cwe_type,
+                round_number=0,
+                line_number=line_number
+            )
+            if result and result[0]:
+                successful += 1
+        
+        self.logger.info(f"✅ {project_name} 基準掃描完成 ({successful}/{len(prompt_lines)} 行)")
+        return successful
+    
+    def has_baseline_result(self, project_name: str, cwe_type: str) -> bool:
+        """
+        專案是否已有第0輪（基準）掃描結果
+        
+        Args:
+            project_name: 專案名稱
+            cwe_type: CWE 類型
+            
+        Returns:
+            bool: Bandit 或 Semgrep 的第0輪 CSV 已存在
+        """
+        cwe_dir = self.output_dir / f"CWE-{cwe_type}"
+        return any(
+            (cwe_dir / scanner / project_name / "第0輪" / f"{project_name}_function_level_scan.csv").exists()
+            for scanner in ("Bandit", "Semgrep")
+        )
+    
+    def hash_prompt_targets(self, project_path: Path, prompt_lines: List[str]) -> Dict[str, str]:
+        """
+        計算 prompt 目標檔案的 SHA-1，用於確認基準掃描時的檔案內容
+        
+        Args:
+            project_path: 專案路徑
+            prompt_lines: prompt 行
+            
+        Returns:
+            Dict[str, str]: 相對路徑 -> SHA-1（檔案不存在時不列入）
+        """
+        hashes = {}
+        for line in prompt_lines:
+            for target in self.extract_function_targets_from_prompt(line):
+                full_path = Path(project_path) / target.file_path
+                if target.file_path in hashes or not full_path.exists():
+                    continue
+                hashes[target.file_path] = hashlib.sha1(full_path.read_bytes()).hexdigest()
+        return hashes
+    
+    def prescan_baselines(
+        self,
+        jobs: List[Tuple[Path, str, List[str]]],
+        cwe_type: str,
+        max_workers: int = 1
+    ) -> Dict[str, Dict]:
+        """
+        以多行程平行執行多個專案的基準掃描（第0輪），並更新基準清單
+        
+        Args:
+            jobs: (專案路徑, 專案名稱, prompt 行) 列表
+            cwe_type: CWE 類型
+            max_workers: 行程數
+            
+        Returns:
+            Dict[str, Dict]: 專案名稱 -> 掃描摘要（僅包含成功完成的專案）
+        """
+        # 只掃描 prompt 中有函式目標的專案
+        jobs = [
+            (path, name, lines) for path, name, lines in jobs
+            if any(self.extract_function_targets_from_prompt(line) for line in lines)
+        ]
+        if not jobs:
+            return {}
+        
+        self.logger.create_separator(f"CWE-{cwe_type} 基準掃描（{len(jobs)} 個專案，{max_workers} 個行程）")
+        start = time.time()
+        results = {}
+        
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_baseline_worker,
+            initargs=(str(self.output_dir),)
+        ) as executor:
+            futures = {
+                executor.submit(run_baseline_scan_worker, str(path), name, lines, cwe_type): name
+                for path, name, lines in jobs
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    self.logger.error(f"{name} 基準掃描失敗: {e}")
+                    continue
+                results[name] = summary
+                self.logger.info(
+                    f"  {name}: {summary['successful_lines']}/{summary['total_lines']} 行 "
+                    f"({summary['elapsed']:.1f} 秒)"
+                )
+        
+        self._save_baseline_manifest(results, cwe_type)
+        self.logger.info(f"✅ 基準掃描完成: {len(results)}/{len(jobs)} 個專案，耗時 {time.time() - start:.1f} 秒")
+        return results
+    
+    def _save_baseline_manifest(self, results: Dict[str, Dict], cwe_type: str):
+        """
+        將基準掃描摘要合併寫入 CWE-{cwe}/baseline_manifest.json，供之後與各輪結果比對
+        
+        Args:
+            results: 專案名稱 -> 掃描摘要
+            cwe_type: CWE 類型
+        """
+        manifest_file = self.output_dir / f"CWE-{cwe_type}" / "baseline_manifest.json"
+        manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        manifest = {}
+        if manifest_file.exists():
+            try:
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"無法讀取基準清單，將重新建立: {e}")
+        
+        manifest.update(results)
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        self.logger.info(f"基準清單已更新: {manifest_file}")
+
+
+# 基準掃描行程使用的掃描管理器（每個行程各自建立）
+_baseline_manager: Optional[CWEScanManager] = None
+
+
+def _init_baseline_worker(output_dir: str):
+    """ProcessPoolExecutor 行程初始化：建立該行程專用的掃描管理器"""
+    global _baseline_manager
+    _baseline_manager = CWEScanManager(Path(output_dir))
+
+
+def run_baseline_scan_worker(project_path: str, project_name: str,
+                             prompt_lines: List[str], cwe_type: str) -> Dict:
+    """
+    在子行程中執行單一專案的基準掃描
+    
+    Args:
+        project_path: 專案路徑
+        project_name: 專案名稱
+        prompt_lines: prompt 行
+        cwe_type: CWE 類型
+        
+    Returns:
+        Dict: 掃描摘要（行數、耗時、目標檔案雜湊、完成時間）
+    """
+    start = time.time()
+    file_hashes = _baseline_manager.hash_prompt_targets(Path(project_path), prompt_lines)
+    successful = _baseline_manager.scan_baseline_function_level(
+        Path(project_path), project_name, prompt_lines, cwe_type
+    )
+    return {
+        "project_path": project_path,
+        "successful_lines": successful,
+        "total_lines": len(prompt_lines),
+        "elapsed": time.time() - start,
+        "file_hashes": file_hashes,
+        "scanned_at": datetime.now().isoformat()
+    }
 
 
-# 全域實例
-cwe_scan_manager = CWEScanManager()
+# 全域實例（第一次使用時才建立，避免匯入模組就執行掃描工具的版本檢查）
+cwe_scan_manager = LazyInstance(CWEScanManager)
@@ -17,6 +17,7 @@ from enum import Enum
 sys.path.append(str(Path(__file__).parent.parent))
 from config.config import config
 from src.logger import get_logger
+from src.lazy_import import LazyInstance
 
 class ErrorType(Enum):
     """錯誤類型枚舉"""
@@ -435,10 +436,10 @@ class RecoveryManager:
             self.logger.error(f"清理環境失敗: {str(e)}")
             return False
 
-# 創建全域實例
-error_handler = ErrorHandler()
-retry_handler = RetryHandler(error_handler)
-recovery_manager = RecoveryManager()
+# 創建全域實例（第一次使用時才建立，避免匯入模組就註冊訊號處理器）
+error_handler = LazyInstance(ErrorHandler)
+retry_handler = LazyInstance(lambda: RetryHandler(error_handler.get()))
+recovery_manager = LazyInstance(RecoveryManager)
 
 # 便捷函數
 def handle_error(error: Exception, context: str = "") -> RecoveryAction:
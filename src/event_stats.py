@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 階段事件統計
+讀取 logs/events_*.jsonl，計算各階段（發送、等待、複製、儲存、掃描...）的延遲百分位數
+
+使用方式：
+    python -m src.event_stats                      # 統計 logs/ 下所有事件檔
+    python -m src.event_stats logs/events_x.jsonl  # 指定事件檔
+    python -m src.event_stats --by project         # 依專案分組
+"""
+
+import argparse
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+except ImportError:
+    from config import config
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    線性內插的百分位數
+
+    Args:
+        sorted_values: 已排序的數值（不可為空）
+        pct: 百分位（0-100）
+
+    Returns:
+        float: 百分位數
+    """
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    fraction = rank - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def read_events(paths: Iterable[Path]) -> Iterator[Dict]:
+    """讀取事件檔（略過無法解析的行，例如程式中斷時寫到一半的最後一行）"""
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(event, dict) and "phase" in event and "duration" in event:
+                        yield event
+        except OSError:
+            continue
+
+
+def summarize(events: Iterable[Dict], by: Optional[str] = None) -> Dict[Tuple[str, str], Dict]:
+    """
+    依階段（及分組欄位）統計延遲
+
+    Args:
+        events: 事件
+        by: 分組欄位（例如 project），None 表示只依階段
+
+    Returns:
+        Dict[Tuple[str, str], Dict]: (分組值, 階段) -> {count, failed, p50, p90, p99, max, total}
+    """
+    durations: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+    failures: Dict[Tuple[str, str], int] = defaultdict(int)
+    for event in events:
+        key = (str(event.get(by, "-")) if by else "", event["phase"])
+        durations[key].append(float(event["duration"]))
+        if event.get("outcome", "ok") != "ok":
+            failures[key] += 1
+
+    stats = {}
+    for key, values in durations.items():
+        values.sort()
+        stats[key] = {
+            "count": len(values),
+            "failed": failures[key],
+            **{f"p{pct}": percentile(values, pct) for pct in PERCENTILES},
+            "max": values[-1],
+            "total": sum(values),
+        }
+    return stats
+
+
+def format_table(stats: Dict[Tuple[str, str], Dict], by: Optional[str] = None) -> str:
+    """將統計結果格式化為文字表格（依總耗時排序，耗時最多的階段在前）"""
+    header = ([by] if by else []) + ["phase", "count", "failed"] + [f"p{pct}" for pct in PERCENTILES] + ["max", "total"]
+    rows = []
+    for (group, phase), s in sorted(stats.items(), key=lambda item: (item[0][0], -item[1]["total"])):
+        row = ([group] if by else []) + [phase, str(s["count"]), str(s["failed"])]
+        row += [f"{s[f'p{pct}']:.3f}s" for pct in PERCENTILES]
+        row += [f"{s['max']:.3f}s", f"{s['total']:.1f}s"]
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(header, widths))]
+    lines.append("  ".join("-" * width for width in widths))
+    lines.extend("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="統計階段事件的延遲百分位數")
+    parser.add_argument("files", nargs="*", type=Path, help="事件檔（預設為 logs/events_*.jsonl）")
+    parser.add_argument("--by", choices=["project", "round", "line", "source"], help="分組欄位")
+    args = parser.parse_args(argv)
+
+    files = args.files or sorted(config.LOGS_DIR.glob("events_*.jsonl"))
+    stats = summarize(read_events(files), by=args.by)
+    if not stats:
+        print("找不到任何階段事件")
+        return 1
+    print(format_table(stats, by=args.by))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
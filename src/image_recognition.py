@@ -4,10 +4,6 @@ Hybrid UI Automation Script - 圖像辨識模組
 處理截圖、圖像匹配、等待回應完成的視覺判斷
 """
 
-import pyautogui
-import cv2
-import numpy as np
-import time
 from pathlib import Path
 from typing import Optional, Tuple, List
 import sys
@@ -17,15 +13,32 @@ sys.path.append(str(Path(__file__).parent.parent))
 try:
     from config.config import config
     from src.logger import get_logger
+    from src.ui_delay_controller import ui_delays
+    from src.lazy_import import LazyInstance, lazy_module
+    from src.tracing import span, traced
+    from src.ui_driver import ui
 except ImportError:
     try:
         from config import config
         from logger import get_logger
+        from ui_delay_controller import ui_delays
+        from lazy_import import LazyInstance, lazy_module
+        from tracing import span, traced
+        from ui_driver import ui
     except ImportError:
         import sys
         sys.path.append(str(Path(__file__).parent.parent / "config"))
         import config
         from logger import get_logger
+        from ui_delay_controller import ui_delays
+        from lazy_import import LazyInstance, lazy_module
+        from tracing import span, traced
+        from ui_driver import ui
+
+# 延遲匯入：pyautogui、cv2、numpy 在第一次截圖時才載入（按鍵與畫面比對經由 UI 驅動）
+pyautogui = lazy_module("pyautogui")
+cv2 = lazy_module("cv2")
+np = lazy_module("numpy")
 
 class ImageRecognition:
     """圖像辨識處理器"""
@@ -37,7 +50,7 @@ class ImageRecognition:
         self.logger.info("圖像辨識模組初始化完成")
     
     def take_screenshot(self, region: Tuple[int, int, int, int] = None, 
-                       save_path: str = None) -> Optional[np.ndarray]:
+                       save_path: str = None) -> Optional["np.ndarray"]:
         """
         截取螢幕畫面
         
@@ -93,22 +106,19 @@ class ImageRecognition:
             if confidence is None:
                 confidence = config.IMAGE_CONFIDENCE
             
-            # 使用 pyautogui 的圖像識別功能
-            try:
-                location = pyautogui.locateOnScreen(
+            # 經由 UI 驅動比對畫面（預設為 pyautogui 的圖像識別功能）
+            with span("image.locate_on_screen", category="image", template=template_path.name) as locate_span:
+                location = ui.locate_on_screen(
                     str(template_path),
                     confidence=confidence,
                     region=region
                 )
-                
-                if location:
-                    self.logger.image_recognition(template_path.name, True, confidence)
-                    return location
-                else:
-                    self.logger.image_recognition(template_path.name, False)
-                    return None
-                    
-            except pyautogui.ImageNotFoundException:
+                locate_span.set(found=bool(location))
+            
+            if location:
+                self.logger.image_recognition(template_path.name, True, confidence)
+                return location
+            else:
                 self.logger.image_recognition(template_path.name, False)
                 return None
                 
@@ -136,20 +146,20 @@ class ImageRecognition:
             template_name = Path(template_path).name
             self.logger.info(f"等待圖像出現: {template_name} (超時: {timeout}秒)")
             
-            start_time = time.time()
+            start_time = ui.time()
             
-            while time.time() - start_time < timeout:
+            while ui.time() - start_time < timeout:
                 location = self.find_image_on_screen(template_path, confidence, region)
                 
                 if location:
-                    elapsed = time.time() - start_time
+                    elapsed = ui.time() - start_time
                     self.logger.info(f"✅ 圖像 {template_name} 已出現 (耗時: {elapsed:.1f}秒)")
                     return True
                 
-                time.sleep(check_interval)
+                ui.sleep(check_interval)
                 
                 # 每10秒記錄一次等待狀態
-                elapsed = time.time() - start_time
+                elapsed = ui.time() - start_time
                 if int(elapsed) % 10 == 0 and int(elapsed) > 0:
                     self.logger.debug(f"等待圖像 {template_name}... ({elapsed:.0f}秒)")
             
@@ -188,7 +198,7 @@ class ImageRecognition:
                     click_y += offset[1]
                 
                 # 執行點擊
-                pyautogui.click(click_x, click_y)
+                ui.click(click_x, click_y)
                 
                 template_name = Path(template_path).name
                 self.logger.info(f"✅ 點擊圖像 {template_name} 於位置 ({click_x}, {click_y})")
@@ -278,7 +288,7 @@ class ImageRecognition:
                     status['notifications_cleared'] = True
                     
                     # 清除通知後再次檢測
-                    time.sleep(1.5)  # 增加等待時間
+                    ui.sleep(1.5)  # 增加等待時間
                     
                     stop_button = self.find_image_on_screen(
                         str(config.STOP_BUTTON_IMAGE),
@@ -378,7 +388,7 @@ class ImageRecognition:
                     status['notifications_cleared'] = True
                     
                     # 清除通知後再次檢測
-                    time.sleep(1)  # 給一點時間讓 UI 更新
+                    ui.sleep(1)  # 給一點時間讓 UI 更新
                     
                     stop_button = self.find_image_on_screen(
                         str(config.STOP_BUTTON_IMAGE),
@@ -435,38 +445,43 @@ class ImageRecognition:
             self.logger.info("檢測到 UI 按鈕被通知遮擋，嘗試清除 VS Code 通知...")
             
             # 保存目前剪貼簿內容
-            import pyperclip
             original_clipboard = ""
             try:
-                original_clipboard = pyperclip.paste()
+                original_clipboard = ui.paste()
             except:
                 pass
             
-            # 使用 Ctrl+Shift+P 開啟命令面板
-            pyautogui.hotkey('ctrl', 'shift', 'p')
-            time.sleep(1.5)  # 增加等待時間確保命令面板開啟
+            # 使用 Ctrl+Shift+P 開啟命令面板（以畫面變化確認面板已開啟）
+            probe = ui_delays.screen_probe()
+            ui.hotkey('ctrl', 'shift', 'p')
+            ui_delays.wait_until('notifications.open_palette', probe, 1.5)
             
             # 將清除通知的命令複製到剪貼簿
             clear_command = "Notifications: Clear All Notifications"
-            pyperclip.copy(clear_command)
-            time.sleep(0.3)
+            ui.copy(clear_command)
+            ui_delays.wait_until('notifications.copy_command',
+                                 lambda: ui.paste() == clear_command, 0.3, settle=False)
             
             # 使用 Ctrl+V 貼上命令（避免中文輸入法問題）
-            pyautogui.hotkey('ctrl', 'v')
-            time.sleep(0.8)
+            probe = ui_delays.screen_probe()
+            ui.hotkey('ctrl', 'v')
+            ui_delays.wait_until('notifications.paste_command', probe, 0.8)
             
             # 按下 Enter 執行命令
-            pyautogui.press('enter')
-            time.sleep(1)
+            probe = ui_delays.screen_probe()
+            ui.press('enter')
+            executed = ui_delays.wait_until('notifications.execute', probe, 1)
             
             # 按 Esc 關閉命令面板（如果還開著）
-            pyautogui.press('escape')
-            time.sleep(0.5)
+            ui.press('escape')
+            ui_delays.wait('notifications.escape', 0.5)
+            if executed and probe is not None:
+                ui_delays.report_success('notifications.escape', 0.5)
             
             # 恢復原始剪貼簿內容
             try:
                 if original_clipboard:
-                    pyperclip.copy(original_clipboard)
+                    ui.copy(original_clipboard)
             except:
                 pass
             
@@ -477,8 +492,8 @@ class ImageRecognition:
             self.logger.error(f"清除 VS Code 通知時發生錯誤: {str(e)}")
             # 嘗試按 Esc 關閉可能開啟的面板
             try:
-                pyautogui.press('escape')
-                pyautogui.press('escape')  # 多按一次確保關閉
+                ui.press('escape')
+                ui.press('escape')  # 多按一次確保關閉
             except:
                 pass
             return False
@@ -514,10 +529,10 @@ class ImageRecognition:
             self.logger.debug("檢查是否出現保存新聊天對話框...")
             
             # 在指定時間內檢查是否出現 NewChat_Save 圖像
-            start_time = time.time()
+            start_time = ui.time()
             check_interval = 0.5  # 檢查間隔
             
-            while time.time() - start_time < timeout:
+            while ui.time() - start_time < timeout:
                 newchat_save_location = self.find_image_on_screen(
                     str(config.NEWCHAT_SAVE_IMAGE),
                     confidence=config.IMAGE_CONFIDENCE
@@ -527,7 +542,7 @@ class ImageRecognition:
                     self.logger.info("✅ 檢測到保存新聊天對話框")
                     return True
                 
-                time.sleep(check_interval)
+                ui.sleep(check_interval)
             
             self.logger.debug("未檢測到保存新聊天對話框")
             return False
@@ -549,26 +564,26 @@ class ImageRecognition:
         try:
             if action == "keep":
                 self.logger.info("處理保存新聊天對話框，按下 Enter 保留並繼續...")
-                pyautogui.press('left')
-                time.sleep(1)
-                pyautogui.press('right')
-                time.sleep(1)
-                pyautogui.press('enter')
-                time.sleep(1)
+                ui.press('left')
+                ui.sleep(1)
+                ui.press('right')
+                ui.sleep(1)
+                ui.press('enter')
+                ui.sleep(1)
                 self.logger.info("✅ 已按下 Enter，保留並繼續聊天")
             elif action == "revert":
                 self.logger.info("處理保存新聊天對話框，按右鍵後按 Enter 復原修改...")
-                pyautogui.press('left')
-                time.sleep(1)
-                pyautogui.press('left')
-                time.sleep(1)
-                pyautogui.press('enter')
-                time.sleep(1)
+                ui.press('left')
+                ui.sleep(1)
+                ui.press('left')
+                ui.sleep(1)
+                ui.press('enter')
+                ui.sleep(1)
                 self.logger.info("✅ 已按右鍵+Enter，復原修改")
             else:
                 self.logger.warning(f"⚠️ 未知的處理行為: {action}，使用預設行為 'keep'")
-                pyautogui.press('enter')
-                time.sleep(1)
+                ui.press('enter')
+                ui.sleep(1)
                 self.logger.info("✅ 使用預設行為，保留並繼續聊天")
             
             return True
@@ -697,8 +712,8 @@ class ImageRecognition:
             self.logger.error(f"提供創建指南時發生錯誤: {str(e)}")
             return False
 
-# 創建全域實例
-image_recognition = ImageRecognition()
+# 創建全域實例（第一次使用時才建立）
+image_recognition = LazyInstance(ImageRecognition)
 
 # 便捷函數
 def find_image(template_path: str, confidence: float = None) -> Optional[Tuple[int, int, int, int]]:
@@ -735,4 +750,4 @@ def check_newchat_save_dialog(timeout: int = 2) -> bool:
 
 def handle_newchat_save_dialog(action: str = "keep") -> bool:
     """處理保存新聊天對話框的便捷函數"""
-    return image_recognition.handle_newchat_save_dialog(action)
\ No newline at end of file
+    return image_recognition.handle_newchat_save_dialog(action)
\ No newline at end of file
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 延遲載入模組
+- lazy_module：第一次存取屬性時才匯入模組（pyautogui、cv2、psutil 等匯入成本高，
+  且 pyautogui 在沒有顯示器的環境匯入就會失敗）
+- LazyInstance：第一次使用時才建立的全域實例（例如 CWEScanManager 建立時會執行掃描工具的版本檢查）
+讓 main.py 不必等所有模組初始化就能顯示第一個對話框，測試也能匯入模組而不產生副作用
+"""
+
+import importlib
+import sys
+import threading
+import types
+from typing import Any, Callable, Dict, List
+
+
+# 模組名稱 -> 載入後要執行的設定（不論由哪個替身觸發載入都只執行一次）
+_load_hooks: Dict[str, List[Callable[[types.ModuleType], None]]] = {}
+_hooks_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    """第一次存取屬性時才匯入的模組替身"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        object.__setattr__(self, "_lazy_target", None)
+
+    def _lazy_load(self) -> types.ModuleType:
+        module = object.__getattribute__(self, "_lazy_target")
+        if module is not None:
+            return module
+        with _hooks_lock:
+            module = object.__getattribute__(self, "_lazy_target")
+            if module is None:
+                module = importlib.import_module(self.__name__)
+                for hook in _load_hooks.pop(self.__name__, []):
+                    hook(module)
+                object.__setattr__(self, "_lazy_target", module)
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lazy_load(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._lazy_load(), name, value)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        loaded = object.__getattribute__(self, "_lazy_target") is not None
+        return f"<lazy module '{self.__name__}' ({'已載入' if loaded else '未載入'})>"
+
+
+def lazy_module(name: str, on_load: Callable[[types.ModuleType], None] = None) -> types.ModuleType:
+    """
+    建立延遲匯入的模組（模組不存在時，在第一次使用時才拋出 ImportError）
+
+    Args:
+        name: 模組名稱
+        on_load: 模組載入後的設定（例如 pyautogui.FAILSAFE），已載入時立即執行
+
+    Returns:
+        types.ModuleType: 模組替身，已匯入時直接返回模組本身
+    """
+    with _hooks_lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            for hook in _load_hooks.pop(name, []) + ([on_load] if on_load else []):
+                hook(module)
+            return module
+        if on_load is not None:
+            _load_hooks.setdefault(name, []).append(on_load)
+    return _LazyModule(name)
+
+
+class LazyInstance:
+    """第一次使用時才建立的全域實例（屬性存取與設定都轉給實際物件）"""
+
+    __slots__ = ("_factory", "_instance", "_lock")
+
+    def __init__(self, factory: Callable[[], Any]):
+        """
+        Args:
+            factory: 建立實例的函數（通常是類別本身）
+        """
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def get(self) -> Any:
+        """取得實際物件（必要時建立）"""
+        instance = object.__getattribute__(self, "_instance")
+        if instance is not None:
+            return instance
+        with object.__getattribute__(self, "_lock"):
+            instance = object.__getattribute__(self, "_instance")
+            if instance is None:
+                instance = object.__getattribute__(self, "_factory")()
+                object.__setattr__(self, "_instance", instance)
+        return instance
+
+    @property
+    def is_initialized(self) -> bool:
+        return object.__getattribute__(self, "_instance") is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self.get(), name, value)
+
+    def __repr__(self) -> str:
+        factory = object.__getattribute__(self, "_factory")
+        if not self.is_initialized:
+            return f"<lazy {getattr(factory, '__name__', factory)} (未建立)>"
+        return repr(self.get())
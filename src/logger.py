@@ -2,13 +2,31 @@
 """
 Hybrid UI Automation Script - 日誌系統模組
 提供詳細的日誌記錄功能，包含成功/失敗/錯誤追蹤
+
+整個行程共用一條日誌管線：各模組的日誌記錄器都是 HybridUIAutomation 底下的子記錄器，
+訊息經 QueueHandler 放入佇列，由背景 QueueListener 寫入依大小輪替的日誌檔與主控台，
+呼叫端（UI / 輪詢執行緒）不必等待磁碟與主控台輸出
+
+另外輸出 JSON lines 事件檔（logs/events_*.jsonl），每個階段（發送、等待、複製、儲存、掃描、
+清除記憶、開啟/關閉 VS Code）記錄專案、輪數、行號、單調時鐘起訖時間與結果，
+可用 python -m src.event_stats 統計各階段延遲百分位數
 """
 
+import atexit
+import functools
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 # 導入配置
 sys.path.append(str(Path(__file__).parent.parent))
@@ -22,72 +40,294 @@ except ImportError:
         sys.path.append(str(Path(__file__).parent.parent / "config"))
         import config
 
+ROOT_LOGGER_NAME = "HybridUIAutomation"
+
+
+class _PipelineQueueHandler(logging.handlers.QueueHandler):
+    """放入佇列前去掉子記錄器名稱的共同前綴，日誌格式維持「模組名稱」"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        if record.name.startswith(ROOT_LOGGER_NAME + "."):
+            record.name = record.name[len(ROOT_LOGGER_NAME) + 1:]
+        return record
+
+
+class _LogPipeline:
+    """行程共用的日誌管線（QueueHandler -> 背景 QueueListener -> 輪替檔案 + 主控台）"""
+    
+    def __init__(self):
+        self.log_file: Optional[Path] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.direct = False
+        self._lock = threading.Lock()
+    
+    def start(self, log_file: Optional[Path] = None, direct: bool = False) -> bool:
+        """
+        啟動管線（已啟動時不做任何事）
+        
+        Args:
+            log_file: 日誌檔案路徑，預設為 config.get_log_file_path()
+            direct: 不經佇列、直接寫入（fork 出的短命子行程結束時不會執行 atexit，佇列中的訊息會遺失）
+        
+        Returns:
+            bool: 是否為本次呼叫啟動
+        """
+        with self._lock:
+            if self.listener is not None or self.direct:
+                return False
+            self.log_file = Path(log_file) if log_file else (self.log_file or config.get_log_file_path())
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            log_level = getattr(logging, config.LOG_LEVEL, logging.INFO)
+            formatter = logging.Formatter(config.LOG_FORMAT)
+            
+            # 檔案處理器（依大小輪替）
+            file_handler = logging.handlers.RotatingFileHandler(
+                self.log_file, maxBytes=config.LOG_MAX_BYTES,
+                backupCount=config.LOG_BACKUP_COUNT, encoding='utf-8'
+            )
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(formatter)
+            
+            # 控制台處理器
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(log_level)
+            console_handler.setFormatter(formatter)
+            
+            root = logging.getLogger(ROOT_LOGGER_NAME)
+            root.setLevel(log_level)
+            root.propagate = False
+            root.handlers.clear()
+            if direct:
+                self.direct = True
+                root.addHandler(file_handler)
+                root.addHandler(console_handler)
+                return True
+            
+            log_queue = queue.SimpleQueue()
+            root.addHandler(_PipelineQueueHandler(log_queue))
+            
+            self.listener = logging.handlers.QueueListener(
+                log_queue, file_handler, console_handler, respect_handler_level=True
+            )
+            self.listener.start()
+            return True
+    
+    def stop(self):
+        """寫出佇列中剩餘的訊息並關閉檔案"""
+        with self._lock:
+            listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+    
+    def reset_after_fork(self):
+        """fork 出的子行程沒有背景執行緒，改為直接寫入同一個日誌檔"""
+        self._lock = threading.Lock()
+        if self.listener is not None:
+            self.listener = None
+            self.start(self.log_file, direct=True)
+
+
+class _EventLog:
+    """JSON lines 事件檔（每行一個事件，逐行寫出）"""
+    
+    def __init__(self):
+        self.path: Optional[Path] = None
+        self._file = None
+        self._lock = threading.Lock()
+        self.listeners: List[Callable[[Dict[str, Any]], Any]] = []
+    
+    def write(self, event: Dict[str, Any]):
+        for listener in list(self.listeners):
+            try:
+                listener(event)
+            except Exception:
+                pass  # 監聽者（例如吞吐量報告）的錯誤不影響自動化流程
+        if not config.EVENT_LOG_ENABLED:
+            return
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    if self.path is None:
+                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                        self.path = config.LOGS_DIR / f"events_{timestamp}_{os.getpid()}.jsonl"
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+                self._file.write(line)
+            except OSError:
+                pass  # 事件檔只用於分析，寫入失敗不影響自動化流程
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def reset_after_fork(self):
+        """子行程另開自己的事件檔（父行程的監聽者不沿用）"""
+        self._lock = threading.Lock()
+        self._file = None
+        self.path = None
+        self.listeners = []
+
+
+_pipeline = _LogPipeline()
+_events = _EventLog()
+_event_context: ContextVar[Dict[str, Any]] = ContextVar("event_context", default={})
+_loggers: Dict[str, "AutomationLogger"] = {}
+_loggers_lock = threading.Lock()
+atexit.register(_pipeline.stop)
+atexit.register(_events.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_pipeline.reset_after_fork)
+    os.register_at_fork(after_in_child=_events.reset_after_fork)
+
+
+def set_event_context(**fields) -> Token:
+    """
+    設定之後事件共用的欄位（例如 project、round、line），返回值交給 reset_event_context 還原
+    
+    Args:
+        **fields: 事件欄位
+    
+    Returns:
+        Token: 還原用的 token
+    """
+    return _event_context.set({**_event_context.get(), **fields})
+
+
+def reset_event_context(token: Token):
+    """還原 set_event_context 之前的事件欄位"""
+    try:
+        _event_context.reset(token)
+    except ValueError:
+        pass  # token 來自其他執行緒的 context
+
+
+def add_event_listener(listener: Callable[[Dict[str, Any]], Any]):
+    """
+    註冊階段事件監聽者（本行程的每筆事件都會以 dict 呼叫，與是否寫出事件檔無關）
+    
+    Args:
+        listener: 監聽函式
+    """
+    _events.listeners.append(listener)
+
+
+def remove_event_listener(listener: Callable[[Dict[str, Any]], Any]):
+    """移除階段事件監聽者"""
+    try:
+        _events.listeners.remove(listener)
+    except ValueError:
+        pass
+
+
+@contextmanager
+def event_context(**fields) -> Iterator[None]:
+    """在區塊內為事件加上共用欄位"""
+    token = set_event_context(**fields)
+    try:
+        yield
+    finally:
+        reset_event_context(token)
+
+
 class AutomationLogger:
     """自動化腳本專用日誌記錄器"""
     
     def __init__(self, name: str = "AutomationScript", log_file: Optional[str] = None):
         """
-        初始化日誌記錄器
+        初始化日誌記錄器（共用行程的日誌管線，不會另外開啟檔案）
         
         Args:
             name: 日誌記錄器名稱
-            log_file: 自定義日誌檔案路徑
+            log_file: 自定義日誌檔案路徑（僅在日誌管線尚未啟動時生效）
         """
         self.name = name
-        self.logger = logging.getLogger(name)
-        # 確保日誌級別正確設定
-        log_level = getattr(logging, config.LOG_LEVEL, logging.INFO)
-        self.logger.setLevel(log_level)
-        
-        # 清除已存在的處理器，避免重複
-        self.logger.handlers.clear()
+        started = _pipeline.start(log_file)
+        self.log_file = _pipeline.log_file
         
-        # 設定日誌檔案路徑
-        if log_file:
-            self.log_file = Path(log_file)
+        if name == ROOT_LOGGER_NAME:
+            self.logger = logging.getLogger(ROOT_LOGGER_NAME)
         else:
-            self.log_file = config.get_log_file_path()
-        
-        # 確保日誌目錄存在
-        self.log_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        # 設定格式器
-        formatter = logging.Formatter(config.LOG_FORMAT)
-        
-        # 設定檔案處理器
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-        
-        # 設定控制台處理器
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(log_level)
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+            self.logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
         
         # 記錄日誌系統啟動
-        self.info(f"日誌系統初始化完成 - 檔案: {self.log_file}")
+        if started:
+            self.info(f"日誌系統初始化完成 - 檔案: {self.log_file}")
     
-    def debug(self, message: str):
-        """記錄除錯訊息"""
-        self.logger.debug(message)
+    def debug(self, message: str, *args, **kwargs):
+        """記錄除錯訊息（其餘參數如 exc_info 直接傳給 logging）"""
+        self.logger.debug(message, *args, **kwargs)
     
-    def info(self, message: str):
+    def info(self, message: str, *args, **kwargs):
         """記錄一般訊息"""
-        self.logger.info(message)
+        self.logger.info(message, *args, **kwargs)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args, **kwargs):
         """記錄警告訊息"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args, **kwargs)
     
-    def error(self, message: str):
+    def error(self, message: str, *args, **kwargs):
         """記錄錯誤訊息"""
-        self.logger.error(message)
+        self.logger.error(message, *args, **kwargs)
     
-    def critical(self, message: str):
+    def critical(self, message: str, *args, **kwargs):
         """記錄嚴重錯誤訊息"""
-        self.logger.critical(message)
+        self.logger.critical(message, *args, **kwargs)
+    
+    def is_enabled_for(self, level: int) -> bool:
+        """是否會輸出指定等級（組合昂貴的除錯訊息前先檢查）"""
+        return self.logger.isEnabledFor(level)
+    
+    def event(self, phase: str, start: float, end: float, outcome: str = "ok", **fields):
+        """
+        輸出一筆階段事件到 JSON lines 事件檔
+        
+        Args:
+            phase: 階段名稱（send / wait / copy / save / scan / clear-memory / open-vscode / close-vscode ...）
+            start: 開始時間（time.monotonic()）
+            end: 結束時間（time.monotonic()）
+            outcome: 結果（ok / failed / error / timeout ...）
+            **fields: 其他欄位，覆蓋目前的事件 context（project、round、line）
+        """
+        event = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "pid": os.getpid(),
+            "source": self.name,
+            "phase": phase,
+            **_event_context.get(),
+            **{key: value for key, value in fields.items() if value is not None},
+            "start": round(start, 6),
+            "end": round(end, 6),
+            "duration": round(end - start, 6),
+            "outcome": outcome,
+        }
+        _events.write(event)
+    
+    @contextmanager
+    def phase(self, phase: str, **fields) -> Iterator[Dict[str, Any]]:
+        """
+        計時一個階段並輸出事件；區塊內可修改 yield 出的 dict（例如設定 outcome 或其他欄位），
+        發生例外時 outcome 為 error
+        
+        Args:
+            phase: 階段名稱
+            **fields: 其他事件欄位
+        """
+        details: Dict[str, Any] = dict(fields)
+        start = time.monotonic()
+        try:
+            yield details
+        except BaseException:
+            details["outcome"] = "error"
+            raise
+        finally:
+            outcome = details.pop("outcome", "ok")
+            self.event(phase, start, time.monotonic(), outcome, **details)
     
     def project_start(self, project_path: str):
         """記錄專案開始處理"""
@@ -182,6 +422,9 @@ class ProjectLogger:
         self.project_name = project_name
         self.main_logger = main_logger
         self.start_time = datetime.now()
+        self._start_monotonic = time.monotonic()
+        # 之後同一執行緒的階段事件都帶有專案名稱
+        self._context_token = set_event_context(project=project_name)
 
         # 在 ExecutionResult/AutomationLog 資料夾下創建專用日誌檔案
         script_root = Path(__file__).parent.parent  # 腳本根目錄
@@ -245,6 +488,7 @@ class ProjectLogger:
                 self.main_logger.error(f"專案日誌關閉失敗: {e}")
         
         self.main_logger.project_success(self.project_name, elapsed)
+        self._end_event("ok")
     
     def failed(self, error_msg: str):
         """標記專案處理失敗"""
@@ -263,16 +507,63 @@ class ProjectLogger:
                 self.main_logger.error(f"專案日誌關閉失敗: {e}")
         
         self.main_logger.project_failed(self.project_name, error_msg, elapsed)
+        self._end_event("failed", error=error_msg)
+    
+    def _end_event(self, outcome: str, **fields):
+        """輸出整個專案的事件並移除專案 context"""
+        self.main_logger.event("project", self._start_monotonic, time.monotonic(), outcome,
+                               project=self.project_name, **fields)
+        reset_event_context(self._context_token)
 
 # 全域日誌記錄器實例
-main_logger = AutomationLogger("HybridUIAutomation")
+main_logger = AutomationLogger(ROOT_LOGGER_NAME)
+_loggers[ROOT_LOGGER_NAME] = main_logger
 
 # 便捷函數
 def get_logger(name: str = None) -> AutomationLogger:
-    """取得日誌記錄器實例"""
-    if name:
-        return AutomationLogger(name)
-    return main_logger
+    """取得日誌記錄器實例（同名稱共用同一個實例）"""
+    if not name:
+        return main_logger
+    logger = _loggers.get(name)
+    if logger is None:
+        with _loggers_lock:
+            logger = _loggers.get(name)
+            if logger is None:
+                logger = AutomationLogger(name)
+                _loggers[name] = logger
+    return logger
+
+def shutdown_logging():
+    """寫出佇列中剩餘的日誌並關閉檔案（程式結束時也會自動執行）"""
+    _pipeline.stop()
+
+def timed_phase(phase: str) -> Callable:
+    """
+    以階段事件計時方法呼叫的裝飾器：返回值為假（或 tuple 第一個元素為假）時 outcome 為 failed，
+    參數中的 project_name / round_number / line_number 會加入事件欄位
+    
+    Args:
+        phase: 階段名稱
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            logger = getattr(args[0], "logger", None) if args else None
+            if not isinstance(logger, AutomationLogger):
+                logger = main_logger
+            fields = {
+                "project": kwargs.get("project_name"),
+                "round": kwargs.get("round_number"),
+                "line": kwargs.get("line_number"),
+            }
+            with logger.phase(phase, **fields) as details:
+                result = func(*args, **kwargs)
+                success = result[0] if isinstance(result, tuple) and result else result
+                if not success:
+                    details["outcome"] = "failed"
+                return result
+        return wrapper
+    return decorator
 
 def create_project_logger(project_name: str) -> ProjectLogger:
     """創建專案專用日誌記錄器"""
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 平行工作模組
+每個 worker 擁有獨立的 Xvfb 虛擬顯示器（DISPLAY=:N）、VS Code user-data-dir 與剪貼簿
+（xclip/xsel 的剪貼簿綁定在各自的 X 顯示器上），由主控制器從共用佇列分派專案，
+讓同一台主機上同時進行 N 個 Copilot 工作階段
+"""
+
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import sys
+
+# 導入配置和日誌（不可在此匯入 pyautogui，必須等 DISPLAY 設定好才能載入）
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+except ImportError:
+    from config import config
+    from logger import get_logger
+
+
+# 啟動子行程時暫時修改 os.environ["DISPLAY"]，需避免多個執行緒同時啟動
+_spawn_lock = threading.Lock()
+
+
+class VirtualDisplay:
+    """Xvfb 虛擬顯示器（可選擇同時啟動輕量視窗管理員）"""
+
+    def __init__(self, display_number: int, resolution: str = None):
+        """
+        初始化虛擬顯示器
+
+        Args:
+            display_number: 顯示器編號（DISPLAY=:N）
+            resolution: 解析度與色深，例如 "1920x1080x24"
+        """
+        self.logger = get_logger("VirtualDisplay")
+        self.display_number = display_number
+        self.resolution = resolution or config.PARALLEL_DISPLAY_RESOLUTION
+        self.xvfb_process: Optional[subprocess.Popen] = None
+        self.wm_process: Optional[subprocess.Popen] = None
+
+    @property
+    def name(self) -> str:
+        return f":{self.display_number}"
+
+    @property
+    def socket_path(self) -> Path:
+        return Path(f"/tmp/.X11-unix/X{self.display_number}")
+
+    def start(self, timeout: float = 10) -> bool:
+        """
+        啟動 Xvfb，等待 X socket 出現
+
+        Args:
+            timeout: 等待秒數
+
+        Returns:
+            bool: 是否啟動成功
+        """
+        if Path(f"/tmp/.X{self.display_number}-lock").exists():
+            self.logger.error(f"顯示器 {self.name} 已被使用（存在 lock 檔）")
+            return False
+
+        cmd = [config.PARALLEL_XVFB_EXECUTABLE, self.name,
+               "-screen", "0", self.resolution, "-nolisten", "tcp"]
+        try:
+            self.xvfb_process = subprocess.Popen(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            self.logger.error(f"找不到 Xvfb 執行檔: {config.PARALLEL_XVFB_EXECUTABLE}")
+            return False
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.xvfb_process.poll() is not None:
+                self.logger.error(f"Xvfb {self.name} 啟動後立即結束 (code={self.xvfb_process.returncode})")
+                return False
+            if self.socket_path.exists():
+                break
+            time.sleep(0.1)
+        else:
+            self.logger.error(f"Xvfb {self.name} 在 {timeout} 秒內未就緒")
+            self.stop()
+            return False
+
+        # Xvfb 沒有視窗管理員時 Alt+F4、Super+Up 無效，可選擇啟動一個
+        if config.PARALLEL_WINDOW_MANAGER:
+            env = os.environ.copy()
+            env["DISPLAY"] = self.name
+            try:
+                self.wm_process = subprocess.Popen(
+                    [config.PARALLEL_WINDOW_MANAGER], env=env,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+            except FileNotFoundError:
+                self.logger.warning(f"找不到視窗管理員: {config.PARALLEL_WINDOW_MANAGER}，改由行程結束關閉 VS Code")
+
+        self.logger.info(f"✅ 虛擬顯示器 {self.name} 已啟動 ({self.resolution})")
+        return True
+
+    def stop(self):
+        """停止視窗管理員與 Xvfb"""
+        for process in (self.wm_process, self.xvfb_process):
+            if process is None or process.poll() is not None:
+                continue
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.wm_process = None
+        self.xvfb_process = None
+
+
+def prepare_user_data_dir(worker_id: int) -> Path:
+    """
+    建立 worker 專用的 VS Code user-data-dir，首次建立時從範本複製（保留 Copilot 登入狀態與設定）
+
+    Args:
+        worker_id: worker 編號
+
+    Returns:
+        Path: user-data-dir 路徑
+    """
+    user_data_dir = Path(config.PARALLEL_USER_DATA_ROOT) / f"worker-{worker_id}"
+    template = config.PARALLEL_USER_DATA_TEMPLATE
+    if not user_data_dir.exists() and template and Path(template).exists():
+        shutil.copytree(template, user_data_dir, symlinks=True,
+                        ignore=shutil.ignore_patterns("Cache*", "CachedData", "logs", "*.lock", "Singleton*"))
+    user_data_dir.mkdir(parents=True, exist_ok=True)
+    return user_data_dir
+
+
+def _iter_tasks(task_queue, project_queue, worker_name: str):
+    """
+    依序產生要處理的專案：本機佇列（None 表示結束）或共享工作佇列（無可領取專案時結束）
+
+    Yields:
+        Tuple[Dict, bool]: (ProjectInfo 字典, 是否由共享佇列領取)
+    """
+    if project_queue is None:
+        while True:
+            item = task_queue.get()
+            if item is None:
+                return
+            yield item, False
+    else:
+        while True:
+            claimed = project_queue.claim(worker_name)
+            if claimed is None:
+                return
+            yield {"name": claimed.name, "path": claimed.path}, True
+
+
+def worker_main(worker_id: int, display: str, user_data_dir: str, options: Optional[Dict],
+                task_queue, result_queue, queue_db: str = None):
+    """
+    worker 行程進入點：在自己的顯示器上逐一處理佇列中的專案
+
+    Args:
+        worker_id: worker 編號
+        display: X 顯示器名稱（例如 ":91"）
+        user_data_dir: VS Code user-data-dir
+        options: 主控制器的執行選項（interaction_settings、cwe_scan_settings、use_smart_wait），
+                 None 表示從共享工作佇列讀取
+        task_queue: 專案佇列，項目為 ProjectInfo 字典，None 表示結束；使用共享工作佇列時不使用
+        result_queue: 回報佇列，可為 None（其他主機上的 worker 只透過共享工作佇列回報）
+        queue_db: 共享工作佇列（SQLite）路徑，None 表示使用 task_queue
+    """
+    # pyautogui / pyperclip 在匯入時綁定 DISPLAY，必須先設定再匯入主程式模組
+    os.environ["DISPLAY"] = display
+
+    from main import HybridUIAutomationScript
+    from src.logger import create_project_logger
+    from src.project_manager import ProjectInfo
+    from src.project_queue import LeaseHeartbeat, SQLiteProjectQueue, default_worker_id
+    from src.vscode_controller import VSCodeController
+
+    def report(*message):
+        if result_queue is not None:
+            result_queue.put(message)
+
+    project_queue = SQLiteProjectQueue(queue_db) if queue_db else None
+    worker_name = f"{default_worker_id()}-w{worker_id}"
+    if options is None:
+        options = project_queue.get_options() if project_queue else {}
+
+    script = HybridUIAutomationScript()
+    script.configure_worker(options, VSCodeController(user_data_dir=Path(user_data_dir)))
+    report("ready", worker_id, None, None)
+
+    for item, claimed in _iter_tasks(task_queue, project_queue, worker_name):
+        if script.error_handler.emergency_stop_requested:
+            if claimed:
+                # 交還租約讓其他 worker 處理，並停止領取
+                project_queue.release(item["name"], worker_name)
+                break
+            report("finished", worker_id, item["name"], {"success": False, "error": "收到中斷請求", "processing_time": 0})
+            continue
+
+        project = ProjectInfo.from_dict(item)
+        report("started", worker_id, project.name, None)
+        start_time = time.time()
+        error_msg = None
+        lease = LeaseHeartbeat(project_queue, project.name, worker_name) if claimed else nullcontext()
+        with lease as heartbeat:
+            try:
+                project_logger = create_project_logger(project.name)
+                project_logger.log(f"由 worker-{worker_id} ({worker_name}, {display}) 處理")
+                success = script._execute_project_automation(project, project_logger)
+            except Exception as e:
+                success = False
+                error_msg = str(e)
+
+            # 該專案延後的 CWE 掃描在交回結果前完成（仍在租約內）
+            script.background_queue.drain_all()
+        processing_time = time.time() - start_time
+        error_msg = error_msg or ("" if success else "處理失敗")
+        if claimed:
+            if heartbeat.lost.is_set():
+                error_msg = "租約遺失（已由其他 worker 接手）"
+            project_queue.complete(project.name, worker_name, success, error_msg, processing_time)
+        report("finished", worker_id, project.name, {
+            "success": success,
+            "error": error_msg,
+            "processing_time": processing_time
+        })
+
+    # 保留視窗模式下最後一個專案的視窗仍開著
+    if config.VSCODE_REUSE_WINDOW:
+        script.vscode_controller.close_current_project(force=True)
+    report("exited", worker_id, None, None)
+
+
+class ParallelCoordinator:
+    """平行工作協調器：啟動虛擬顯示器與 worker 行程，分派專案並彙整結果"""
+
+    def __init__(self, worker_count: int = None,
+                 on_result: Callable[[str, Dict], None] = None,
+                 on_started: Callable[[str], None] = None, queue_db: Path = None):
+        """
+        初始化協調器
+
+        Args:
+            worker_count: worker 數量，預設為 config.PARALLEL_WORKERS
+            on_result: 專案完成時的回呼 (專案名稱, 結果)
+            on_started: 專案開始處理時的回呼 (專案名稱)
+            queue_db: 共享工作佇列路徑；指定時本機 worker 改從佇列領取，其他主機也可加入
+        """
+        self.logger = get_logger("ParallelCoordinator")
+        self.worker_count = worker_count or config.PARALLEL_WORKERS
+        self.queue_db = str(queue_db) if queue_db else None
+        self.on_result = on_result
+        self.on_started = on_started
+        self._context = multiprocessing.get_context("spawn")
+        self.displays: List[VirtualDisplay] = []
+        self.processes: List = []
+
+    def run(self, projects: List, options: Dict) -> Dict[str, Dict]:
+        """
+        平行處理所有專案
+
+        Args:
+            projects: ProjectInfo 列表（加入共享工作佇列的主機可傳入空列表）
+            options: 傳給 worker 的執行選項，None 表示由 worker 從共享工作佇列讀取
+
+        Returns:
+            Dict[str, Dict]: 專案名稱 -> 結果（只包含本機 worker 處理的專案）
+        """
+        task_queue = self._context.Queue()
+        result_queue = self._context.Queue()
+        project_queue = None
+        if self.queue_db:
+            from src.project_queue import SQLiteProjectQueue
+            project_queue = SQLiteProjectQueue(self.queue_db)
+            project_queue.enqueue(projects)
+            if options is not None:
+                project_queue.set_options(options)
+        else:
+            for project in projects:
+                task_queue.put(project.to_dict())
+
+        results: Dict[str, Dict] = {}
+        try:
+            self._start_workers(options, task_queue, result_queue)
+            if not self.processes:
+                self.logger.error("沒有任何 worker 成功啟動")
+                return results
+
+            if project_queue is None:
+                for _ in self.processes:
+                    task_queue.put(None)
+
+            exited = 0
+            while exited < len(self.processes):
+                try:
+                    kind, worker_id, project_name, payload = result_queue.get(timeout=5)
+                except Exception:
+                    # 檢查是否有 worker 異常結束（未回報 exited）
+                    if not any(p.is_alive() for p in self.processes):
+                        self.logger.error("所有 worker 行程都已結束，停止等待")
+                        break
+                    continue
+
+                if kind == "started":
+                    self.logger.info(f"worker-{worker_id} 開始處理: {project_name}")
+                    if self.on_started:
+                        self.on_started(project_name)
+                elif kind == "finished":
+                    results[project_name] = payload
+                    status = "✅ 成功" if payload["success"] else f"❌ 失敗 ({payload['error']})"
+                    self.logger.info(f"worker-{worker_id} 完成 {project_name}: {status} "
+                                     f"[{len(results)}/{len(projects)}]")
+                    if self.on_result:
+                        self.on_result(project_name, payload)
+                elif kind == "exited":
+                    exited += 1
+
+            # 只有提交專案的主控制器需要等待其他主機
+            if project_queue is not None and projects:
+                self._wait_for_remote_workers(project_queue)
+        finally:
+            self._stop_workers()
+
+        return results
+
+    def _wait_for_remote_workers(self, project_queue):
+        """本機 worker 已無專案可領取時，等待其他主機上處理中的專案完成（期間收回到期租約）"""
+        while True:
+            project_queue.reclaim_expired()
+            counts = project_queue.counts()
+            processing = counts.get("processing", 0)
+            if not processing:
+                break
+            self.logger.info(f"等待其他主機完成 {processing} 個處理中的專案...")
+            time.sleep(config.PROJECT_QUEUE_POLL_INTERVAL)
+        if counts.get("pending", 0):
+            self.logger.warning(f"佇列中仍有 {counts['pending']} 個待處理專案（租約到期被收回），"
+                                f"可再啟動 worker 繼續處理")
+
+    def _start_workers(self, options: Dict, task_queue, result_queue):
+        """為每個 worker 啟動虛擬顯示器與 spawn 行程"""
+        for worker_id in range(self.worker_count):
+            display = VirtualDisplay(config.PARALLEL_DISPLAY_BASE + worker_id)
+            if not display.start():
+                continue
+            self.displays.append(display)
+
+            user_data_dir = prepare_user_data_dir(worker_id)
+            process = self._context.Process(
+                target=worker_main,
+                args=(worker_id, display.name, str(user_data_dir), options, task_queue, result_queue,
+                      self.queue_db),
+                name=f"automation-worker-{worker_id}"
+            )
+            # spawn 子行程會在匯入 __main__ 時就載入 pyautogui，因此啟動當下的 DISPLAY 也要正確
+            with _spawn_lock:
+                original_display = os.environ.get("DISPLAY")
+                os.environ["DISPLAY"] = display.name
+                try:
+                    process.start()
+                finally:
+                    if original_display is None:
+                        os.environ.pop("DISPLAY", None)
+                    else:
+                        os.environ["DISPLAY"] = original_display
+            self.processes.append(process)
+            self.logger.info(f"worker-{worker_id} 已啟動 (DISPLAY={display.name}, user-data-dir={user_data_dir})")
+
+    def _stop_workers(self):
+        """等待 worker 結束並關閉虛擬顯示器"""
+        for process in self.processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                self.logger.warning(f"{process.name} 未正常結束，強制終止")
+                process.terminate()
+                process.join(timeout=5)
+        for display in self.displays:
+            display.stop()
+        self.processes = []
+        self.displays = []
+
+
+def main():
+    """命令列：讓本機的 worker 加入共享工作佇列（在其他主機上執行）"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="加入共享專案工作佇列的平行 worker")
+    parser.add_argument("--queue-db", required=True, help="共享工作佇列（SQLite）路徑")
+    parser.add_argument("--workers", type=int, default=config.PARALLEL_WORKERS, help="本機 worker 數量")
+    args = parser.parse_args()
+
+    coordinator = ParallelCoordinator(args.workers, queue_db=Path(args.queue_db))
+    results = coordinator.run([], None)
+    succeeded = sum(1 for r in results.values() if r["success"])
+    print(f"本機處理 {len(results)} 個專案，成功 {succeeded} 個")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 逐行進度檢查點模組
+每儲存一行回應就記錄（輪數、行號、回應雜湊、掃描狀態），
+中斷後重新執行時從下一個未完成的行繼續，不必重做已完成的 Copilot 互動
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+    from src.response_index import RESPONSE_MARKER
+except ImportError:
+    from config import config
+    from logger import get_logger
+    from response_index import RESPONSE_MARKER
+
+
+CHECKPOINT_FILENAME = "progress_checkpoint.json"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def checkpoint_path(project_name: str) -> Path:
+    """
+    專案檢查點檔案路徑（與回應檔案放在同一個結果資料夾，清理執行記錄時一併移除）
+
+    Args:
+        project_name: 專案名稱
+
+    Returns:
+        Path: 檢查點檔案路徑
+    """
+    return config.EXECUTION_RESULT_DIR / "Success" / project_name / CHECKPOINT_FILENAME
+
+
+class ProgressCheckpoint:
+    """單一專案的逐行進度檢查點"""
+
+    def __init__(self, project_name: str, prompt_lines: List[str], path: Path = None):
+        """
+        載入或建立檢查點；提示詞內容與檢查點記錄不同時，舊進度作廢
+
+        Args:
+            project_name: 專案名稱
+            prompt_lines: 本次執行的提示詞行
+            path: 檢查點檔案路徑，預設為 checkpoint_path(project_name)
+        """
+        self.logger = get_logger("ProgressCheckpoint")
+        self.project_name = project_name
+        self.path = Path(path) if path else checkpoint_path(project_name)
+        self.prompt_hash = _sha256("\n".join(prompt_lines))
+        self.total_lines = len(prompt_lines)
+        self._lock = threading.Lock()  # 延後的 CWE 掃描可能在其他時間點更新掃描狀態
+        # 背景寫入時 record_line 在寫入執行緒中較晚執行，先到的掃描狀態暫存於此
+        self._early_scan_status: Dict[tuple, str] = {}
+        self.data = self._load()
+
+    def _new_data(self) -> Dict:
+        return {
+            "project": self.project_name,
+            "prompt_hash": self.prompt_hash,
+            "total_lines": self.total_lines,
+            "finished": False,
+            "rounds": {},
+            "updated": datetime.now().isoformat()
+        }
+
+    def _load(self) -> Dict:
+        """載入檢查點並確認與目前的提示詞一致"""
+        if not self.path.exists():
+            return self._new_data()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"讀取進度檢查點失敗，從頭開始: {e}")
+            return self._new_data()
+
+        if data.get("prompt_hash") != self.prompt_hash:
+            self.logger.warning(f"專案 {self.project_name} 的提示詞已變更，捨棄舊的進度檢查點")
+            return self._new_data()
+        if data.get("finished"):
+            # 上一次已全部完成：重新執行時從頭開始，而不是把每一輪都視為已完成
+            self.logger.info(f"專案 {self.project_name} 的上一次執行已完成，重新開始記錄進度")
+            return self._new_data()
+        return data
+
+    def _save(self):
+        """先寫暫存檔再取代（呼叫端需持有鎖）"""
+        self.data["updated"] = datetime.now().isoformat()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"寫入進度檢查點失敗: {e}")
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+    def _round_lines(self, round_number: int) -> Dict[str, Dict]:
+        return self.data["rounds"].get(str(round_number), {})
+
+    def completed_lines(self, round_number: int) -> int:
+        """指定輪數中從第1行起連續完成的行數"""
+        lines = self._round_lines(round_number)
+        count = 0
+        while str(count + 1) in lines:
+            count += 1
+        return count
+
+    def next_line(self, round_number: int) -> int:
+        """指定輪數的下一個未完成行號（全部完成時為 total_lines + 1）"""
+        return self.completed_lines(round_number) + 1
+
+    def is_round_complete(self, round_number: int) -> bool:
+        return self.completed_lines(round_number) >= self.total_lines
+
+    @property
+    def has_progress(self) -> bool:
+        return any(self.data["rounds"].values())
+
+    def load_response(self, round_number: int, line_number: int) -> Optional[str]:
+        """
+        從回應檔案讀回已完成行的回應（續跑串接模式時需要），並以雜湊確認內容未被修改
+
+        Args:
+            round_number: 輪數
+            line_number: 行號
+
+        Returns:
+            Optional[str]: 回應內容，檔案遺失或內容不符時返回 None
+        """
+        record = self._round_lines(round_number).get(str(line_number))
+        if not record or not record.get("response_file"):
+            return None
+        try:
+            response_file = self.path.parent / record["response_file"]
+            content = response_file.read_text(encoding='utf-8')
+            response = content.split(RESPONSE_MARKER, 1)[1]
+        except (OSError, IndexError):
+            return None
+        return response if _sha256(response) == record.get("response_hash") else None
+
+    def unscanned_lines(self) -> List[str]:
+        """延後的 CWE 掃描尚未完成（例如執行中斷）的行"""
+        result = []
+        for round_key, lines in sorted(self.data["rounds"].items(), key=lambda item: int(item[0])):
+            for line_key, record in sorted(lines.items(), key=lambda item: int(item[0])):
+                if record.get("scan_status") in ("pending", "deferred"):
+                    result.append(f"第{round_key}輪第{line_key}行")
+        return result
+
+    # ------------------------------------------------------------------
+    # 更新
+    # ------------------------------------------------------------------
+    def record_line(self, round_number: int, line_number: int, response: str,
+                    response_file: Optional[Path], retry_count: int = 0):
+        """
+        記錄一行已儲存的回應（在 save_response_to_file 成功後立即呼叫）
+
+        Args:
+            round_number: 輪數
+            line_number: 行號
+            response: 回應內容
+            response_file: 回應檔案路徑
+            retry_count: 重試次數
+        """
+        with self._lock:
+            lines = self.data["rounds"].setdefault(str(round_number), {})
+            # 該行之後的舊記錄（前一次執行留下）已不再連續，一併清除
+            for key in [k for k in lines if int(k) > line_number]:
+                del lines[key]
+            lines[str(line_number)] = {
+                "response_hash": _sha256(response),
+                "response_file": self._relative(response_file),
+                "retry_count": retry_count,
+                "scan_status": self._early_scan_status.pop((round_number, line_number), "pending"),
+                "saved_at": datetime.now().isoformat()
+            }
+            self.data["finished"] = False
+            self._save()
+
+    def mark_scan(self, round_number: int, line_number: int, status: str):
+        """
+        更新一行的 CWE 掃描狀態
+
+        Args:
+            round_number: 輪數
+            line_number: 行號
+            status: done / failed / deferred / disabled
+        """
+        with self._lock:
+            record = self._round_lines(round_number).get(str(line_number))
+            if record is None:
+                # 回應仍在背景寫入，記錄建立時再套用
+                self._early_scan_status[(round_number, line_number)] = status
+                return
+            record["scan_status"] = status
+            self._save()
+
+    def reset_round(self, round_number: int):
+        """清除指定輪數的進度（例如該輪須重新開始）"""
+        with self._lock:
+            for key in [key for key in self._early_scan_status if key[0] == round_number]:
+                del self._early_scan_status[key]
+            if self.data["rounds"].pop(str(round_number), None) is not None:
+                self._save()
+
+    def mark_finished(self):
+        """所有輪數皆已完成"""
+        with self._lock:
+            self.data["finished"] = True
+            self._save()
+
+    def _relative(self, response_file: Optional[Path]) -> Optional[str]:
+        if response_file is None:
+            return None
+        try:
+            return Path(response_file).relative_to(self.path.parent).as_posix()
+        except ValueError:
+            return str(response_file)
+
+
+def has_unfinished_checkpoint(project_name: str) -> bool:
+    """
+    專案是否有尚未完成的進度檢查點（清理執行記錄時應保留，以便續跑）
+
+    Args:
+        project_name: 專案名稱
+
+    Returns:
+        bool: 是否有未完成的進度
+    """
+    if not config.RESUME_FROM_CHECKPOINT:
+        return False
+    path = checkpoint_path(project_name)
+    if not path.exists():
+        return False
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return not data.get("finished") and any(data.get("rounds", {}).values())
+    except (OSError, ValueError):
+        return False
@@ -6,9 +6,12 @@ Hybrid UI Automation Script - 專案管理模組
 
 import os
 import json
+import uuid
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, asdict
+from typing import Callable, List, Dict, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, fields
+from functools import cached_property
 from datetime import datetime
 import sys
 
@@ -16,6 +19,8 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from config.config import config
 from src.logger import get_logger
+from src.project_scanner import ProjectScanner, read_manifest
+from src.lazy_import import LazyInstance
 
 @dataclass
 class ProjectInfo:
@@ -25,7 +30,7 @@ class ProjectInfo:
     status: str = "pending"  # pending, processing, completed, failed, skipped
     has_copilot_file: bool = False
     file_count: int = 0
-    supported_files: List[str] = None
+    manifest_path: Optional[str] = None  # 檔案清單的 manifest 快取（supported_files 需要時才讀取）
     last_processed: Optional[str] = None
     error_message: Optional[str] = None
     processing_time: Optional[float] = None
@@ -37,18 +42,23 @@ class ProjectInfo:
     prompt_file_size: int = 0        # 提示詞檔案大小（bytes）
     prompt_file_path: Optional[str] = None  # 提示詞檔案路徑
     
-    def __post_init__(self):
-        if self.supported_files is None:
-            self.supported_files = []
+    @cached_property
+    def supported_files(self) -> List[str]:
+        """支援的程式檔案（相對路徑），第一次存取時才從 manifest 讀取，manifest 不存在時重新走訪"""
+        manifest = read_manifest(Path(self.manifest_path)) if self.manifest_path else None
+        if manifest is None:
+            manifest = ProjectScanner(ProjectManager.SUPPORTED_EXTENSIONS).walk(Path(self.path))
+        return manifest.files
     
     def to_dict(self) -> Dict:
-        """轉換為字典格式"""
+        """轉換為字典格式（不含檔案清單）"""
         return asdict(self)
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'ProjectInfo':
-        """從字典創建實例"""
-        return cls(**data)
+        """從字典創建實例（忽略未知欄位，例如舊版狀態檔中的 supported_files）"""
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
 
 class ProjectManager:
     """專案管理器"""
@@ -78,15 +88,26 @@ class ProjectManager:
         self.projects_root = projects_root or config.PROJECTS_DIR
         self.projects: List[ProjectInfo] = []
         self.status_file = self.projects_root / "automation_status.json"
+        # 狀態日誌：每次狀態變更附加一行，定期合併回 status_file（檢查點）
+        self.journal_file = self.projects_root / "automation_status.journal.jsonl"
+        self._journal_id: Optional[str] = None
+        self._journal_entries = 0
+        self.scanner = ProjectScanner(self.SUPPORTED_EXTENSIONS,
+                                      cache_dir=self.projects_root / config.PROJECT_SCAN_CACHE_DIRNAME)
         
         self.logger.info(f"專案管理器初始化 - 根目錄: {self.projects_root}")
         
         # 確保專案目錄存在
         self.projects_root.mkdir(parents=True, exist_ok=True)
     
-    def scan_projects(self) -> List[ProjectInfo]:
+    def scan_projects(self, progress_callback: Callable[[int, int, str, Optional[ProjectInfo]], None] = None
+                      ) -> List[ProjectInfo]:
         """
         掃描專案目錄，發現所有專案
+        各專案的分析（檔案走訪、提示詞分析、結果目錄檢查）以執行緒池平行進行，結果依專案名稱排序
+        
+        Args:
+            progress_callback: 每完成一個專案時在呼叫端執行緒呼叫 (已完成數, 總數, 專案名稱, 專案資訊或 None)
         
         Returns:
             List[ProjectInfo]: 專案資訊列表
@@ -96,12 +117,26 @@ class ProjectManager:
         self.projects = []
         
         try:
-            # 遍歷專案根目錄下的所有子目錄
-            for item in self.projects_root.iterdir():
-                if item.is_dir() and not item.name.startswith('.'):
-                    project_info = self._analyze_project(item)
-                    if project_info:
-                        self.projects.append(project_info)
+            # 專案根目錄下的所有子目錄
+            with os.scandir(self.projects_root) as entries:
+                project_paths = sorted(Path(entry.path) for entry in entries
+                                       if entry.is_dir() and not entry.name.startswith('.'))
+            
+            results: List[Optional[ProjectInfo]] = [None] * len(project_paths)
+            workers = max(1, min(config.PROJECT_SCAN_WORKERS, len(project_paths)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="project-scan") as executor:
+                futures = {executor.submit(self._analyze_project, path): index
+                           for index, path in enumerate(project_paths)}
+                for completed, future in enumerate(as_completed(futures), 1):
+                    index = futures[future]
+                    results[index] = future.result()
+                    if progress_callback:
+                        try:
+                            progress_callback(completed, len(project_paths), project_paths[index].name, results[index])
+                        except Exception as e:
+                            self.logger.warning(f"掃描進度回呼發生錯誤: {str(e)}")
+            
+            self.projects = [project for project in results if project]
             
             self.logger.info(f"掃描完成，發現 {len(self.projects)} 個專案")
             
@@ -126,16 +161,10 @@ class ProjectManager:
         """
         try:
             project_name = project_path.name
-            supported_files = []
-            file_count = 0
             
-            # 遞迴搜尋支援的檔案類型
-            for ext in self.SUPPORTED_EXTENSIONS:
-                files = list(project_path.rglob(f"*{ext}"))
-                if files:
-                    for file_path in files:
-                        supported_files.append(str(file_path.relative_to(project_path)))
-                    file_count += len(files)
+            # 單次走訪搜尋支援的檔案類型（未變動的專案直接使用快取的 manifest）
+            manifest = self.scanner.scan(project_path)
+            file_count = manifest.file_count
             
             # 分析專案專用提示詞
             prompt_info = self._analyze_project_prompt(project_path)
@@ -159,7 +188,7 @@ class ProjectManager:
                 path=str(project_path),
                 has_copilot_file=has_copilot_file,
                 file_count=file_count,
-                supported_files=supported_files,
+                manifest_path=str(self.scanner.manifest_path(project_path)),
                 status="completed" if has_copilot_file else "pending",
                 # 加入專案提示詞資訊
                 has_custom_prompt=prompt_info["has_custom_prompt"],
@@ -297,8 +326,8 @@ class ProjectManager:
                     if status == "failed":
                         project.retry_count += 1
                     
-                    # 儲存狀態
-                    self._save_status()
+                    # 儲存狀態（附加到狀態日誌）
+                    self._append_status(project)
                     
                     self.logger.debug(f"更新專案 {project_name} 狀態為 {status}")
                     return True
@@ -369,6 +398,41 @@ class ProjectManager:
         """
         return self.update_project_status(project_name, "failed", error_message, processing_time)
     
+    def sync_from_queue(self, queue) -> int:
+        """
+        將專案工作佇列（可能由其他主機處理）的結果寫回 automation_status.json
+        結果檔案在處理該專案的主機上，因此直接採用佇列狀態，不重新驗證
+        
+        Args:
+            queue: ProjectQueueBackend 實例
+            
+        Returns:
+            int: 狀態有變動的專案數量
+        """
+        changed = 0
+        for item in queue.get_items():
+            project = self.get_project_by_name(item.name)
+            if project is None or item.status == "pending":
+                continue
+            if (project.status == item.status and project.last_processed == item.last_processed):
+                continue
+            
+            if item.status == "failed" and project.status != "failed":
+                project.retry_count += 1
+            project.status = item.status
+            project.last_processed = item.last_processed
+            project.error_message = item.error_message
+            if item.processing_time:
+                project.processing_time = item.processing_time
+            if item.status == "completed":
+                project.has_copilot_file = True
+            changed += 1
+        
+        if changed:
+            self._save_status()
+            self.logger.info(f"已從工作佇列同步 {changed} 個專案狀態")
+        return changed
+    
     def get_project_by_name(self, project_name: str) -> Optional[ProjectInfo]:
         """
         根據名稱取得專案資訊
@@ -457,10 +521,13 @@ class ProjectManager:
         
         return report
     
-    def save_summary_report(self) -> str:
+    def save_summary_report(self, filename: str = None) -> str:
         """
         儲存摘要報告到檔案
         
+        Args:
+            filename: 報告檔名，預設為 automation_report_{時間戳記}.json
+        
         Returns:
             str: 報告檔案路徑
         """
@@ -471,7 +538,7 @@ class ProjectManager:
         report_dir = script_root / "ExecutionResult" / "AutomationReport"
         report_dir.mkdir(parents=True, exist_ok=True)
         
-        report_file = report_dir / f"automation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        report_file = report_dir / (filename or f"automation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
         
         try:
             with open(report_file, 'w', encoding='utf-8') as f:
@@ -484,22 +551,113 @@ class ProjectManager:
             self.logger.error(f"儲存摘要報告失敗: {str(e)}")
             return ""
     
+    # 狀態日誌中記錄的欄位（其餘欄位由掃描產生，不隨處理狀態改變）
+    _JOURNAL_FIELDS = ("status", "last_processed", "error_message", "processing_time", "retry_count")
+    
     def _save_status(self):
-        """儲存專案狀態到檔案"""
+        """
+        寫入完整的狀態檢查點並清空狀態日誌
+        先寫暫存檔再取代，寫入途中中斷不會損壞原本的狀態檔案
+        """
         try:
+            journal_id = uuid.uuid4().hex
             status_data = {
                 "last_updated": datetime.now().isoformat(),
+                "journal_id": journal_id,
                 "projects": [project.to_dict() for project in self.projects]
             }
+            self._atomic_write(self.status_file, json.dumps(status_data, ensure_ascii=False, indent=2))
             
-            with open(self.status_file, 'w', encoding='utf-8') as f:
-                json.dump(status_data, f, ensure_ascii=False, indent=2)
+            # 日誌標頭記錄對應的檢查點；若在此之前中斷，舊日誌因編號不符而被忽略（內容已在檢查點中）
+            self._atomic_write(self.journal_file, json.dumps({"checkpoint": journal_id}) + "\n")
+            self._journal_id = journal_id
+            self._journal_entries = 0
                 
         except Exception as e:
             self.logger.error(f"儲存狀態檔案失敗: {str(e)}")
     
+    def _append_status(self, project: ProjectInfo):
+        """
+        將單一專案的狀態變更附加到狀態日誌，累積一定數量後合併為檢查點
+        
+        Args:
+            project: 狀態已更新的專案
+        """
+        if self._journal_id is None:
+            # 尚無對應的檢查點（首次執行或舊版狀態檔），先寫入完整檢查點
+            self._save_status()
+            return
+        
+        try:
+            entry = {"name": project.name}
+            entry.update({field: getattr(project, field) for field in self._JOURNAL_FIELDS})
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                if config.STATUS_JOURNAL_FSYNC:
+                    os.fsync(f.fileno())
+            self._journal_entries += 1
+        except Exception as e:
+            self.logger.error(f"寫入狀態日誌失敗，改寫完整檢查點: {str(e)}")
+            self._save_status()
+            return
+        
+        if self._journal_entries >= config.STATUS_JOURNAL_COMPACT_EVERY:
+            self._save_status()
+    
+    def _replay_journal(self) -> int:
+        """
+        依序套用狀態日誌中屬於目前檢查點的變更
+        
+        Returns:
+            int: 套用的變更數量
+        """
+        if self._journal_id is None or not self.journal_file.exists():
+            return 0
+        
+        projects = {project.name: project for project in self.projects}
+        applied = 0
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = {}
+            if header.get("checkpoint") != self._journal_id:
+                # 檢查點已被取代或刪除（例如 ProjectStatusReset），日誌不再有效
+                return 0
+            
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 最後一行可能在寫入途中中斷，之前的變更仍然有效
+                    self.logger.warning("狀態日誌最後一筆不完整，已略過")
+                    break
+                project = projects.get(entry.get("name"))
+                if project is None:
+                    continue
+                for field in self._JOURNAL_FIELDS:
+                    if field in entry:
+                        setattr(project, field, entry[field])
+                applied += 1
+        
+        self._journal_entries = applied
+        return applied
+    
+    @staticmethod
+    def _atomic_write(path: Path, content: str):
+        """寫入暫存檔、fsync 後以 os.replace 取代目標檔案"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
     def _load_status(self):
-        """從檔案載入專案狀態"""
+        """從檔案載入專案狀態（檢查點 + 狀態日誌）"""
+        self._journal_id = None
+        self._journal_entries = 0
         try:
             if self.status_file.exists():
                 with open(self.status_file, 'r', encoding='utf-8') as f:
@@ -518,7 +676,9 @@ class ProjectManager:
                         project.processing_time = saved_project.processing_time
                         project.retry_count = saved_project.retry_count
                 
-                self.logger.info("專案狀態載入完成")
+                self._journal_id = status_data.get("journal_id")
+                replayed = self._replay_journal()
+                self.logger.info(f"專案狀態載入完成（套用 {replayed} 筆狀態日誌）")
                 
         except Exception as e:
             self.logger.error(f"載入狀態檔案失敗: {str(e)}")
@@ -568,8 +728,8 @@ class ProjectManager:
             "average_lines_per_project": total_prompt_lines / max(1, projects_with_prompts)
         }
 
-# 創建全域實例
-project_manager = ProjectManager()
+# 創建全域實例（第一次使用時才建立，避免匯入模組就讀取狀態檔）
+project_manager = LazyInstance(ProjectManager)
 
 # 便捷函數
 def scan_all_projects() -> List[ProjectInfo]:
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 專案工作佇列模組
+讓多台主機或多個 worker 共同處理同一批專案：
+- 原子性領取專案（同一專案同一時間只會被一個 worker 處理）
+- 租約 + 心跳：worker 持續續約，當機或斷線的 worker 租約到期後專案自動回到待處理
+- 狀態值與 automation_status.json 相同（pending / processing / completed / failed）
+
+ProjectQueueBackend 定義介面，SQLiteProjectQueue 為檔案鎖定的 SQLite 實作；
+日後可加入 Redis 等其他後端。
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+except ImportError:
+    from config import config
+    from logger import get_logger
+
+
+@dataclass
+class QueueItem:
+    """佇列中的專案"""
+    name: str
+    path: str
+    status: str = "pending"
+    worker_id: Optional[str] = None
+    lease_expires: Optional[float] = None
+    attempts: int = 0
+    error_message: Optional[str] = None
+    processing_time: Optional[float] = None
+    last_processed: Optional[str] = None
+
+
+def default_worker_id() -> str:
+    """預設的 worker 識別碼：主機名稱-行程編號"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ProjectQueueBackend(ABC):
+    """專案佇列後端介面"""
+
+    @abstractmethod
+    def enqueue(self, projects: Iterable) -> int:
+        """加入專案（已存在的專案不重複加入，失敗的專案重新排入），返回排入的數量"""
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float = None) -> Optional[QueueItem]:
+        """原子性領取一個待處理專案，沒有可領取的專案時返回 None"""
+
+    @abstractmethod
+    def heartbeat(self, name: str, worker_id: str, lease_seconds: float = None) -> bool:
+        """續約，租約已被收回時返回 False"""
+
+    @abstractmethod
+    def complete(self, name: str, worker_id: str, success: bool,
+                 error_message: str = None, processing_time: float = None) -> bool:
+        """回報處理結果，租約已被收回時返回 False"""
+
+    @abstractmethod
+    def release(self, name: str, worker_id: str) -> bool:
+        """放棄租約，專案回到待處理"""
+
+    @abstractmethod
+    def reclaim_expired(self) -> int:
+        """收回已到期的租約，返回收回數量"""
+
+    @abstractmethod
+    def get_items(self) -> List[QueueItem]:
+        """取得所有專案的目前狀態"""
+
+    @abstractmethod
+    def set_options(self, options: Dict):
+        """儲存執行選項，讓其他主機上的 worker 使用相同設定"""
+
+    @abstractmethod
+    def get_options(self) -> Dict:
+        """讀取執行選項"""
+
+    def counts(self) -> Dict[str, int]:
+        """各狀態的專案數量"""
+        result: Dict[str, int] = {}
+        for item in self.get_items():
+            result[item.status] = result.get(item.status, 0) + 1
+        return result
+
+
+class SQLiteProjectQueue(ProjectQueueBackend):
+    """
+    SQLite 專案佇列
+    領取與收回租約都在 BEGIN IMMEDIATE 交易中進行，由 SQLite 檔案鎖保證原子性；
+    多主機共用時，資料庫需放在支援 POSIX 檔案鎖的共享檔案系統上
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            name TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            worker_id TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error_message TEXT,
+            processing_time REAL,
+            last_processed TEXT
+        );
+        CREATE TABLE IF NOT EXISTS options (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Path = None, max_attempts: int = None):
+        """
+        初始化 SQLite 佇列
+
+        Args:
+            db_path: 資料庫路徑，預設為 config.PROJECT_QUEUE_DB
+            max_attempts: 租約到期被收回的次數上限，超過即標記為失敗
+        """
+        self.logger = get_logger("ProjectQueue")
+        self.db_path = Path(db_path or config.PROJECT_QUEUE_DB)
+        self.max_attempts = max_attempts or config.PROJECT_QUEUE_MAX_ATTEMPTS
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(self._SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """每次操作使用新的連線，避免跨執行緒（心跳執行緒）共用"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, projects: Iterable) -> int:
+        added = 0
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for project in projects:
+                # 已失敗的專案重新提交時視為重試；處理中與已完成的專案維持原狀
+                cursor = conn.execute(
+                    "INSERT INTO projects (name, path, status) VALUES (?, ?, 'pending') "
+                    "ON CONFLICT(name) DO UPDATE SET status = 'pending', path = excluded.path, "
+                    "attempts = 0, worker_id = NULL, lease_expires = NULL WHERE status = 'failed'",
+                    (project.name, str(project.path))
+                )
+                added += cursor.rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        self.logger.info(f"排入佇列: {added} 個專案")
+        return added
+
+    def claim(self, worker_id: str, lease_seconds: float = None) -> Optional[QueueItem]:
+        lease_seconds = lease_seconds or config.PROJECT_QUEUE_LEASE_SECONDS
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._reclaim_expired(conn)
+            row = conn.execute(
+                "SELECT * FROM projects WHERE status = 'pending' ORDER BY name LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE projects SET status = 'processing', worker_id = ?, lease_expires = ?, "
+                "attempts = attempts + 1, last_processed = ? WHERE name = ?",
+                (worker_id, time.time() + lease_seconds, datetime.now().isoformat(), row["name"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        item = self._row_to_item(row)
+        item.status = "processing"
+        item.worker_id = worker_id
+        item.attempts += 1
+        self.logger.info(f"{worker_id} 領取專案: {item.name} (第 {item.attempts} 次)")
+        return item
+
+    def heartbeat(self, name: str, worker_id: str, lease_seconds: float = None) -> bool:
+        lease_seconds = lease_seconds or config.PROJECT_QUEUE_LEASE_SECONDS
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE projects SET lease_expires = ? "
+                "WHERE name = ? AND worker_id = ? AND status = 'processing'",
+                (time.time() + lease_seconds, name, worker_id)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def complete(self, name: str, worker_id: str, success: bool,
+                 error_message: str = None, processing_time: float = None) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE projects SET status = ?, error_message = ?, processing_time = ?, "
+                "lease_expires = NULL, last_processed = ? "
+                "WHERE name = ? AND worker_id = ? AND status = 'processing'",
+                ("completed" if success else "failed", None if success else error_message,
+                 processing_time, datetime.now().isoformat(), name, worker_id)
+            )
+            if cursor.rowcount != 1:
+                self.logger.warning(f"{worker_id} 回報 {name} 時租約已被收回，結果不寫入")
+                return False
+            return True
+        finally:
+            conn.close()
+
+    def release(self, name: str, worker_id: str) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE projects SET status = 'pending', worker_id = NULL, lease_expires = NULL "
+                "WHERE name = ? AND worker_id = ? AND status = 'processing'",
+                (name, worker_id)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def reclaim_expired(self) -> int:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            reclaimed = self._reclaim_expired(conn)
+            conn.execute("COMMIT")
+            return reclaimed
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _reclaim_expired(self, conn: sqlite3.Connection) -> int:
+        """收回到期租約（呼叫端需已開始交易）"""
+        now = time.time()
+        expired = conn.execute(
+            "SELECT name, worker_id, attempts FROM projects "
+            "WHERE status = 'processing' AND lease_expires < ?", (now,)
+        ).fetchall()
+        for row in expired:
+            if row["attempts"] >= self.max_attempts:
+                conn.execute(
+                    "UPDATE projects SET status = 'failed', worker_id = NULL, lease_expires = NULL, "
+                    "error_message = ? WHERE name = ?",
+                    (f"租約到期 {row['attempts']} 次（最後 worker: {row['worker_id']}）", row["name"])
+                )
+                self.logger.warning(f"專案 {row['name']} 租約到期次數過多，標記為失敗")
+            else:
+                conn.execute(
+                    "UPDATE projects SET status = 'pending', worker_id = NULL, lease_expires = NULL "
+                    "WHERE name = ?", (row["name"],)
+                )
+                self.logger.warning(f"收回 {row['worker_id']} 的到期租約: {row['name']}")
+        return len(expired)
+
+    def get_items(self) -> List[QueueItem]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT * FROM projects ORDER BY name").fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_item(row) for row in rows]
+
+    def set_options(self, options: Dict):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO options (key, value) VALUES ('run_options', ?)",
+                (json.dumps(options, ensure_ascii=False),)
+            )
+        finally:
+            conn.close()
+
+    def get_options(self) -> Dict:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM options WHERE key = 'run_options'").fetchone()
+        finally:
+            conn.close()
+        return json.loads(row["value"]) if row else {}
+
+    @staticmethod
+    def _row_to_item(row: sqlite3.Row) -> QueueItem:
+        return QueueItem(**{key: row[key] for key in row.keys()})
+
+
+class LeaseHeartbeat:
+    """
+    背景續約執行緒（context manager）
+    以租約的 1/3 為間隔續約；租約被收回時設定 lost，呼叫端可據此放棄結果
+    """
+
+    def __init__(self, queue: ProjectQueueBackend, name: str, worker_id: str,
+                 lease_seconds: float = None):
+        self.queue = queue
+        self.name = name
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds or config.PROJECT_QUEUE_LEASE_SECONDS
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{name}", daemon=True)
+
+    def __enter__(self) -> 'LeaseHeartbeat':
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(self.name, self.worker_id, self.lease_seconds):
+                    self.lost.set()
+                    return
+            except Exception:
+                # 暫時性錯誤（例如資料庫鎖定）下次再試，租約仍有餘裕
+                continue
+
+
+def create_project_queue(db_path: Path = None) -> ProjectQueueBackend:
+    """依設定建立專案佇列後端（目前支援 SQLite）"""
+    return SQLiteProjectQueue(db_path)
+
+
+def main():
+    """命令列：查看佇列狀態或收回到期租約"""
+    parser = argparse.ArgumentParser(description="專案工作佇列管理")
+    parser.add_argument("--db", type=Path, default=None, help="佇列資料庫路徑（預設為 config.PROJECT_QUEUE_DB）")
+    parser.add_argument("command", choices=["status", "reclaim"], help="status: 顯示狀態；reclaim: 收回到期租約")
+    args = parser.parse_args()
+
+    queue = create_project_queue(args.db)
+    if args.command == "reclaim":
+        print(f"收回 {queue.reclaim_expired()} 個到期租約")
+    for status, count in sorted(queue.counts().items()):
+        print(f"{status:<12}{count}")
+    for item in queue.get_items():
+        if item.status == "processing":
+            remaining = (item.lease_expires or 0) - time.time()
+            print(f"  {item.name}: {item.worker_id} (租約剩餘 {remaining:.0f} 秒)")
+
+
+if __name__ == "__main__":
+    main()
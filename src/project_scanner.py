@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 專案檔案掃描模組
+以單次 os.scandir 走訪分類專案內的程式檔案：
+- 預設略過版本控制、相依套件、虛擬環境與快取目錄，並遵守各層 .gitignore
+- 掃描結果（manifest）依目錄 mtime 快取，未變動的專案重新啟動時只需 stat 各目錄
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+except ImportError:
+    from config import config
+    from logger import get_logger
+
+
+# manifest 格式版本，規則改變時遞增以讓舊快取失效
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ProjectManifest:
+    """專案掃描結果"""
+    root: str
+    files: List[str] = field(default_factory=list)              # 支援的檔案（相對路徑，排序）
+    dirs: Dict[str, int] = field(default_factory=dict)           # 走訪過的目錄 -> mtime_ns
+    gitignores: Dict[str, int] = field(default_factory=dict)     # 套用的 .gitignore -> mtime_ns
+    extensions: List[str] = field(default_factory=list)
+    from_cache: bool = False
+
+    @property
+    def file_count(self) -> int:
+        return len(self.files)
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "root": self.root,
+            "extensions": self.extensions,
+            "files": self.files,
+            "dirs": self.dirs,
+            "gitignores": self.gitignores,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ProjectManifest':
+        return cls(root=data["root"], files=data["files"], dirs=data["dirs"],
+                   gitignores=data["gitignores"], extensions=data["extensions"], from_cache=True)
+
+
+class _GitIgnoreRule:
+    """單一 .gitignore 規則"""
+
+    def __init__(self, pattern: str):
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # 開頭或中間含有 / 的規則相對於 .gitignore 所在目錄，否則可匹配任何層級
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        prefix = "^" if anchored else "^(?:.*/)?"
+        self.regex = re.compile(prefix + self._translate(pattern) + "$")
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        """將 gitignore 萬用字元轉為正規表示式"""
+        result = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                result.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("**", i):
+                result.append(".*")
+                i += 2
+            elif pattern[i] == "*":
+                result.append("[^/]*")
+                i += 1
+            elif pattern[i] == "?":
+                result.append("[^/]")
+                i += 1
+            elif pattern[i] == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    result.append(re.escape(pattern[i]))
+                    i += 1
+                else:
+                    body = pattern[i + 1:end].replace("\\", "\\\\")
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    result.append(f"[{body}]")
+                    i = end + 1
+            elif pattern[i] == "\\" and i + 1 < len(pattern):
+                result.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                result.append(re.escape(pattern[i]))
+                i += 1
+        return "".join(result)
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        return bool(self.regex.match(rel_path))
+
+
+def parse_gitignore(text: str) -> List[_GitIgnoreRule]:
+    """
+    解析 .gitignore 內容
+
+    Args:
+        text: 檔案內容
+
+    Returns:
+        List[_GitIgnoreRule]: 規則列表（依檔案順序，後面的規則優先）
+    """
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        rules.append(_GitIgnoreRule(line))
+    return rules
+
+
+class ProjectScanner:
+    """單次走訪的專案檔案掃描器"""
+
+    def __init__(self, extensions: Iterable[str], ignore_dirs: Iterable[str] = None,
+                 use_gitignore: bool = None, cache_dir: Path = None):
+        """
+        初始化掃描器
+
+        Args:
+            extensions: 支援的副檔名（例如 ".py"）
+            ignore_dirs: 一律略過的目錄名稱，預設為 config.PROJECT_SCAN_IGNORE_DIRS
+            use_gitignore: 是否遵守 .gitignore，預設為 config.PROJECT_SCAN_USE_GITIGNORE
+            cache_dir: manifest 快取目錄，None 表示不快取
+        """
+        self.logger = get_logger("ProjectScanner")
+        self.extensions = frozenset(extensions)
+        self.ignore_dirs = frozenset(config.PROJECT_SCAN_IGNORE_DIRS if ignore_dirs is None else ignore_dirs)
+        self.use_gitignore = config.PROJECT_SCAN_USE_GITIGNORE if use_gitignore is None else use_gitignore
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def scan(self, project_path: Path) -> ProjectManifest:
+        """
+        取得專案的 manifest：快取仍有效時直接使用，否則重新走訪並更新快取
+
+        Args:
+            project_path: 專案路徑
+
+        Returns:
+            ProjectManifest: 掃描結果
+        """
+        project_path = Path(project_path)
+        cached = self._load_cached(project_path)
+        if cached is not None:
+            return cached
+
+        manifest = self.walk(project_path)
+        self._save_cached(project_path, manifest)
+        return manifest
+
+    def walk(self, project_path: Path) -> ProjectManifest:
+        """
+        單次走訪專案目錄（不使用快取）
+
+        Args:
+            project_path: 專案路徑
+
+        Returns:
+            ProjectManifest: 掃描結果
+        """
+        root = str(project_path)
+        manifest = ProjectManifest(root=root, extensions=sorted(self.extensions))
+        # 堆疊項目：(目錄絕對路徑, 相對路徑, 生效中的 .gitignore 規則 [(基準相對路徑, 規則)])
+        stack: List[Tuple[str, str, List[Tuple[str, List[_GitIgnoreRule]]]]] = [(root, "", [])]
+
+        while stack:
+            dir_path, rel_dir, ignore_stack = stack.pop()
+            try:
+                manifest.dirs[rel_dir] = os.stat(dir_path).st_mtime_ns
+                entries = list(os.scandir(dir_path))
+            except OSError as e:
+                self.logger.debug(f"無法讀取目錄 {dir_path}: {e}")
+                continue
+
+            if self.use_gitignore:
+                gitignore = os.path.join(dir_path, ".gitignore")
+                if any(entry.name == ".gitignore" for entry in entries):
+                    try:
+                        with open(gitignore, 'r', encoding='utf-8', errors='ignore') as f:
+                            rules = parse_gitignore(f.read())
+                        manifest.gitignores[_join(rel_dir, ".gitignore")] = os.stat(gitignore).st_mtime_ns
+                        if rules:
+                            ignore_stack = ignore_stack + [(rel_dir, rules)]
+                    except OSError:
+                        pass
+
+            for entry in entries:
+                rel_path = _join(rel_dir, entry.name)
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                if is_dir:
+                    if entry.name in self.ignore_dirs or self._is_virtualenv(entry.path):
+                        continue
+                    if ignore_stack and _is_ignored(ignore_stack, rel_path, True):
+                        continue
+                    stack.append((entry.path, rel_path, ignore_stack))
+                elif os.path.splitext(entry.name)[1] in self.extensions:
+                    if ignore_stack and _is_ignored(ignore_stack, rel_path, False):
+                        continue
+                    try:
+                        if entry.is_file():
+                            manifest.files.append(rel_path)
+                    except OSError:
+                        continue
+
+        manifest.files.sort()
+        return manifest
+
+    @staticmethod
+    def _is_virtualenv(dir_path: str) -> bool:
+        """名稱不在略過清單中的虛擬環境以 pyvenv.cfg 辨識"""
+        return os.path.exists(os.path.join(dir_path, "pyvenv.cfg"))
+
+    # ------------------------------------------------------------------
+    # manifest 快取
+    # ------------------------------------------------------------------
+    def manifest_path(self, project_path: Path) -> Optional[Path]:
+        """
+        專案 manifest 快取檔的路徑（作為 ProjectInfo 的 manifest 參照）
+
+        Args:
+            project_path: 專案路徑
+
+        Returns:
+            Optional[Path]: 快取檔路徑，未設定快取目錄時返回 None
+        """
+        if self.cache_dir is None:
+            return None
+        project_path = Path(project_path)
+        digest = hashlib.sha1(str(project_path.resolve()).encode("utf-8"), usedforsecurity=False).hexdigest()[:12]
+        return self.cache_dir / f"{project_path.name}-{digest}.json"
+
+    def _load_cached(self, project_path: Path) -> Optional[ProjectManifest]:
+        """載入快取並以目錄與 .gitignore 的 mtime 驗證（新增、刪除、改名檔案都會改變目錄 mtime）"""
+        cache_path = self.manifest_path(project_path)
+        if cache_path is None:
+            return None
+        manifest = read_manifest(cache_path)
+        if (manifest is None or manifest.root != str(project_path)
+                or set(manifest.extensions) != self.extensions):
+            return None
+        try:
+            for rel_path, mtime in list(manifest.dirs.items()) + list(manifest.gitignores.items()):
+                if os.stat(os.path.join(manifest.root, rel_path)).st_mtime_ns != mtime:
+                    return None
+            return manifest
+        except OSError:
+            return None
+
+    def _save_cached(self, project_path: Path, manifest: ProjectManifest):
+        cache_path = self.manifest_path(project_path)
+        if cache_path is None:
+            return
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # 暫存檔名包含行程與執行緒編號，同時掃描同一專案時不會互相覆寫
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.logger.debug(f"儲存專案 manifest 快取失敗: {e}")
+
+
+def read_manifest(manifest_path: Path) -> Optional[ProjectManifest]:
+    """
+    讀取 manifest 快取檔（不驗證是否過期）
+
+    Args:
+        manifest_path: 快取檔路徑
+
+    Returns:
+        Optional[ProjectManifest]: manifest，檔案不存在、格式錯誤或版本不符時返回 None
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return ProjectManifest.from_dict(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _is_ignored(ignore_stack: List[Tuple[str, List[_GitIgnoreRule]]], rel_path: str, is_dir: bool) -> bool:
+    """依序套用各層 .gitignore（較深層、較後面的規則優先）"""
+    ignored = False
+    for base, rules in ignore_stack:
+        sub_path = rel_path[len(base) + 1:] if base else rel_path
+        for rule in rules:
+            if rule.matches(sub_path, is_dir):
+                ignored = not rule.negate
+    return ignored
@@ -10,12 +10,16 @@
 - 全選/取消全選
 """
 
+import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from pathlib import Path
 from typing import Set, Tuple, List
 
 from src.logger import get_logger
+from src.project_manager import ProjectManager
 
 logger = get_logger("ProjectSelector")
 
@@ -114,6 +118,9 @@ class ProjectSelector:
         )
         self.stats_label.pack()
         
+        self.progress_label = ttk.Label(stats_frame, text="", foreground="gray")
+        self.progress_label.pack()
+        
         # 按鈕框架
         button_frame = ttk.Frame(self.root, padding="10")
         button_frame.pack(fill=tk.X)
@@ -170,14 +177,21 @@ class ProjectSelector:
                 self._cancel()
                 return
             
-            # 獲取所有專案目錄
-            for item in sorted(self.projects_dir.iterdir()):
-                if item.is_dir() and not item.name.startswith('.'):
-                    self.all_projects.append(item.name)
-                    self.listbox.insert(tk.END, f"  {item.name}")
+            # 獲取所有專案目錄（scandir 直接使用目錄項目的類型資訊，不需逐一 stat）
+            with os.scandir(self.projects_dir) as entries:
+                self.all_projects = sorted(
+                    entry.name for entry in entries
+                    if entry.is_dir() and not entry.name.startswith('.')
+                )
+            if self.all_projects:
+                self.listbox.insert(tk.END, *(f"  {name}" for name in self.all_projects))
             
             logger.info(f"載入了 {len(self.all_projects)} 個專案")
             
+            # 列表先顯示，檔案數量在背景分析完成後逐一補上
+            if self.all_projects:
+                self._start_background_analysis()
+            
             if not self.all_projects:
                 messagebox.showwarning(
                     "警告",
@@ -189,6 +203,57 @@ class ProjectSelector:
             messagebox.showerror("錯誤", f"載入專案列表失敗:\n{str(e)}")
             self._cancel()
     
+    def _start_background_analysis(self):
+        """
+        在背景執行緒分析所有專案（同時預熱 manifest 快取），進度經由佇列交給 Tk 主執行緒顯示
+        使用者選擇專案的同時完成分析，確認後主流程的 scan_projects 可直接使用快取
+        """
+        def progress(completed: int, total: int, name: str, project):
+            self._analysis_progress.put((completed, total, name, project))
+        
+        def analyze():
+            try:
+                ProjectManager(self.projects_dir).scan_projects(progress_callback=progress)
+            except Exception as e:
+                logger.warning(f"背景分析專案時出錯: {e}")
+            finally:
+                self._analysis_progress.put(None)
+        
+        self._analysis_progress = queue.Queue()
+        self._row_index = {name: index for index, name in enumerate(self.all_projects)}
+        threading.Thread(target=analyze, name="project-selector-analysis", daemon=True).start()
+        self.root.after(100, self._poll_analysis)
+    
+    def _poll_analysis(self):
+        """由 Tk 主執行緒定期取出分析進度，更新專案列的檔案數量與進度文字"""
+        try:
+            finished = False
+            while True:
+                try:
+                    item = self._analysis_progress.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    finished = True
+                    self.progress_label.config(text="")
+                    break
+                completed, total, name, project = item
+                index = self._row_index.get(name)
+                if index is not None:
+                    label = (f"  {name}  ({project.file_count} 個檔案)" if project
+                             else f"  {name}  (沒有支援的程式檔案)")
+                    selected = self.listbox.selection_includes(index)
+                    self.listbox.delete(index)
+                    self.listbox.insert(index, label)
+                    if selected:
+                        self.listbox.selection_set(index)
+                self.progress_label.config(text=f"分析專案中... {completed}/{total}")
+            if not finished:
+                self.root.after(100, self._poll_analysis)
+        except tk.TclError:
+            # 視窗已關閉
+            pass
+    
     def _on_selection_changed(self, event=None):
         """處理選擇變化"""
         try:
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 回應擷取通道模組
+讀取由 VS Code 匯出掛鉤（companion extension / chat export hook）寫入的 Copilot 回應檔案，
+取代 Ctrl+↑ → Shift+F10 → 複製 的剪貼簿流程
+
+檔案協定（詳見 docs/RESPONSE_CAPTURE_CHANNEL.md）：
+- 每個完成的回應寫成匯出目錄下的一個 *.json 檔案
+- 內容為 {"text": "<回應全文>", "completed_at": <epoch 秒數>}
+- 寫入端須先寫暫存檔再 rename，讀取端只處理 .json 檔案
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Set
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+except ImportError:
+    from config import config
+    from logger import get_logger
+
+
+class ResponseExportReader:
+    """匯出檔案回應讀取器"""
+
+    def __init__(self, export_dir: Path = None, poll_interval: float = None):
+        """
+        初始化回應讀取器
+
+        Args:
+            export_dir: 匯出目錄，預設為 config.RESPONSE_EXPORT_DIR
+            poll_interval: 輪詢間隔（秒），預設為 config.RESPONSE_CAPTURE_POLL_INTERVAL
+        """
+        self.logger = get_logger("ResponseExportReader")
+        self.export_dir = Path(export_dir or config.RESPONSE_EXPORT_DIR)
+        self.poll_interval = poll_interval if poll_interval is not None else config.RESPONSE_CAPTURE_POLL_INTERVAL
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        self._sent_at = 0.0
+        self._consumed: Set[str] = set()
+        self.logger.info(f"回應擷取通道初始化完成，匯出目錄: {self.export_dir}")
+
+    def mark_request_sent(self) -> float:
+        """
+        記錄提示詞送出的時間點，之後只接受晚於此時間完成的回應
+
+        Returns:
+            float: 記錄的時間戳記
+        """
+        self._sent_at = time.time()
+        return self._sent_at
+
+    def wait_for_response(self, timeout: float = None, since: float = None) -> Optional[str]:
+        """
+        等待匯出目錄出現新的回應檔案並讀取
+
+        Args:
+            timeout: 最長等待時間（秒），預設為 config.RESPONSE_CAPTURE_TIMEOUT
+            since: 只接受此時間之後完成的回應，預設為最後一次 mark_request_sent 的時間
+
+        Returns:
+            Optional[str]: 回應內容，逾時則返回 None
+        """
+        if timeout is None:
+            timeout = config.RESPONSE_CAPTURE_TIMEOUT
+        if since is None:
+            since = self._sent_at
+
+        deadline = time.monotonic() + timeout
+        while True:
+            response = self.read_latest_response(since)
+            if response is not None:
+                return response
+            if time.monotonic() >= deadline:
+                self.logger.debug(f"等待匯出回應逾時 ({timeout}秒)")
+                return None
+            time.sleep(self.poll_interval)
+
+    def read_latest_response(self, since: float = 0.0) -> Optional[str]:
+        """
+        讀取最新一筆尚未使用過的匯出回應（不等待）
+        最新的檔案為空或損毀時標記為已使用，改讀次新的檔案
+
+        Args:
+            since: 只接受此時間之後完成的回應
+
+        Returns:
+            Optional[str]: 回應內容，沒有新回應則返回 None
+        """
+        candidates = []
+        try:
+            with os.scandir(self.export_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json") or entry.name in self._consumed:
+                        continue
+                    if not entry.is_file():
+                        continue
+                    mtime = entry.stat().st_mtime
+                    if mtime >= since:
+                        candidates.append((mtime, Path(entry.path)))
+        except FileNotFoundError:
+            return None
+
+        for _, path in sorted(candidates, reverse=True):
+            self._consumed.add(path.name)
+            text = self._read_export_text(path, since)
+            if text is not None:
+                self.logger.debug(f"讀取匯出回應: {path.name} ({len(text)} 字元)")
+                return text
+        return None
+
+    def _read_export_text(self, path: Path, since: float) -> Optional[str]:
+        """讀取匯出檔案的回應內容，格式錯誤、過期或內容為空時返回 None"""
+        payload = self._read_export(path)
+        if payload is None:
+            return None
+
+        completed_at = payload.get("completed_at")
+        if isinstance(completed_at, (int, float)) and completed_at < since:
+            self.logger.debug(f"忽略過期的匯出回應: {path.name}")
+            return None
+
+        text = payload.get("text")
+        if not text or not text.strip():
+            self.logger.warning(f"匯出回應內容為空: {path.name}")
+            return None
+        return text
+
+    def _read_export(self, path: Path) -> Optional[dict]:
+        """讀取並解析單一匯出檔案"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if not isinstance(payload, dict):
+                self.logger.warning(f"匯出檔案格式錯誤（非物件）: {path.name}")
+                return None
+            return payload
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"讀取匯出檔案失敗: {path.name} - {e}")
+            return None
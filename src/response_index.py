@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 回應索引模組
+每個專案在結果資料夾維護一份 JSON lines 索引（輪數、行號、檔案、回應內容的位元組位置），
+讀取先前的回應時只需一次 seek + read，不必 glob 全部檔案再比對 mtime
+"""
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from src.logger import get_logger
+except ImportError:
+    from logger import get_logger
+
+
+INDEX_FILENAME = "response_index.jsonl"
+RESPONSE_MARKER = "## Copilot 回應\n\n"  # 回應檔案中回應內容前的標題
+
+
+@dataclass
+class ResponseEntry:
+    """索引中的一筆回應"""
+    round: int
+    line: Optional[int]   # 全域提示詞模式（按輪記錄）為 None
+    file: str             # 相對於專案結果資料夾的路徑
+    offset: int           # 回應內容在檔案中的位元組位置
+    length: int           # 回應內容的位元組長度
+    saved_at: float
+
+
+class ResponseIndex:
+    """單一專案的回應索引"""
+
+    def __init__(self, project_dir: Path):
+        """
+        載入專案的回應索引
+
+        Args:
+            project_dir: 專案結果資料夾（ExecutionResult/Success/<專案>）
+        """
+        self.logger = get_logger("ResponseIndex")
+        self.project_dir = Path(project_dir)
+        self.index_file = self.project_dir / INDEX_FILENAME
+        self._entries: List[ResponseEntry] = []
+        self._latest: Dict[Tuple[int, Optional[int]], ResponseEntry] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.index_file.exists():
+            return
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    self._add(ResponseEntry(**json.loads(line)))
+                except (ValueError, TypeError):
+                    # 最後一行可能在寫入途中中斷
+                    continue
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, entry: ResponseEntry):
+        self._entries.append(entry)
+        self._latest[(entry.round, entry.line)] = entry
+
+    def add(self, round_number: int, line_number: Optional[int], response_file: Path,
+            offset: int, length: int) -> ResponseEntry:
+        """
+        加入一筆回應並附加到索引檔
+
+        Args:
+            round_number: 輪數
+            line_number: 行號（按輪記錄時為 None）
+            response_file: 回應檔案路徑
+            offset: 回應內容的位元組位置
+            length: 回應內容的位元組長度
+
+        Returns:
+            ResponseEntry: 新增的索引項目
+        """
+        entry = ResponseEntry(
+            round=round_number,
+            line=line_number,
+            file=Path(response_file).relative_to(self.project_dir).as_posix(),
+            offset=offset,
+            length=length,
+            saved_at=time.time()
+        )
+        with self._lock:
+            self.project_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+            self._add(entry)
+        return entry
+
+    def latest(self, round_number: int = None, line_number: int = None) -> Optional[ResponseEntry]:
+        """
+        取得最新的回應項目
+
+        Args:
+            round_number: 指定輪數，None 表示不限
+            line_number: 指定行號（需同時指定輪數），None 表示該輪最後儲存的回應
+
+        Returns:
+            Optional[ResponseEntry]: 索引項目，找不到時返回 None
+        """
+        with self._lock:
+            if round_number is not None and line_number is not None:
+                return self._latest.get((round_number, line_number))
+            for entry in reversed(self._entries):
+                if round_number is None or entry.round == round_number:
+                    return entry
+        return None
+
+    def path_of(self, entry: ResponseEntry) -> Path:
+        return self.project_dir / entry.file
+
+    def read(self, entry: ResponseEntry) -> Optional[str]:
+        """
+        以一次 seek + read 讀取回應內容
+
+        Args:
+            entry: 索引項目
+
+        Returns:
+            Optional[str]: 回應內容，檔案遺失或已被修改時返回 None
+        """
+        try:
+            with open(self.path_of(entry), 'rb') as f:
+                f.seek(entry.offset)
+                data = f.read(entry.length)
+            if len(data) != entry.length:
+                return None
+            return data.decode('utf-8')
+        except (OSError, UnicodeDecodeError):
+            return None
+
+
+def find_latest_response_file(project_dir: Path, round_number: int = None) -> Optional[Path]:
+    """
+    無索引時的備援：在結果資料夾中找最新的回應檔案（支援「第N輪/」子資料夾與舊的平面格式）
+
+    Args:
+        project_dir: 專案結果資料夾
+        round_number: 指定輪數，None 表示不限
+
+    Returns:
+        Optional[Path]: 最新的回應檔案
+    """
+    project_dir = Path(project_dir)
+    if not project_dir.exists():
+        return None
+    if round_number is None:
+        candidates = list(project_dir.glob("第*輪/*.md")) + list(project_dir.glob("*_第*輪.md"))
+    else:
+        candidates = (list(project_dir.glob(f"第{round_number}輪/*.md"))
+                      + list(project_dir.glob(f"*_第{round_number}輪.md")))
+    if not candidates:
+        return None
+    return max(candidates, key=lambda path: path.stat().st_mtime)
+
+
+def extract_response(content: str) -> Optional[str]:
+    """從回應檔案內容中取出回應部分（相容沒有回應標題的舊格式檔案）"""
+    if RESPONSE_MARKER in content:
+        return content.split(RESPONSE_MARKER, 1)[1]
+    separator = "=" * 50 + "\n\n"
+    if separator in content:
+        return content.split(separator, 1)[1]
+    return None
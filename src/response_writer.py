@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 回應檔案寫入模組
+- 已建立的資料夾會快取，同一輪不必重複 mkdir
+- 先寫暫存檔再 os.replace，讀取端不會看到寫到一半的檔案
+- fsync 策略：always（每個檔案）、round（輪次結束 flush 時）、never
+- 可選擇交給背景執行緒寫入，於輪次結束時 flush
+"""
+
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+except ImportError:
+    from config import config
+    from logger import get_logger
+
+
+FSYNC_POLICIES = ("always", "round", "never")
+
+
+class ResponseWriter:
+    """回應檔案寫入器"""
+
+    def __init__(self, fsync_policy: str = None, background: bool = None):
+        """
+        初始化寫入器
+
+        Args:
+            fsync_policy: always / round / never，預設為 config.RESPONSE_WRITE_FSYNC
+            background: 是否在背景執行緒寫入，預設為 config.RESPONSE_WRITE_BACKGROUND
+        """
+        self.logger = get_logger("ResponseWriter")
+        self.fsync_policy = config.RESPONSE_WRITE_FSYNC if fsync_policy is None else fsync_policy
+        if self.fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"未知的 fsync 策略: {self.fsync_policy}")
+        self.background = config.RESPONSE_WRITE_BACKGROUND if background is None else background
+
+        self._created_dirs: Set[Path] = set()
+        self._unsynced: List[Path] = []      # round 策略下等待 flush 時 fsync 的檔案
+        self._errors: List[str] = []         # 背景寫入的錯誤，flush 時回報
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def ensure_dir(self, directory: Path):
+        """建立資料夾（已建立過的直接略過）"""
+        directory = Path(directory)
+        if directory in self._created_dirs:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._created_dirs.add(directory)
+            self._created_dirs.update(directory.parents)
+
+    def write(self, path: Path, data: bytes, on_written: Callable[[Path], None] = None) -> bool:
+        """
+        寫入檔案（背景模式下排入佇列後立即返回）
+
+        Args:
+            path: 目標檔案
+            data: 檔案內容
+            on_written: 檔案就位後呼叫（背景模式下在寫入執行緒中呼叫）
+
+        Returns:
+            bool: 同步模式為是否寫入成功；背景模式為是否已排入佇列
+        """
+        path = Path(path)
+        self.ensure_dir(path.parent)
+        if not self.background:
+            return self._write_now(path, data, on_written)
+
+        self._start_worker()
+        self._queue.put((path, data, on_written))
+        return True
+
+    def flush(self) -> bool:
+        """
+        等待背景寫入完成，並依 round 策略 fsync 尚未同步的檔案（輪次結束時呼叫）
+
+        Returns:
+            bool: 自上次 flush 以來是否全部寫入成功
+        """
+        if self._queue is not None:
+            self._queue.join()
+
+        with self._lock:
+            unsynced, self._unsynced = self._unsynced, []
+            errors, self._errors = self._errors, []
+
+        for path in unsynced:
+            _fsync_path(path)
+        for directory in {path.parent for path in unsynced}:
+            _fsync_path(directory)
+
+        for error in errors:
+            self.logger.error(f"背景寫入回應失敗: {error}")
+        return not errors
+
+    def forget_dirs(self):
+        """資料夾可能被外部刪除（例如清理執行記錄）時清除快取"""
+        with self._lock:
+            self._created_dirs.clear()
+
+    def close(self):
+        """flush 並停止背景執行緒"""
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._queue = None
+
+    # ------------------------------------------------------------------
+    # 內部
+    # ------------------------------------------------------------------
+    def _write_now(self, path: Path, data: bytes, on_written: Callable[[Path], None] = None) -> bool:
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            try:
+                self._write_tmp(tmp_path, data)
+            except FileNotFoundError:
+                # 快取中的資料夾已被外部刪除，重新建立後再試一次
+                self.forget_dirs()
+                self.ensure_dir(path.parent)
+                self._write_tmp(tmp_path, data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            if self.background:
+                with self._lock:
+                    self._errors.append(f"{path.name}: {e}")
+            else:
+                self.logger.error(f"寫入 {path} 失敗: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+        if self.fsync_policy == "always":
+            _fsync_path(path.parent)
+        elif self.fsync_policy == "round":
+            with self._lock:
+                self._unsynced.append(path)
+
+        if on_written is not None:
+            try:
+                on_written(path)
+            except Exception as e:
+                self.logger.error(f"回應寫入後的處理失敗: {e}")
+        return True
+
+    def _write_tmp(self, tmp_path: Path, data: bytes):
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            if self.fsync_policy == "always":
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _start_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._worker, name="ResponseWriter", daemon=True)
+            self._thread.start()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write_now(*item)
+            finally:
+                self._queue.task_done()
+
+
+def _fsync_path(path: Path):
+    """fsync 檔案或資料夾（不支援的平台略過）"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
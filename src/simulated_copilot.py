@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 模擬 VS Code / Copilot Chat 的 UI 驅動
+以虛擬時鐘模擬 Copilot Chat 對鍵盤操作的反應，不需要顯示器或網路：
+- 回應延遲（依回應長度與隨機抖動），生成期間 stop 按鈕可見，完成後 send 按鈕可見
+- 速率限制（命中後一段時間內的請求都回覆速率限制訊息）
+- 截斷的回應（缺少「已完成回答」），以及回應尚未完成就複製時只取得已生成的部分
+- 通知遮擋（send / stop 按鈕都看不到，需以命令面板清除通知）
+並統計固定等待（sleep）中實際在等 Copilot 與純粹浪費的時間，供基準測試比較流程的額外負擔
+"""
+
+import random
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import sys
+
+# 導入配置
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.ui_driver import Region, UIDriver
+except ImportError:
+    from config import config
+    from ui_driver import Region, UIDriver
+
+
+RATE_LIMIT_MESSAGE = "Sorry, you have been rate-limited. Please wait a moment before trying again."
+CLEAR_NOTIFICATIONS_COMMAND = "Notifications: Clear All Notifications"
+
+
+@dataclass
+class SimulationProfile:
+    """模擬參數"""
+    response_latency: float = 20.0       # 回應生成的平均秒數
+    latency_jitter: float = 0.3          # 延遲的隨機變動比例（±）
+    response_chars: int = 1500           # 回應的平均字元數
+    rate_limit_rate: float = 0.0         # 每次送出觸發速率限制的機率
+    rate_limit_window: float = 120.0     # 觸發後持續回覆速率限制訊息的秒數
+    truncated_rate: float = 0.0          # 回應被截斷（缺少完成標記）的機率
+    notification_rate: float = 0.0       # 生成期間出現通知遮擋的機率
+    ui_latency: float = 0.05             # 按鍵後畫面更新所需的秒數
+    seed: int = 0
+
+
+@dataclass
+class SimulationStats:
+    """模擬統計"""
+    submits: int = 0                     # 送出的提示詞數
+    completed: int = 0                   # 回應生成完成後才複製的次數
+    rate_limited: int = 0
+    truncated: int = 0
+    notifications_shown: int = 0
+    notifications_cleared: int = 0
+    copies: int = 0
+    premature_copies: int = 0            # 回應尚未生成完就複製
+    keystrokes: int = 0
+    sleep_calls: int = 0
+    sleep_seconds: float = 0.0           # 所有 sleep 的虛擬秒數
+    waiting_seconds: float = 0.0         # sleep 中 Copilot 正在生成的部分（必要的等待）
+    generating_seconds: float = 0.0      # Copilot 生成回應的總秒數
+
+    @property
+    def overhead_seconds(self) -> float:
+        """sleep 中 Copilot 並未生成的部分（固定等待的額外負擔）"""
+        return self.sleep_seconds - self.waiting_seconds
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["overhead_seconds"] = self.overhead_seconds
+        return data
+
+
+class VirtualClock:
+    """虛擬時鐘：sleep 只推進時間，不實際等待"""
+
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.epoch = start
+        self.now = 0.0
+
+    def advance(self, seconds: float):
+        if seconds > 0:
+            self.now += seconds
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.epoch + self.now
+
+
+@dataclass
+class _Response:
+    text: str
+    start: float
+    done: float
+    kind: str                            # complete / truncated / rate_limited
+    notification_at: Optional[float] = None
+
+
+def default_responder(prompt: str, chars: int, rng: random.Random) -> str:
+    """依提示詞中的函式名稱產生回應（程式碼區塊 + 完成標記）"""
+    names = re.findall(r"([A-Za-z_][A-Za-z0-9_]*)\(\)", prompt) or ["handler"]
+    body: List[str] = ["以下是修改後的實作：", "", "```python"]
+    while sum(len(line) + 1 for line in body) < chars:
+        name = rng.choice(names)
+        body.extend([f"def {name}(value):", "    result = str(value).strip()", "    return result", ""])
+    body.extend(["```", "", "已完成回答"])
+    return "\n".join(body)
+
+
+class SimulatedCopilotDriver(UIDriver):
+    """模擬 VS Code / Copilot Chat 的 UI 驅動"""
+
+    name = "simulated"
+
+    def __init__(self, profile: SimulationProfile = None,
+                 responder: Callable[[str, int, random.Random], str] = None):
+        """
+        初始化模擬驅動
+
+        Args:
+            profile: 模擬參數
+            responder: 產生回應內容的函數 (提示詞, 字元數, 亂數產生器) -> 回應，預設為 default_responder
+        """
+        self.profile = profile or SimulationProfile()
+        self.responder = responder or default_responder
+        self.rng = random.Random(self.profile.seed)
+        self.clock = VirtualClock()
+        self.stats = SimulationStats()
+
+        self.clipboard = ""
+        self.focus = "editor"            # editor / input / response / menu / palette
+        self.input_text = ""
+        self.selected = False
+        self.menu_index = 0
+        self.palette_text = ""
+        self.responses: List[_Response] = []
+        self.prompts: List[str] = []
+        self.notification_visible = False
+        self._rate_limited_until = -1.0
+        self._screen_version = 0
+        self._screen_visible_at = 0.0
+        self._screen_shown = 0
+
+        self._images = {
+            Path(config.STOP_BUTTON_IMAGE).name: "stop",
+            Path(config.SEND_BUTTON_IMAGE).name: "send",
+        }
+
+    # ------------------------------------------------------------------
+    # 時間
+    # ------------------------------------------------------------------
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        start = self.clock.now
+        current = self._current_response()
+        self.clock.advance(seconds)
+        self.stats.sleep_calls += 1
+        self.stats.sleep_seconds += seconds
+        if current is not None:
+            self.stats.waiting_seconds += min(self.clock.now, current.done) - start
+
+    def monotonic(self) -> float:
+        return self.clock.monotonic()
+
+    def time(self) -> float:
+        return self.clock.time()
+
+    # ------------------------------------------------------------------
+    # 鍵盤
+    # ------------------------------------------------------------------
+    def hotkey(self, *keys: str):
+        self.stats.keystrokes += 1
+        combo = tuple(key.lower() for key in keys)
+        if combo == ("ctrl", "f1"):
+            self.focus = "input"
+            self.selected = False
+        elif combo == ("ctrl", "a"):
+            if self.focus == "input":
+                self.selected = True
+        elif combo == ("ctrl", "v"):
+            self._paste_clipboard()
+        elif combo == ("ctrl", "up"):
+            if self.responses:
+                self.focus = "response"
+        elif combo == ("shift", "f10"):
+            if self.focus == "response":
+                self.focus = "menu"
+                self.menu_index = 0
+        elif combo == ("ctrl", "shift", "p"):
+            self.focus = "palette"
+            self.palette_text = ""
+        else:
+            return
+        self._screen_changed()
+
+    def press(self, key: str):
+        self.stats.keystrokes += 1
+        key = key.lower()
+        if key == "enter":
+            self._press_enter()
+        elif key == "down" and self.focus == "menu":
+            self.menu_index += 1
+        elif key == "delete" and self.focus == "input" and self.selected:
+            self.input_text = ""
+            self.selected = False
+        elif key == "escape" and self.focus in ("menu", "palette"):
+            self.focus = "input"
+        else:
+            return
+        self._screen_changed()
+
+    def click(self, x: int, y: int):
+        self.stats.keystrokes += 1
+
+    # ------------------------------------------------------------------
+    # 剪貼簿
+    # ------------------------------------------------------------------
+    def copy(self, text: str):
+        self.clipboard = text
+
+    def paste(self) -> str:
+        return self.clipboard
+
+    # ------------------------------------------------------------------
+    # 畫面
+    # ------------------------------------------------------------------
+    def locate_on_screen(self, image_path: str, confidence: float = None,
+                         region: Region = None) -> Optional[Region]:
+        button = self._images.get(Path(image_path).name)
+        if button is None or self._notification_showing():
+            return None
+        generating = self._current_response() is not None
+        if (button == "stop") == generating:
+            return (1200, 900, 24, 24)
+        return None
+
+    def screen_signature(self, region: Region = None) -> bytes:
+        if self.clock.now >= self._screen_visible_at:
+            self._screen_shown = self._screen_version
+        current = self._current_response()
+        streamed = self._streamed_chars(current) if current else 0
+        return f"{self._screen_shown}:{streamed}:{int(self._notification_showing())}".encode()
+
+    # ------------------------------------------------------------------
+    # 模擬
+    # ------------------------------------------------------------------
+    def _screen_changed(self):
+        self._screen_version += 1
+        self._screen_visible_at = self.clock.now + self.profile.ui_latency
+
+    def _paste_clipboard(self):
+        if self.focus == "input":
+            self.input_text = self.clipboard if self.selected else self.input_text + self.clipboard
+            self.selected = False
+        elif self.focus == "palette":
+            self.palette_text += self.clipboard
+
+    def _press_enter(self):
+        if self.focus == "input":
+            if self.input_text and self._current_response() is None:
+                self._submit(self.input_text)
+                self.input_text = ""
+        elif self.focus == "menu":
+            if self.menu_index == 1:
+                self._copy_response()
+            self.focus = "response"
+        elif self.focus == "palette":
+            if self.palette_text.strip() == CLEAR_NOTIFICATIONS_COMMAND and self.notification_visible:
+                self.notification_visible = False
+                self.stats.notifications_cleared += 1
+            self.focus = "input"
+
+    def _submit(self, prompt: str):
+        profile = self.profile
+        now = self.clock.now
+        self.stats.submits += 1
+        self.prompts.append(prompt)
+
+        if now < self._rate_limited_until or self.rng.random() < profile.rate_limit_rate:
+            if now >= self._rate_limited_until:
+                self._rate_limited_until = now + profile.rate_limit_window
+            self.stats.rate_limited += 1
+            response = _Response(RATE_LIMIT_MESSAGE, now, now + 2.0, "rate_limited")
+        else:
+            chars = max(1, int(profile.response_chars * self._jitter()))
+            text = self.responder(prompt, chars, self.rng)
+            latency = profile.response_latency * self._jitter()
+            kind = "complete"
+            if self.rng.random() < profile.truncated_rate:
+                text = text[:max(1, len(text) * 2 // 3)]
+                kind = "truncated"
+                self.stats.truncated += 1
+            response = _Response(text, now, now + latency, kind)
+            self.stats.generating_seconds += latency
+
+        if self.rng.random() < profile.notification_rate:
+            response.notification_at = self.rng.uniform(response.start, response.done)
+            self.stats.notifications_shown += 1
+        self.responses.append(response)
+
+    def _copy_response(self):
+        self.stats.copies += 1
+        response = self.responses[-1]
+        if self.clock.now < response.done:
+            self.stats.premature_copies += 1
+        else:
+            self.stats.completed += 1
+        streamed = self._streamed_chars(response)
+        self.clipboard = response.text[:streamed]
+
+    def _current_response(self) -> Optional[_Response]:
+        if self.responses and self.clock.now < self.responses[-1].done:
+            return self.responses[-1]
+        return None
+
+    def _streamed_chars(self, response: _Response) -> int:
+        if self.clock.now >= response.done:
+            return len(response.text)
+        progress = (self.clock.now - response.start) / max(response.done - response.start, 1e-9)
+        return int(len(response.text) * max(0.0, progress))
+
+    def _notification_showing(self) -> bool:
+        if not self.notification_visible and self.responses:
+            last = self.responses[-1]
+            if last.notification_at is not None and self.clock.now >= last.notification_at:
+                last.notification_at = None
+                self.notification_visible = True
+        return self.notification_visible
+
+    def _jitter(self) -> float:
+        jitter = self.profile.latency_jitter
+        return 1 + self.rng.uniform(-jitter, jitter)
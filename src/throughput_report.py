@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 吞吐量報告
+依階段事件把執行時間拆成 Copilot 生成、UI 操作與固定等待、速率限制退避、CWE 掃描、VS Code 開啟/關閉與其他，
+計算每小時處理行數與佇列剩餘時間，執行期間定期更新 throughput.json 與 throughput.html
+
+使用方式（由事件檔離線產生，例如平行模式各 worker 的事件檔）：
+    python -m src.throughput_report                        # 統計 logs/ 下所有事件檔
+    python -m src.throughput_report logs/events_x.jsonl --planned-lines 1200
+"""
+
+import argparse
+import html
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.event_stats import read_events
+except ImportError:
+    from config import config
+    from event_stats import read_events
+
+
+# 階段 -> 時間分類
+PHASE_CATEGORIES = {
+    "wait": "copilot",
+    "send": "ui",
+    "copy": "ui",
+    "backoff": "backoff",
+    "scan": "scan",
+    "open-vscode": "vscode",
+    "close-vscode": "vscode",
+    "clear-memory": "vscode",
+}
+
+CATEGORY_LABELS = {
+    "copilot": "Copilot 生成",
+    "ui": "UI 操作與固定等待",
+    "backoff": "速率限制退避",
+    "scan": "CWE 掃描",
+    "vscode": "VS Code 開啟/關閉",
+    "other": "其他（儲存、專案間停頓等）",
+}
+
+
+class ThroughputTracker:
+    """依階段事件累計各分類時間與處理行數"""
+
+    def __init__(self, planned_lines: int = 0, output_dir: Path = None,
+                 refresh_interval: float = None, clock: Callable[[], float] = time.monotonic,
+                 auto_write: bool = True):
+        """
+        初始化吞吐量統計
+
+        Args:
+            planned_lines: 本次執行預計處理的行數（所有專案 × 輪數）
+            output_dir: 報告目錄，預設為 config.THROUGHPUT_REPORT_DIR
+            refresh_interval: 最短更新間隔（秒），預設為 config.THROUGHPUT_REPORT_INTERVAL
+            clock: 時鐘（與事件的 start / end 相同，預設為 time.monotonic）
+            auto_write: 累計事件時是否依更新間隔寫出報告
+        """
+        self.planned_lines = planned_lines
+        self.output_dir = Path(output_dir) if output_dir else config.THROUGHPUT_REPORT_DIR
+        self.refresh_interval = (config.THROUGHPUT_REPORT_INTERVAL
+                                 if refresh_interval is None else refresh_interval)
+        self.clock = clock
+        self.auto_write = auto_write
+        self.started_at = clock()
+        self.started_wall = datetime.now()
+        self.category_seconds: Dict[str, float] = {category: 0.0 for category in CATEGORY_LABELS}
+        self.lines = 0
+        self.failed_lines = 0
+        self.retries = 0
+        self.projects = 0
+        self._spans: Dict[int, List[float]] = {}  # pid -> [最早開始, 最晚結束]
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._last_write: Optional[float] = None
+
+    def record(self, event: Dict):
+        """
+        累計一筆階段事件（可作為 logger.add_event_listener 的監聽者），到達更新間隔時寫出報告
+
+        Args:
+            event: 階段事件
+        """
+        phase = event.get("phase")
+        duration = float(event.get("duration") or 0.0)
+        with self._lock:
+            category = PHASE_CATEGORIES.get(phase)
+            if category is not None:
+                self.category_seconds[category] += duration
+            elif phase == "line":
+                # 全域提示詞模式一次送出多行，事件以 lines 欄位記錄代表的行數
+                count = int(event.get("lines") or 1)
+                if event.get("outcome") == "ok":
+                    self.lines += count
+                else:
+                    self.failed_lines += count
+                self.retries += int(event.get("retries") or 0)
+            elif phase == "project":
+                self.projects += 1
+
+            if "start" in event and "end" in event:
+                span = self._spans.setdefault(event.get("pid", 0), [event["start"], event["end"]])
+                span[0] = min(span[0], event["start"])
+                span[1] = max(span[1], event["end"])
+
+            now = self.clock()
+            due = self.auto_write and (self._last_write is None
+                                       or now - self._last_write >= self.refresh_interval)
+            if due:
+                self._last_write = now
+        if due:
+            self.write()
+
+    def snapshot(self, live: bool = True) -> Dict:
+        """
+        目前的吞吐量統計
+
+        Args:
+            live: True 時以時鐘計算經過時間；False 時以事件涵蓋的時間計算（離線統計事件檔）
+
+        Returns:
+            Dict: 行數、每小時行數、預估剩餘時間與各分類時間
+        """
+        with self._lock:
+            if live or not self._spans:
+                elapsed = max(0.0, self.clock() - self.started_at)
+                worker_seconds = elapsed
+                workers = 1
+            else:
+                elapsed = (max(end for _, end in self._spans.values())
+                           - min(start for start, _ in self._spans.values()))
+                worker_seconds = sum(end - start for start, end in self._spans.values())
+                workers = len(self._spans)
+            categories = dict(self.category_seconds)
+            lines, failed, retries, projects = self.lines, self.failed_lines, self.retries, self.projects
+
+        categories["other"] = max(0.0, worker_seconds - sum(categories.values()))
+        lines_per_hour = lines * 3600 / elapsed if elapsed > 0 else 0.0
+        remaining_lines = max(0, self.planned_lines - lines - failed) if self.planned_lines else None
+        eta_seconds = None
+        if remaining_lines is not None and lines_per_hour > 0:
+            eta_seconds = remaining_lines / lines_per_hour * 3600
+
+        return {
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "started": self.started_wall.isoformat(timespec="seconds") if live else None,
+            "elapsed_seconds": round(elapsed, 1),
+            "workers": workers,
+            "projects": projects,
+            "lines": lines,
+            "failed_lines": failed,
+            "retries": retries,
+            "planned_lines": self.planned_lines or None,
+            "remaining_lines": remaining_lines,
+            "lines_per_hour": round(lines_per_hour, 2),
+            "eta_seconds": round(eta_seconds) if eta_seconds is not None else None,
+            "eta": ((datetime.now() + timedelta(seconds=eta_seconds)).isoformat(timespec="minutes")
+                    if eta_seconds is not None else None),
+            "breakdown": {
+                category: {
+                    "label": CATEGORY_LABELS[category],
+                    "seconds": round(seconds, 1),
+                    "percent": round(seconds * 100 / worker_seconds, 1) if worker_seconds > 0 else 0.0,
+                    "per_line": round(seconds / lines, 2) if lines else None,
+                }
+                for category, seconds in categories.items()
+            },
+        }
+
+    def write(self, live: bool = True) -> Optional[Path]:
+        """
+        寫出 throughput.json 與 throughput.html（先寫暫存檔再取代，瀏覽器不會讀到寫到一半的檔案）
+
+        Args:
+            live: 同 snapshot()
+
+        Returns:
+            Optional[Path]: JSON 報告路徑，寫入失敗時返回 None
+        """
+        report = self.snapshot(live)
+        try:
+            with self._write_lock:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                json_path = self.output_dir / "throughput.json"
+                _atomic_write(json_path, json.dumps(report, ensure_ascii=False, indent=2))
+                _atomic_write(self.output_dir / "throughput.html", render_html(report, self.refresh_interval))
+            return json_path
+        except OSError:
+            return None  # 報告只用於觀察進度，寫入失敗不影響自動化流程
+
+
+def _atomic_write(path: Path, text: str):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """秒數轉為 1d 02:03:04 格式"""
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    text = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{days}d {text}" if days else text
+
+
+def render_html(report: Dict, refresh_interval: float = 30) -> str:
+    """
+    產生自動重新整理的 HTML 報告
+
+    Args:
+        report: snapshot() 的結果
+        refresh_interval: 瀏覽器重新整理間隔（秒）
+
+    Returns:
+        str: HTML
+    """
+    rows = [_breakdown_row(item) for item in report["breakdown"].values()]
+    summary = [
+        ("更新時間", report["updated"]),
+        ("經過時間", format_duration(report["elapsed_seconds"])),
+        ("已處理行數", f"{report['lines']}（失敗 {report['failed_lines']}，重試 {report['retries']}）"),
+        ("每小時行數", f"{report['lines_per_hour']:.1f}"),
+        ("剩餘行數", "-" if report["remaining_lines"] is None else str(report["remaining_lines"])),
+        ("預估剩餘時間", format_duration(report["eta_seconds"])),
+        ("預估完成時間", report["eta"] or "-"),
+    ]
+    summary_rows = "".join(f"<tr><th>{html.escape(name)}</th><td>{html.escape(str(value))}</td></tr>"
+                           for name, value in summary)
+    return f"""<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<meta http-equiv="refresh" content="{int(max(5, refresh_interval))}">
+<title>自動化吞吐量</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ padding: 4px 12px; text-align: left; border-bottom: 1px solid #ddd; }}
+.bar {{ background: #4a90d9; height: 12px; }}
+.bar-cell {{ width: 300px; }}
+</style>
+</head>
+<body>
+<h1>自動化吞吐量</h1>
+<table>{summary_rows}</table>
+<h2>時間分配</h2>
+<table>
+<tr><th>分類</th><th>時間</th><th>比例</th><th>每行</th><th class="bar-cell"></th></tr>
+{"".join(rows)}
+</table>
+</body>
+</html>
+"""
+
+
+def _breakdown_row(item: Dict) -> str:
+    per_line = "-" if item["per_line"] is None else f"{item['per_line']:.1f}s"
+    return (f"<tr><td>{html.escape(item['label'])}</td><td>{format_duration(item['seconds'])}</td>"
+            f"<td>{item['percent']:.1f}%</td><td>{per_line}</td>"
+            f"<td class='bar-cell'><div class='bar' style='width:{item['percent']:.1f}%'></div></td></tr>")
+
+
+def build_from_events(events: Iterable[Dict], planned_lines: int = 0, output_dir: Path = None) -> ThroughputTracker:
+    """
+    由事件檔的事件建立吞吐量統計（不寫出報告）
+
+    Args:
+        events: 階段事件
+        planned_lines: 預計處理的行數
+        output_dir: 報告目錄
+
+    Returns:
+        ThroughputTracker: 統計結果（以 snapshot(live=False) / write(live=False) 輸出）
+    """
+    tracker = ThroughputTracker(planned_lines, output_dir, auto_write=False)
+    for event in events:
+        tracker.record(event)
+    return tracker
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="由階段事件檔產生吞吐量報告")
+    parser.add_argument("paths", nargs="*", type=Path, help="事件檔（預設為 logs/events_*.jsonl）")
+    parser.add_argument("--planned-lines", type=int, default=0, help="預計處理的總行數（計算剩餘時間）")
+    parser.add_argument("--output-dir", type=Path, help="報告目錄（預設為 config.THROUGHPUT_REPORT_DIR）")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(config.LOGS_DIR.glob("events_*.jsonl"))
+    if not paths:
+        print(f"找不到事件檔: {config.LOGS_DIR}/events_*.jsonl")
+        return 1
+
+    tracker = build_from_events(read_events(paths), args.planned_lines, args.output_dir)
+    report = tracker.snapshot(live=False)
+    output = tracker.write(live=False)
+    print(f"行數: {report['lines']}（失敗 {report['failed_lines']}，重試 {report['retries']}），"
+          f"每小時 {report['lines_per_hour']:.1f} 行，worker {report['workers']} 個，"
+          f"經過 {format_duration(report['elapsed_seconds'])}")
+    for item in report["breakdown"].values():
+        print(f"  {item['label']:<24} {format_duration(item['seconds']):>12} {item['percent']:>6.1f}%")
+    if report["eta_seconds"] is not None:
+        print(f"剩餘 {report['remaining_lines']} 行，預估 {format_duration(report['eta_seconds'])}（{report['eta']}）")
+    print(f"報告已寫入: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
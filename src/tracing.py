@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 熱點追蹤模組
+以 span（區段）記錄熱點路徑的耗時：截圖比對、剪貼簿複製、Semgrep / Bandit 執行、函式資訊擷取、CSV 寫入等，
+匯出為 Chrome trace JSON（chrome://tracing 或 https://ui.perfetto.dev 開啟），以時間軸檢視一次執行
+
+停用時（config.TRACE_ENABLED = False）span() 直接返回共用的空區段，traced 裝飾器只多一次屬性檢查
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import sys
+
+# 導入配置
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+except ImportError:
+    from config import config
+
+
+class _NullSpan:
+    """停用追蹤時的空區段"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """一個計時區段（離開時記錄為 Chrome trace 的 complete event）"""
+
+    __slots__ = ("_tracer", "name", "category", "args", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self._tracer._record(self, self._start, end)
+        return False
+
+    def set(self, **args):
+        """補充區段參數（例如結果、數量）"""
+        self.args.update(args)
+
+
+class Tracer:
+    """收集 span 並匯出為 Chrome trace JSON"""
+
+    def __init__(self, enabled: bool = None, max_spans: int = None):
+        """
+        初始化追蹤器
+
+        Args:
+            enabled: 是否啟用，預設為 config.TRACE_ENABLED
+            max_spans: 最多保留的 span 數量（超過後捨棄新的 span），預設為 config.TRACE_MAX_SPANS
+        """
+        self.enabled = config.TRACE_ENABLED if enabled is None else enabled
+        self.max_spans = config.TRACE_MAX_SPANS if max_spans is None else max_spans
+        self.dropped = 0
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name: str, category: str = "automation", **args):
+        """
+        建立計時區段（with 語句使用）
+
+        Args:
+            name: 區段名稱（例如 copilot.copy_response）
+            category: 類別（Chrome trace 的 cat）
+            **args: 區段參數，顯示在時間軸的詳細資訊中
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def traced(self, name: str = None, category: str = "automation") -> Callable:
+        """
+        以 span 計時整個函數呼叫的裝飾器
+
+        Args:
+            name: 區段名稱，預設為「類別名稱.函數名稱」
+            category: 類別
+        """
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, span_name, category, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _record(self, span: _Span, start: int, end: int):
+        thread = threading.current_thread()
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": (start - self._origin) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if span.args:
+            event["args"] = {key: _json_safe(value) for key, value in span.args.items()}
+        with self._lock:
+            if len(self._events) >= self.max_spans:
+                self.dropped += 1
+                return
+            self._events.append(event)
+            self._thread_names.setdefault(thread.ident, thread.name)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        轉為 Chrome trace 格式
+
+        Returns:
+            Dict[str, Any]: {"traceEvents": [...], "displayTimeUnit": "ms", ...}
+        """
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        pid = os.getpid()
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "HybridUIAutomation"}}
+        ]
+        metadata.extend(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in thread_names.items()
+        )
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_spans": self.dropped},
+        }
+
+    def export(self, path: Path = None) -> Optional[Path]:
+        """
+        匯出 Chrome trace JSON
+
+        Args:
+            path: 輸出檔案，預設為 logs/trace_<時間>_<pid>.json
+
+        Returns:
+            Optional[Path]: 輸出檔案，沒有任何 span 或寫入失敗時返回 None
+        """
+        if not self._events:
+            return None
+        if path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = config.LOGS_DIR / f"trace_{timestamp}_{os.getpid()}.json"
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        except OSError:
+            return None
+        return path
+
+    def reset(self):
+        """清除已收集的 span"""
+        with self._lock:
+            self._events.clear()
+            self._thread_names.clear()
+            self.dropped = 0
+            self._origin = time.perf_counter_ns()
+
+    def _reset_after_fork(self):
+        """子行程（CWE 掃描行程池）不重複匯出父行程的 span"""
+        self._lock = threading.Lock()
+        self.reset()
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+# 全域追蹤器實例
+tracer = Tracer()
+
+
+def _export_at_exit():
+    if tracer.enabled:
+        tracer.export()
+
+
+atexit.register(_export_at_exit)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=tracer._reset_after_fork)
+
+
+def span(name: str, category: str = "automation", **args):
+    """建立計時區段的便捷函數"""
+    return tracer.span(name, category, **args)
+
+
+def traced(name: str = None, category: str = "automation") -> Callable:
+    """以 span 計時函數呼叫的便捷裝飾器"""
+    return tracer.traced(name, category)
+
+
+def export_trace(path: Path = None) -> Optional[Path]:
+    """匯出 Chrome trace JSON 的便捷函數"""
+    return tracer.export(path)
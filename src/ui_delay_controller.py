@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 自適應 UI 延遲模組
+記錄每個 UI 步驟實際生效所需的時間（畫面變化或剪貼簿變化），
+以高百分位數加上安全係數設定等待時間，並依機器保存、隨成功次數逐步縮短
+"""
+
+import atexit
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+    from src.ui_driver import ui
+except ImportError:
+    from config import config
+    from logger import get_logger
+    from ui_driver import ui
+
+
+def _percentile(values, percentile: float) -> float:
+    """以最近排名法計算百分位數"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(percentile / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class _StepState:
+    """單一 UI 步驟的延遲狀態"""
+
+    def __init__(self, default: float, max_samples: int):
+        self.default = default
+        self.delay = default
+        self.samples = deque(maxlen=max_samples)
+        self.successes = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "default": self.default,
+            "delay": round(self.delay, 4),
+            "samples": [round(s, 4) for s in self.samples],
+            "successes": self.successes
+        }
+
+
+class UIDelayController:
+    """UI 步驟延遲控制器"""
+
+    def __init__(self, profile_path: Path = None, enabled: bool = None):
+        """
+        初始化延遲控制器
+
+        Args:
+            profile_path: 延遲設定檔路徑，預設為 config.UI_DELAY_PROFILE_DIR / {hostname}.json
+            enabled: 是否啟用自適應延遲，預設為 config.UI_ADAPTIVE_DELAY_ENABLED
+        """
+        self.logger = get_logger("UIDelayController")
+        self.enabled = config.UI_ADAPTIVE_DELAY_ENABLED if enabled is None else enabled
+        self.profile_path = Path(profile_path) if profile_path else (
+            config.UI_DELAY_PROFILE_DIR / f"{socket.gethostname()}.json"
+        )
+        self._steps: Dict[str, _StepState] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load_profile()
+
+    # ------------------------------------------------------------------
+    # 延遲查詢與等待
+    # ------------------------------------------------------------------
+    def get_delay(self, step: str, default: float) -> float:
+        """
+        取得步驟目前的等待時間
+
+        Args:
+            step: 步驟名稱
+            default: 原本的固定延遲（同時作為上限）
+
+        Returns:
+            float: 等待秒數
+        """
+        if not self.enabled:
+            return default
+        with self._lock:
+            state = self._get_state(step, default)
+            return min(state.delay, default)
+
+    def wait(self, step: str, default: float) -> float:
+        """
+        依步驟目前的延遲進行等待（無法直接觀測的步驟使用）
+
+        Args:
+            step: 步驟名稱
+            default: 原本的固定延遲
+
+        Returns:
+            float: 實際等待秒數
+        """
+        delay = self.get_delay(step, default)
+        ui.sleep(delay)
+        return delay
+
+    def wait_until(self, step: str, probe: Optional[Callable[[], bool]], default: float,
+                   settle: bool = True, timeout_factor: float = 1.0) -> bool:
+        """
+        輪詢探測函式直到步驟生效，並記錄實際耗時
+
+        Args:
+            step: 步驟名稱
+            probe: 探測函式，回傳 True 表示步驟已生效；None 時退回 wait()
+            default: 原本的固定延遲
+            settle: 探測成功後是否再等待（安全係數 - 1）倍的耗時，讓畫面完成繪製
+            timeout_factor: 最長等待 default 的倍數（預設與原本的固定延遲相同）
+
+        Returns:
+            bool: 步驟是否在時限內生效（未探測時一律為 True）
+        """
+        if not self.enabled or probe is None:
+            self.wait(step, default)
+            return True
+
+        start = ui.monotonic()
+        deadline = start + default * timeout_factor
+        while True:
+            try:
+                ready = probe()
+            except Exception as e:
+                self.logger.debug(f"步驟 {step} 探測失敗: {e}")
+                ready = False
+
+            elapsed = ui.monotonic() - start
+            if ready:
+                self.record(step, elapsed, default)
+                if settle:
+                    ui.sleep(elapsed * (config.UI_DELAY_SAFETY_MARGIN - 1))
+                return True
+            if ui.monotonic() >= deadline:
+                self.logger.debug(f"步驟 {step} 在 {elapsed:.2f} 秒內未觀測到變化")
+                self.report_failure(step, default)
+                return False
+            ui.sleep(config.UI_DELAY_PROBE_INTERVAL)
+
+    def screen_probe(self, region: Tuple[int, int, int, int] = None) -> Optional[Callable[[], bool]]:
+        """
+        建立畫面變化探測函式（須在送出按鍵之前呼叫），停用或截圖失敗時返回 None
+
+        Args:
+            region: 比對區域 (left, top, width, height)，None 表示全螢幕
+
+        Returns:
+            Optional[Callable[[], bool]]: 探測函式
+        """
+        if not self.enabled:
+            return None
+        try:
+            return make_screen_change_probe(region)
+        except Exception as e:
+            self.logger.debug(f"無法建立畫面變化探測，改用固定延遲: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # 觀測與回饋
+    # ------------------------------------------------------------------
+    def record(self, step: str, observed: float, default: float):
+        """
+        記錄一次實測的生效時間並更新延遲
+
+        Args:
+            step: 步驟名稱
+            observed: 實測秒數
+            default: 原本的固定延遲
+        """
+        with self._lock:
+            state = self._get_state(step, default)
+            state.samples.append(observed)
+            self._shrink(state)
+            self._dirty = True
+
+    def report_success(self, step: str, default: float):
+        """回報步驟在目前延遲下正確完成，延遲可逐步縮短"""
+        if not self.enabled:
+            return
+        with self._lock:
+            state = self._get_state(step, default)
+            state.successes += 1
+            self._shrink(state)
+            self._dirty = True
+
+    def report_failure(self, step: str, default: float):
+        """回報步驟在目前延遲下失敗，延遲回復為原本的固定值"""
+        if not self.enabled:
+            return
+        with self._lock:
+            state = self._get_state(step, default)
+            if state.delay < state.default:
+                self.logger.info(f"步驟 {step} 失敗，延遲由 {state.delay:.2f}s 回復為 {state.default:.2f}s")
+            state.delay = state.default
+            state.successes = 0
+            self._dirty = True
+
+    def _shrink(self, state: _StepState):
+        """依觀測值計算目標延遲，並以固定比例逐步逼近（呼叫端需持有鎖）"""
+        if len(state.samples) + state.successes < config.UI_DELAY_MIN_SAMPLES:
+            return
+        if state.samples:
+            target = _percentile(state.samples, config.UI_DELAY_PERCENTILE) * config.UI_DELAY_SAFETY_MARGIN
+        else:
+            # 沒有直接觀測值的步驟只能依成功回饋縮短，最多縮到原本的一半
+            target = state.default * 0.5
+        target = min(max(target, config.UI_DELAY_MIN_SECONDS), state.default)
+        state.delay = max(target, state.delay * config.UI_DELAY_SHRINK_FACTOR)
+
+    def _get_state(self, step: str, default: float) -> _StepState:
+        """取得或建立步驟狀態（呼叫端需持有鎖）"""
+        state = self._steps.get(step)
+        if state is None:
+            state = _StepState(default, config.UI_DELAY_MAX_SAMPLES)
+            self._steps[step] = state
+        elif state.default != default:
+            # 程式碼中的固定延遲被調整過，以新的值為上限
+            state.default = default
+            state.delay = min(state.delay, default)
+        return state
+
+    # ------------------------------------------------------------------
+    # 設定檔
+    # ------------------------------------------------------------------
+    def _load_profile(self):
+        """載入本機的延遲設定檔"""
+        if not self.profile_path.exists():
+            return
+        try:
+            with open(self.profile_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for step, item in data.get("steps", {}).items():
+                state = _StepState(float(item["default"]), config.UI_DELAY_MAX_SAMPLES)
+                state.delay = float(item.get("delay", state.default))
+                state.samples.extend(float(s) for s in item.get("samples", []))
+                state.successes = int(item.get("successes", 0))
+                self._steps[step] = state
+            self.logger.info(f"已載入 UI 延遲設定檔: {self.profile_path} ({len(self._steps)} 個步驟)")
+        except Exception as e:
+            self.logger.warning(f"載入 UI 延遲設定檔失敗，使用預設延遲: {e}")
+            self._steps = {}
+
+    def reset(self):
+        """清除所有步驟的觀測結果，回到原本的固定延遲（不影響已儲存的設定檔）"""
+        with self._lock:
+            self._steps = {}
+            self._dirty = False
+
+    def save(self) -> bool:
+        """
+        儲存延遲設定檔（先寫暫存檔再取代）
+
+        Returns:
+            bool: 儲存是否成功
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            data = {
+                "host": socket.gethostname(),
+                "updated": time.strftime('%Y-%m-%d %H:%M:%S'),
+                "steps": {name: state.to_dict() for name, state in sorted(self._steps.items())}
+            }
+            self._dirty = False
+
+        try:
+            self.profile_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.profile_path.with_suffix(".json.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.profile_path)
+            return True
+        except Exception as e:
+            self.logger.warning(f"儲存 UI 延遲設定檔失敗: {e}")
+            return False
+
+    def get_summary(self) -> Dict[str, Tuple[float, float]]:
+        """取得各步驟的 (目前延遲, 原本延遲)"""
+        with self._lock:
+            return {name: (state.delay, state.default) for name, state in self._steps.items()}
+
+
+def make_screen_change_probe(region: Tuple[int, int, int, int] = None) -> Callable[[], bool]:
+    """
+    建立畫面變化探測函式：立即擷取基準畫面，之後每次呼叫比對是否與基準不同
+    必須在送出按鍵「之前」呼叫
+
+    Args:
+        region: 比對區域 (left, top, width, height)，None 表示全螢幕
+
+    Returns:
+        Callable[[], bool]: 畫面已變化時回傳 True
+    """
+    baseline = ui.screen_signature(region)
+    return lambda: ui.screen_signature(region) != baseline
+
+
+# 創建全域實例
+ui_delays = UIDelayController()
+atexit.register(ui_delays.save)
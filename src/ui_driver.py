@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - UI 驅動模組
+Copilot 互動流程的鍵盤、剪貼簿、畫面比對與時間操作都經由目前的 UI 驅動執行：
+- PyAutoGUIDriver：實際操作桌面（預設）
+- SimulatedCopilotDriver（src/simulated_copilot.py）：以虛擬時鐘模擬 VS Code / Copilot，
+  不需要顯示器或網路即可測試與量測互動流程
+
+模組中以 ui.hotkey(...)、ui.sleep(...) 使用目前的驅動；以 use_ui_driver() 暫時替換
+"""
+
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+import sys
+
+# 導入延遲載入工具
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from src.lazy_import import lazy_module
+except ImportError:
+    from lazy_import import lazy_module
+
+# 延遲匯入：第一次操作 UI 時才載入
+pyautogui = lazy_module("pyautogui")
+pyperclip = lazy_module("pyperclip")
+
+Region = Tuple[int, int, int, int]
+
+
+class UIDriver(ABC):
+    """UI 驅動介面（鍵盤、剪貼簿、畫面、時間）"""
+
+    name = "base"
+
+    # 鍵盤與滑鼠
+    @abstractmethod
+    def hotkey(self, *keys: str):
+        """按下組合鍵"""
+
+    @abstractmethod
+    def press(self, key: str):
+        """按下單一按鍵"""
+
+    @abstractmethod
+    def click(self, x: int, y: int):
+        """點擊畫面座標"""
+
+    # 剪貼簿
+    @abstractmethod
+    def copy(self, text: str):
+        """寫入剪貼簿"""
+
+    @abstractmethod
+    def paste(self) -> str:
+        """讀取剪貼簿"""
+
+    # 畫面
+    @abstractmethod
+    def locate_on_screen(self, image_path: str, confidence: float = None,
+                         region: Region = None) -> Optional[Region]:
+        """
+        在畫面上尋找圖像
+
+        Args:
+            image_path: 模板圖像路徑
+            confidence: 匹配信心度
+            region: 搜尋區域
+
+        Returns:
+            Optional[Region]: 找到的位置 (left, top, width, height)，找不到時返回 None
+        """
+
+    @abstractmethod
+    def screen_signature(self, region: Region = None) -> bytes:
+        """畫面內容的摘要（比較前後是否變化用）"""
+
+    # 時間（模擬驅動以虛擬時鐘取代）
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+
+class PyAutoGUIDriver(UIDriver):
+    """以 pyautogui / pyperclip 實際操作桌面"""
+
+    name = "pyautogui"
+
+    def hotkey(self, *keys: str):
+        pyautogui.hotkey(*keys)
+
+    def press(self, key: str):
+        pyautogui.press(key)
+
+    def click(self, x: int, y: int):
+        pyautogui.click(x, y)
+
+    def copy(self, text: str):
+        pyperclip.copy(text)
+
+    def paste(self) -> str:
+        return pyperclip.paste()
+
+    def locate_on_screen(self, image_path: str, confidence: float = None,
+                         region: Region = None) -> Optional[Region]:
+        try:
+            return pyautogui.locateOnScreen(image_path, confidence=confidence, region=region)
+        except pyautogui.ImageNotFoundException:
+            return None
+
+    def screen_signature(self, region: Region = None) -> bytes:
+        image = pyautogui.screenshot(region=region) if region else pyautogui.screenshot()
+        return hashlib.md5(image.tobytes(), usedforsecurity=False).digest()
+
+
+_driver: Optional[UIDriver] = None
+_driver_lock = threading.Lock()
+
+
+def get_ui_driver() -> UIDriver:
+    """取得目前的 UI 驅動（未設定時建立 PyAutoGUIDriver）"""
+    global _driver
+    if _driver is None:
+        with _driver_lock:
+            if _driver is None:
+                _driver = PyAutoGUIDriver()
+    return _driver
+
+
+def set_ui_driver(driver: Optional[UIDriver]) -> Optional[UIDriver]:
+    """
+    設定目前的 UI 驅動
+
+    Args:
+        driver: UI 驅動，None 表示回到預設的 PyAutoGUIDriver
+
+    Returns:
+        Optional[UIDriver]: 原本的驅動
+    """
+    global _driver
+    with _driver_lock:
+        previous, _driver = _driver, driver
+    return previous
+
+
+@contextmanager
+def use_ui_driver(driver: UIDriver) -> Iterator[UIDriver]:
+    """在區塊內使用指定的 UI 驅動"""
+    previous = set_ui_driver(driver)
+    try:
+        yield driver
+    finally:
+        set_ui_driver(previous)
+
+
+class _ActiveDriver:
+    """轉給目前 UI 驅動的替身（各模組以 ui.xxx() 呼叫，替換驅動後立即生效）"""
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        return getattr(get_ui_driver(), name)
+
+    def __repr__(self) -> str:
+        return f"<ui driver: {get_ui_driver().name}>"
+
+
+ui = _ActiveDriver()
@@ -10,6 +10,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from config.config import config
 from src.settings_manager import settings_manager
+from src.progress_checkpoint import has_unfinished_checkpoint
 
 class UIManager:
     """UI 管理器 - 提供簡單的選項選擇介面"""
@@ -21,6 +22,7 @@ class UIManager:
         self.choice_made = False
         self.selected_projects = set()  # 使用者選擇的專案
         self.clean_history = True  # 是否清理歷史記錄
+        self.resume_projects = set()  # 有未完成進度、使用者選擇從中斷處繼續（清理時保留）的專案
         
     def show_options_dialog(self) -> tuple:
         """
@@ -146,6 +148,23 @@ class UIManager:
                 )
                 return
             
+            # 有未完成進度的專案：詢問一次要從中斷處繼續，還是清理後重新開始
+            self.resume_projects = set()
+            if self.clean_history:
+                unfinished = sorted(name for name in self.selected_projects if has_unfinished_checkpoint(name))
+                if unfinished:
+                    listing = "\n".join(f"• {name}" for name in unfinished[:10])
+                    if len(unfinished) > 10:
+                        listing += f"\n… 等 {len(unfinished)} 個專案"
+                    resume = messagebox.askyesno(
+                        "偵測到未完成的進度",
+                        f"以下專案上次執行尚未完成：\n{listing}\n\n"
+                        "是：保留執行記錄，從中斷處繼續\n否：清理執行記錄，重新開始",
+                        parent=root
+                    )
+                    if resume:
+                        self.resume_projects = set(unfinished)
+            
             self.smart_wait_selected = wait_var.get()
             self.choice_made = True
             root.destroy()
@@ -205,7 +224,7 @@ class UIManager:
             print(f"❌ 重置專案狀態時發生錯誤: {str(e)}")
             return False
     
-    def clean_project_history(self, project_names: set) -> bool:
+    def clean_project_history(self, project_names: set, resume_projects: set = None) -> bool:
         """
         清理指定專案的執行記錄和結果（直接刪除，不備份）
         
@@ -220,10 +239,13 @@ class UIManager:
         
         Args:
             project_names: 要清理的專案名稱集合
+            resume_projects: 要從中斷處繼續的專案（保留結果與進度檢查點），預設為對話框中的選擇
             
         Returns:
             bool: 清理是否成功
         """
+        if resume_projects is None:
+            resume_projects = self.resume_projects
         if not project_names:
             return True
         
@@ -239,6 +261,11 @@ class UIManager:
             total_size = 0  # 釋放的空間（bytes）
             
             for project_name in project_names:
+                # 使用者選擇從中斷處繼續的專案保留結果與進度檢查點
+                if project_name in resume_projects:
+                    print(f"\n⏯️  保留專案 {project_name} 的未完成進度（將從中斷處繼續）")
+                    continue
+                
                 print(f"\n📂 清理專案: {project_name}")
                 
                 # 1. ExecutionResult/Success/{專案名稱}/
@@ -7,8 +7,6 @@ Hybrid UI Automation Script - VS Code 操作控制模組
 import subprocess
 import time
 import os
-import psutil
-import pyautogui
 from pathlib import Path
 from typing import Optional, List
 import sys
@@ -17,51 +15,125 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 try:
     from config.config import config
-    from src.logger import get_logger
+    from src.logger import get_logger, timed_phase
     from src.vscode_ui_initializer import initialize_vscode_ui
+    from src.ui_delay_controller import ui_delays
+    from src.lazy_import import LazyInstance, lazy_module
+    from src.vscode_readiness import ReadinessProbe
+    from src.vscode_process_tracker import VSCodeProcessTracker
 except ImportError:
     try:
         from config import config
-        from logger import get_logger
+        from logger import get_logger, timed_phase
         from vscode_ui_initializer import initialize_vscode_ui
+        from ui_delay_controller import ui_delays
+        from lazy_import import LazyInstance, lazy_module
+        from vscode_readiness import ReadinessProbe
+        from vscode_process_tracker import VSCodeProcessTracker
     except ImportError:
         import sys
         sys.path.append(str(Path(__file__).parent.parent / "config"))
         import config
-        from logger import get_logger
+        from logger import get_logger, timed_phase
         from vscode_ui_initializer import initialize_vscode_ui
+        from ui_delay_controller import ui_delays
+        from lazy_import import LazyInstance, lazy_module
+        from vscode_readiness import ReadinessProbe
+        from vscode_process_tracker import VSCodeProcessTracker
+
+# 延遲匯入：第一次操作進程或鍵盤時才載入
+psutil = lazy_module("psutil")
+pyautogui = lazy_module("pyautogui")
 
 class VSCodeController:
     """VS Code 操作控制器"""
     
-    def __init__(self):
-        """初始化 VS Code 控制器"""
+    def __init__(self, user_data_dir: Path = None):
+        """
+        初始化 VS Code 控制器
+        
+        Args:
+            user_data_dir: 獨立的 VS Code user-data-dir（平行 worker 使用），None 表示使用預設設定
+        """
         self.logger = get_logger("VSCodeController")
         self.current_project_path = None
         self.vscode_process = None
-        # 啟動時記錄所有現有 VS Code 進程 PID
-        self.pre_existing_vscode_pids = set()
-        for proc in psutil.process_iter(['pid', 'name']):
-            if 'code' in proc.info['name'].lower():
-                self.pre_existing_vscode_pids.add(proc.info['pid'])
-        self.logger.info(f"VS Code 控制器初始化完成，已記錄現有 VS Code PID: {self.pre_existing_vscode_pids}")
+        self.user_data_dir = Path(user_data_dir).resolve() if user_data_dir else None
+        self.crash_count = 0  # 保留視窗模式下 VS Code 非預期結束的次數
+        # 只追蹤本控制器啟動的行程樹；現有 VS Code 行程於第一次啟動前才記錄
+        self.processes = VSCodeProcessTracker(self.user_data_dir)
+        self.logger.info("VS Code 控制器初始化完成")
+    
+    @property
+    def pre_existing_vscode_pids(self) -> set:
+        """第一次啟動 VS Code 前已存在的 VS Code 進程 PID"""
+        return self.processes.pre_existing_pids
     
     def is_vscode_running(self) -> bool:
         """
-        檢查 VS Code 是否正在運行
+        檢查 VS Code 是否正在運行（已啟動過時只檢查本控制器啟動的行程樹）
         
         Returns:
             bool: VS Code 是否在運行
         """
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                if 'code' in proc.info['name'].lower():
-                    return True
-            return False
+            if self.processes.launch_count:
+                return self.processes.is_alive()
+            if self.user_data_dir:
+                return bool(self._find_instance_processes())
+            return bool(self.processes.scan())
         except Exception as e:
             self.logger.debug(f"檢查 VS Code 運行狀態時發生錯誤: {str(e)}")
             return False
     
+    def _find_instance_processes(self) -> List["psutil.Process"]:
+        """
+        找出使用本控制器 user-data-dir 的 VS Code 行程（其他 worker 的實例不受影響）
+        
+        Returns:
+            List[psutil.Process]: 行程列表
+        """
+        marker = f"--user-data-dir={self.user_data_dir}"
+        processes = []
+        for proc in psutil.process_iter(['pid', 'cmdline']):
+            try:
+                if marker in (proc.info['cmdline'] or []):
+                    processes.append(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return processes
+    
+    def _terminate_instance_processes(self, timeout: float = 10) -> bool:
+        """
+        等待本實例的 VS Code 行程結束，逾時則終止（虛擬顯示器沒有視窗管理員時 Alt+F4 無效）
+        
+        Args:
+            timeout: 等待正常關閉的秒數
+            
+        Returns:
+            bool: 行程是否都已結束
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self._find_instance_processes():
+                return True
+            time.sleep(0.5)
+        
+        processes = self._find_instance_processes()
+        self.logger.warning(f"VS Code 實例未在 {timeout} 秒內關閉，終止 {len(processes)} 個行程")
+        for proc in processes:
+            try:
+                proc.terminate()
+            except psutil.NoSuchProcess:
+                pass
+        _, alive = psutil.wait_procs(processes, timeout=5)
+        for proc in alive:
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+        return not alive
+    
 
     
     def close_all_vscode_instances(self) -> bool:
@@ -74,9 +146,15 @@ class VSCodeController:
         try:
             self.logger.info("使用 Alt+F4 關閉 VS Code...")
             
+            self.processes.expect_exit()
             pyautogui.hotkey('alt', 'f4')
             time.sleep(2)
             
+            # 獨立實例：確認只屬於本實例的行程已結束
+            if self.user_data_dir:
+                self._terminate_instance_processes()
+            self.processes.is_alive()  # 已結束時記錄 exit 事件
+            
             self.current_project_path = None
             self.vscode_process = None
             self.logger.info("✅ VS Code 關閉命令已執行")
@@ -86,6 +164,7 @@ class VSCodeController:
             self.logger.error(f"關閉 VS Code 時發生錯誤: {str(e)}")
             return False
     
+    @timed_phase("open-vscode")
     def open_project(self, project_path: str, wait_for_load: bool = True) -> bool:
         """
         開啟專案
@@ -106,24 +185,25 @@ class VSCodeController:
             
             self.logger.info(f"開啟專案: {project_path}")
             
-            # 設置環境變量以提高穩定性
-            env = os.environ.copy()
-            env['ELECTRON_DISABLE_SECURITY_WARNINGS'] = '1'
-            env['ELECTRON_NO_ATTACH_CONSOLE'] = '1'
+            # 保留視窗模式：沿用上一個專案的視窗切換資料夾，VS Code 已結束（當機）時才完整重啟
+            if config.VSCODE_REUSE_WINDOW and self.current_project_path:
+                if self.is_vscode_running():
+                    if self._switch_workspace(project_path):
+                        return True
+                    self.logger.warning("切換資料夾失敗，關閉 VS Code 後完整重啟")
+                    self.close_all_vscode_instances()
+                else:
+                    self.crash_count += 1
+                    self.logger.warning(f"⚠️ VS Code 已非預期結束（第 {self.crash_count} 次），完整重啟")
+                    self.current_project_path = None
+                    self.vscode_process = None
             
             # 使用命令列開啟專案，添加穩定性參數
-            cmd = [config.VSCODE_EXECUTABLE, str(project_path)]
-            
-            # 添加穩定性參數
-            stability_args = [
-                "--disable-gpu-sandbox",     # 避免 GPU 相關崩潰
-                "--no-sandbox",              # 避免沙盒相關問題  
-                "--disable-dev-shm-usage",   # 避免共享記憶體問題
-                "--disable-background-timer-throttling",  # 避免背景計時器問題
-            ]
-            
-            cmd.extend(stability_args)
+            cmd = self._vscode_command(str(project_path))
             self.logger.debug(f"執行命令: {' '.join(cmd)}")
+            probe = ReadinessProbe(project_path, self.is_vscode_running)
+            probe.clear_marker()
+            self.processes.pre_existing_pids  # 啟動前記錄現有的 VS Code 行程
             
             try:
                 self.vscode_process = subprocess.Popen(
@@ -131,34 +211,23 @@ class VSCodeController:
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL,
                     cwd=str(project_path.parent),
-                    env=env
+                    env=self._vscode_env()
                 )
+                self.processes.track(self.vscode_process)
                 
                 self.current_project_path = str(project_path)
                 
                 if wait_for_load:
-                    # 等待 VS Code 啟動並驗證
-                    self.logger.info("等待 VS Code 啟動...")
-                    time.sleep(config.VSCODE_STARTUP_DELAY)
-                    
-                    # 驗證 VS Code 是否正常啟動
-                    max_attempts = 5
-                    for attempt in range(max_attempts):
-                        if self.is_vscode_running():
-                            self.logger.info(f"✅ VS Code 啟動成功 (第 {attempt + 1} 次檢查)")
-                            time.sleep(2)  # 額外等待確保完全載入
-                            
-                            # 立即最大化視窗，不動到既有畫面
-                            self.logger.info("正在最大化視窗...")
-                            self._maximize_window_direct()
-                            
-                            return True
-                        else:
-                            self.logger.debug(f"第 {attempt + 1}/{max_attempts} 次檢查: VS Code 尚未完全啟動")
-                            time.sleep(1)
+                    # 等待工作區就緒（視窗標題 / Chat 面板 / 標記檔），取代固定的啟動等待
+                    self.logger.info("等待 VS Code 工作區就緒...")
+                    result = probe.wait(config.VSCODE_STARTUP_TIMEOUT)
+                    if result.ready:
+                        self.logger.info(f"✅ VS Code 啟動成功 ({result.elapsed:.1f} 秒)")
+                    else:
+                        self.logger.warning(f"⚠️ VS Code 啟動但無法確認工作區就緒: {result.reason}")
                     
-                    self.logger.warning("⚠️ VS Code 啟動但無法確認運行狀態")
-                    # 即使無法確認狀態也嘗試最大化
+                    # 立即最大化視窗，不動到既有畫面（即使無法確認狀態也嘗試最大化）
+                    self.logger.info("正在最大化視窗...")
                     self._maximize_window_direct()
                     return True  # 假設成功，繼續執行
                 else:
@@ -182,13 +251,102 @@ class VSCodeController:
             self.logger.error(f"開啟專案失敗: {str(e)}")
             return False
     
+    def _vscode_command(self, *args: str) -> List[str]:
+        """
+        VS Code 命令列（加上穩定性參數與本控制器的 user-data-dir）
+        
+        Args:
+            *args: 資料夾路徑等參數
+            
+        Returns:
+            List[str]: 命令列
+        """
+        cmd = [config.VSCODE_EXECUTABLE, *args]
+        
+        # 添加穩定性參數
+        stability_args = [
+            "--disable-gpu-sandbox",     # 避免 GPU 相關崩潰
+            "--no-sandbox",              # 避免沙盒相關問題  
+            "--disable-dev-shm-usage",   # 避免共享記憶體問題
+            "--disable-background-timer-throttling",  # 避免背景計時器問題
+        ]
+        cmd.extend(stability_args)
+        
+        # 獨立實例：使用專用的 user-data-dir，避免與其他 worker 共用同一個 VS Code 主行程
+        if self.user_data_dir:
+            cmd.append(f"--user-data-dir={self.user_data_dir}")
+        return cmd
+    
+    def _vscode_env(self) -> dict:
+        """設置環境變量以提高穩定性"""
+        env = os.environ.copy()
+        env['ELECTRON_DISABLE_SECURITY_WARNINGS'] = '1'
+        env['ELECTRON_NO_ATTACH_CONSOLE'] = '1'
+        return env
+    
+    def _switch_workspace(self, project_path: Path) -> bool:
+        """
+        在現有的 VS Code 視窗中切換到另一個專案資料夾（code --reuse-window），並等待工作區就緒
+        
+        Args:
+            project_path: 專案路徑
+            
+        Returns:
+            bool: 切換是否成功
+        """
+        self.logger.info(f"♻️ 沿用現有 VS Code 視窗切換到: {project_path.name}")
+        cmd = self._vscode_command("--reuse-window", str(project_path))
+        self.logger.debug(f"執行命令: {' '.join(cmd)}")
+        ReadinessProbe(project_path).clear_marker()
+        try:
+            # 命令列只把開啟要求交給執行中的 VS Code 主行程，隨即結束
+            subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                cwd=str(project_path.parent),
+                env=self._vscode_env(),
+                timeout=config.VSCODE_STARTUP_TIMEOUT
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            self.logger.warning(f"切換資料夾命令失敗: {e}")
+            return False
+        
+        self.current_project_path = str(project_path)
+        if not self.wait_for_workspace_ready(project_path):
+            return False
+        self.logger.info(f"✅ 已切換到專案: {project_path.name}")
+        return True
+    
+    def wait_for_workspace_ready(self, project_path: Path, timeout: float = None) -> bool:
+        """
+        等待切換後的工作區就緒（視窗標題顯示專案資料夾等訊號，見 src/vscode_readiness.py）
+        
+        Args:
+            project_path: 專案路徑
+            timeout: 最長等待秒數，預設為 config.VSCODE_WORKSPACE_READY_TIMEOUT
+            
+        Returns:
+            bool: 工作區是否就緒
+        """
+        if timeout is None:
+            timeout = config.VSCODE_WORKSPACE_READY_TIMEOUT
+        return ReadinessProbe(project_path, self.is_vscode_running).wait(timeout).ready
+    
+    @timed_phase("close-vscode")
     def close_current_project(self, force: bool = False) -> bool:
         """
-        關閉當前專案
+        關閉當前專案；保留視窗模式下保留 VS Code 視窗給下一個專案使用
+        
+        Args:
+            force: 保留視窗模式下仍關閉 VS Code（例如所有專案處理完畢）
         
         Returns:
             bool: 關閉是否成功
         """
+        if config.VSCODE_REUSE_WINDOW and not force and self.is_vscode_running():
+            self.logger.info("保留 VS Code 視窗給下一個專案使用")
+            return True
         return self.close_all_vscode_instances()
     
 
@@ -281,20 +439,15 @@ class VSCodeController:
         try:
             self.logger.debug(f"等待 VS Code 準備就緒 (超時: {timeout}秒)")
             
-            start_time = time.time()
+            # 有開啟中的專案時以就緒訊號判斷（視窗標題 / Chat 面板 / 標記檔）
+            if self.current_project_path:
+                return ReadinessProbe(self.current_project_path, self.is_vscode_running).wait(timeout).ready
             
-            while time.time() - start_time < timeout:
+            start_time = time.monotonic()
+            while time.monotonic() - start_time < timeout:
                 if self.is_vscode_running():
-                    # 嘗試簡單的按鍵操作來測試響應性
-                    try:
-                        pyautogui.press('escape')
-                        time.sleep(0.1)
-                        self.logger.debug("VS Code 響應正常")
-                        return True
-                    except:
-                        pass
-                
-                time.sleep(1)
+                    return True
+                time.sleep(config.VSCODE_READY_INTERVAL)
             
             self.logger.warning(f"VS Code 在 {timeout} 秒內未準備就緒")
             return False
@@ -369,6 +522,7 @@ class VSCodeController:
             self.logger.error(f"聚焦 VS Code 視窗時發生錯誤: {str(e)}")
             return False
     
+    @timed_phase("clear-memory")
     def clear_copilot_memory(self, modification_action: str = "keep") -> bool:
         """
         清除 Copilot Chat 記憶，包含智能檢測和處理保存對話提示
@@ -387,7 +541,12 @@ class VSCodeController:
             from src.image_recognition import check_newchat_save_dialog, handle_newchat_save_dialog
             
             # 執行清除記憶命令序列
+            probes_ok = True
+            observed = False
             for i, command in enumerate(config.COPILOT_CLEAR_MEMORY_COMMANDS):
+                step = command.get('step', f"clear_memory.command_{i}")
+                probe = ui_delays.screen_probe() if command.get('probe') == 'screen' else None
+                
                 if command['type'] == 'hotkey':
                     pyautogui.hotkey(*command['keys'])
                     self.logger.debug(f"執行快捷鍵: {'+'.join(command['keys'])}")
@@ -413,7 +572,23 @@ class VSCodeController:
                     else:
                         self.logger.debug("未檢測到保存對話提示，繼續正常流程")
                 
-                time.sleep(command['delay'])
+                if probe is not None:
+                    observed = True
+                    probes_ok = ui_delays.wait_until(step, probe, command['delay']) and probes_ok
+                else:
+                    ui_delays.wait(step, command['delay'])
+            
+            # 可觀測的步驟都有生效時，才允許縮短其餘無法觀測的步驟
+            for i, command in enumerate(config.COPILOT_CLEAR_MEMORY_COMMANDS):
+                if command.get('probe') == 'screen':
+                    continue
+                step = command.get('step', f"clear_memory.command_{i}")
+                if not observed:
+                    break
+                if probes_ok:
+                    ui_delays.report_success(step, command['delay'])
+                else:
+                    ui_delays.report_failure(step, command['delay'])
             
             self.logger.info("✅ Copilot Chat 記憶清除流程完成")
             return True
@@ -422,8 +597,8 @@ class VSCodeController:
             self.logger.error(f"清除 Copilot Chat 記憶時發生錯誤: {str(e)}")
             return False
 
-# 創建全域實例
-vscode_controller = VSCodeController()
+# 創建全域實例（第一次使用時才建立，避免匯入模組就走訪所有進程）
+vscode_controller = LazyInstance(VSCodeController)
 
 # 便捷函數
 def open_project(project_path: str, wait_for_load: bool = True) -> bool:
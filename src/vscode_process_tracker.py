@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - VS Code 行程追蹤模組
+只追蹤控制器自己啟動的 VS Code 行程樹（Popen 的啟動器與其子行程），
+存活檢查以 Popen.poll() / os.kill(pid, 0) 完成，不必每次走訪整個行程表：
+- 只有追蹤中的行程都結束（或只剩啟動器）時才走訪一次行程表，找出脫離啟動器的 VS Code 主行程
+- 行程名稱完全比對（code / code-insiders / codium 與 VSCODE_EXECUTABLE 的檔名），不再誤判 vscode-server 等行程
+- 行程樹全部結束時輸出 vscode-exit 事件：預期中的關閉為 exit，其餘為 crash
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Set
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+    from src.lazy_import import lazy_module
+except ImportError:
+    from config import config
+    from logger import get_logger
+    from lazy_import import lazy_module
+
+# 延遲匯入：需要走訪行程表時才載入
+psutil = lazy_module("psutil")
+
+
+def vscode_process_names() -> Set[str]:
+    """
+    視為 VS Code 的行程名稱（完全比對）
+
+    Returns:
+        Set[str]: config.VSCODE_PROCESS_NAMES 加上 VSCODE_EXECUTABLE 的檔名
+    """
+    names = {name.lower() for name in config.VSCODE_PROCESS_NAMES}
+    names.add(Path(config.VSCODE_EXECUTABLE).name.lower())
+    return names
+
+
+def is_vscode_process_name(name: Optional[str]) -> bool:
+    """行程名稱是否為 VS Code（完全比對，不含 vscode-server 之類的名稱）"""
+    return bool(name) and name.lower() in vscode_process_names()
+
+
+def pid_alive(pid: int) -> bool:
+    """
+    行程是否仍存在（os.kill(pid, 0)，不走訪行程表）
+
+    Args:
+        pid: 行程 ID
+
+    Returns:
+        bool: 行程是否存在
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # 行程存在但屬於其他使用者
+    except OSError:
+        return False
+    return True
+
+
+class VSCodeProcessTracker:
+    """追蹤控制器啟動的 VS Code 行程樹"""
+
+    def __init__(self, user_data_dir: Path = None):
+        """
+        初始化行程追蹤
+
+        Args:
+            user_data_dir: 獨立實例的 user-data-dir，尋找主行程時只接受命令列帶有此參數的行程
+        """
+        self.logger = get_logger("VSCodeProcessTracker")
+        self.user_data_dir = user_data_dir
+        self.process = None                   # 啟動器的 Popen
+        self.pids: Set[int] = set()           # 追蹤中的行程樹
+        self.launched_at: Optional[float] = None       # time.monotonic()
+        self.launched_wall: Optional[float] = None     # time.time()，與行程建立時間比較
+        self.expecting_exit = False
+        self.launch_count = 0
+        self.last_exit: Optional[str] = None  # 上一次結束的結果（exit / crash）
+        self._pre_existing: Optional[Set[int]] = None
+
+    @property
+    def pre_existing_pids(self) -> Set[int]:
+        """第一次啟動前已存在的 VS Code 行程（第一次使用時才走訪行程表）"""
+        if self._pre_existing is None:
+            self._pre_existing = {proc.info['pid'] for proc in self.scan()}
+        return self._pre_existing
+
+    @property
+    def tracking(self) -> bool:
+        """是否正在追蹤已啟動的 VS Code"""
+        return self.launched_at is not None
+
+    def scan(self) -> List["psutil.Process"]:
+        """
+        走訪行程表，找出名稱完全符合的 VS Code 行程
+
+        Returns:
+            List[psutil.Process]: 行程列表
+        """
+        processes = []
+        for proc in psutil.process_iter(['pid', 'name']):
+            try:
+                if is_vscode_process_name(proc.info['name']):
+                    processes.append(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return processes
+
+    def running_pids(self) -> List[int]:
+        """
+        走訪一次行程表，列出第一次啟動前不存在的 VS Code 行程（未在追蹤時的存活檢查）；
+        尚未記錄既有行程時，所有 VS Code 行程都算在內
+
+        Returns:
+            List[int]: 行程 ID 列表
+        """
+        pre_existing = self._pre_existing or set()
+        return sorted(proc.info['pid'] for proc in self.scan() if proc.info['pid'] not in pre_existing)
+
+    def track(self, process):
+        """
+        開始追蹤剛啟動的 VS Code（呼叫端應在 Popen 之前讀取 pre_existing_pids）
+
+        Args:
+            process: 啟動器的 subprocess.Popen
+        """
+        self.process = process
+        self.pids = {process.pid}
+        self.launched_at = time.monotonic()
+        self.launched_wall = time.time()
+        self.expecting_exit = False
+        self.launch_count += 1
+        self.last_exit = None
+
+    def expect_exit(self):
+        """標記接下來的結束是預期中的關閉（不記為 crash）"""
+        self.expecting_exit = True
+
+    def is_alive(self) -> bool:
+        """
+        追蹤中的 VS Code 是否仍在執行；只剩啟動器或全部結束時才走訪一次行程表，
+        全部結束時輸出 vscode-exit 事件並停止追蹤
+
+        Returns:
+            bool: 是否仍在執行
+        """
+        if not self.tracking:
+            return False
+        self._prune()
+        if self.pids - self._launcher_pid():
+            return True
+
+        # 啟動器通常把 VS Code 主行程交給背景後立即結束：走訪一次行程表找出它
+        self.discover()
+        self._prune()
+        if self.pids:
+            return True
+        self._report_exit()
+        return False
+
+    def discover(self):
+        """走訪行程表，把啟動後建立的 VS Code 行程（或接手開啟要求的既有實例）加入追蹤"""
+        marker = f"--user-data-dir={self.user_data_dir}" if self.user_data_dir else None
+        pre_existing = self.pre_existing_pids
+        found, handed_off = set(), set()
+        for proc in psutil.process_iter(['pid', 'name', 'create_time', 'cmdline']):
+            try:
+                info = proc.info
+                if not is_vscode_process_name(info['name']):
+                    continue
+                if marker and marker not in (info['cmdline'] or []):
+                    continue
+                if info['pid'] in pre_existing:
+                    handed_off.add(info['pid'])
+                elif (info['create_time'] or 0) >= self.launched_wall - 1:
+                    found.add(info['pid'])
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if found:
+            self.pids |= found
+        elif self.process is None or self.process.poll() is not None:
+            # 啟動器已結束卻沒有新的行程：開啟要求是交給已在執行的 VS Code 處理
+            self.pids |= handed_off
+
+    def reset(self):
+        """停止追蹤（不輸出事件）"""
+        self.process = None
+        self.pids = set()
+        self.launched_at = None
+        self.launched_wall = None
+        self.expecting_exit = False
+
+    def _launcher_pid(self) -> Set[int]:
+        return {self.process.pid} if self.process is not None else set()
+
+    def _prune(self):
+        """移除已結束的行程；啟動器以 poll() 回收，避免留下 zombie"""
+        alive = set()
+        for pid in self.pids:
+            if self.process is not None and pid == self.process.pid:
+                if self.process.poll() is None:
+                    alive.add(pid)
+            elif pid_alive(pid):
+                alive.add(pid)
+        self.pids = alive
+
+    def _report_exit(self):
+        outcome = "exit" if self.expecting_exit else "crash"
+        pid = self.process.pid if self.process is not None else None
+        if outcome == "crash":
+            self.logger.warning(f"⚠️ VS Code 非預期結束（啟動器 PID: {pid}）")
+        else:
+            self.logger.debug(f"VS Code 已結束（啟動器 PID: {pid}）")
+        self.logger.event("vscode-exit", self.launched_at, time.monotonic(), outcome, pid=pid)
+        self.reset()
+        self.last_exit = outcome
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - VS Code 就緒偵測模組
+以實際可觀察的訊號判斷工作區何時可以開始操作，取代固定的啟動等待：
+- window：X11 視窗標題顯示專案資料夾（xdotool search，取得視窗 ID）
+- chat_panel：畫面上看得到 Copilot Chat 的 send 按鈕（經由 UI 驅動截圖比對）
+- marker：啟動工作（tasks.json 的 runOn: folderOpen）寫出的標記檔
+
+每個訊號只有在可用時才列入判斷（例如未安裝 xdotool 時略過 window）；
+所有訊號都不可用時退回原本的固定等待
+"""
+
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import sys
+
+# 導入配置和日誌
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from config.config import config
+    from src.logger import get_logger
+    from src.ui_driver import ui
+except ImportError:
+    from config import config
+    from logger import get_logger
+    from ui_driver import ui
+
+
+@dataclass
+class ReadinessResult:
+    """就緒偵測結果"""
+    ready: bool
+    elapsed: float                                  # 等待的秒數
+    signals: Dict[str, bool] = field(default_factory=dict)  # 最後一次檢查各訊號的結果
+    window_id: Optional[str] = None
+    fallback: bool = False                          # 沒有可用訊號，使用固定等待
+    reason: str = ""
+
+
+def title_shows_folder(title: str, folder_name: str) -> bool:
+    """
+    VS Code 視窗標題（預設格式「檔案 - 資料夾 - Visual Studio Code」）是否顯示指定資料夾
+
+    Args:
+        title: 視窗標題
+        folder_name: 資料夾名稱
+
+    Returns:
+        bool: 標題中以「 - 」分隔的某一段等於資料夾名稱
+    """
+    return folder_name in re.split(r"\s+[-—]\s+", title.strip())
+
+
+def marker_path(project_path: Path) -> Optional[Path]:
+    """
+    專案的就緒標記檔路徑（config.VSCODE_READY_MARKER_FILE，相對路徑以專案資料夾為基準）
+
+    Args:
+        project_path: 專案路徑
+
+    Returns:
+        Optional[Path]: 標記檔路徑，未設定時返回 None
+    """
+    if not config.VSCODE_READY_MARKER_FILE:
+        return None
+    marker = Path(config.VSCODE_READY_MARKER_FILE)
+    return marker if marker.is_absolute() else Path(project_path) / marker
+
+
+class ReadinessProbe:
+    """VS Code 工作區就緒偵測"""
+
+    def __init__(self, project_path: Path, is_running: Callable[[], bool] = None,
+                 checks: List[str] = None):
+        """
+        初始化就緒偵測
+
+        Args:
+            project_path: 專案路徑（視窗標題與標記檔以此判斷）
+            is_running: 檢查 VS Code 是否仍在執行的函數，結束時提早返回失敗
+            checks: 要使用的訊號，預設為 config.VSCODE_READY_CHECKS
+        """
+        self.logger = get_logger("ReadinessProbe")
+        self.project_path = Path(project_path)
+        self.is_running = is_running
+        self.checks = list(config.VSCODE_READY_CHECKS if checks is None else checks)
+        self.marker = marker_path(self.project_path)
+        self.window_id: Optional[str] = None
+
+    def clear_marker(self):
+        """啟動前刪除上一次留下的標記檔，避免誤判為已就緒"""
+        if self.marker is not None:
+            try:
+                self.marker.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.debug(f"無法刪除就緒標記檔 {self.marker}: {e}")
+
+    def available_checks(self) -> List[str]:
+        """
+        目前環境可用的訊號
+
+        Returns:
+            List[str]: 可用的訊號名稱
+        """
+        available = []
+        for check in self.checks:
+            if check == "window" and shutil.which("xdotool"):
+                available.append(check)
+            elif check == "chat_panel" and Path(config.SEND_BUTTON_IMAGE).exists():
+                available.append(check)
+            elif check == "marker" and self.marker is not None:
+                available.append(check)
+        return available
+
+    def check_window(self) -> bool:
+        """以 xdotool 尋找標題顯示專案資料夾的 VS Code 視窗，找到時記錄視窗 ID"""
+        name = self.project_path.name
+        pattern = f"{re.escape(name)}.*Visual Studio Code"
+        for window_id in _xdotool("search", "--onlyvisible", "--name", pattern).split():
+            title = _xdotool("getwindowname", window_id).strip()
+            if title_shows_folder(title, name):
+                self.window_id = window_id
+                return True
+        return False
+
+    def check_chat_panel(self) -> bool:
+        """畫面上是否看得到 Copilot Chat 的 send 按鈕"""
+        try:
+            return ui.locate_on_screen(str(config.SEND_BUTTON_IMAGE),
+                                       confidence=config.IMAGE_CONFIDENCE) is not None
+        except Exception as e:
+            self.logger.debug(f"截圖比對失敗: {e}")
+            return False
+
+    def check_marker(self) -> bool:
+        """啟動工作是否已寫出標記檔"""
+        return self.marker is not None and self.marker.exists()
+
+    def wait(self, timeout: float = None, interval: float = None) -> ReadinessResult:
+        """
+        等待所有可用訊號都成立
+
+        Args:
+            timeout: 最長等待秒數，預設為 config.VSCODE_STARTUP_TIMEOUT
+            interval: 檢查間隔秒數，預設為 config.VSCODE_READY_INTERVAL
+
+        Returns:
+            ReadinessResult: 就緒偵測結果
+        """
+        timeout = config.VSCODE_STARTUP_TIMEOUT if timeout is None else timeout
+        interval = config.VSCODE_READY_INTERVAL if interval is None else interval
+        start = ui.monotonic()
+        checks = self.available_checks()
+
+        if not checks:
+            # 沒有可觀察的訊號，沿用固定等待
+            ui.sleep(config.VSCODE_STARTUP_DELAY)
+            ready = self.is_running() if self.is_running else True
+            return ReadinessResult(ready, ui.monotonic() - start, fallback=True,
+                                   reason="" if ready else "VS Code 未在執行")
+
+        probes = {"window": self.check_window, "chat_panel": self.check_chat_panel,
+                  "marker": self.check_marker}
+        signals: Dict[str, bool] = {}
+        while True:
+            # 已成立的訊號不再重複檢查（截圖比對的成本較高）
+            for check in checks:
+                if not signals.get(check):
+                    signals[check] = probes[check]()
+            elapsed = ui.monotonic() - start
+            if all(signals.values()):
+                self.logger.info(f"✅ 工作區就緒（{elapsed:.1f} 秒）: {', '.join(checks)}")
+                return ReadinessResult(True, elapsed, dict(signals), self.window_id)
+            if self.is_running and not self.is_running():
+                return ReadinessResult(False, elapsed, dict(signals), self.window_id,
+                                       reason="VS Code 未在執行")
+            if elapsed >= timeout:
+                missing = [check for check, ok in signals.items() if not ok]
+                self.logger.warning(f"⚠️ {timeout} 秒內工作區未就緒，未成立的訊號: {', '.join(missing)}")
+                return ReadinessResult(False, elapsed, dict(signals), self.window_id,
+                                       reason=f"未成立: {', '.join(missing)}")
+            ui.sleep(interval)
+
+
+def _xdotool(*args: str) -> str:
+    """執行 xdotool，失敗時返回空字串"""
+    try:
+        result = subprocess.run(["xdotool", *args], capture_output=True, text=True, timeout=2)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout if result.returncode == 0 else ""
+
+
+def wait_for_workspace(project_path: Path, timeout: float = None,
+                       is_running: Callable[[], bool] = None) -> ReadinessResult:
+    """等待工作區就緒的便捷函數"""
+    return ReadinessProbe(project_path, is_running).wait(timeout)
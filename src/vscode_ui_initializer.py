@@ -4,7 +4,6 @@ Hybrid UI Automation Script - VS Code UI 初始化模組
 實作視窗最大化、關閉面板、重設UI狀態等功能
 """
 
-import pyautogui
 import time
 import sys
 from pathlib import Path
@@ -15,19 +14,25 @@ sys.path.append(str(Path(__file__).parent.parent))
 try:
     from config.config import config
     from src.logger import get_logger
+    from src.lazy_import import lazy_module
 except ImportError:
     try:
         from config import config
         from logger import get_logger
+        from lazy_import import lazy_module
     except ImportError:
         import sys
         sys.path.append(str(Path(__file__).parent.parent / "config"))
         import config
         from logger import get_logger
+        from lazy_import import lazy_module
 
-# 設定 pyautogui 安全機制
-pyautogui.FAILSAFE = config.FAILSAFE_ENABLED
-pyautogui.PAUSE = 0.1  # 每個 pyautogui 操作間的暫停時間
+def _configure_pyautogui(module):
+    """設定 pyautogui 安全機制（pyautogui 第一次載入時執行）"""
+    module.FAILSAFE = config.FAILSAFE_ENABLED
+    module.PAUSE = 0.1  # 每個 pyautogui 操作間的暫停時間
+
+pyautogui = lazy_module("pyautogui", on_load=_configure_pyautogui)
 
 class VSCodeUIInitializer:
     """VS Code UI 初始化器"""
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+測試背景工作佇列：先進先出、時間預算、指定工作優先執行、退避等待期間執行
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.background_work_queue import BackgroundWorkQueue
+from src.copilot_rate_limit_handler import RateLimitBackoff, ResponseFailure
+
+
+def test_fifo_and_failure_isolation():
+    """工作依排入順序執行，單一工作失敗不影響其他工作"""
+    queue = BackgroundWorkQueue()
+    order = []
+
+    def fail():
+        raise RuntimeError("boom")
+
+    queue.submit("cwe_scan", order.append, args=(1,), key="p1")
+    queue.submit("cwe_scan", fail, key="p1")
+    queue.submit("cwe_scan", order.append, args=(2,), key="p1")
+
+    assert queue.drain_all() == 3
+    assert order == [1, 2]
+    assert queue.failed_count == 1 and queue.completed_count == 2
+    print("✅ 先進先出且失敗不影響後續工作")
+
+
+def test_drain_respects_budget():
+    """預估耗時超過剩餘時間的工作不會開始"""
+    queue = BackgroundWorkQueue()
+    queue.submit("slow", time.sleep, args=(0.05,))
+    queue.drain_all()
+
+    queue.submit("slow", time.sleep, args=(0.05,))
+    assert queue.drain(0.01) == 0
+    assert len(queue) == 1
+    assert queue.drain(1) == 1
+    print("✅ 時間預算內才執行工作")
+
+
+def test_unmeasured_task_uses_conservative_estimate():
+    """尚未量測過的工作以保守預估判斷，短暫的閒置時段不會開始整個專案的基準掃描"""
+    queue = BackgroundWorkQueue()
+    done = []
+    queue.submit("baseline_scan", done.append, args=("p1",), key="p1")
+    assert queue.estimate("baseline_scan") == config.BACKGROUND_TASK_ESTIMATES["baseline_scan"]
+    assert queue.estimate("unknown") == config.BACKGROUND_TASK_DEFAULT_ESTIMATE
+    assert queue.drain(5) == 0 and not done
+
+    queue.drain_all()
+    queue.submit("baseline_scan", done.append, args=("p2",), key="p2")
+    assert queue.drain(5) == 1 and done == ["p1", "p2"]
+    print("✅ 未量測的工作使用保守預估")
+
+
+def test_run_matching_and_unique():
+    """指定類型與專案的工作可立即執行，unique 不重複排入"""
+    queue = BackgroundWorkQueue()
+    done = []
+    assert queue.submit("baseline_scan", done.append, args=("a",), key="a", unique=True)
+    assert not queue.submit("baseline_scan", done.append, args=("a",), key="a", unique=True)
+    queue.submit("baseline_scan", done.append, args=("b",), key="b", unique=True)
+
+    assert queue.run_matching("baseline_scan", "b") == 1
+    assert done == ["b"] and len(queue) == 1
+    print("✅ 指定專案的基準掃描可優先執行")
+
+
+def test_backoff_runs_background_work():
+    """退避等待期間應先執行背景工作，再睡眠剩餘時間"""
+    queue = BackgroundWorkQueue()
+    done = []
+    queue.submit("report", done.append, args=("report",))
+
+    slept = []
+    backoff = RateLimitBackoff(base_delays={"truncated": 2}, sleep=slept.append,
+                               on_idle=queue.drain)
+    delay = backoff.wait(ResponseFailure.TRUNCATED, 1, 1)
+    assert done == ["report"]
+    assert sum(slept) <= delay
+    print("✅ 退避等待期間執行了背景工作")
+
+
+if __name__ == "__main__":
+    test_fifo_and_failure_isolation()
+    test_drain_respects_budget()
+    test_unmeasured_task_uses_conservative_estimate()
+    test_run_matching_and_unique()
+    test_backoff_runs_background_work()
+    print("🎉 背景工作佇列測試通過")
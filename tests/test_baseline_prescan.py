@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+測試基準掃描：行程池平行掃描第0輪並寫入基準清單、延後掃描使用的檔案快照，
+以及只為尚未修改過的專案排入基準掃描
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.config import config
+from main import HybridUIAutomationScript
+from src.cwe_scan_manager import CWEScanManager
+from src.logger import add_event_listener, remove_event_listener
+from src.progress_checkpoint import checkpoint_path
+from src.project_manager import ProjectInfo
+
+PROMPT = "請幫我定位到app/views.py的load_file()的函式，並修改"
+
+
+def _make_project(root: Path, name: str) -> Path:
+    project = root / name
+    (project / "app").mkdir(parents=True)
+    (project / "app" / "views.py").write_text(
+        "def load_file(path):\n    return open(path).read()\n", encoding="utf-8"
+    )
+    return project
+
+
+def test_prescan_baselines_in_process_pool():
+    """多個專案的基準掃描應寫入第0輪 CSV 與基準清單"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        manager = CWEScanManager(root / "CWE_Result")
+        jobs = [
+            (_make_project(root, "p1"), "p1", [PROMPT]),
+            (_make_project(root, "p2"), "p2", [PROMPT]),
+            (_make_project(root, "p3"), "p3", ["沒有函式目標的提示詞"]),
+        ]
+
+        results = manager.prescan_baselines(jobs, "022", max_workers=2)
+        assert set(results) == {"p1", "p2"}, results
+        assert results["p1"]["file_hashes"].keys() == {"app/views.py"}
+
+        for name in ("p1", "p2"):
+            csv_file = root / "CWE_Result" / "CWE-022" / "Bandit" / name / "第0輪" / f"{name}_function_level_scan.csv"
+            assert csv_file.exists(), csv_file
+
+        manifest = json.loads((root / "CWE_Result" / "CWE-022" / "baseline_manifest.json").read_text(encoding="utf-8"))
+        assert set(manifest) == {"p1", "p2"}
+        print("✅ 平行基準掃描完成並寫入基準清單")
+
+
+def test_snapshot_prompt_targets():
+    """快照應只包含 prompt 指定的檔案並保留相對路徑"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        project = _make_project(root, "p1")
+        (project / "other.py").write_text("x = 1\n", encoding="utf-8")
+        manager = CWEScanManager(root / "CWE_Result")
+        events = []
+
+        snapshot = manager.snapshot_prompt_targets(project, PROMPT)
+        add_event_listener(events.append)
+        try:
+            # 快照資料夾與專案同名，原始報告檔名不含暫存資料夾名稱
+            assert snapshot.name == "p1"
+            assert (snapshot / "app" / "views.py").exists()
+            assert not (snapshot / "other.py").exists()
+        finally:
+            manager.scan_snapshot_function_level(snapshot, "p1", PROMPT, "022", round_number=1, line_number=1)
+            remove_event_listener(events.append)
+        assert not snapshot.exists() and not snapshot.parent.exists()
+        # 快照掃描只算一次 scan 階段（不與內部的函式級掃描重複計時）
+        assert [event["phase"] for event in events].count("scan") == 1
+        print("✅ 快照建立與掃描後清除正常")
+
+
+def test_schedule_skips_modified_projects():
+    """非待處理、保留未完成進度或已有第0輪結果的專案不重新排入基準掃描"""
+    saved = (config.EXECUTION_RESULT_DIR, config.RESUME_FROM_CHECKPOINT)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        type(config).EXECUTION_RESULT_DIR = root / "ExecutionResult"
+        type(config).RESUME_FROM_CHECKPOINT = True
+        try:
+            projects = [ProjectInfo(name, str(_make_project(root, name)))
+                        for name in ("fresh", "resumed", "baselined", "done")]
+            script = HybridUIAutomationScript()
+            script.cwe_scan_manager = CWEScanManager(root / "CWE_Result")
+            script.cwe_scan_settings = {"enabled": True, "cwe_type": "022"}
+            script.project_manager.get_all_pending_projects = lambda: projects[:3]
+            script._load_scan_prompt_lines = lambda project: [PROMPT]
+
+            checkpoint = checkpoint_path("resumed")
+            checkpoint.parent.mkdir(parents=True)
+            checkpoint.write_text(json.dumps({"rounds": {"1": {"1": {"status": "done"}}}}), encoding="utf-8")
+            baseline = root / "CWE_Result" / "CWE-022" / "Bandit" / "baselined" / "第0輪"
+            baseline.mkdir(parents=True)
+            (baseline / "baselined_function_level_scan.csv").write_text("", encoding="utf-8")
+
+            script._schedule_baseline_scans(projects)
+            assert [task.key for task in script.background_queue._tasks] == ["fresh"]
+        finally:
+            type(config).EXECUTION_RESULT_DIR, type(config).RESUME_FROM_CHECKPOINT = saved
+    print("✅ 只為尚未修改的專案排入基準掃描")
+
+
+if __name__ == "__main__":
+    test_prescan_baselines_in_process_pool()
+    test_snapshot_prompt_targets()
+    test_schedule_skips_modified_projects()
+    print("🎉 基準掃描測試通過")
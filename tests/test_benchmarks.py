@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+測試基準測試工具：合成專案可編譯且函式位置正確、CWE 掃描基準測試可輸出結果 JSON
+"""
+
+import json
+import py_compile
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.common import compare_results, time_call
+from benchmarks.synthetic_project import generate_project
+
+
+def test_synthetic_project():
+    """合成專案可編譯、漏洞數符合密度、記錄的漏洞行落在函式內"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = generate_project(Path(tmp), num_files=3, functions_per_file=5,
+                                   function_lines=4, vuln_density=0.4, seed=7)
+        for rel_path in project.files:
+            py_compile.compile(str(project.root / rel_path), doraise=True)
+
+        assert len(project.functions) == 15
+        assert len(project.vulnerable) == 6
+        for function in project.vulnerable:
+            lines = (project.root / function.file_path).read_text(encoding="utf-8").splitlines()
+            assert lines[function.start - 1].startswith(f"def {function.name}(")
+            assert function.start < function.vuln_line <= function.end
+            assert any(keyword in lines[function.vuln_line - 1]
+                       for keyword in ("hashlib", "eval", "shell=True", "tarfile"))
+
+        prompt_lines = project.prompt_lines(functions_per_line=2)
+        assert len(prompt_lines) == 9  # 每檔 5 個函式 → 3 行
+        assert prompt_lines[0].startswith("請幫我定位到pkg/module_0.py的handler_0_0()、handler_0_1()的函式")
+    print("✅ 合成專案正確")
+
+
+def test_time_call_and_compare():
+    """setup 的返回值傳給被計時函數；比較表格輸出比值"""
+    calls = []
+    stats = time_call(lambda value: calls.append(value) or value, repeat=3,
+                      setup=lambda: len(calls), warmup=1)
+    assert stats["runs"] == 3 and calls == [0, 1, 2, 3] and stats["result"] == 3
+
+    baseline = {"results": {"case": {"median": 2.0}}}
+    current = {"results": {"case": {"median": 1.0}, "new_case": {"median": 0.5}}}
+    table = compare_results(baseline, current)
+    assert "0.50x" in table and "new_case" in table
+    print("✅ 計時與比較正確")
+
+
+def test_cwe_scan_benchmark_writes_results():
+    """小型合成專案執行 CWE 掃描基準測試，結果 JSON 包含所有案例"""
+    from benchmarks.bench_cwe_scan import main
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "result.json"
+        assert main(["--files", "2", "--functions", "3", "--density", "0.5",
+                     "--cwes", "327", "--repeat", "1", "--output", str(output)]) == 0
+        data = json.loads(output.read_text(encoding="utf-8"))
+
+    results = data["results"]
+    assert data["benchmark"] == "cwe_scan" and data["meta"]["params"]["files"] == 2
+    assert results["extract_function_info"]["matched"] == 6
+    assert results["aggregate_by_function"]["input"] == 3 * 6
+    assert {"scan_single_file[CWE-327]", "scan_project",
+            "scan_from_prompt_function_level[CWE-327]"} <= set(results)
+    assert results["scan_from_prompt_function_level[CWE-327]"]["succeeded"] == 2
+    print("✅ CWE 掃描基準測試輸出正確")
+
+
+if __name__ == "__main__":
+    test_synthetic_project()
+    test_time_call_and_compare()
+    test_cwe_scan_benchmark_writes_results()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+測試 Chat 匯出掛鉤：從 VS Code Chat 工作階段匯出完成的回應，並由回應擷取通道讀取
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chat_export_hook import ChatSessionExportHook, response_text
+from src.response_capture import ResponseExportReader
+
+
+def _write_session(session_file: Path, requests):
+    """模擬 VS Code 儲存工作階段（每次寫入都更新 mtime）"""
+    session_file.parent.mkdir(parents=True, exist_ok=True)
+    session_file.write_text(json.dumps({"version": 3, "requests": requests}, ensure_ascii=False),
+                            encoding="utf-8")
+    stamp = time.time() + len(requests)
+    os.utime(session_file, (stamp, stamp))
+
+
+def _request(request_id, text, done=True):
+    request = {"requestId": request_id, "message": {"text": "提示詞"},
+               "response": [{"value": text}, {"kind": "inlineReference", "name": "a.py"}]}
+    if done:
+        request["result"] = {"timings": {"totalElapsed": 1000}}
+    return request
+
+
+def test_response_text():
+    """只組合 markdown 片段"""
+    parts = [{"value": "第一段"}, {"kind": "codeblockUri"},
+             {"kind": "markdownContent", "content": {"value": "第二段"}}]
+    assert response_text(parts) == "第一段第二段"
+    assert response_text(None) == ""
+    print("✅ 回應片段組合正確")
+
+
+def test_export_completed_responses():
+    """啟動前的舊回應不匯出；新完成的回應寫入匯出目錄並被讀取端讀到"""
+    with tempfile.TemporaryDirectory() as tmp:
+        user_data_dir, export_dir = Path(tmp) / "vscode", Path(tmp) / "export"
+        session_file = user_data_dir / "User" / "workspaceStorage" / "abc" / "chatSessions" / "s1.json"
+        _write_session(session_file, [_request("old", "舊回應")])
+
+        hook = ChatSessionExportHook(user_data_dir, export_dir)
+        reader = ResponseExportReader(export_dir, poll_interval=0.01)
+        assert hook.poll() == 0
+        sent_at = reader.mark_request_sent()
+
+        # 回應進行中尚未完成，不匯出
+        _write_session(session_file, [_request("old", "舊回應"), _request("r2", "進行中", done=False)])
+        assert hook.poll() == 0
+        assert not list(export_dir.glob("*.json"))
+
+        _write_session(session_file, [_request("old", "舊回應"), _request("r2", "新回應\n已完成回答")])
+        assert hook.poll() == 1
+        assert hook.poll() == 0
+        assert not list(export_dir.glob("*.tmp"))
+        assert reader.wait_for_response(timeout=1, since=sent_at) == "新回應\n已完成回答"
+    print("✅ 匯出完成的回應正確")
+
+
+if __name__ == "__main__":
+    test_response_text()
+    test_export_completed_responses()
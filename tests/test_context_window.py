@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+測試串接上下文視窗：預算內不變、先捨棄說明文字再捨棄舊程式碼、只保留結尾、長度不隨輪數成長
+"""
+
+import sys
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.context_window import ContextWindowManager
+
+
+def _code(name: str, lines: int) -> str:
+    body = "\n".join(f"    x_{name}_{i} = {i}" for i in range(lines))
+    return f"```python\ndef {name}():\n{body}\n```"
+
+
+def test_within_budget_unchanged():
+    """未超過預算時原樣串接"""
+    manager = ContextWindowManager(max_chars=1000)
+    prompt, window = manager.build_prompt("上一個回應\n", "修改 a.py")
+    assert prompt == "上一個回應\n修改 a.py"
+    assert not window.was_trimmed and window.summary() == ""
+    print("✅ 預算內不裁剪")
+
+
+def test_drop_prose_before_code():
+    """先捨棄說明文字，程式碼區塊完整保留並留下省略標記"""
+    context = "\n\n".join(["說明" * 200, _code("foo", 5), "補充" * 200, _code("bar", 5)])
+    manager = ContextWindowManager(max_chars=600)
+    prompt, window = manager.build_prompt(context, "修改 b.py")
+    assert len(prompt) <= 600
+    assert _code("foo", 5) in prompt and _code("bar", 5) in prompt
+    assert "說明說明" not in prompt and "已省略" in prompt
+    assert [s.kind for s in window.elided] == ["prose", "prose"]
+    print("✅ 優先捨棄說明文字")
+
+
+def test_drop_old_code_then_keep_tail():
+    """說明文字不夠時捨棄舊程式碼區塊；最後一個區塊仍過大時只保留結尾"""
+    context = "\n\n".join([_code("old", 40), "說明", _code("new", 40)])
+    manager = ContextWindowManager(max_chars=900)
+    prompt, window = manager.build_prompt(context, "繼續")
+    assert len(prompt) <= 900
+    assert "def old" not in prompt and "x_new_39" in prompt
+    assert [s.kind for s in window.elided] == ["prose", "code"]
+
+    small = ContextWindowManager(max_chars=300)
+    prompt, window = small.build_prompt(context, "繼續")
+    assert len(prompt) <= 300 and prompt.endswith("```\n繼續")
+    assert window.elided[-1].kind == "head" and "已省略前" in prompt
+    print("✅ 捨棄舊程式碼並保留結尾")
+
+
+def test_length_stays_flat_when_chaining():
+    """回應不斷重複先前內容時，送出的提示詞長度維持在預算內"""
+    manager = ContextWindowManager(max_chars=2000)
+    accumulated = ""
+    for line in range(1, 30):
+        prompt, _ = manager.build_prompt(accumulated, f"第 {line} 行提示詞") if accumulated else (f"第 {line} 行提示詞", None)
+        assert len(prompt) <= 2000
+        # 模擬回應：重複整個提示詞再加上新的程式碼
+        accumulated = f"{prompt}\n\n說明第 {line} 行的修改\n\n{_code(f'f{line}', 8)}"
+    print("✅ 串接提示詞長度不隨行數成長")
+
+
+if __name__ == "__main__":
+    test_within_budget_unchanged()
+    test_drop_prose_before_code()
+    test_drop_old_code_then_keep_tail()
+    test_length_stays_flat_when_chaining()
+    print("🎉 上下文視窗測試通過")
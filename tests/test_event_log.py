@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+測試階段事件檔：事件欄位與 context、timed_phase 的結果判定、事件統計的百分位數
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.event_stats import percentile, read_events, summarize
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _run_events(code: str, logs_dir: Path) -> list:
+    """在獨立行程中執行（事件檔為行程共用），返回寫出的事件"""
+    prelude = (
+        "from pathlib import Path\n"
+        "from config.config import config\n"
+        f"type(config).LOGS_DIR = Path({str(logs_dir)!r})\n"
+        "from src.logger import get_logger, event_context, timed_phase, shutdown_logging\n"
+    )
+    result = subprocess.run([sys.executable, "-c", prelude + code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    files = list(logs_dir.glob("events_*.jsonl"))
+    assert len(files) == 1, files
+    return [json.loads(line) for line in files[0].read_text(encoding="utf-8").splitlines()]
+
+
+def test_phase_event_with_context():
+    """phase 事件帶有 context 欄位、單調時鐘起訖與耗時"""
+    with tempfile.TemporaryDirectory() as tmp:
+        events = _run_events(
+            "logger = get_logger('Tester')\n"
+            "with event_context(project='demo', round=2):\n"
+            "    with logger.phase('send', line=3):\n"
+            "        pass\n"
+            "    with logger.phase('wait', line=3) as details:\n"
+            "        details['outcome'] = 'timeout'\n"
+            "with logger.phase('scan'):\n"
+            "    pass\n",
+            Path(tmp)
+        )
+        assert [e["phase"] for e in events] == ["send", "wait", "scan"]
+        send, wait, scan = events
+        assert send["project"] == "demo" and send["round"] == 2 and send["line"] == 3
+        assert send["source"] == "Tester" and send["outcome"] == "ok"
+        assert send["end"] >= send["start"] and send["duration"] >= 0
+        assert wait["outcome"] == "timeout"
+        assert "project" not in scan
+        print("✅ 階段事件與 context 正確")
+
+
+def test_timed_phase_outcomes():
+    """返回值為假時 failed、拋出例外時 error，參數中的專案資訊會寫入事件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        events = _run_events(
+            "class Worker:\n"
+            "    def __init__(self):\n"
+            "        self.logger = get_logger('Worker')\n"
+            "    @timed_phase('copy')\n"
+            "    def copy(self, ok):\n"
+            "        return (ok, 'text')\n"
+            "    @timed_phase('scan')\n"
+            "    def scan(self, project_name=None, round_number=None, line_number=None):\n"
+            "        raise RuntimeError('boom')\n"
+            "worker = Worker()\n"
+            "worker.copy(True)\n"
+            "worker.copy(False)\n"
+            "try:\n"
+            "    worker.scan(project_name='p1', round_number=1, line_number=4)\n"
+            "except RuntimeError:\n"
+            "    pass\n",
+            Path(tmp)
+        )
+        assert [(e["phase"], e["outcome"]) for e in events] == [
+            ("copy", "ok"), ("copy", "failed"), ("scan", "error")
+        ]
+        assert events[0]["source"] == "Worker"
+        assert events[2]["project"] == "p1" and events[2]["line"] == 4
+        print("✅ timed_phase 結果判定正確")
+
+
+def test_event_stats_percentiles():
+    """百分位數線性內插、略過損壞的行、依專案分組"""
+    assert percentile([1.0], 99) == 1.0
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+    assert abs(percentile([1.0, 2.0, 3.0, 4.0, 5.0], 90) - 4.6) < 1e-9
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "events_test.jsonl"
+        lines = [json.dumps({"phase": "wait", "project": "a", "duration": d, "outcome": "ok"})
+                 for d in (1, 2, 3, 4)]
+        lines.append(json.dumps({"phase": "wait", "project": "b", "duration": 10, "outcome": "timeout"}))
+        lines.append('{"phase": "send", "dura')  # 中斷時寫到一半的行
+        path.write_text("\n".join(lines), encoding="utf-8")
+
+        stats = summarize(read_events([path]))
+        assert list(stats) == [("", "wait")]
+        wait = stats[("", "wait")]
+        assert wait["count"] == 5 and wait["failed"] == 1 and wait["max"] == 10
+        assert wait["p50"] == 3
+
+        by_project = summarize(read_events([path]), by="project")
+        assert by_project[("a", "wait")]["count"] == 4
+        assert by_project[("b", "wait")]["failed"] == 1
+    print("✅ 事件統計正確")
+
+
+if __name__ == "__main__":
+    test_phase_event_with_context()
+    test_timed_phase_outcomes()
+    test_event_stats_percentiles()
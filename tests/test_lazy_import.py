@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+測試延遲載入：匯入主程式與各模組時不載入 pyautogui / cv2 / psutil，也不建立全域實例
+"""
+
+import json
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.lazy_import import LazyInstance, lazy_module
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def test_import_has_no_side_effects():
+    """在獨立行程中匯入主程式與各模組，確認沒有載入重量級套件、沒有建立全域實例"""
+    code = """
+import json, sys
+import main
+from src import copilot_handler, cwe_scan_manager, error_handler, image_recognition, project_manager, vscode_controller
+heavy = [name for name in ("pyautogui", "cv2", "numpy", "psutil", "bandit") if name in sys.modules]
+instances = {
+    "copilot_handler": copilot_handler.copilot_handler.is_initialized,
+    "cwe_scan_manager": cwe_scan_manager.cwe_scan_manager.is_initialized,
+    "error_handler": error_handler.error_handler.is_initialized,
+    "image_recognition": image_recognition.image_recognition.is_initialized,
+    "project_manager": project_manager.project_manager.is_initialized,
+    "vscode_controller": vscode_controller.vscode_controller.is_initialized,
+}
+print(json.dumps({"heavy": heavy, "instances": instances}))
+"""
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    assert data["heavy"] == [], data["heavy"]
+    assert not any(data["instances"].values()), data["instances"]
+    print("✅ 匯入時沒有載入重量級套件或建立全域實例")
+
+
+def test_lazy_instance_created_once():
+    """第一次存取屬性時才建立，之後共用同一個實例；屬性設定轉給實際物件"""
+    created = []
+
+    class Service:
+        def __init__(self):
+            created.append(self)
+            self.value = 1
+
+    service = LazyInstance(Service)
+    assert not service.is_initialized and created == []
+    assert service.value == 1
+    service.value = 2
+    assert service.get().value == 2 and len(created) == 1
+    print("✅ 全域實例延遲建立")
+
+
+def test_lazy_module_and_load_hook():
+    """模組在第一次存取時匯入，載入設定只執行一次；不存在的模組在使用時才報錯"""
+    sys.modules.pop("colorsys", None)
+    calls = []
+    proxy = lazy_module("colorsys", on_load=calls.append)
+    assert isinstance(proxy, types.ModuleType) and calls == []
+    assert proxy.rgb_to_hsv(1.0, 0.0, 0.0)[0] == 0.0
+    assert len(calls) == 1 and calls[0] is sys.modules["colorsys"]
+    assert lazy_module("colorsys") is sys.modules["colorsys"]
+
+    missing = lazy_module("module_that_does_not_exist")
+    try:
+        missing.anything
+        assert False, "應拋出 ImportError"
+    except ImportError:
+        pass
+    print("✅ 模組延遲匯入")
+
+
+if __name__ == "__main__":
+    test_import_has_no_side_effects()
+    test_lazy_instance_created_once()
+    test_lazy_module_and_load_hook()
+    print("🎉 延遲載入測試通過")
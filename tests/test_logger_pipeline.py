@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+測試共用日誌管線：同名稱共用記錄器、只開啟一個日誌檔、exc_info 傳遞、依大小輪替、fork 子行程的日誌
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _run(code: str, logs_dir: Path, max_bytes: int = 10 * 1024 * 1024) -> str:
+    """在獨立行程中執行（日誌管線為行程共用），日誌寫到暫存資料夾"""
+    prelude = (
+        "from pathlib import Path\n"
+        "from config.config import config\n"
+        f"type(config).LOGS_DIR = Path({str(logs_dir)!r})\n"
+        f"config.LOG_MAX_BYTES = {max_bytes}\n"
+        "config.LOG_BACKUP_COUNT = 2\n"
+        "from src.logger import get_logger, shutdown_logging\n"
+    )
+    result = subprocess.run([sys.executable, "-c", prelude + code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_shared_pipeline_and_exc_info():
+    """多個模組的記錄器寫入同一個檔案，exc_info 會輸出 traceback"""
+    with tempfile.TemporaryDirectory() as tmp:
+        logs_dir = Path(tmp)
+        _run(
+            "a = get_logger('ModuleA')\n"
+            "assert a is get_logger('ModuleA')\n"
+            "for name in ('ModuleB', 'ModuleC', 'ModuleD'):\n"
+            "    get_logger(name).info(f'hello from {name}')\n"
+            "try:\n"
+            "    1 / 0\n"
+            "except ZeroDivisionError:\n"
+            "    a.error('計算失敗', exc_info=True)\n"
+            "shutdown_logging()\n",
+            logs_dir
+        )
+        log_files = list(logs_dir.glob("*.log"))
+        assert len(log_files) == 1, log_files
+        content = log_files[0].read_text(encoding="utf-8")
+        assert " - ModuleB - INFO - hello from ModuleB" in content
+        assert "ZeroDivisionError" in content
+        assert content.count("日誌系統初始化完成") == 1
+        print("✅ 共用日誌管線與 exc_info 正確")
+
+
+def test_rotation_by_size():
+    """超過大小上限時輪替，保留的檔案數受限"""
+    with tempfile.TemporaryDirectory() as tmp:
+        logs_dir = Path(tmp)
+        _run(
+            "logger = get_logger('Rotation')\n"
+            "for i in range(400):\n"
+            "    logger.debug('x' * 100)\n"
+            "shutdown_logging()\n",
+            logs_dir, max_bytes=8 * 1024
+        )
+        names = sorted(p.name for p in logs_dir.iterdir())
+        assert len(names) == 3 and any(name.endswith(".log.2") for name in names), names
+        print("✅ 日誌依大小輪替")
+
+
+def test_forked_child_logs_written():
+    """fork 的子行程直接寫入同一個日誌檔，結束時不會遺失訊息"""
+    with tempfile.TemporaryDirectory() as tmp:
+        logs_dir = Path(tmp)
+        _run(
+            "import os\n"
+            "logger = get_logger('Parent')\n"
+            "logger.info('before fork')\n"
+            "pid = os.fork()\n"
+            "if pid == 0:\n"
+            "    get_logger('Child').info('from child')\n"
+            "    os._exit(0)\n"
+            "os.waitpid(pid, 0)\n"
+            "logger.info('after fork')\n"
+            "shutdown_logging()\n",
+            logs_dir
+        )
+        content = next(logs_dir.glob("*.log")).read_text(encoding="utf-8")
+        assert "from child" in content and "after fork" in content
+        print("✅ fork 子行程的日誌已寫入")
+
+
+if __name__ == "__main__":
+    test_shared_pipeline_and_exc_info()
+    test_rotation_by_size()
+    test_forked_child_logs_written()
+    print("🎉 日誌管線測試通過")
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+測試平行工作模式的環境準備：worker user-data-dir、虛擬顯示器啟動失敗處理
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.parallel_workers import VirtualDisplay, prepare_user_data_dir
+
+
+def test_prepare_user_data_dir_from_template():
+    """首次建立 worker 目錄時應從範本複製，並略過快取與 lock 檔"""
+    original_root = config.PARALLEL_USER_DATA_ROOT
+    original_template = config.PARALLEL_USER_DATA_TEMPLATE
+    with tempfile.TemporaryDirectory() as tmp:
+        template = Path(tmp) / "template"
+        (template / "User").mkdir(parents=True)
+        (template / "User" / "settings.json").write_text("{}", encoding="utf-8")
+        (template / "CachedData").mkdir()
+        (template / "code.lock").write_text("", encoding="utf-8")
+        try:
+            config.PARALLEL_USER_DATA_ROOT = Path(tmp) / "workers"
+            config.PARALLEL_USER_DATA_TEMPLATE = template
+
+            user_data_dir = prepare_user_data_dir(2)
+            assert user_data_dir == Path(tmp) / "workers" / "worker-2"
+            assert (user_data_dir / "User" / "settings.json").exists()
+            assert not (user_data_dir / "CachedData").exists()
+            assert not (user_data_dir / "code.lock").exists()
+            print("✅ worker user-data-dir 由範本建立")
+        finally:
+            config.PARALLEL_USER_DATA_ROOT = original_root
+            config.PARALLEL_USER_DATA_TEMPLATE = original_template
+
+
+def test_virtual_display_missing_executable():
+    """找不到 Xvfb 時應回傳 False 而非拋出例外"""
+    original = config.PARALLEL_XVFB_EXECUTABLE
+    try:
+        config.PARALLEL_XVFB_EXECUTABLE = "/nonexistent/Xvfb"
+        display = VirtualDisplay(987)
+        assert display.name == ":987"
+        assert not display.start(timeout=1)
+        print("✅ 缺少 Xvfb 時正確回報失敗")
+    finally:
+        config.PARALLEL_XVFB_EXECUTABLE = original
+
+
+if __name__ == "__main__":
+    test_prepare_user_data_dir_from_template()
+    test_virtual_display_missing_executable()
+    print("🎉 平行工作模式測試通過")
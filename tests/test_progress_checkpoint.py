@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+測試逐行進度檢查點：續跑行號、回應雜湊驗證、提示詞變更時作廢、清理時保留未完成專案
+"""
+
+import sys
+import tempfile
+import threading
+from functools import partial
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.progress_checkpoint import RESPONSE_MARKER, ProgressCheckpoint
+from src.response_writer import ResponseWriter
+
+PROMPTS = ["修改 a.py 的 foo()", "修改 b.py 的 bar()", "修改 c.py 的 baz()"]
+
+
+def _write_response(directory: Path, round_number: int, line_number: int, response: str) -> Path:
+    path = directory / f"第{round_number}輪" / f"20250101_000000_第{line_number}行.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# header\n\n## 第 {line_number} 行原始提示詞\n\nprompt\n\n{RESPONSE_MARKER}{response}",
+                    encoding="utf-8")
+    return path
+
+
+def test_resume_position_and_reload():
+    """記錄後重新載入，下一行與輪數完成狀態正確"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "demo" / "progress_checkpoint.json"
+        checkpoint = ProgressCheckpoint("demo", PROMPTS, path=path)
+        assert checkpoint.next_line(1) == 1 and not checkpoint.has_progress
+
+        for line in (1, 2, 3):
+            checkpoint.record_line(1, line, f"r{line}", _write_response(path.parent, 1, line, f"r{line}"))
+        checkpoint.record_line(2, 1, "r2-1", _write_response(path.parent, 2, 1, "r2-1"))
+        checkpoint.mark_scan(2, 1, "deferred")
+
+        reloaded = ProgressCheckpoint("demo", PROMPTS, path=path)
+        assert reloaded.is_round_complete(1)
+        assert reloaded.next_line(2) == 2
+        assert reloaded.load_response(2, 1) == "r2-1"
+        assert reloaded.unscanned_lines() == ["第1輪第1行", "第1輪第2行", "第1輪第3行", "第2輪第1行"]
+        print("✅ 續跑位置與重新載入正確")
+
+
+def test_tampered_response_and_rerecord():
+    """回應檔案被修改時無法讀回；重做某行會清除其後的舊記錄"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "demo" / "progress_checkpoint.json"
+        checkpoint = ProgressCheckpoint("demo", PROMPTS, path=path)
+        for line in (1, 2, 3):
+            checkpoint.record_line(1, line, f"r{line}", _write_response(path.parent, 1, line, f"r{line}"))
+
+        _write_response(path.parent, 1, 2, "被修改的內容")
+        assert checkpoint.load_response(1, 2) is None
+
+        checkpoint.record_line(1, 2, "new", _write_response(path.parent, 1, 2, "new"))
+        assert checkpoint.next_line(1) == 3
+        print("✅ 回應雜湊驗證與重做正確")
+
+
+def test_prompt_change_discards_progress():
+    """提示詞變更後舊進度作廢"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "demo" / "progress_checkpoint.json"
+        checkpoint = ProgressCheckpoint("demo", PROMPTS, path=path)
+        checkpoint.record_line(1, 1, "r1", None)
+
+        changed = ProgressCheckpoint("demo", PROMPTS + ["新增的一行"], path=path)
+        assert not changed.has_progress and changed.next_line(1) == 1
+        print("✅ 提示詞變更時捨棄舊進度")
+
+
+def test_finished_checkpoint_starts_fresh():
+    """上一次已全部完成的檢查點不再沿用，重新執行時從第1行開始"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "demo" / "progress_checkpoint.json"
+        checkpoint = ProgressCheckpoint("demo", PROMPTS, path=path)
+        for line in (1, 2, 3):
+            checkpoint.record_line(1, line, f"r{line}", _write_response(path.parent, 1, line, f"r{line}"))
+        checkpoint.mark_finished()
+
+        rerun = ProgressCheckpoint("demo", PROMPTS, path=path)
+        assert not rerun.has_progress and not rerun.is_round_complete(1)
+        assert rerun.next_line(1) == 1
+        print("✅ 已完成的檢查點重新開始正確")
+
+
+def test_scan_status_before_background_write():
+    """背景寫入時掃描狀態先於 record_line 更新，記錄建立後仍保留該狀態"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "demo" / "progress_checkpoint.json"
+        checkpoint = ProgressCheckpoint("demo", PROMPTS, path=path)
+        writer = ResponseWriter(fsync_policy="never", background=True)
+        release = threading.Event()
+        # 第一個寫入的回呼擋住寫入執行緒，確保 mark_scan 先執行
+        writer.write(path.parent / "blocker.md", b"", on_written=lambda _: release.wait(5))
+        for line, status in ((1, "done"), (2, "deferred")):
+            response = f"r{line}"
+            data = f"header\n{RESPONSE_MARKER}{response}".encode("utf-8")
+            writer.write(path.parent / "第1輪" / f"第{line}行.md", data,
+                         on_written=partial(checkpoint.record_line, 1, line, response))
+            checkpoint.mark_scan(1, line, status)
+        assert not checkpoint.has_progress
+
+        release.set()
+        assert writer.flush()
+        writer.close()
+        reloaded = ProgressCheckpoint("demo", PROMPTS, path=path)
+        assert reloaded.next_line(1) == 3 and reloaded.load_response(1, 2) == "r2"
+        assert reloaded.unscanned_lines() == ["第1輪第2行"]
+        print("✅ 背景寫入時的掃描狀態正確")
+
+
+if __name__ == "__main__":
+    test_resume_position_and_reload()
+    test_tampered_response_and_rerecord()
+    test_prompt_change_discards_progress()
+    test_finished_checkpoint_starts_fresh()
+    test_scan_status_before_background_write()
+    print("🎉 進度檢查點測試通過")
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+測試專案工作佇列：原子領取、租約續約與到期收回、結果寫回 automation_status.json 語意
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.project_manager import ProjectInfo, ProjectManager
+from src.project_queue import LeaseHeartbeat, SQLiteProjectQueue
+
+
+def _make_projects(count: int):
+    return [ProjectInfo(name=f"project_{i}", path=f"/tmp/project_{i}") for i in range(count)]
+
+
+def test_claims_are_exclusive():
+    """多個執行緒同時領取時，每個專案只會被領取一次"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SQLiteProjectQueue(Path(tmp) / "queue.db")
+        assert queue.enqueue(_make_projects(20)) == 20
+        assert queue.enqueue(_make_projects(20)) == 0  # 重複加入不影響
+
+        claimed = []
+        lock = threading.Lock()
+
+        def worker(worker_id):
+            while True:
+                item = SQLiteProjectQueue(Path(tmp) / "queue.db").claim(f"w{worker_id}", lease_seconds=60)
+                if item is None:
+                    return
+                with lock:
+                    claimed.append(item.name)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(claimed) == sorted(p.name for p in _make_projects(20))
+        assert queue.counts() == {"processing": 20}
+        print("✅ 專案領取具排他性")
+
+
+def test_expired_lease_is_reclaimed():
+    """租約到期的專案回到待處理，原 worker 的結果不再被接受；超過次數則標記失敗"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SQLiteProjectQueue(Path(tmp) / "queue.db", max_attempts=2)
+        queue.enqueue(_make_projects(1))
+
+        first = queue.claim("host-a", lease_seconds=0.05)
+        time.sleep(0.1)
+        assert queue.reclaim_expired() == 1
+        assert not queue.heartbeat(first.name, "host-a")
+        assert not queue.complete(first.name, "host-a", True)
+
+        second = queue.claim("host-b", lease_seconds=0.05)
+        assert second.name == first.name and second.attempts == 2
+        time.sleep(0.1)
+        assert queue.claim("host-c") is None  # 第二次到期即超過上限
+        item = queue.get_items()[0]
+        assert item.status == "failed" and "host-b" in item.error_message
+        print("✅ 到期租約收回與次數上限正確")
+
+
+def test_heartbeat_keeps_lease():
+    """心跳執行緒持續續約時專案不會被收回"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SQLiteProjectQueue(Path(tmp) / "queue.db")
+        queue.enqueue(_make_projects(1))
+        item = queue.claim("host-a", lease_seconds=0.3)
+        with LeaseHeartbeat(queue, item.name, "host-a", lease_seconds=0.3) as heartbeat:
+            time.sleep(0.8)
+            assert queue.reclaim_expired() == 0
+        assert not heartbeat.lost.is_set()
+        assert queue.complete(item.name, "host-a", True, processing_time=1.5)
+        print("✅ 心跳續約正確")
+
+
+def test_sync_to_project_manager():
+    """佇列結果寫回 ProjectManager，並沿用失敗時累加 retry_count 的語意"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "projects"
+        for name in ("alpha", "beta", "gamma"):
+            (root / name).mkdir(parents=True)
+            (root / name / "main.py").write_text("print('hi')\n", encoding="utf-8")
+        manager = ProjectManager(root)
+        manager.scan_projects()
+
+        queue = SQLiteProjectQueue(Path(tmp) / "queue.db")
+        queue.enqueue(manager.projects)
+        queue.set_options({"use_smart_wait": False})
+        assert queue.get_options() == {"use_smart_wait": False}
+
+        a = queue.claim("host-a")
+        b = queue.claim("host-b")
+        queue.complete(a.name, "host-a", True, processing_time=12.0)
+        queue.complete(b.name, "host-b", False, error_message="處理失敗", processing_time=3.0)
+
+        assert manager.sync_from_queue(queue) == 2
+        assert manager.sync_from_queue(queue) == 0  # 沒有新變動
+        assert manager.get_project_by_name(a.name).status == "completed"
+        failed = manager.get_project_by_name(b.name)
+        assert failed.status == "failed" and failed.retry_count == 1
+        assert manager.get_project_by_name("gamma").status == "pending"
+
+        # 失敗的專案重新提交時視為重試
+        assert queue.enqueue(manager.projects) == 1
+        assert queue.claim("host-c").name == b.name
+        print("✅ 佇列狀態寫回 automation_status.json")
+
+
+if __name__ == "__main__":
+    test_claims_are_exclusive()
+    test_expired_lease_is_reclaimed()
+    test_heartbeat_keeps_lease()
+    test_sync_to_project_manager()
+    print("🎉 專案工作佇列測試通過")
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+測試專案檔案掃描：單次走訪分類、預設略過目錄、.gitignore 規則、manifest 快取失效
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.project_manager import ProjectInfo, ProjectManager
+from src.project_scanner import ProjectScanner, parse_gitignore
+
+
+def _touch(path: Path, content: str = ""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def _build_project(root: Path):
+    _touch(root / "main.py")
+    _touch(root / "lib" / "util.c")
+    _touch(root / "lib" / "util.h")
+    _touch(root / "lib" / "impl.c++")
+    _touch(root / "README.md")
+    _touch(root / ".git" / "hooks" / "hook.py")
+    _touch(root / "node_modules" / "pkg" / "index.go")
+    _touch(root / "env" / "pyvenv.cfg")
+    _touch(root / "env" / "lib" / "site.py")
+    _touch(root / "build" / "gen.py")
+    _touch(root / "lib" / "generated_1.py")
+    _touch(root / "lib" / "keep_generated.py")
+    _touch(root / ".gitignore", "# 註解\n/build/\ngenerated_*.py\n!keep_*.py\n")
+
+
+def test_single_walk_classification():
+    """只回傳支援的副檔名，並略過 VCS、相依套件、虛擬環境與 .gitignore 排除的檔案"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "demo"
+        _build_project(root)
+        _touch(root / "lib" / "keep_generated.py")
+        _touch(root / "lib" / ".gitignore", "keep_generated.py\n")
+
+        scanner = ProjectScanner(ProjectManager.SUPPORTED_EXTENSIONS)
+        manifest = scanner.walk(root)
+        assert manifest.files == ["lib/impl.c++", "lib/util.c", "lib/util.h", "main.py"]
+        print("✅ 單次走訪分類與略過規則正確")
+
+
+def test_gitignore_patterns():
+    """錨定、目錄限定、** 與否定規則"""
+    rules = parse_gitignore("/root_only.py\nbuild/\n**/tmp/*.py\n*.py\n!keep.py\n")
+
+    def ignored(path, is_dir=False):
+        result = False
+        for rule in rules:
+            if rule.matches(path, is_dir):
+                result = not rule.negate
+        return result
+
+    assert ignored("root_only.py")
+    assert ignored("a/b/tmp/x.py")
+    assert ignored("build", is_dir=True)
+    assert not ignored("build")  # 目錄限定規則不套用在檔案
+    assert not ignored("src/keep.py")
+    print("✅ .gitignore 規則解析正確")
+
+
+def test_manifest_cache_invalidation():
+    """未變動時使用快取；新增檔案或修改 .gitignore 後重新掃描"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "demo"
+        _build_project(root)
+        scanner = ProjectScanner(ProjectManager.SUPPORTED_EXTENSIONS, cache_dir=Path(tmp) / "cache")
+
+        first = scanner.scan(root)
+        assert not first.from_cache
+        second = scanner.scan(root)
+        assert second.from_cache and second.files == first.files
+
+        _touch(root / "lib" / "deep" / "new.go")
+        third = scanner.scan(root)
+        assert not third.from_cache and "lib/deep/new.go" in third.files
+
+        gitignore = root / ".gitignore"
+        gitignore.write_text("*.go\n", encoding="utf-8")
+        stat = gitignore.stat()
+        os.utime(gitignore, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        fourth = scanner.scan(root)
+        assert not fourth.from_cache and "lib/deep/new.go" not in fourth.files
+        print("✅ manifest 快取依 mtime 失效")
+
+
+def test_project_info_lazy_files():
+    """ProjectInfo 只保存數量與 manifest 參照，檔案清單在存取時才讀取；舊版狀態欄位被忽略"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "projects"
+        _build_project(root / "demo")
+        manager = ProjectManager(root)
+        project = manager.scan_projects()[0]
+
+        data = project.to_dict()
+        assert "supported_files" not in data and data["file_count"] == 5
+        assert Path(data["manifest_path"]).exists()
+
+        data["supported_files"] = ["legacy.py"]  # 舊版狀態檔格式
+        restored = ProjectInfo.from_dict(data)
+        assert restored.supported_files == [
+            "lib/impl.c++", "lib/keep_generated.py", "lib/util.c", "lib/util.h", "main.py"
+        ]
+
+        Path(data["manifest_path"]).unlink()
+        assert ProjectInfo.from_dict(data).supported_files == restored.supported_files
+        print("✅ 專案檔案清單延遲載入")
+
+
+def test_parallel_scan_order_and_progress():
+    """平行分析的結果依專案名稱排序，每個專案回報一次進度"""
+    from config.config import config
+
+    original = config.PROJECT_SCAN_WORKERS
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "projects"
+        names = [f"proj_{i:02d}" for i in range(12)]
+        for name in reversed(names):
+            _touch(root / name / "main.py")
+        (root / "empty_project").mkdir()
+        try:
+            config.PROJECT_SCAN_WORKERS = 4
+            progress = []
+            manager = ProjectManager(root)
+            projects = manager.scan_projects(
+                progress_callback=lambda done, total, name, info: progress.append((done, total, name, info))
+            )
+            assert [p.name for p in projects] == names
+            assert [done for done, _, _, _ in progress] == list(range(1, 14))
+            assert all(total == 13 for _, total, _, _ in progress)
+            assert any(name == "empty_project" and info is None for _, _, name, info in progress)
+            print("✅ 平行掃描順序與進度回報正確")
+        finally:
+            config.PROJECT_SCAN_WORKERS = original
+
+
+if __name__ == "__main__":
+    test_single_walk_classification()
+    test_gitignore_patterns()
+    test_manifest_cache_invalidation()
+    test_project_info_lazy_files()
+    test_parallel_scan_order_and_progress()
+    print("🎉 專案掃描測試通過")
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+測試回應失敗分類與指數退避
+"""
+
+import sys
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.copilot_rate_limit_handler import (
+    ResponseFailure,
+    RateLimitBackoff,
+    classify_response_failure
+)
+
+
+def test_classify_response_failure():
+    """完整、空白、截斷、速率限制應分別被辨識"""
+    assert classify_response_failure("def foo():\n    pass\n已完成回答") is None
+    assert classify_response_failure("程式碼...\n已完成回答。\nMade changes.") is None
+    assert classify_response_failure(None) == ResponseFailure.EMPTY
+    assert classify_response_failure("  \n") == ResponseFailure.EMPTY
+    assert classify_response_failure("def foo():\n    return") == ResponseFailure.TRUNCATED
+    assert classify_response_failure(
+        "Sorry, you have exhausted this model's rate limit. Please wait a moment before trying again."
+    ) == ResponseFailure.RATE_LIMITED
+    print("✅ 失敗類型分類正確")
+
+
+def test_backoff_grows_and_resets():
+    """連續失敗時等待時間應以倍數成長並受上限限制，成功後歸零"""
+    slept = []
+    backoff = RateLimitBackoff(base_delays={"truncated": 10, "rate_limited": 60, "empty": 5},
+                               multiplier=2, max_delay=100, sleep=slept.append)
+
+    delays = [backoff.wait(ResponseFailure.TRUNCATED, 1, 1) for _ in range(5)]
+    ceilings = [10, 20, 40, 80, 100]
+    for delay, ceiling in zip(delays, ceilings):
+        assert ceiling / 2 <= delay <= ceiling, (delay, ceiling)
+    assert abs(sum(slept) - sum(delays)) < 1e-6
+    print(f"✅ 退避等待: {[round(d) for d in delays]}")
+
+    backoff.reset()
+    assert backoff.consecutive_failures == 0
+    assert backoff.next_delay(ResponseFailure.EMPTY) <= 5
+    print("✅ 成功後退避計數歸零")
+
+
+def test_ready_probe_checked_before_resume():
+    """等待結束後應以可輸入檢查確認 Copilot 已恢復"""
+    probes = iter([False, False, True])
+    calls = []
+
+    def probe():
+        calls.append(1)
+        return next(probes)
+
+    backoff = RateLimitBackoff(base_delays={"rate_limited": 1}, sleep=lambda s: None)
+    backoff.wait(ResponseFailure.RATE_LIMITED, 2, 1, ready_probe=probe)
+    assert len(calls) == 3
+    print("✅ 可輸入檢查通過後才繼續")
+
+
+if __name__ == "__main__":
+    test_classify_response_failure()
+    test_backoff_grows_and_resets()
+    test_ready_probe_checked_before_resume()
+    print("🎉 退避機制測試通過")
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+測試回應擷取通道：從匯出檔案讀取 Copilot 回應
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.response_capture import ResponseExportReader
+
+
+def _write_export(export_dir: Path, name: str, text: str, completed_at: float):
+    """模擬匯出掛鉤：先寫暫存檔再 rename"""
+    tmp_path = export_dir / f"{name}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"text": text, "completed_at": completed_at}, f, ensure_ascii=False)
+    os.replace(tmp_path, export_dir / f"{name}.json")
+
+
+def test_read_new_export():
+    """送出後寫入的匯出檔案應該被讀到"""
+    with tempfile.TemporaryDirectory() as tmp:
+        reader = ResponseExportReader(Path(tmp), poll_interval=0.01)
+        sent_at = reader.mark_request_sent()
+        _write_export(Path(tmp), "r1", "回應內容\n已完成回答", sent_at + 0.1)
+
+        response = reader.wait_for_response(timeout=1)
+        assert response == "回應內容\n已完成回答"
+        print("✅ 讀取新匯出回應成功")
+
+        # 同一個檔案不應被重複使用
+        assert reader.wait_for_response(timeout=0.05) is None
+        print("✅ 已讀取的檔案不會重複使用")
+
+
+def test_ignore_stale_export():
+    """送出前就存在的匯出檔案應該被忽略"""
+    with tempfile.TemporaryDirectory() as tmp:
+        reader = ResponseExportReader(Path(tmp), poll_interval=0.01)
+        _write_export(Path(tmp), "old", "舊回應", time.time() - 60)
+        old_file = Path(tmp) / "old.json"
+        os.utime(old_file, (time.time() - 60, time.time() - 60))
+
+        reader.mark_request_sent()
+        start = time.monotonic()
+        assert reader.wait_for_response(timeout=0.1) is None
+        assert time.monotonic() - start < 1
+        print("✅ 舊匯出檔案被忽略，逾時回傳 None")
+
+
+def test_skip_broken_latest_export():
+    """最新的匯出檔案為空或損毀時，改讀次新的有效回應"""
+    with tempfile.TemporaryDirectory() as tmp:
+        export_dir = Path(tmp)
+        reader = ResponseExportReader(export_dir, poll_interval=0.01)
+        since = time.time() - 30
+        _write_export(export_dir, "valid", "有效回應", since + 1)
+        _write_export(export_dir, "empty", "   ", since + 2)
+        (export_dir / "corrupt.json").write_text("{not json", encoding="utf-8")
+        for offset, name in enumerate(("valid", "empty", "corrupt"), 1):
+            os.utime(export_dir / f"{name}.json", (since + offset, since + offset))
+
+        assert reader.read_latest_response(since) == "有效回應"
+        assert reader.read_latest_response(since) is None
+        print("✅ 略過損毀的最新匯出檔案")
+
+
+if __name__ == "__main__":
+    test_read_new_export()
+    test_ignore_stale_export()
+    test_skip_broken_latest_export()
+    print("🎉 回應擷取通道測試通過")
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+測試回應索引：依輪數/行號查詢、seek 讀取、檔案被修改時失效、無索引時搜尋「第N輪/」子資料夾
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.response_index import (
+    RESPONSE_MARKER,
+    ResponseIndex,
+    extract_response,
+    find_latest_response_file
+)
+
+
+def _write_response(project_dir: Path, round_number: int, line_number: int, response: str) -> tuple:
+    path = project_dir / f"第{round_number}輪" / f"20250101_00000{line_number}_第{line_number}行.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = f"# 專案: demo\n\n## 第 {line_number} 行原始提示詞\n\n提示\n\n{RESPONSE_MARKER}".encode("utf-8")
+    body = response.encode("utf-8")
+    path.write_bytes(header + body)
+    return path, len(header), len(body)
+
+
+def test_index_lookup_and_seek_read():
+    """依輪數與行號取得最新回應，重新載入後結果相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp) / "demo"
+        index = ResponseIndex(project_dir)
+        for round_number, line_number in ((1, 1), (1, 2), (2, 1)):
+            response = f"第{round_number}輪第{line_number}行的回應 ✅"
+            path, offset, length = _write_response(project_dir, round_number, line_number, response)
+            index.add(round_number, line_number, path, offset, length)
+
+        reloaded = ResponseIndex(project_dir)
+        assert len(reloaded) == 3
+        assert reloaded.read(reloaded.latest()) == "第2輪第1行的回應 ✅"
+        assert reloaded.read(reloaded.latest(1)) == "第1輪第2行的回應 ✅"
+        assert reloaded.read(reloaded.latest(1, 1)) == "第1輪第1行的回應 ✅"
+        assert reloaded.latest(3) is None
+        print("✅ 索引查詢與 seek 讀取正確")
+
+
+def test_stale_entry_and_torn_line():
+    """檔案被截短時讀取失敗；索引檔最後一行寫入中斷時略過"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp) / "demo"
+        index = ResponseIndex(project_dir)
+        path, offset, length = _write_response(project_dir, 1, 1, "完整的回應內容")
+        entry = index.add(1, 1, path, offset, length)
+
+        path.write_bytes(path.read_bytes()[:offset + 3])
+        assert index.read(entry) is None
+
+        with open(index.index_file, 'a', encoding='utf-8') as f:
+            f.write('{"round": 2, "line"')
+        assert len(ResponseIndex(project_dir)) == 1
+        print("✅ 失效項目與中斷的索引行處理正確")
+
+
+def test_fallback_search_round_subfolders():
+    """沒有索引時可在「第N輪/」子資料夾與舊的平面格式中找到回應檔案"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp) / "demo"
+        assert find_latest_response_file(project_dir) is None
+
+        path, _, _ = _write_response(project_dir, 2, 1, "子資料夾格式")
+        assert find_latest_response_file(project_dir) == path
+        assert find_latest_response_file(project_dir, 1) is None
+
+        legacy = project_dir / "20240101_000000_第1輪.md"
+        legacy.write_text("# 舊格式\n" + "=" * 50 + "\n\n舊格式回應", encoding="utf-8")
+        assert find_latest_response_file(project_dir, 1) == legacy
+        assert extract_response(legacy.read_text(encoding="utf-8")) == "舊格式回應"
+        print("✅ 無索引時的備援搜尋正確")
+
+
+if __name__ == "__main__":
+    test_index_lookup_and_seek_read()
+    test_stale_entry_and_torn_line()
+    test_fallback_search_round_subfolders()
+    print("🎉 回應索引測試通過")
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+測試回應檔案寫入器：原子寫入、資料夾快取與重建、背景寫入與 flush、寫入後回呼
+"""
+
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.response_writer import ResponseWriter
+
+
+def test_sync_write_and_dir_cache():
+    """同步寫入不留下暫存檔；資料夾被刪除後自動重建"""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ResponseWriter(fsync_policy="round", background=False)
+        written = []
+        target = Path(tmp) / "demo" / "第1輪" / "a.md"
+        assert writer.write(target, "內容".encode("utf-8"), on_written=written.append)
+        assert target.read_text(encoding="utf-8") == "內容" and written == [target]
+        assert [p.name for p in target.parent.iterdir()] == ["a.md"]
+
+        shutil.rmtree(Path(tmp) / "demo")
+        assert writer.write(target, b"again")
+        assert target.read_bytes() == b"again"
+        assert writer.flush()
+        print("✅ 同步寫入與資料夾快取正確")
+
+
+def test_background_write_and_flush():
+    """背景寫入依序完成，flush 後檔案與回呼都已就位"""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ResponseWriter(fsync_policy="never", background=True)
+        written = []
+        paths = [Path(tmp) / "demo" / f"第{i % 2 + 1}輪" / f"{i}.md" for i in range(20)]
+        for i, path in enumerate(paths):
+            assert writer.write(path, str(i).encode("utf-8"), on_written=written.append)
+        assert writer.flush()
+        assert written == paths
+        assert all(path.read_text(encoding="utf-8") == str(i) for i, path in enumerate(paths))
+        writer.close()
+        print("✅ 背景寫入與 flush 正確")
+
+
+def test_background_error_reported_on_flush():
+    """背景寫入失敗時不呼叫回呼，並在 flush 時回報"""
+    with tempfile.TemporaryDirectory() as tmp:
+        blocker = Path(tmp) / "not_a_dir"
+        blocker.write_text("x", encoding="utf-8")
+        writer = ResponseWriter(fsync_policy="always", background=True)
+        writer._created_dirs.add(blocker)  # 模擬快取中的資料夾已被同名檔案取代
+        written = []
+        writer.write(blocker / "a.md", b"data", on_written=written.append)
+        assert not writer.flush() and written == []
+        assert writer.flush()
+        writer.close()
+        print("✅ 背景寫入錯誤於 flush 時回報")
+
+
+if __name__ == "__main__":
+    test_sync_write_and_dir_cache()
+    test_background_write_and_flush()
+    test_background_error_reported_on_flush()
+    print("🎉 回應寫入器測試通過")
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+測試模擬 UI 驅動：鍵盤操作對應的 Copilot Chat 狀態、回應生成期間的按鈕與複製內容，
+以及以模擬驅動執行整輪逐行流程（含速率限制重試與通知清除）
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.simulated_copilot import (
+    CLEAR_NOTIFICATIONS_COMMAND,
+    RATE_LIMIT_MESSAGE,
+    SimulatedCopilotDriver,
+    SimulationProfile,
+)
+from src.ui_driver import PyAutoGUIDriver, UIDriver, get_ui_driver, ui, use_ui_driver
+
+
+def _submit(driver: SimulatedCopilotDriver, prompt: str):
+    driver.copy(prompt)
+    driver.hotkey('ctrl', 'f1')
+    driver.hotkey('ctrl', 'a')
+    driver.hotkey('ctrl', 'v')
+    driver.press('enter')
+
+
+def _copy(driver: SimulatedCopilotDriver) -> str:
+    driver.copy("")
+    driver.hotkey('ctrl', 'f1')
+    driver.hotkey('ctrl', 'up')
+    driver.hotkey('shift', 'f10')
+    driver.press('down')
+    driver.press('enter')
+    return driver.paste()
+
+
+def _buttons(driver: SimulatedCopilotDriver):
+    return (bool(driver.locate_on_screen(str(config.STOP_BUTTON_IMAGE))),
+            bool(driver.locate_on_screen(str(config.SEND_BUTTON_IMAGE))))
+
+
+def test_use_ui_driver_restores_previous():
+    """use_ui_driver 區塊內 ui 轉給指定驅動，結束後還原"""
+    driver = SimulatedCopilotDriver()
+    before = get_ui_driver()
+    with use_ui_driver(driver):
+        ui.copy("hello")
+        ui.sleep(5)
+        assert ui.paste() == "hello" and ui.monotonic() == 5
+    assert get_ui_driver() is before
+    assert isinstance(before, PyAutoGUIDriver)
+    print("✅ UI 驅動切換正確")
+
+
+def test_incomplete_driver_rejected():
+    """未實作全部 UI 操作的驅動在建立時就失敗"""
+    class KeyboardOnlyDriver(UIDriver):
+        def hotkey(self, *keys: str):
+            pass
+
+    try:
+        KeyboardOnlyDriver()
+    except TypeError:
+        print("✅ 不完整的驅動無法建立")
+        return
+    raise AssertionError("不完整的驅動不應可以建立")
+
+
+def test_response_lifecycle():
+    """生成期間只看到 stop 按鈕、提早複製只取得部分內容；完成後看到 send 按鈕並取得完整回應"""
+    driver = SimulatedCopilotDriver(SimulationProfile(response_latency=10, latency_jitter=0))
+    assert _buttons(driver) == (False, True)
+
+    _submit(driver, "請實作 handler_1() 的函式")
+    assert driver.stats.submits == 1
+    driver.sleep(5)
+    assert _buttons(driver) == (True, False)
+    partial = _copy(driver)
+    assert partial and "已完成回答" not in partial
+    assert driver.stats.premature_copies == 1
+
+    driver.sleep(5)
+    assert _buttons(driver) == (False, True)
+    full = _copy(driver)
+    assert full.startswith(partial) and full.endswith("已完成回答") and "handler_1" in full
+    assert driver.stats.completed == 1
+    # 兩次 5 秒的等待都落在生成期間，全部是必要等待
+    assert driver.stats.waiting_seconds == 10 and driver.stats.overhead_seconds == 0
+    print("✅ 回應生成流程正確")
+
+
+def test_rate_limit_and_notification():
+    """速率限制期間回覆限制訊息；通知遮擋按鈕直到以命令面板清除"""
+    profile = SimulationProfile(response_latency=10, latency_jitter=0, rate_limit_rate=1.0,
+                                rate_limit_window=30, notification_rate=1.0)
+    driver = SimulatedCopilotDriver(profile)
+    _submit(driver, "prompt")
+    driver.sleep(3)
+    assert _copy(driver) == RATE_LIMIT_MESSAGE
+    assert driver.stats.rate_limited == 1 and driver.stats.notifications_shown == 1
+    assert _buttons(driver) == (False, False)
+
+    driver.copy(CLEAR_NOTIFICATIONS_COMMAND)
+    driver.hotkey('ctrl', 'shift', 'p')
+    driver.hotkey('ctrl', 'v')
+    driver.press('enter')
+    assert driver.stats.notifications_cleared == 1
+    assert _buttons(driver) == (False, True)
+
+    # 速率限制期間結束後恢復正常回應
+    driver.profile.rate_limit_rate = 0.0
+    driver.profile.notification_rate = 0.0
+    driver.sleep(30)
+    _submit(driver, "prompt")
+    driver.sleep(10)
+    assert _copy(driver).endswith("已完成回答")
+    print("✅ 速率限制與通知遮擋正確")
+
+
+def test_line_by_line_loop_with_faults():
+    """整輪逐行流程在模擬驅動下完成，速率限制與截斷的回應都經由重試補回"""
+    from benchmarks.bench_automation_loop import make_prompt_lines, run_simulation
+    from src.ui_delay_controller import ui_delays
+
+    profile_path = ui_delays.profile_path
+    profile = SimulationProfile(response_latency=8, rate_limit_rate=0.2, rate_limit_window=20,
+                                truncated_rate=0.2, notification_rate=0.3, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run_simulation(profile, make_prompt_lines(6), Path(tmp), adaptive=True)
+        saved = list(Path(tmp).glob("ExecutionResult/Success/*/第1輪/*.md"))
+
+    assert result["succeeded"] == 6 and result["failed"] == 0
+    assert result["rate_limited"] > 0 and result["truncated"] > 0
+    assert result["retries"] == result["rate_limited"] + result["truncated"]
+    assert result["notifications_shown"] == result["notifications_cleared"] > 0
+    assert len(saved) == 6
+    assert config.EXECUTION_RESULT_DIR == config.PROJECT_ROOT / "ExecutionResult"
+    assert ui_delays.profile_path == profile_path
+    print("✅ 模擬逐行流程正確")
+
+
+if __name__ == "__main__":
+    test_use_ui_driver_restores_previous()
+    test_incomplete_driver_rejected()
+    test_response_lifecycle()
+    test_rate_limit_and_notification()
+    test_line_by_line_loop_with_faults()
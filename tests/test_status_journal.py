@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+測試專案狀態日誌：狀態變更以附加方式寫入、定期合併檢查點、重新載入時正確重播
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.project_manager import ProjectManager
+
+
+def _make_manager(root: Path, count: int = 3) -> ProjectManager:
+    for i in range(count):
+        (root / f"project_{i}").mkdir(parents=True, exist_ok=True)
+        (root / f"project_{i}" / "main.py").write_text("print('hi')\n", encoding="utf-8")
+    manager = ProjectManager(root)
+    manager.scan_projects()
+    return manager
+
+
+def test_updates_append_and_replay():
+    """狀態變更只附加日誌，不改寫檢查點；新的管理器載入時重播日誌"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        manager = _make_manager(root)
+        manager.update_project_status("project_0", "processing")  # 首次更新寫入完整檢查點
+        checkpoint = manager.status_file.read_bytes()
+
+        manager.update_project_status("project_0", "completed", processing_time=12.5)
+        manager.update_project_status("project_1", "failed", "處理失敗", 3.0)
+        assert manager.status_file.read_bytes() == checkpoint
+        assert len(manager.journal_file.read_text(encoding="utf-8").splitlines()) == 3
+
+        reloaded = _make_manager(root)
+        assert reloaded.get_project_by_name("project_0").status == "completed"
+        assert reloaded.get_project_by_name("project_0").processing_time == 12.5
+        failed = reloaded.get_project_by_name("project_1")
+        assert failed.status == "failed" and failed.retry_count == 1
+        assert reloaded.get_project_by_name("project_2").status == "pending"
+        print("✅ 狀態日誌附加與重播正確")
+
+
+def test_compaction_and_torn_tail():
+    """累積到上限時合併為檢查點；最後一行不完整時略過"""
+    original = config.STATUS_JOURNAL_COMPACT_EVERY
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        try:
+            config.STATUS_JOURNAL_COMPACT_EVERY = 2
+            manager = _make_manager(root)
+            manager.update_project_status("project_0", "processing")
+            manager.update_project_status("project_0", "completed")
+            manager.update_project_status("project_1", "processing")  # 第2筆，觸發合併
+            data = json.loads(manager.status_file.read_text(encoding="utf-8"))
+            statuses = {p["name"]: p["status"] for p in data["projects"]}
+            assert statuses["project_0"] == "completed" and statuses["project_1"] == "processing"
+            assert len(manager.journal_file.read_text(encoding="utf-8").splitlines()) == 1
+
+            manager.update_project_status("project_1", "completed")
+            with open(manager.journal_file, 'a', encoding='utf-8') as f:
+                f.write('{"name": "project_2", "stat')
+            reloaded = _make_manager(root)
+            assert reloaded.get_project_by_name("project_1").status == "completed"
+            assert reloaded.get_project_by_name("project_2").status == "pending"
+            print("✅ 合併檢查點與不完整日誌處理正確")
+        finally:
+            config.STATUS_JOURNAL_COMPACT_EVERY = original
+
+
+def test_stale_journal_ignored():
+    """檢查點被刪除（例如 ProjectStatusReset）後，殘留的日誌不得恢復舊狀態"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        manager = _make_manager(root)
+        manager.update_project_status("project_0", "processing")
+        manager.update_project_status("project_0", "completed")
+        manager.status_file.unlink()
+
+        reloaded = _make_manager(root)
+        assert reloaded.get_project_by_name("project_0").status == "pending"
+        print("✅ 過期的狀態日誌被忽略")
+
+
+if __name__ == "__main__":
+    test_updates_append_and_replay()
+    test_compaction_and_torn_tail()
+    test_stale_journal_ignored()
+    print("🎉 狀態日誌測試通過")
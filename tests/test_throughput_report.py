@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+測試吞吐量報告：階段事件分類、每小時行數與剩餘時間、定期寫出 JSON / HTML、事件監聽與離線統計，
+以及全域提示詞模式的預計行數與行事件
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.bench_automation_loop import simulated_environment
+from config.config import config
+from main import HybridUIAutomationScript
+from src.copilot_handler import CopilotHandler
+from src.logger import add_event_listener, get_logger, remove_event_listener
+from src.project_manager import ProjectInfo
+from src.simulated_copilot import SimulatedCopilotDriver, SimulationProfile
+from src.throughput_report import ThroughputTracker, build_from_events, format_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _event(phase, start, duration, outcome="ok", pid=1, **fields):
+    return {"phase": phase, "pid": pid, "start": start, "end": start + duration,
+            "duration": duration, "outcome": outcome, **fields}
+
+
+def test_breakdown_and_eta():
+    """各分類時間、其他時間、每小時行數與預估剩餘時間"""
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = ThroughputTracker(planned_lines=10, output_dir=Path(tmp), refresh_interval=60, clock=clock)
+        for phase, duration in (("open-vscode", 20), ("send", 5), ("wait", 60), ("copy", 5),
+                                ("backoff", 100), ("send", 5), ("wait", 60), ("copy", 5), ("scan", 40)):
+            tracker.record(_event(phase, clock.now, duration))
+        tracker.record(_event("line", 1000, 140, retries=0))
+        tracker.record(_event("line", 1140, 200, retries=1))
+        tracker.record(_event("line", 1340, 60, outcome="failed"))
+        clock.now += 360
+
+        report = tracker.snapshot()
+        breakdown = report["breakdown"]
+        assert report["lines"] == 2 and report["failed_lines"] == 1 and report["retries"] == 1
+        assert breakdown["copilot"]["seconds"] == 120 and breakdown["ui"]["seconds"] == 20
+        assert breakdown["backoff"]["seconds"] == 100 and breakdown["scan"]["seconds"] == 40
+        assert breakdown["vscode"]["seconds"] == 20 and breakdown["other"]["seconds"] == 60
+        assert breakdown["copilot"]["percent"] == 33.3 and breakdown["copilot"]["per_line"] == 60
+        assert report["lines_per_hour"] == 20
+        assert report["remaining_lines"] == 7 and report["eta_seconds"] == 7 * 180
+
+        # 第一筆事件即寫出報告，之後間隔內不再寫出
+        first = json.loads((Path(tmp) / "throughput.json").read_text(encoding="utf-8"))
+        assert first["lines"] == 0
+        assert "自動化吞吐量" in (Path(tmp) / "throughput.html").read_text(encoding="utf-8")
+        tracker.record(_event("line", 1400, 10))
+        assert json.loads((Path(tmp) / "throughput.json").read_text(encoding="utf-8"))["lines"] == 3
+    print("✅ 吞吐量統計正確")
+
+
+def test_event_listener_without_event_file():
+    """停用事件檔時監聽者仍收到事件；移除後不再收到"""
+    received = []
+    logger = get_logger("ThroughputTest")
+    original = config.EVENT_LOG_ENABLED
+    type(config).EVENT_LOG_ENABLED = False
+    try:
+        add_event_listener(received.append)
+        logger.event("line", 1.0, 2.5, retries=2)
+        remove_event_listener(received.append)
+        logger.event("line", 3.0, 4.0)
+    finally:
+        type(config).EVENT_LOG_ENABLED = original
+    assert len(received) == 1
+    assert received[0]["phase"] == "line" and received[0]["duration"] == 1.5 and received[0]["retries"] == 2
+    print("✅ 事件監聽正確")
+
+
+def test_offline_multiple_workers():
+    """離線統計以事件涵蓋的時間計算，多個 worker 的時間分別計入"""
+    events = [
+        _event("wait", 0, 50, pid=1), _event("line", 0, 100, pid=1),
+        _event("wait", 50, 80, pid=2), _event("line", 50, 150, pid=2),
+    ]
+    report = build_from_events(events, planned_lines=0).snapshot(live=False)
+    assert report["workers"] == 2 and report["elapsed_seconds"] == 200
+    assert report["lines"] == 2 and report["lines_per_hour"] == 36
+    assert report["breakdown"]["copilot"]["seconds"] == 130
+    assert report["breakdown"]["other"]["seconds"] == 250 - 130
+    assert report["remaining_lines"] is None and report["eta"] is None
+    assert format_duration(90061) == "1d 01:01:01"
+    print("✅ 離線統計正確")
+
+
+def test_global_prompt_mode():
+    """全域提示詞模式：預計行數取自 prompt1.txt，送出整份提示詞後記錄同樣的行數"""
+    saved = (config.PROMPT1_FILE_PATH, config.THROUGHPUT_REPORT_DIR)
+    settings = {"prompt_source_mode": "global", "interaction_enabled": False}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        type(config).PROMPT1_FILE_PATH = root / "prompt1.txt"
+        type(config).THROUGHPUT_REPORT_DIR = root / "report"
+        config.PROMPT1_FILE_PATH.write_text("第一行\n\n第二行\n第三行\n", encoding="utf-8")
+        project = root / "proj"
+        project.mkdir()
+        try:
+            script = HybridUIAutomationScript()
+            script.interaction_settings = settings
+            script._start_throughput_report([ProjectInfo("proj", str(project))])
+            remove_event_listener(script.throughput.record)
+            assert script.throughput.planned_lines == 3
+
+            events = []
+            driver = SimulatedCopilotDriver(SimulationProfile(response_latency=5, seed=1))
+            add_event_listener(events.append)
+            try:
+                with simulated_environment(driver, root, adaptive=False, timeout=600):
+                    assert CopilotHandler(interaction_settings=settings).process_project_with_iterations(str(project))
+            finally:
+                remove_event_listener(events.append)
+
+            tracker = ThroughputTracker(planned_lines=3, output_dir=root / "report", auto_write=False)
+            for event in events:
+                tracker.record(event)
+            report = tracker.snapshot()
+            assert report["lines"] == 3 and report["remaining_lines"] == 0
+        finally:
+            type(config).PROMPT1_FILE_PATH, type(config).THROUGHPUT_REPORT_DIR = saved
+    print("✅ 全域提示詞模式的行數統計正確")
+
+
+if __name__ == "__main__":
+    test_breakdown_and_eta()
+    test_event_listener_without_event_file()
+    test_offline_multiple_workers()
+    test_global_prompt_mode()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+測試熱點追蹤：停用時不記錄、span 與裝飾器的巢狀時間、例外標記、上限、Chrome trace 匯出
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.tracing import Tracer
+
+
+def test_disabled_tracer_records_nothing():
+    """停用時 span 為共用的空區段，裝飾器直接呼叫原函數"""
+    tracer = Tracer(enabled=False)
+
+    @tracer.traced("work")
+    def work(x):
+        return x * 2
+
+    with tracer.span("outer", value=1) as s:
+        s.set(extra=True)
+        assert work(3) == 6
+    assert tracer.span("a") is tracer.span("b")
+    assert len(tracer) == 0
+    assert tracer.export() is None
+    print("✅ 停用時不記錄 span")
+
+
+def test_nested_spans_and_errors():
+    """巢狀 span 的時間包含關係、參數、例外標記"""
+    tracer = Tracer(enabled=True)
+
+    @tracer.traced()
+    def inner():
+        return "ok"
+
+    with tracer.span("outer", category="scan", cwe="078") as s:
+        assert inner() == "ok"
+        s.set(found=2)
+    try:
+        with tracer.span("failing"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+
+    events = {e["name"]: e for e in tracer.to_chrome_trace()["traceEvents"] if e["ph"] == "X"}
+    outer = events["outer"]
+    inner_event = events["test_nested_spans_and_errors.<locals>.inner"]
+    assert outer["cat"] == "scan" and outer["args"] == {"cwe": "078", "found": 2}
+    assert outer["ts"] <= inner_event["ts"]
+    assert inner_event["ts"] + inner_event["dur"] <= outer["ts"] + outer["dur"]
+    assert events["failing"]["args"]["error"] == "ValueError"
+    print("✅ 巢狀 span 與例外標記正確")
+
+
+def test_max_spans_and_export():
+    """超過上限的 span 被捨棄並計數；匯出檔包含執行緒名稱"""
+    tracer = Tracer(enabled=True, max_spans=3)
+
+    def worker():
+        for _ in range(2):
+            with tracer.span("tick"):
+                pass
+
+    thread = threading.Thread(target=worker, name="ScanThread")
+    thread.start()
+    thread.join()
+    worker()
+    assert len(tracer) == 3 and tracer.dropped == 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = tracer.export(Path(tmp) / "trace.json")
+        data = json.loads(path.read_text(encoding="utf-8"))
+    thread_names = {e["args"]["name"] for e in data["traceEvents"] if e["name"] == "thread_name"}
+    assert "ScanThread" in thread_names
+    assert data["otherData"]["dropped_spans"] == 1
+    assert data["displayTimeUnit"] == "ms"
+
+    tracer.reset()
+    assert len(tracer) == 0 and tracer.dropped == 0
+    print("✅ span 上限與 Chrome trace 匯出正確")
+
+
+if __name__ == "__main__":
+    test_disabled_tracer_records_nothing()
+    test_nested_spans_and_errors()
+    test_max_spans_and_export()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+測試自適應 UI 延遲控制器：依實測縮短延遲、失敗時回復、依機器保存設定檔
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.ui_delay_controller import UIDelayController
+
+
+def test_delay_shrinks_towards_observed_percentile():
+    """累積足夠觀測值後，延遲應逐步縮短但不低於 百分位數 × 安全係數"""
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = UIDelayController(Path(tmp) / "host.json", enabled=True)
+        assert controller.get_delay("chat.paste", 0.5) == 0.5
+
+        for _ in range(100):
+            controller.record("chat.paste", 0.1, 0.5)
+
+        delay = controller.get_delay("chat.paste", 0.5)
+        expected = 0.1 * config.UI_DELAY_SAFETY_MARGIN
+        assert abs(delay - expected) < 1e-6, delay
+        print(f"✅ 延遲由 0.5s 縮短為 {delay:.3f}s")
+
+
+def test_failure_restores_default():
+    """步驟失敗時延遲應回復為原本的固定值"""
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = UIDelayController(Path(tmp) / "host.json", enabled=True)
+        for _ in range(20):
+            controller.report_success("copy.focus_input", 1)
+        assert controller.get_delay("copy.focus_input", 1) < 1
+
+        controller.report_failure("copy.focus_input", 1)
+        assert controller.get_delay("copy.focus_input", 1) == 1
+        print("✅ 失敗後延遲回復為預設值")
+
+
+def test_wait_until_returns_on_probe():
+    """探測成功時應立即返回，逾時則回報失敗"""
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = UIDelayController(Path(tmp) / "host.json", enabled=True)
+        start = time.monotonic()
+        assert controller.wait_until("clipboard.copy", lambda: True, 2, settle=False)
+        assert time.monotonic() - start < 0.5
+
+        assert not controller.wait_until("clipboard.copy", lambda: False, 0.1, settle=False)
+        print("✅ 探測成功立即返回、逾時回傳 False")
+
+
+def test_profile_persisted_per_machine():
+    """儲存後重新載入應保留學習到的延遲"""
+    with tempfile.TemporaryDirectory() as tmp:
+        profile = Path(tmp) / "host.json"
+        controller = UIDelayController(profile, enabled=True)
+        for _ in range(30):
+            controller.record("copy.context_menu", 0.2, 1)
+        learned = controller.get_delay("copy.context_menu", 1)
+        assert controller.save()
+
+        reloaded = UIDelayController(profile, enabled=True)
+        assert abs(reloaded.get_delay("copy.context_menu", 1) - learned) < 1e-3
+        print("✅ 延遲設定檔保存與載入成功")
+
+
+if __name__ == "__main__":
+    test_delay_shrinks_towards_observed_percentile()
+    test_failure_restores_default()
+    test_wait_until_returns_on_probe()
+    test_profile_persisted_per_machine()
+    print("🎉 自適應 UI 延遲測試通過")
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+測試 VS Code 行程追蹤：行程名稱完全比對、啟動器結束後找出 VS Code 主行程、
+存活檢查不重複走訪行程表，以及結束時輸出 crash / exit 事件
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+import src.vscode_process_tracker as tracker_module
+from src.copilot_handler import CopilotHandler
+from src.logger import add_event_listener, remove_event_listener
+from src.simulated_copilot import SimulatedCopilotDriver
+from src.ui_driver import use_ui_driver
+from src.vscode_process_tracker import VSCodeProcessTracker, is_vscode_process_name, pid_alive
+
+
+class FakeProcessTable:
+    """以固定的行程列表取代 psutil.process_iter，並記錄走訪次數"""
+
+    class NoSuchProcess(Exception):
+        pass
+
+    AccessDenied = NoSuchProcess
+
+    def __init__(self):
+        self.entries = []
+        self.scans = 0
+
+    def add(self, pid, name, cmdline=()):
+        self.entries.append(SimpleNamespace(info={"pid": pid, "name": name, "create_time": time.time(),
+                                                  "cmdline": list(cmdline)}))
+
+    def process_iter(self, attrs):
+        self.scans += 1
+        return list(self.entries)
+
+
+def _run(outcome_expected, expect_exit):
+    table = FakeProcessTable()
+    events = []
+    original = tracker_module.psutil
+    tracker_module.psutil = table
+    add_event_listener(events.append)
+    main = None
+    try:
+        table.add(1, "vscode-server")
+        tracker = VSCodeProcessTracker()
+        assert tracker.pre_existing_pids == set()
+
+        # 啟動器立即結束，VS Code 主行程（以另一個子行程代表）繼續執行
+        launcher = subprocess.Popen([sys.executable, "-c", "pass"])
+        launcher.wait()
+        tracker.track(launcher)
+        main = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        table.add(main.pid, "code")
+
+        assert tracker.is_alive() and tracker.pids == {main.pid}
+        scans = table.scans
+        for _ in range(100):
+            assert tracker.is_alive()
+        assert table.scans == scans
+
+        if expect_exit:
+            tracker.expect_exit()
+        main.kill()
+        main.wait()
+        table.entries.pop()
+        assert not tracker.is_alive() and not tracker.tracking
+        assert tracker.last_exit == outcome_expected
+    finally:
+        remove_event_listener(events.append)
+        tracker_module.psutil = original
+        if main is not None and main.poll() is None:
+            main.kill()
+            main.wait()
+
+    exits = [event for event in events if event["phase"] == "vscode-exit"]
+    assert len(exits) == 1 and exits[0]["outcome"] == outcome_expected
+    assert exits[0]["pid"] == launcher.pid
+
+
+def test_process_names():
+    """名稱完全比對，不把 vscode-server 等行程當成 VS Code"""
+    assert is_vscode_process_name("code") and is_vscode_process_name("Code")
+    assert not is_vscode_process_name("vscode-server")
+    assert not is_vscode_process_name("codelldb") and not is_vscode_process_name(None)
+    assert pid_alive(os.getpid())
+    print("✅ 行程名稱比對正確")
+
+
+def test_crash_detected():
+    """主行程非預期結束時記錄 crash"""
+    _run("crash", expect_exit=False)
+    print("✅ 非預期結束偵測正確")
+
+
+def test_expected_exit():
+    """關閉前標記預期結束時記錄 exit"""
+    _run("exit", expect_exit=True)
+    print("✅ 預期結束記錄正確")
+
+
+def test_close_ready_without_tracking():
+    """控制器沒有在追蹤時，關閉檢查改為走訪一次行程表並排除啟動前已存在的行程"""
+    table = FakeProcessTable()
+    original = tracker_module.psutil
+    tracker_module.psutil = table
+    try:
+        tracker = VSCodeProcessTracker()
+        handler = CopilotHandler(vscode_controller=SimpleNamespace(processes=tracker))
+        table.add(7, "code")
+        with use_ui_driver(SimulatedCopilotDriver()):
+            # 尚未記錄既有行程：任何 VS Code 行程都視為仍在執行
+            assert not tracker.tracking and not handler.test_vscode_close_ready()
+
+            assert tracker.pre_existing_pids == {7}
+            table.add(8, "code")
+            assert tracker.running_pids() == [8]
+            assert not handler.test_vscode_close_ready()
+
+            table.entries.pop()
+            assert handler.test_vscode_close_ready()
+    finally:
+        tracker_module.psutil = original
+    print("✅ 未追蹤時的關閉檢查正確")
+
+
+if __name__ == "__main__":
+    test_process_names()
+    test_crash_detected()
+    test_expected_exit()
+    test_close_ready_without_tracking()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+測試 VS Code 就緒偵測：視窗標題判斷、Chat 面板與標記檔訊號、逾時與 VS Code 結束時提早返回，
+以及沒有可用訊號時退回固定等待（以模擬 UI 驅動的虛擬時鐘執行）
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.simulated_copilot import SimulatedCopilotDriver
+from src.ui_driver import use_ui_driver
+from src.vscode_readiness import ReadinessProbe, title_shows_folder
+
+MARKER = ".vscode/.automation_ready"
+
+
+def test_title_shows_folder():
+    """視窗標題以「 - 」分隔，必須有一段完全等於資料夾名稱"""
+    assert title_shows_folder("main.py - proj_b - Visual Studio Code", "proj_b")
+    assert title_shows_folder("proj_b - Visual Studio Code", "proj_b")
+    assert not title_shows_folder("main.py - proj_b2 - Visual Studio Code", "proj_b")
+    assert not title_shows_folder("main.py - proj_a - Visual Studio Code", "proj_b")
+    print("✅ 視窗標題判斷正確")
+
+
+def test_ready_when_marker_written():
+    """Chat 面板可見且啟動工作寫出標記檔後立即就緒，不等滿固定時間"""
+    original = config.VSCODE_READY_MARKER_FILE
+    type(config).VSCODE_READY_MARKER_FILE = MARKER
+    driver = SimulatedCopilotDriver()
+    try:
+        with tempfile.TemporaryDirectory() as tmp, use_ui_driver(driver):
+            marker = Path(tmp) / MARKER
+            marker.parent.mkdir()
+            marker.write_text("stale", encoding="utf-8")
+
+            def is_running():
+                # 啟動工作在第 4 秒寫出標記檔
+                if driver.clock.now >= 4 and not marker.exists():
+                    marker.write_text("ready", encoding="utf-8")
+                return True
+
+            probe = ReadinessProbe(Path(tmp), is_running, checks=["chat_panel", "marker"])
+            probe.clear_marker()
+            assert not marker.exists()
+            assert probe.available_checks() == ["chat_panel", "marker"]
+
+            result = probe.wait(timeout=30, interval=1)
+            assert result.ready and not result.fallback
+            assert result.signals == {"chat_panel": True, "marker": True}
+            assert result.elapsed == 5
+    finally:
+        type(config).VSCODE_READY_MARKER_FILE = original
+    print("✅ 標記檔就緒正確")
+
+
+def test_timeout_and_exit():
+    """訊號未成立時於逾時返回；VS Code 結束時提早返回"""
+    original = config.VSCODE_READY_MARKER_FILE
+    type(config).VSCODE_READY_MARKER_FILE = MARKER
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            driver = SimulatedCopilotDriver()
+            with use_ui_driver(driver):
+                result = ReadinessProbe(Path(tmp), lambda: True, checks=["marker"]).wait(timeout=10, interval=1)
+            assert not result.ready and result.elapsed == 10 and "marker" in result.reason
+
+            driver = SimulatedCopilotDriver()
+            with use_ui_driver(driver):
+                result = ReadinessProbe(Path(tmp), lambda: driver.clock.now < 3,
+                                        checks=["marker"]).wait(timeout=10, interval=1)
+            assert not result.ready and result.elapsed == 3 and result.reason == "VS Code 未在執行"
+    finally:
+        type(config).VSCODE_READY_MARKER_FILE = original
+    print("✅ 逾時與結束處理正確")
+
+
+def test_fallback_without_signals():
+    """沒有可用訊號（未設定標記檔）時退回固定的啟動等待"""
+    original = config.VSCODE_READY_MARKER_FILE
+    type(config).VSCODE_READY_MARKER_FILE = None
+    driver = SimulatedCopilotDriver()
+    try:
+        with tempfile.TemporaryDirectory() as tmp, use_ui_driver(driver):
+            result = ReadinessProbe(Path(tmp), lambda: True, checks=["marker"]).wait()
+    finally:
+        type(config).VSCODE_READY_MARKER_FILE = original
+    assert result.ready and result.fallback
+    assert result.elapsed == config.VSCODE_STARTUP_DELAY
+    print("✅ 固定等待退回正確")
+
+
+if __name__ == "__main__":
+    test_title_shows_folder()
+    test_ready_when_marker_written()
+    test_timeout_and_exit()
+    test_fallback_without_signals()
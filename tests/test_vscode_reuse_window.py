@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+測試保留 VS Code 視窗模式：以 --reuse-window 切換資料夾、關閉專案時保留視窗、
+VS Code 非預期結束時完整重啟
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加專案根目錄到路徑
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.config import config
+import src.vscode_controller as vscode_module
+import src.vscode_process_tracker as tracker_module
+from src.vscode_controller import VSCodeController
+
+
+class FakeSubprocess:
+    """記錄 VS Code 命令列，不實際啟動"""
+    DEVNULL = vscode_module.subprocess.DEVNULL
+    SubprocessError = vscode_module.subprocess.SubprocessError
+
+    def __init__(self):
+        self.started = []
+        self.reused = []
+
+    def Popen(self, cmd, **kwargs):
+        self.started.append(cmd)
+        return SimpleNamespace(pid=4242)
+
+    def run(self, cmd, **kwargs):
+        self.reused.append(cmd)
+        return SimpleNamespace(returncode=0, stdout="")
+
+
+def _controller(running):
+    """建立控制器：進程檢查、視窗操作與等待都以記錄取代"""
+    originals = (tracker_module.psutil, vscode_module.subprocess)
+    tracker_module.psutil = SimpleNamespace(process_iter=lambda attrs: [])
+    fake = FakeSubprocess()
+    vscode_module.subprocess = fake
+    controller = VSCodeController()
+    controller.closed = 0
+
+    def close_all():
+        controller.closed += 1
+        controller.current_project_path = None
+        return True
+
+    controller.is_vscode_running = lambda: running[0]
+    controller.close_all_vscode_instances = close_all
+    controller._maximize_window_direct = lambda: True
+    controller.wait_for_workspace_ready = lambda path, timeout=None: True
+    return controller, fake, originals
+
+
+def test_reuse_window_switches_folder():
+    """第二個專案沿用視窗切換資料夾；一般關閉保留視窗，force 才真正關閉"""
+    saved = (config.VSCODE_REUSE_WINDOW, config.VSCODE_STARTUP_DELAY)
+    type(config).VSCODE_REUSE_WINDOW = True
+    type(config).VSCODE_STARTUP_DELAY = 0
+    running = [True]
+    controller, fake, originals = _controller(running)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = Path(tmp) / "proj_a", Path(tmp) / "proj_b"
+            first.mkdir()
+            second.mkdir()
+
+            assert controller.open_project(str(first))
+            assert len(fake.started) == 1 and "--reuse-window" not in fake.started[0]
+            assert controller.close_current_project() and controller.closed == 0
+
+            assert controller.open_project(str(second))
+            assert len(fake.started) == 1 and len(fake.reused) == 1
+            assert "--reuse-window" in fake.reused[0] and str(second) in fake.reused[0]
+            assert controller.current_project_path == str(second)
+
+            assert controller.close_current_project(force=True) and controller.closed == 1
+    finally:
+        tracker_module.psutil, vscode_module.subprocess = originals
+        type(config).VSCODE_REUSE_WINDOW, type(config).VSCODE_STARTUP_DELAY = saved
+    print("✅ 保留視窗切換資料夾正確")
+
+
+def test_crash_falls_back_to_cold_start():
+    """VS Code 已結束時不切換資料夾，而是完整重啟並記錄次數"""
+    saved = (config.VSCODE_REUSE_WINDOW, config.VSCODE_STARTUP_DELAY)
+    type(config).VSCODE_REUSE_WINDOW = True
+    type(config).VSCODE_STARTUP_DELAY = 0
+    running = [True]
+    controller, fake, originals = _controller(running)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = Path(tmp) / "proj_a", Path(tmp) / "proj_b"
+            first.mkdir()
+            second.mkdir()
+            assert controller.open_project(str(first))
+
+            running[0] = False
+            controller.is_vscode_running = lambda: running[0] or bool(fake.started[1:])
+            assert controller.open_project(str(second))
+            assert len(fake.started) == 2 and not fake.reused
+            assert str(second) in fake.started[1] and controller.crash_count == 1
+    finally:
+        tracker_module.psutil, vscode_module.subprocess = originals
+        type(config).VSCODE_REUSE_WINDOW, type(config).VSCODE_STARTUP_DELAY = saved
+    print("✅ 非預期結束後完整重啟正確")
+
+
+if __name__ == "__main__":
+    test_reuse_window_switches_folder()
+    test_crash_falls_back_to_cold_start()